@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Anomaly Detector
+프로젝트별 output 토큰 속도를 rolling baseline과 비교하여 루프에 빠진 에이전트를 감지
+
+세션 사용량 임계값(80/90/95%)은 루프가 20분 만에 세션을 다 쓰는 경우 너무 늦게 울린다.
+이벤트가 들어올 때마다 판정하므로 루프가 시작된 뒤 그 줄을 읽은 tick에서 바로 알림.
+
+- 프로젝트: 트랜스크립트 경로의 projects/ 다음 디렉터리 (subagent 트랜스크립트 포함)
+- 분 단위 ring (RING_MINUTES칸): 여러 트랜스크립트가 파일 단위로 읽혀 조금 늦게 들어온
+  이벤트도 받아주고, ring에서 밀려난 분을 baseline에 반영
+- ring보다 늦은 이벤트(첫 전체 스캔, 밀린 backlog)가 있었으면 조회 전에
+  flush(recent_events)로 최근 이벤트 버퍼를 시간순으로 다시 넣어 재구성
+  (이때 baseline은 버퍼 구간으로 줄어듦)
+- baseline: 활동한 분(output > 0)의 EWMA 평균 + EWMA 절대 편차 (이벤트당 O(1))
+  - 한가한 분은 제외 (넣으면 baseline이 0에 가까워져 평소 작업도 이상치가 됨)
+  - 반영할 값은 임계값에서 자름 (루프가 곧바로 새 baseline이 되지 않도록)
+- 판정: 최근 SUSTAIN_MINUTES분(진행 중인 분 포함) 평균 속도 > 임계값
+  임계값 = max(평균 + k × 편차, 평균 × MIN_RATIO, min_rate), baseline이 MIN_SAMPLES분 이상일 때만
+- 같은 프로젝트는 COOLDOWN_SECONDS 동안 다시 알리지 않음 (이벤트 시각 기준 → replay 재현 가능)
+- 시작 시 전체 스캔처럼 오래된 이벤트는 baseline에만 반영하고 알림하지 않음
+  (max_alert_delay, replay에서는 None으로 모든 시점 판정)
+
+    python3 replay.py --anomalies          # 과거 트랜스크립트에서 감지되었을 알림
+"""
+
+import math
+from collections import deque
+from operator import attrgetter
+from pathlib import Path
+
+
+# ring 길이 (이보다 늦게 들어온 이벤트는 flush에서 최근 이벤트 버퍼로 재구성)
+RING_MINUTES = 5
+# 판정에 쓰는 최근 분 수 (진행 중인 분 포함)
+SUSTAIN_MINUTES = 3
+# baseline 반감기 (활동한 분 수)
+HALF_LIFE_MINUTES = 120
+# baseline이 이만큼 쌓이기 전에는 판정하지 않음 (활동한 분 수)
+MIN_SAMPLES = 30
+
+DEFAULT_THRESHOLD_SIGMAS = 6.0
+# 평균 대비 최소 배수 (편차가 작은 프로젝트의 오탐 방지)
+MIN_RATIO = 3.0
+# 최소 output 토큰/분 (평소 사용량이 적은 프로젝트의 오탐 방지)
+DEFAULT_MIN_RATE = 4000
+# 평균 절대 편차 → 표준편차 (정규분포 기준)
+MAD_SCALE = math.sqrt(math.pi / 2)
+
+COOLDOWN_SECONDS = 30 * 60
+# 이보다 오래된 이벤트로는 알림하지 않음 (데몬 시작 시 전체 스캔)
+MAX_ALERT_DELAY_SECONDS = 10 * 60
+# 임계값의 이 비율을 넘으면 데몬 tick 간격을 줄여 감시
+WATCH_RATIO = 0.5
+WATCH_INTERVAL_SECONDS = 5
+# 출력에 포함할 최근 알림 수
+RECENT_ALERTS = 20
+
+_by_timestamp = attrgetter('timestamp')
+
+
+def project_of(path):
+    """트랜스크립트 경로 → 프로젝트 이름 (projects/ 다음 디렉터리, 없으면 상위 디렉터리)"""
+    if path is None:
+        return None
+    parts = Path(path).parts
+    for index in range(len(parts) - 2, -1, -1):
+        if parts[index] == 'projects':
+            return parts[index + 1]
+    return Path(path).parent.name
+
+
+class ProjectRate:
+    """프로젝트별 분 단위 ring + baseline"""
+
+    __slots__ = ('head', 'minute_ids', 'totals', 'files', 'mean', 'deviation', 'samples')
+
+    def __init__(self):
+        self.head = None
+        self.minute_ids = [None] * RING_MINUTES
+        self.totals = [0] * RING_MINUTES
+        self.files = [{} for _ in range(RING_MINUTES)]   # 분별 {트랜스크립트: output 토큰}
+        self.mean = 0.0
+        self.deviation = 0.0
+        self.samples = 0
+
+    def window(self):
+        """최근 SUSTAIN_MINUTES분 output 합계"""
+        total = 0
+        for minute in range(self.head - SUSTAIN_MINUTES + 1, self.head + 1):
+            slot = minute % RING_MINUTES
+            if self.minute_ids[slot] == minute:
+                total += self.totals[slot]
+        return total
+
+    def top_file(self):
+        """최근 SUSTAIN_MINUTES분 output이 가장 많은 트랜스크립트"""
+        tokens = {}
+        for minute in range(self.head - SUSTAIN_MINUTES + 1, self.head + 1):
+            slot = minute % RING_MINUTES
+            if self.minute_ids[slot] == minute:
+                for path, value in self.files[slot].items():
+                    tokens[path] = tokens.get(path, 0) + value
+        return max(tokens, key=tokens.get) if tokens else None
+
+
+class LoopDetector:
+    """
+    프로젝트별 output 토큰 속도 이상 감지 (usage_engine 리스너: add_event(event), reset())
+
+    advance(now)를 ingest 전에 호출하고, 조회 전에 flush(recent_events), 새 알림은 drain()으로 꺼냄
+    """
+
+    __slots__ = ('threshold_sigmas', 'min_rate', 'max_alert_delay', 'alpha', 'now', 'alerted_at', 'pending',
+                 'recent', 'projects', 'late_events', 'watch_until', 'stale')
+
+    def __init__(self, threshold_sigmas=DEFAULT_THRESHOLD_SIGMAS, min_rate=DEFAULT_MIN_RATE,
+                 max_alert_delay=MAX_ALERT_DELAY_SECONDS):
+        self.threshold_sigmas = threshold_sigmas
+        self.min_rate = min_rate
+        self.max_alert_delay = max_alert_delay
+        self.alpha = 1 - 0.5 ** (1 / HALF_LIFE_MINUTES)
+        self.now = None
+        self.alerted_at = {}                        # 프로젝트 → 마지막 알림 (재스캔 후에도 유지)
+        self.pending = []
+        self.recent = deque(maxlen=RECENT_ALERTS)
+        self.reset()
+
+    def reset(self):
+        """전체 재스캔 시 초기화 (알림 cooldown은 유지 → 같은 루프를 다시 알리지 않음)"""
+        self.projects = {}
+        self.late_events = 0
+        self.watch_until = None
+        self.stale = False
+
+    def set_threshold(self, threshold_sigmas, min_rate):
+        """설정 변경 (baseline 유지)"""
+        self.threshold_sigmas = threshold_sigmas
+        self.min_rate = min_rate
+
+    def advance(self, now_epoch):
+        """현재 시간 (알림 지연 판단, 감시 간격)"""
+        self.now = now_epoch
+
+    def threshold(self, rate):
+        """분당 임계값"""
+        spread = MAD_SCALE * rate.deviation
+        return max(rate.mean + self.threshold_sigmas * spread, rate.mean * MIN_RATIO, self.min_rate)
+
+    def _close(self, rate, value):
+        """ring에서 밀려난 분을 baseline에 반영"""
+        if not value:
+            return
+        if rate.samples >= MIN_SAMPLES:
+            value = min(value, self.threshold(rate))
+        rate.samples += 1
+        if rate.samples == 1:
+            rate.mean = float(value)
+            return
+        # 처음에는 단순 평균으로 빠르게 채움
+        alpha = max(self.alpha, 1 / rate.samples)
+        deviation = abs(value - rate.mean)
+        rate.mean += alpha * (value - rate.mean)
+        rate.deviation += alpha * (deviation - rate.deviation)
+
+    def _roll(self, rate, minute):
+        start = minute - RING_MINUTES + 1
+        if rate.head is not None:
+            start = max(start, rate.head + 1)
+        for target in range(start, minute + 1):
+            slot = target % RING_MINUTES
+            if rate.minute_ids[slot] is not None:
+                self._close(rate, rate.totals[slot])
+            rate.minute_ids[slot] = target
+            rate.totals[slot] = 0
+            rate.files[slot] = {}
+        rate.head = minute
+
+    def add_event(self, event):
+        """새 usage 이벤트 (O(1))"""
+        tokens = event.output_tokens
+        if not tokens:
+            return
+
+        project = project_of(event.file)
+        rate = self.projects.get(project)
+        if rate is None:
+            rate = self.projects[project] = ProjectRate()
+
+        minute = int(event.timestamp // 60)
+        if rate.head is None or minute > rate.head:
+            self._roll(rate, minute)
+        elif minute <= rate.head - RING_MINUTES:
+            self.late_events += 1
+            self.stale = True
+            return
+        slot = minute % RING_MINUTES
+        rate.totals[slot] += tokens
+        files = rate.files[slot]
+        files[event.file] = files.get(event.file, 0) + tokens
+
+        if rate.samples < MIN_SAMPLES:
+            return
+        per_minute = rate.window() / SUSTAIN_MINUTES
+        threshold = self.threshold(rate)
+        if per_minute < threshold * WATCH_RATIO:
+            return
+
+        # 임계값 근처: 진행 중인 분이 끝날 때까지 짧은 간격으로 감시
+        watch_until = (rate.head + SUSTAIN_MINUTES) * 60
+        if self.watch_until is None or watch_until > self.watch_until:
+            self.watch_until = watch_until
+        if per_minute <= threshold:
+            return
+
+        timestamp = event.timestamp
+        if self.max_alert_delay is not None and (self.now is None or timestamp < self.now - self.max_alert_delay):
+            return
+        last = self.alerted_at.get(project)
+        if last is not None and timestamp - last < COOLDOWN_SECONDS:
+            return
+
+        self.alerted_at[project] = timestamp
+        top_file = rate.top_file()
+        alert = {
+            'project': project,
+            'file': str(top_file) if top_file is not None else None,
+            'epoch': timestamp,
+            'output_tokens_per_minute': round(per_minute),
+            'baseline_per_minute': round(rate.mean),
+            'threshold_per_minute': round(threshold),
+            'ratio': round(per_minute / rate.mean, 1) if rate.mean else None
+        }
+        self.pending.append(alert)
+        self.recent.append(alert)
+
+    def flush(self, recent_events):
+        """
+        ring보다 늦은 이벤트가 있었으면 최근 이벤트 버퍼를 시간순으로 다시 넣음
+
+        Returns:
+            bool: 재구성 여부
+        """
+        if not self.stale:
+            return False
+        late_events = self.late_events
+        self.reset()
+        for event in sorted(recent_events, key=_by_timestamp):
+            self.add_event(event)
+        self.late_events = late_events
+        return True
+
+    def drain(self):
+        """아직 알리지 않은 알림 (꺼낸 뒤 비움)"""
+        alerts, self.pending = self.pending, []
+        return alerts
+
+    def next_interval(self, interval):
+        """다음 tick까지 대기 시간 (임계값 근처인 프로젝트가 있으면 짧게)"""
+        if self.watch_until is not None and self.now is not None and self.now < self.watch_until:
+            return min(interval, WATCH_INTERVAL_SECONDS)
+        return interval
+
+    def status(self):
+        """출력/통계용 요약"""
+        return {
+            'projects_tracked': len(self.projects),
+            'warmed_up': sum(1 for rate in self.projects.values() if rate.samples >= MIN_SAMPLES),
+            'late_events': self.late_events,
+            'watching': self.next_interval(math.inf) != math.inf
+        }
+
+
+def describe_alert(alert):
+    """알림 메시지 (한 줄)"""
+    ratio = f" ({alert['ratio']}× baseline)" if alert['ratio'] is not None else ''
+    return (f"{alert['project']}: {alert['output_tokens_per_minute']:,} output tokens/min{ratio}"
+            f" in {Path(alert['file']).name if alert['file'] else 'unknown transcript'}")
@@ -8,17 +8,22 @@ Calibration Learner v2 - Per-session window calibration
 3. 리셋 타임 고려 - 세션 바뀌면 해당 윈도우 데이터만 사용
 """
 
-import json
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from typing import Dict, Optional, Tuple
 
+import json_backend
+from records import CalibrationPoint
+
 
 # 파일 경로
 CALIBRATION_DATA_FILE = Path.home() / '.claude-monitor' / 'calibration_data.json'
 BASELINE_THRESHOLD = 0.15  # 초기 baseline
 
+# 모델 캐시 (history는 보관하지 않음, 파일이 바뀔 때만 다시 읽음)
+_models_cache = {'signature': None, 'models': {}}
+
 
 def get_session_window_key(now: datetime) -> str:
     """
@@ -43,35 +48,103 @@ def get_session_window_key(now: datetime) -> str:
         return '09:00-14:00'
 
 
+def _read_calibration_file() -> Dict:
+    """보정 데이터 파일 그대로 (history는 dict 리스트)"""
+    if not CALIBRATION_DATA_FILE.exists():
+        return {}
+
+    try:
+        with open(CALIBRATION_DATA_FILE, 'rb') as f:
+            return json_backend.load(f)
+    except:
+        return {}
+
+
 def load_calibration_data() -> Dict:
     """
-    보정 데이터 로드
+    보정 데이터 로드 (history는 CalibrationPoint 리스트, 깨진 포인트는 건너뜀)
 
     구조:
     {
         "15:00-20:00": {
-            "history": [...],
+            "history": [CalibrationPoint, ...],
             "model": {...}
         },
         "20:00-01:00": {...},
         ...
     }
     """
-    if not CALIBRATION_DATA_FILE.exists():
-        return {}
+    data = _read_calibration_file()
+    for window_data in data.values():
+        points = []
+        for point in window_data.get('history', []):
+            try:
+                points.append(CalibrationPoint.from_dict(point))
+            except (KeyError, TypeError):
+                continue
+        window_data['history'] = points
+    return data
+
+
+def _encode_calibration_data(data: Dict) -> Dict:
+    """파일 형식 (history의 CalibrationPoint를 dict로)"""
+    return {
+        window_key: {**window_data, 'history': [point.to_dict() for point in window_data.get('history', [])]}
+        for window_key, window_data in data.items()
+    }
+
+
+def load_calibration_models() -> Dict:
+    """
+    윈도우별 모델만 로드 (매 tick 호출용)
+
+    history 리스트는 메모리에 남기지 않고, 파일의 (mtime, size)가 바뀔 때만 다시 읽는다.
 
+    Returns:
+        dict: {window_key: model or None}
+    """
     try:
-        with open(CALIBRATION_DATA_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {}
+        stat = CALIBRATION_DATA_FILE.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+
+    if signature != _models_cache['signature']:
+        # 모델만 필요 → history를 CalibrationPoint로 바꾸지 않음
+        data = _read_calibration_file() if signature is not None else {}
+        _models_cache['models'] = {key: value.get('model') for key, value in data.items()}
+        _models_cache['signature'] = signature
+
+    return _models_cache['models']
+
+
+def clear_calibration_cache():
+    """모델 캐시 비우기 (메모리 절약)"""
+    _models_cache['signature'] = None
+    _models_cache['models'] = {}
+
+
+def export_models_cache() -> Dict:
+    """모델 캐시 (데몬 체크포인트용)"""
+    return {'signature': _models_cache['signature'], 'models': dict(_models_cache['models'])}
+
+
+def restore_models_cache(cache: Dict):
+    """
+    체크포인트의 모델 캐시 복원
+
+    파일 signature도 함께 복원하므로, 그 사이 캘리브레이션 파일이 바뀌었으면
+    다음 load_calibration_models() 호출에서 다시 읽는다.
+    """
+    _models_cache['signature'] = cache.get('signature')
+    _models_cache['models'] = dict(cache.get('models') or {})
 
 
 def save_calibration_data(data: Dict):
     """보정 데이터 저장"""
     CALIBRATION_DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(CALIBRATION_DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    with open(CALIBRATION_DATA_FILE, 'wb') as f:
+        json_backend.dump(_encode_calibration_data(data), f, indent=True)
 
 
 def get_monitor_reading() -> Optional[Tuple[float, float, str]]:
@@ -87,8 +160,8 @@ def get_monitor_reading() -> Optional[Tuple[float, float, str]]:
         return None
 
     try:
-        with open(output_file, 'r') as f:
-            data = json.load(f)
+        with open(output_file, 'rb') as f:
+            data = json_backend.load(f)
 
         if data.get('status') != 'active':
             return None
@@ -109,7 +182,7 @@ def get_monitor_reading() -> Optional[Tuple[float, float, str]]:
         return None
 
 
-def record_calibration_point(window_key: str, monitor_value: float, actual_value: float) -> Dict:
+def record_calibration_point(window_key: str, monitor_value: float, actual_value: float) -> CalibrationPoint:
     """
     보정 포인트 기록 (세션별)
 
@@ -119,20 +192,12 @@ def record_calibration_point(window_key: str, monitor_value: float, actual_value
         actual_value: 실제 값 (0.0 ~ 1.0)
 
     Returns:
-        dict: 기록된 포인트
+        CalibrationPoint: 기록된 포인트
     """
     tz = ZoneInfo('Asia/Seoul')
     now = datetime.now(tz)
 
-    offset = actual_value - monitor_value
-
-    point = {
-        'timestamp': now.isoformat(),
-        'monitor_value': round(monitor_value, 4),
-        'actual_value': round(actual_value, 4),
-        'offset': round(offset, 4),
-        'absolute_error': round(abs(offset), 4)
-    }
+    point = CalibrationPoint.create(now.isoformat(), monitor_value, actual_value)
 
     # 데이터 로드
     data = load_calibration_data()
@@ -203,7 +268,7 @@ def update_calibration_model(window_key: str) -> Dict:
     recent_history = history[-50:]
 
     # 통계 계산
-    offsets = [point['offset'] for point in recent_history]
+    offsets = [point.offset for point in recent_history]
     offset_mean = sum(offsets) / len(offsets)
     offset_variance = sum((x - offset_mean) ** 2 for x in offsets) / len(offsets)
     offset_std = offset_variance ** 0.5
@@ -243,10 +308,10 @@ def get_calibrated_value(monitor_value: float, window_key: str) -> Dict:
     Returns:
         dict: 보정 정보
     """
-    data = load_calibration_data()
+    models = load_calibration_models()
 
     # 해당 윈도우의 모델 확인
-    if window_key not in data or data[window_key]['model'] is None:
+    if models.get(window_key) is None:
         # 모델 없음 - baseline 사용
         return {
             'original_value': round(monitor_value, 4),
@@ -258,7 +323,7 @@ def get_calibrated_value(monitor_value: float, window_key: str) -> Dict:
             'window_key': window_key
         }
 
-    model = data[window_key]['model']
+    model = models[window_key]
 
     if model['sample_count'] < 10:
         # 충분한 데이터 없음 - baseline 사용
@@ -382,7 +447,7 @@ def auto_calibrate_with_prompt() -> Optional[Dict]:
     print(f"\n✅ Calibration recorded for {window_key}:")
     print(f"   Session Monitor: {session_monitor*100:.1f}%")
     print(f"   Session Actual:  {session_actual*100:.1f}%")
-    print(f"   Offset:  {point['offset']*100:+.1f}%")
+    print(f"   Offset:  {point.offset*100:+.1f}%")
     print(f"   Samples: {model['sample_count']}")
     print(f"   Confidence: {model['confidence']:.2f} ({model['status']})")
 
@@ -456,7 +521,7 @@ def main():
         show_status()
     elif args.history:
         data = load_calibration_data()
-        print(json.dumps(data, indent=2))
+        print(json_backend.dumps(_encode_calibration_data(data), indent=True).decode('utf-8'))
     elif args.calibrate:
         result = auto_calibrate_with_prompt()
         if result:
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Cold Storage
+압축된 트랜스크립트(.jsonl.gz, .jsonl.zst) 읽기 및 압축
+
+압축 파일은 더 이상 바뀌지 않으므로 한 번만 풀어서 분 단위 usage 요약으로
+만들고, 압축 파일 내용의 해시를 키로 인덱스에 저장한다. 이후에는 다시
+압축을 풀지 않고 요약만 사용한다.
+
+- 요약: 분마다 [첫 timestamp, input, output, cache_read, cache_creation, 메시지 수]
+  (세션/주간 윈도우 경계는 분 단위이므로 윈도우 합계는 원본과 동일)
+- 원본 .jsonl을 이미 끝까지 읽은 상태에서 압축본이 나타나면 중복 집계하지 않음
+- --compress: 오래된 트랜스크립트를 압축하고 원본과 요약 합계가 같은지 확인
+
+zstd는 선택 사항 (pip install zstandard)
+
+usage_scanner가 매번 import하므로 gzip/hashlib/zstandard(설치 확인 포함)는 압축 파일을
+실제로 다룰 때만 import한다.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import usage_scanner
+from records import UsageEvent
+
+
+COMPRESSED_INDEX_FILE = Path.home() / '.claude-monitor' / 'compressed_index.json'
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+DEFAULT_COLD_DAYS = 14
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_index = None
+_warned_paths = set()
+# zstandard 설치 여부 (zstd_available()에서 처음 확인)
+_zstd_available = None
+
+
+def zstd_available():
+    """zstandard 설치 여부 (처음 호출할 때 한 번 확인)"""
+    global _zstd_available
+    if _zstd_available is None:
+        import importlib.util
+        _zstd_available = importlib.util.find_spec('zstandard') is not None
+    return _zstd_available
+
+
+def is_compressed(path):
+    """압축된 트랜스크립트인지 확인"""
+    return str(path).endswith(COMPRESSED_SUFFIXES)
+
+
+def uncompressed_path(path):
+    """foo.jsonl.gz → foo.jsonl"""
+    path = str(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def open_compressed(path):
+    """
+    압축 파일을 바이너리 스트림으로 열기 (전체를 메모리에 풀지 않음)
+
+    Raises:
+        RuntimeError: zstandard가 설치되지 않은 경우
+    """
+    path = str(path)
+    if path.endswith('.gz'):
+        import gzip
+        return gzip.open(path, 'rb')
+
+    if not zstd_available():
+        raise RuntimeError('zstandard is not installed (pip install zstandard)')
+    import zstandard
+    return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+
+def decompress_errors():
+    """압축 해제 중 발생할 수 있는 예외 (zstandard 미설치, 손상된 파일 등)"""
+    errors = (OSError, EOFError, RuntimeError)
+    if zstd_available():
+        import zstandard
+        errors += (zstandard.ZstdError,)
+    return errors
+
+
+def iter_lines(stream):
+    """스트림을 줄 단위로 순회 (개행 포함, zstd reader는 readline 미지원)"""
+    pending = b''
+    while True:
+        chunk = stream.read(usage_scanner.READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        chunk = pending + chunk
+        lines = chunk.split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+    if pending:
+        yield pending
+
+
+def hash_file(path):
+    """파일 내용 해시 (sha256)"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_summary():
+    """분 단위 요약 생성"""
+    return {'bytes_read': 0, 'source_size': 0, 'minutes': {}}
+
+
+def add_line_to_summary(summary, line):
+    """트랜스크립트 한 줄을 요약에 추가"""
+    summary['bytes_read'] += len(line)
+    if line.endswith(b'\n'):
+        # 원본 커서와 비교할 크기 (마지막 개행까지)
+        summary['source_size'] = summary['bytes_read']
+    event = usage_scanner.parse_usage_line(line)
+    if event is None:
+        return
+
+    minute = int(event.timestamp // 60)
+    bucket = summary['minutes'].get(minute)
+    if bucket is None:
+        summary['minutes'][minute] = [
+            event.timestamp,
+            event.input_tokens,
+            event.output_tokens,
+            event.cache_read_tokens,
+            event.cache_creation_tokens,
+            1
+        ]
+        return
+
+    bucket[0] = min(bucket[0], event.timestamp)
+    bucket[1] += event.input_tokens
+    bucket[2] += event.output_tokens
+    bucket[3] += event.cache_read_tokens
+    bucket[4] += event.cache_creation_tokens
+    bucket[5] += 1
+
+
+def finish_summary(summary):
+    """요약 → 인덱스 항목 (시간순 bucket 리스트)"""
+    return {
+        'source_size': summary['source_size'],
+        'buckets': [summary['minutes'][minute] for minute in sorted(summary['minutes'])]
+    }
+
+
+def summarize_stream(stream):
+    """JSONL 스트림 → 인덱스 항목"""
+    summary = new_summary()
+    for line in iter_lines(stream):
+        add_line_to_summary(summary, line)
+    return finish_summary(summary)
+
+
+def summary_totals(entry):
+    """인덱스 항목의 토큰 합계"""
+    totals = [0, 0, 0, 0, 0]
+    for bucket in entry['buckets']:
+        for i in range(5):
+            totals[i] += bucket[i + 1]
+    return dict(zip(('input_tokens', 'output_tokens', 'cache_read_tokens',
+                     'cache_creation_tokens', 'messages_count'), totals))
+
+
+def load_compressed_index():
+    """압축 파일 인덱스 로드 (프로세스당 한 번)"""
+    global _index
+    if _index is None:
+        _index = {'summaries': {}, 'paths': {}}
+        if COMPRESSED_INDEX_FILE.exists():
+            try:
+                with open(COMPRESSED_INDEX_FILE, 'r') as f:
+                    _index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Failed to load compressed index: {e}")
+    return _index
+
+
+def drop_index_cache():
+    """메모리에 올린 인덱스 비우기 (다음 조회 때 다시 로드)"""
+    global _index
+    _index = None
+
+
+def save_compressed_index(index):
+    """압축 파일 인덱스 저장 (원자적 교체)"""
+    COMPRESSED_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = COMPRESSED_INDEX_FILE.with_suffix('.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_file, COMPRESSED_INDEX_FILE)
+
+
+def get_compressed_summary(path, stat):
+    """
+    압축 파일의 요약 (해시가 인덱스에 있으면 압축을 풀지 않음)
+
+    경로별 (size, mtime, inode)가 같으면 해시도 다시 계산하지 않는다.
+
+    Returns:
+        dict: 인덱스 항목 (읽을 수 없으면 None)
+    """
+    index = load_compressed_index()
+    path = str(path)
+    changed = False
+
+    known = index['paths'].get(path)
+    if known is not None and (known['size'], known['mtime'], known['inode']) == \
+            (stat.st_size, stat.st_mtime, stat.st_ino):
+        content_hash = known['hash']
+    else:
+        content_hash = hash_file(path)
+        index['paths'][path] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'inode': stat.st_ino,
+            'hash': content_hash
+        }
+        changed = True
+
+    entry = index['summaries'].get(content_hash)
+    if entry is None:
+        try:
+            with open_compressed(path) as stream:
+                entry = summarize_stream(stream)
+        except decompress_errors() as e:
+            # zstandard 미설치, 손상된 파일 등 → 경고 한 번만
+            if path not in _warned_paths:
+                _warned_paths.add(path)
+                print(f"Warning: Cannot read compressed transcript {path}: {e}")
+            return None
+        index['summaries'][content_hash] = entry
+        changed = True
+
+    if changed:
+        save_compressed_index(index)
+
+    return entry
+
+
+def iter_compressed_events(path, stat, cursors):
+    """
+    압축 파일의 분 단위 요약 이벤트 순회
+
+    같은 트랜스크립트의 원본(.jsonl)을 이미 끝까지 읽었다면 (압축 직후)
+    이미 집계된 것이므로 아무것도 내보내지 않는다.
+
+    Yields:
+        UsageEvent: 분 단위 요약 이벤트 (messages = 합쳐진 메시지 수)
+    """
+    entry = get_compressed_summary(path, stat)
+    if entry is None:
+        return
+
+    original = cursors.get(uncompressed_path(path))
+    if original is not None and original['offset'] >= entry['source_size']:
+        return
+
+    path = str(path)
+    for timestamp, input_tokens, output_tokens, cache_read, cache_creation, messages in entry['buckets']:
+        yield UsageEvent(timestamp, input_tokens, output_tokens, cache_read, cache_creation, messages, path)
+
+
+def compress_transcript(path, use_zstd=False):
+    """
+    트랜스크립트 하나를 압축하고 원본 삭제
+
+    압축하면서 원본 요약을 만들고, 압축본을 다시 풀어 요약 합계가 같은지
+    확인한 뒤에만 원본을 지운다. 요약은 인덱스에 미리 넣어 두므로
+    모니터가 압축본을 다시 풀 필요가 없다.
+
+    Returns:
+        tuple: (압축 파일 경로, 원본 크기, 압축 크기)
+    """
+    path = Path(path)
+    suffix = '.zst' if use_zstd else '.gz'
+    target = path.with_name(path.name + suffix)
+    # 임시 파일은 세션 glob에 걸리지 않는 이름으로
+    tmp_file = path.with_name('.' + path.name + '.tmp' + suffix)
+
+    summary = new_summary()
+    with open(path, 'rb') as source:
+        if use_zstd:
+            if not zstd_available():
+                raise RuntimeError('zstandard is not installed (pip install zstandard)')
+            import zstandard
+            out = zstandard.ZstdCompressor(level=10).stream_writer(open(tmp_file, 'wb'), closefd=True)
+        else:
+            import gzip
+            out = gzip.open(tmp_file, 'wb', compresslevel=9)
+        with out:
+            for line in source:
+                add_line_to_summary(summary, line)
+                out.write(line)
+
+    entry = finish_summary(summary)
+    with open_compressed(tmp_file) as stream:
+        check = summarize_stream(stream)
+    if summary_totals(check) != summary_totals(entry) or check['source_size'] != entry['source_size']:
+        tmp_file.unlink()
+        raise RuntimeError(f'Verification failed for {path}')
+
+    stat = os.stat(tmp_file)
+    content_hash = hash_file(tmp_file)
+    os.replace(tmp_file, target)
+
+    index = load_compressed_index()
+    index['summaries'][content_hash] = entry
+    index['paths'][str(target)] = {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'inode': stat.st_ino,
+        'hash': content_hash
+    }
+    save_compressed_index(index)
+
+    original_size = summary['bytes_read']
+    path.unlink()
+    return target, original_size, stat.st_size
+
+
+def find_cold_transcripts(projects_dir=None, days=DEFAULT_COLD_DAYS, now=None):
+    """days일 이상 수정되지 않은 .jsonl 트랜스크립트"""
+    if projects_dir is None:
+        projects_dir = Path.home() / '.claude' / 'projects'
+    if now is None:
+        now = time.time()
+
+    cutoff = now - days * 86400
+    # 탐색 단계의 stat 재사용 (경로순 정렬)
+    return [path for path in usage_scanner.walk_sessions(projects_dir)
+            if not is_compressed(path) and path.stat_result.st_mtime < cutoff]
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Claude Monitor cold storage')
+    parser.add_argument('--compress', action='store_true',
+                        help='Compress transcripts that have not been modified recently')
+    parser.add_argument('--days', type=int, default=DEFAULT_COLD_DAYS,
+                        help=f'Compress transcripts untouched for this many days (default: {DEFAULT_COLD_DAYS})')
+    parser.add_argument('--zstd', action='store_true',
+                        help='Use zstd instead of gzip (requires zstandard)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='List cold transcripts without compressing')
+
+    args = parser.parse_args()
+
+    if not args.compress:
+        parser.print_help()
+        return 0
+
+    if args.zstd and not zstd_available():
+        print("❌ zstandard is not installed (pip install zstandard)")
+        return 1
+
+    cold = find_cold_transcripts(days=args.days)
+    print(f"📂 {len(cold)} transcripts untouched for {args.days}+ days")
+
+    if args.dry_run:
+        for path in cold:
+            print(f"   {path}")
+        return 0
+
+    total_before = 0
+    total_after = 0
+    for path in cold:
+        try:
+            target, before, after = compress_transcript(path, args.zstd)
+        except (OSError, RuntimeError) as e:
+            print(f"   ⚠️  {path}: {e}")
+            continue
+        total_before += before
+        total_after += after
+        print(f"   ✅ {target.name}: {before:,} → {after:,} bytes")
+
+    if total_before:
+        print(f"\n💾 {total_before:,} → {total_after:,} bytes ({total_after / total_before * 100:.1f}%)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Config Store
+설정 파일 스키마 검증, 읽기 전용 설정, 변경 감지
+
+- 로드 시 한 번 스키마로 검증하고 기본값을 채움
+  (빠진 키가 monitor_once 깊은 곳에서 KeyError로 드러나지 않도록)
+- 검증된 설정은 읽기 전용 (dict → MappingProxyType, list → tuple)
+  기존 코드의 config['a']['b'], config.get('a', {}) 접근은 그대로 동작
+- ConfigWatcher: 파일 signature(mtime/size/inode)가 바뀌면 다시 읽고
+  바뀐 키 경로를 돌려줌 (데몬이 tick 사이에 설정을 통째로 교체)
+- 새 설정이 잘못되었으면 기존 설정을 유지
+"""
+
+import json
+import os
+from pathlib import Path
+from types import MappingProxyType
+
+from timezone_windows import get_zone
+
+
+CONFIG_FILE = Path.home() / '.claude-monitor' / 'config.json'
+
+REQUIRED = object()   # 기본값 대신 사용: 없으면 오류
+NUMBER = (int, float)
+
+# 스키마: {key: 하위 스키마 dict 또는 (타입, 기본값[, 검사 함수])}
+# - 기본값 None: 선택 항목 (없으면 채우지 않음, 사용하는 쪽의 기본값 사용)
+# - 스키마에 없는 키(note, metadata 등)는 그대로 유지
+LIMIT_SCHEMA = {
+    'input_tokens_per_minute': (NUMBER, REQUIRED),
+    'output_tokens_per_minute': (NUMBER, REQUIRED),
+    'requests_per_minute': (NUMBER, None),
+}
+
+
+def _check_timezone(value):
+    try:
+        get_zone(value)
+    except (KeyError, ValueError):
+        return f"unknown timezone '{value}'"
+    return None
+
+
+def _check_thresholds(value):
+    if not all(isinstance(v, NUMBER) and not isinstance(v, bool) and 0 < v <= 100 for v in value):
+        return 'thresholds must be percentages between 0 and 100'
+    return None
+
+
+def _check_positive(value):
+    return None if value > 0 else 'must be positive'
+
+
+def _check_hour(value):
+    return None if 0 <= value < 24 else 'must be an hour between 0 and 23'
+
+
+CONFIG_SCHEMA = {
+    'plan': {
+        'name': (str, REQUIRED),
+    },
+    'rate_limits': {
+        'session': dict(LIMIT_SCHEMA, window_hours=(NUMBER, 5, _check_positive)),
+        'weekly': dict(LIMIT_SCHEMA, window_hours=(NUMBER, 168, _check_positive)),
+    },
+    'reset_schedule': {
+        'session_base_hour': (int, None, _check_hour),
+        'weekly_reset': (dict, None),
+    },
+    'display_settings': {
+        'timezone': (str, 'Asia/Seoul', _check_timezone),
+        'timezone_abbr': (str, 'KST'),
+    },
+    'notifications': {
+        'enabled': (bool, None),
+        'thresholds': (list, None, _check_thresholds),
+        'backends': (list, None),
+        'webhook_url': (str, None),
+        'coalesce_seconds': (NUMBER, None),
+        'max_per_minute': (int, None, _check_positive),
+    },
+    'forecast': {
+        'half_life_minutes': (NUMBER, None, _check_positive),
+        'alert_minutes': (NUMBER, None),
+    },
+    'anomaly': {
+        'enabled': (bool, None),
+        'threshold_sigmas': (NUMBER, None, _check_positive),
+        'min_tokens_per_minute': (NUMBER, None, _check_positive),
+    },
+    'sources': {
+        'enabled': (list, None),
+    },
+}
+
+
+class ConfigError(ValueError):
+    """설정 파일 오류 (errors: 문제 목록)"""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _type_name(types):
+    if types is NUMBER:
+        return 'number'
+    return types.__name__
+
+
+def _validate(value, schema, path, errors):
+    """스키마 검증 + 기본값 채우기 (새 dict 반환)"""
+    result = dict(value)
+
+    for key, spec in schema.items():
+        key_path = f'{path}.{key}' if path else key
+
+        if isinstance(spec, dict):
+            child = result.get(key, {})
+            if not isinstance(child, dict):
+                errors.append(f'{key_path}: expected an object')
+                continue
+            result[key] = _validate(child, spec, key_path, errors)
+            continue
+
+        types, default = spec[0], spec[1]
+        check = spec[2] if len(spec) > 2 else None
+
+        if key not in result:
+            if default is REQUIRED:
+                errors.append(f'{key_path}: missing')
+            elif default is not None:
+                result[key] = default
+            continue
+
+        item = result[key]
+        # bool은 int의 하위 타입이므로 숫자 항목에서 제외
+        if not isinstance(item, types) or (isinstance(item, bool) and types is not bool):
+            errors.append(f'{key_path}: expected {_type_name(types)}, got {type(item).__name__}')
+            continue
+        if check is not None:
+            problem = check(item)
+            if problem:
+                errors.append(f'{key_path}: {problem}')
+
+    return result
+
+
+def freeze(value):
+    """읽기 전용으로 변환 (dict → MappingProxyType, list → tuple)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """JSON 출력용으로 되돌림"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def validate_config(raw):
+    """
+    설정 검증
+
+    Args:
+        raw: config.json 내용 (dict)
+
+    Returns:
+        MappingProxyType: 기본값이 채워진 읽기 전용 설정
+
+    Raises:
+        ConfigError: 스키마에 맞지 않는 경우 (모든 문제를 한 번에 보고)
+    """
+    if not isinstance(raw, dict):
+        raise ConfigError(['config must be a JSON object'])
+
+    errors = []
+    config = _validate(raw, CONFIG_SCHEMA, '', errors)
+    if errors:
+        raise ConfigError(errors)
+    return freeze(config)
+
+
+def read_config(config_file=CONFIG_FILE):
+    """
+    설정 파일 읽기 + 검증
+
+    Raises:
+        FileNotFoundError: 파일이 없는 경우
+        ConfigError: JSON 또는 스키마 오류
+    """
+    with open(config_file, 'r') as f:
+        try:
+            raw = json.load(f)
+        except ValueError as e:
+            raise ConfigError([f'invalid JSON: {e}'])
+    return validate_config(raw)
+
+
+def diff_config(old, new, path=''):
+    """
+    바뀐 설정 키 경로
+
+    Returns:
+        set: {'rate_limits.session.output_tokens_per_minute', ...}
+    """
+    changed = set()
+    for key in set(old) | set(new):
+        key_path = f'{path}.{key}' if path else key
+        old_value = old.get(key)
+        new_value = new.get(key)
+        if isinstance(old_value, MappingProxyType) and isinstance(new_value, MappingProxyType):
+            changed |= diff_config(old_value, new_value, key_path)
+        elif old_value != new_value:
+            changed.add(key_path)
+    return changed
+
+
+def file_signature(path):
+    """파일 변경 감지용 (mtime_ns, size, inode), 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class ConfigWatcher:
+    """
+    설정 파일 변경 감지
+
+    poll()은 파일 signature만 확인하므로 매 tick 호출해도 stat 1회 비용.
+    """
+
+    def __init__(self, config, config_file=CONFIG_FILE):
+        self.config = config
+        self.config_file = config_file
+        self.signature = file_signature(config_file)
+
+    def poll(self, force=False):
+        """
+        바뀌었으면 다시 읽어 self.config 교체
+
+        Args:
+            force: signature와 관계없이 다시 읽음 (SIGHUP)
+
+        Returns:
+            set: 바뀐 키 경로 (바뀌지 않았거나 새 설정이 잘못되었으면 빈 set)
+        """
+        signature = file_signature(self.config_file)
+        if not force and signature == self.signature:
+            return set()
+        self.signature = signature
+
+        try:
+            new_config = read_config(self.config_file)
+        except OSError as e:
+            print(f"❌ Config reload failed, keeping current config: {e}")
+            return set()
+        except ConfigError as e:
+            print(f"❌ Invalid configuration in {self.config_file}, keeping current config")
+            for error in e.errors:
+                print(f"   - {error}")
+            return set()
+
+        changed = diff_config(self.config, new_config)
+        self.config = new_config
+        return changed
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Daemon Socket
+실행 중인 데몬의 최신 출력을 Unix 도메인 소켓으로 제공
+
+연결하면 데몬이 마지막 tick의 JSON 출력을 보내고 쓰기 방향을 닫는다 (shutdown).
+--once는 데몬이 있으면 트랜스크립트를 읽지 않고 이 값을 바로 출력한다.
+
+출력을 다 읽은 클라이언트는 JSON 메시지 하나를 보내고 닫을 수 있다 (send_to_daemon).
+claude-usage-sync(Native Messaging 호스트)가 Extension 관측값을 파일 없이 데몬에 넘기는 경로.
+데몬은 tick 사이에 drain_messages()로 꺼내 소스에 반영한다.
+"""
+
+import os
+import sys
+
+# socket, threading, pathlib은 사용할 때 import (--once 빠른 경로는 os, sys만 사용)
+
+
+SOCKET_FILE = os.path.join(os.path.expanduser('~'), '.claude-monitor', 'daemon.sock')
+DEFAULT_QUERY_TIMEOUT = 0.5
+RECV_SIZE = 64 * 1024
+# 클라이언트 메시지 (사용량 관측값은 수백 바이트)
+MAX_MESSAGE_BYTES = 64 * 1024
+MESSAGE_TIMEOUT = 0.5
+# 이 인자가 있으면 --once도 데몬 출력을 쓰지 않음 (monitor_daemon main에서 처리)
+ONCE_BYPASS_ARGS = ('--rescan', '-h', '--help')
+
+
+class OutputServer:
+    """최신 출력을 제공하는 소켓 서버 (백그라운드 스레드)"""
+
+    def __init__(self, socket_file=SOCKET_FILE):
+        import threading
+        from collections import deque
+        from pathlib import Path
+
+        self.socket_file = Path(socket_file)
+        self._payload = None
+        self._lock = threading.Lock()
+        self._messages = deque()
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        소켓 열기
+
+        Returns:
+            bool: 성공 여부 (Unix 소켓 미지원 환경이면 False)
+        """
+        import socket
+        import threading
+
+        if not hasattr(socket, 'AF_UNIX'):
+            return False
+
+        self.socket_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.socket_file.unlink()
+        except FileNotFoundError:
+            pass
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(str(self.socket_file))
+        os.chmod(self.socket_file, 0o600)
+        self._server.listen(8)
+
+        self._thread = threading.Thread(target=self._serve, name='output-socket', daemon=True)
+        self._thread.start()
+        return True
+
+    def publish(self, payload):
+        """최신 출력 교체 (bytes)"""
+        with self._lock:
+            self._payload = payload
+
+    def has_messages(self):
+        """tick 사이 대기를 끝낼 메시지가 있는지"""
+        return bool(self._messages)
+
+    def drain_messages(self):
+        """받은 클라이언트 메시지 (꺼낸 뒤 비움, 받은 순서)"""
+        messages = []
+        while self._messages:
+            messages.append(self._messages.popleft())
+        return messages
+
+    def _serve(self):
+        import socket
+
+        # close()가 self._server를 None으로 바꿔도 닫힌 소켓의 accept 오류로 끝나도록 지역 변수로
+        server = self._server
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # close()
+            with conn:
+                with self._lock:
+                    payload = self._payload
+                try:
+                    if payload is not None:
+                        conn.sendall(payload)
+                    conn.shutdown(socket.SHUT_WR)
+                    message = self._read_message(conn)
+                except (OSError, ValueError):
+                    continue
+                if message is not None:
+                    self._messages.append(message)
+
+    def _read_message(self, conn):
+        """클라이언트가 보낸 JSON 메시지 (조회만 한 클라이언트는 바로 닫으므로 None)"""
+        import json
+
+        conn.settimeout(MESSAGE_TIMEOUT)
+        chunks = []
+        size = 0
+        while True:
+            chunk = conn.recv(RECV_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_MESSAGE_BYTES:
+                raise ValueError('message too large')
+            chunks.append(chunk)
+        return json.loads(b''.join(chunks)) if chunks else None
+
+    def close(self):
+        """소켓 닫기"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        try:
+            self.socket_file.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def query_daemon(socket_file=SOCKET_FILE, timeout=DEFAULT_QUERY_TIMEOUT):
+    """
+    실행 중인 데몬의 최신 출력 요청
+
+    Returns:
+        bytes: JSON 출력 (데몬이 없거나 아직 출력이 없으면 None)
+    """
+    if not os.path.exists(socket_file):
+        return None
+
+    import socket
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_file))
+            while True:
+                chunk = client.recv(RECV_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    return b''.join(chunks) or None
+
+
+def send_to_daemon(message, socket_file=SOCKET_FILE, timeout=DEFAULT_QUERY_TIMEOUT):
+    """
+    실행 중인 데몬에 JSON 메시지 전달 (출력을 끝까지 읽은 뒤 보내고 닫음)
+
+    Returns:
+        bool: 데몬이 응답했으면 True (데몬이 없으면 False → 호출자가 파일 등으로 대체)
+    """
+    if not os.path.exists(socket_file):
+        return False
+
+    import json
+    import socket
+    if not hasattr(socket, 'AF_UNIX'):
+        return False
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_file))
+            while client.recv(RECV_SIZE):
+                pass
+            client.sendall(json.dumps(message).encode('utf-8'))
+            client.shutdown(socket.SHUT_WR)
+    except OSError:
+        return False
+    return True
+
+
+def answer_once(argv):
+    """
+    `monitor_daemon.py --once` 빠른 경로: 실행 중인 데몬의 출력을 그대로 출력
+
+    monitor_daemon이 나머지 모듈(argparse 포함)을 import하기 전에 호출한다.
+
+    Args:
+        argv: 명령행 인자 (sys.argv[1:])
+
+    Returns:
+        bool: 데몬 출력으로 응답했으면 True (아니면 monitor_daemon main이 처리)
+    """
+    if '--once' not in argv or any(arg in ONCE_BYPASS_ARGS for arg in argv):
+        return False
+    payload = query_daemon()
+    if payload is None:
+        return False
+    sys.stdout.write(payload.decode('utf-8') + '\n')
+    return True
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Burn Rate Forecaster
+최근 토큰 사용 속도(EWMA)로 윈도우별 limit 도달 시각 예측
+
+"현재 속도면 16:42에 100% 도달 (리셋 38분 전)"
+
+- 이벤트는 분 단위 bucket에 O(1)로 누적 (증분)
+- 속도는 최근 HORIZON 분의 완료된 bucket에 대한 지수 가중 평균
+- --backtest: 과거 트랜스크립트를 재생하여 예측 오차 측정
+"""
+
+import bisect
+import math
+import time
+
+from usage_scanner import load_all_events
+
+
+DEFAULT_HALF_LIFE_MINUTES = 10
+DEFAULT_HORIZON_MINUTES = 60
+
+
+class BurnRateForecaster:
+    """
+    분당 토큰 사용 속도 EWMA
+
+    input 속도는 input + cache_creation (calculate_usage_percentage와 동일 기준)
+    """
+
+    __slots__ = ('half_life_minutes', 'horizon_minutes', 'alpha', 'buckets', 'cutoff_minute')
+
+    def __init__(self, half_life_minutes=DEFAULT_HALF_LIFE_MINUTES, horizon_minutes=DEFAULT_HORIZON_MINUTES):
+        self.half_life_minutes = half_life_minutes
+        self.horizon_minutes = horizon_minutes
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life_minutes)
+        self.buckets = {}        # minute -> [input_tokens, output_tokens]
+        self.cutoff_minute = None
+
+    def set_half_life(self, half_life_minutes):
+        """반감기 변경 (설정 reload, bucket은 그대로 사용)"""
+        self.half_life_minutes = half_life_minutes
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life_minutes)
+
+    def reset(self):
+        """전체 재스캔 시 초기화"""
+        self.buckets = {}
+
+    def advance(self, now_epoch):
+        """현재 시간 기준으로 horizon 밖 bucket 정리 (ingest 전에 호출)"""
+        self.cutoff_minute = int(now_epoch // 60) - self.horizon_minutes
+        for minute in [m for m in self.buckets if m < self.cutoff_minute]:
+            del self.buckets[minute]
+
+    def add_event(self, event):
+        """새 usage 이벤트 누적 (O(1))"""
+        minute = int(event.timestamp // 60)
+        if self.cutoff_minute is not None and minute < self.cutoff_minute:
+            return
+
+        bucket = self.buckets.get(minute)
+        if bucket is None:
+            bucket = [0, 0]
+            self.buckets[minute] = bucket
+        bucket[0] += event.input_tokens + event.cache_creation_tokens
+        bucket[1] += event.output_tokens
+
+    def rates(self, now_epoch):
+        """
+        현재 분당 토큰 속도 (완료된 분만 사용)
+
+        Returns:
+            dict: {'input': tpm, 'output': tpm}
+        """
+        now_minute = int(now_epoch // 60)
+        input_rate = 0.0
+        output_rate = 0.0
+        decay = 1.0 - self.alpha
+
+        for minute in range(now_minute - self.horizon_minutes, now_minute):
+            bucket = self.buckets.get(minute)
+            if bucket is None:
+                input_rate *= decay
+                output_rate *= decay
+            else:
+                input_rate = self.alpha * bucket[0] + decay * input_rate
+                output_rate = self.alpha * bucket[1] + decay * output_rate
+
+        return {'input': input_rate, 'output': output_rate}
+
+    def merge(self, others):
+        """다른 forecaster들의 bucket을 더함 (multi-root 합계용)"""
+        for other in others:
+            for minute, (input_tokens, output_tokens) in other.buckets.items():
+                bucket = self.buckets.get(minute)
+                if bucket is None:
+                    bucket = [0, 0]
+                    self.buckets[minute] = bucket
+                bucket[0] += input_tokens
+                bucket[1] += output_tokens
+
+    def forecast_window(self, now_epoch, display_percentage, limits, reset_epoch):
+        """
+        윈도우의 limit 도달 시각 예측
+
+        Args:
+            now_epoch: 현재 시간 (UTC epoch)
+            display_percentage: 현재 표시 사용량 (%, 캘리브레이션 반영)
+            limits: rate limit 설정 (session 또는 weekly)
+            reset_epoch: 윈도우 리셋 시간 (UTC epoch, rolling 윈도우는 None)
+
+        Returns:
+            dict: 예측 정보
+        """
+        rates = self.rates(now_epoch)
+        window_minutes = limits['window_hours'] * 60
+        total_input_limit = limits['input_tokens_per_minute'] * window_minutes
+        total_output_limit = limits['output_tokens_per_minute'] * window_minutes
+
+        # 분당 퍼센트 증가량 (input/output 중 빠른 쪽)
+        input_pct_rate = rates['input'] / total_input_limit * 100 if total_input_limit > 0 else 0.0
+        output_pct_rate = rates['output'] / total_output_limit * 100 if total_output_limit > 0 else 0.0
+        pct_per_minute = max(input_pct_rate, output_pct_rate)
+
+        if reset_epoch is None:
+            minutes_until_reset = math.inf
+        else:
+            minutes_until_reset = max((reset_epoch - now_epoch) / 60, 0)
+        remaining_pct = max(100.0 - display_percentage, 0.0)
+
+        if remaining_pct == 0:
+            minutes_to_limit = 0.0
+        elif pct_per_minute > 0:
+            minutes_to_limit = remaining_pct / pct_per_minute
+        else:
+            minutes_to_limit = math.inf
+
+        hits_before_reset = minutes_to_limit < minutes_until_reset
+        exhaustion_epoch = now_epoch + minutes_to_limit * 60 if hits_before_reset else None
+
+        projected_at_reset = None
+        minutes_before_reset = None
+        if reset_epoch is not None:
+            projected_at_reset = round(display_percentage + pct_per_minute * minutes_until_reset, 1)
+            if hits_before_reset:
+                minutes_before_reset = round(minutes_until_reset - minutes_to_limit, 1)
+
+        return {
+            'tokens_per_minute': {
+                'input': round(rates['input'], 1),
+                'output': round(rates['output'], 1)
+            },
+            'percent_per_hour': round(pct_per_minute * 60, 2),
+            'projected_percentage_at_reset': projected_at_reset,
+            'hits_limit_before_reset': hits_before_reset,
+            'minutes_to_limit': round(minutes_to_limit, 1) if hits_before_reset else None,
+            'minutes_before_reset': minutes_before_reset,
+            'exhaustion_epoch': exhaustion_epoch,
+            'half_life_minutes': self.half_life_minutes
+        }
+
+
+def describe_forecast(forecast, exhaustion_time=None):
+    """
+    예측 정보 → 상태 문구
+
+    예: "At the current pace you hit 100% at 16:42, 38 minutes before reset"
+    """
+    if not forecast['hits_limit_before_reset']:
+        if forecast['projected_percentage_at_reset'] is None:
+            return "No usage in recent minutes"
+        return f"On pace for {forecast['projected_percentage_at_reset']}% at reset"
+
+    if forecast['minutes_to_limit'] == 0:
+        return "Limit reached"
+
+    at = f" at {exhaustion_time.strftime('%H:%M')}" if exhaustion_time is not None else ''
+    if forecast['minutes_before_reset'] is None:
+        return f"At the current pace you hit 100%{at}"
+    return (f"At the current pace you hit 100%{at}, "
+            f"{int(forecast['minutes_before_reset'])} minutes before reset")
+
+
+def backtest(events, horizon_minutes=30, step_minutes=5, half_life_minutes=DEFAULT_HALF_LIFE_MINUTES):
+    """
+    과거 이벤트를 시간순으로 재생하며 예측 오차 측정
+
+    각 시점 t에서 forecaster의 속도로 (t, t + horizon] 구간의 토큰 수를 예측하고
+    실제 사용량과 비교한다. 사용량이 전혀 없는 구간은 건너뛴다.
+
+    Args:
+        events: 시간순 usage 이벤트
+        horizon_minutes: 예측 구간 (분)
+        step_minutes: 평가 간격 (분)
+        half_life_minutes: EWMA 반감기 (분)
+
+    Returns:
+        dict: 오차 통계 (output 토큰 기준)
+    """
+    if not events:
+        return {'samples': 0}
+
+    forecaster = BurnRateForecaster(half_life_minutes=half_life_minutes)
+    step = step_minutes * 60
+    horizon = horizon_minutes * 60
+
+    # 누적 output 토큰 (이분 탐색용 prefix sum)
+    timestamps = [event.timestamp for event in events]
+    cumulative = [0]
+    for event in events:
+        cumulative.append(cumulative[-1] + event.output_tokens)
+
+    abs_errors = []
+    signed_errors = []
+    actual_total = 0
+    index = 0
+    t = (int(timestamps[0]) // step + 1) * step
+    end = timestamps[-1]
+
+    while t <= end:
+        forecaster.advance(t)
+        while index < len(events) and timestamps[index] < t:
+            forecaster.add_event(events[index])
+            index += 1
+
+        predicted = forecaster.rates(t)['output'] * horizon_minutes
+        hi = bisect.bisect_right(timestamps, t + horizon)
+        actual = cumulative[hi] - cumulative[index]
+
+        if predicted > 0 or actual > 0:
+            abs_errors.append(abs(predicted - actual))
+            signed_errors.append(predicted - actual)
+            actual_total += actual
+
+        t += step
+
+    samples = len(abs_errors)
+    if samples == 0:
+        return {'samples': 0}
+
+    mae = sum(abs_errors) / samples
+    return {
+        'samples': samples,
+        'horizon_minutes': horizon_minutes,
+        'half_life_minutes': half_life_minutes,
+        'mae_output_tokens': round(mae, 1),
+        'bias_output_tokens': round(sum(signed_errors) / samples, 1),
+        'wape': round(sum(abs_errors) / actual_total, 3) if actual_total > 0 else None
+    }
+
+
+def main():
+    """메인 함수 (backtest CLI)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Burn Rate Forecaster')
+    parser.add_argument('--backtest', action='store_true',
+                        help='Replay historical transcripts and report forecast error')
+    parser.add_argument('--horizon', type=int, default=30,
+                        help='Forecast horizon in minutes (default: 30)')
+    parser.add_argument('--step', type=int, default=5,
+                        help='Evaluation step in minutes (default: 5)')
+    parser.add_argument('--half-life', type=float, nargs='+', default=[DEFAULT_HALF_LIFE_MINUTES],
+                        help='EWMA half-life(s) in minutes to compare')
+
+    args = parser.parse_args()
+
+    if not args.backtest:
+        parser.print_help()
+        return 0
+
+    started = time.perf_counter()
+    events = load_all_events()
+    print(f"📂 Loaded {len(events):,} usage events in {time.perf_counter() - started:.2f}s")
+
+    for half_life in args.half_life:
+        result = backtest(events, args.horizon, args.step, half_life)
+        if result['samples'] == 0:
+            print("No usage to evaluate.")
+            break
+        print(f"\n📊 Half-life {half_life:g}m, horizon {args.horizon}m ({result['samples']:,} samples)")
+        print(f"   MAE:  {result['mae_output_tokens']:,.1f} output tokens")
+        print(f"   Bias: {result['bias_output_tokens']:+,.1f} output tokens")
+        if result['wape'] is not None:
+            print(f"   WAPE: {result['wape'] * 100:.1f}%")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
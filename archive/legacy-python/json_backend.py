@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - JSON Backend
+트랜스크립트 줄 디코딩과 출력/저장 파일 인코딩에 쓰는 JSON 계층
+
+설치된 라이브러리 중 빠른 것을 사용하고 없으면 표준 json으로 대체:
+    msgspec → orjson → json
+(트랜스크립트 디코딩은 typed struct를 쓰는 msgspec이 가장 빠르고, 출력 인코딩은 비슷함
+ → json_benchmark.py)
+CLAUDE_MONITOR_JSON 환경 변수(msgspec, orjson, json)로 강제할 수 있음 (미설치면 무시)
+
+백엔드는 import 시점이 아니라 처음 쓸 때 선택 (msgspec import만 수십 ms → --once 시작 시간):
+- decode_usage_line(): 트랜스크립트 대량 디코딩 → 처음 호출할 때 선호 백엔드 선택
+- loads/dumps/load/dump: 작은 문서(설정, 출력) → 이미 선택된 백엔드가 있으면 그것을,
+  없으면 표준 json (환경 변수로 지정했으면 그 백엔드)
+  → 새 줄이 없는 --once(인덱스)와 데몬 소켓 응답은 빠른 백엔드를 import하지 않음
+
+- loads(data): bytes/str → 객체 (실패 시 DECODE_ERRORS, 모든 백엔드에서 ValueError 하위 클래스)
+- dumps(obj, indent=False): 객체 → UTF-8 bytes (indent=True면 2칸 들여쓰기)
+- load(f) / dump(obj, f, indent=False): 바이너리 파일 객체
+- decode_usage_line(line): assistant 메시지의 usage 필드만 추출
+  (msgspec은 필요한 필드만 가진 typed struct로 디코딩하여 나머지는 건너뜀)
+
+출력은 백엔드와 관계없이 UTF-8 (ensure_ascii 없음)
+"""
+
+import os
+
+
+BACKEND_ENV = 'CLAUDE_MONITOR_JSON'
+# 선호 순서
+BACKENDS = ('msgspec', 'orjson', 'json')
+
+
+def available_backends():
+    """설치된 백엔드 (선호 순서)"""
+    import importlib.util
+    return [name for name in BACKENDS if name == 'json' or importlib.util.find_spec(name) is not None]
+
+
+def _usage_fields(data):
+    """디코딩된 dict → (timestamp 문자열, input, output, cache_read, cache_creation) 또는 None"""
+    if not isinstance(data, dict) or data.get('type') != 'assistant':
+        return None
+
+    message = data.get('message')
+    timestamp = data.get('timestamp')
+    if not isinstance(message, dict) or not timestamp:
+        return None
+
+    usage = message.get('usage')
+    if not usage:
+        return None
+
+    return (
+        timestamp,
+        usage.get('input_tokens', 0) or 0,
+        usage.get('output_tokens', 0) or 0,
+        usage.get('cache_read_input_tokens', 0) or 0,
+        usage.get('cache_creation_input_tokens', 0) or 0
+    )
+
+
+def _stdlib_backend():
+    import json
+
+    def dumps(obj, indent=False):
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+    def decode_usage_line(line):
+        try:
+            return _usage_fields(json.loads(line))
+        except ValueError:
+            return None
+
+    return {'name': 'json', 'loads': json.loads, 'dumps': dumps,
+            'decode_usage_line': decode_usage_line, 'errors': (ValueError,)}
+
+
+def _orjson_backend():
+    import orjson
+
+    loads = orjson.loads
+    compact = orjson.OPT_NON_STR_KEYS
+    indented = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+
+    def dumps(obj, indent=False):
+        return orjson.dumps(obj, option=indented if indent else compact)
+
+    def decode_usage_line(line):
+        try:
+            return _usage_fields(loads(line))
+        except ValueError:
+            return None
+
+    return {'name': 'orjson', 'loads': loads, 'dumps': dumps,
+            'decode_usage_line': decode_usage_line, 'errors': (ValueError,)}
+
+
+def _msgspec_backend():
+    from typing import Optional, Union
+
+    import msgspec
+    from msgspec import UNSET, UnsetType
+
+    # 없는 필드(UNSET)와 null을 구분 (토큰 필드가 하나도 없으면 일반 디코딩으로 판단)
+    class Usage(msgspec.Struct):
+        input_tokens: Union[int, None, UnsetType] = UNSET
+        output_tokens: Union[int, None, UnsetType] = UNSET
+        cache_read_input_tokens: Union[int, None, UnsetType] = UNSET
+        cache_creation_input_tokens: Union[int, None, UnsetType] = UNSET
+
+    class Message(msgspec.Struct):
+        usage: Optional[Usage] = None
+
+    class TranscriptLine(msgspec.Struct):
+        type: Optional[str] = None
+        timestamp: Optional[str] = None
+        message: Optional[Message] = None
+
+    decoder = msgspec.json.Decoder()
+    line_decoder = msgspec.json.Decoder(TranscriptLine)
+    encoder = msgspec.json.Encoder()
+    errors = (ValueError, msgspec.DecodeError)
+
+    def dumps(obj, indent=False):
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if indent else data
+
+    def decode_generic(line):
+        try:
+            return _usage_fields(decoder.decode(line))
+        except errors:
+            return None
+
+    def decode_usage_line(line):
+        try:
+            record = line_decoder.decode(line)
+        except msgspec.ValidationError:
+            # 예상과 다른 형태 (message가 문자열 등)
+            return decode_generic(line)
+        except errors:
+            return None
+
+        message = record.message
+        if record.type != 'assistant' or message is None or not record.timestamp:
+            return None
+        usage = message.usage
+        if usage is None:
+            return None
+        if (usage.input_tokens is UNSET and usage.output_tokens is UNSET
+                and usage.cache_read_input_tokens is UNSET and usage.cache_creation_input_tokens is UNSET):
+            # 빈 usage({})는 무시, 다른 필드만 있으면 0 토큰 메시지 (표준 json과 같게)
+            return decode_generic(line)
+        return (
+            record.timestamp,
+            usage.input_tokens or 0,
+            usage.output_tokens or 0,
+            usage.cache_read_input_tokens or 0,
+            usage.cache_creation_input_tokens or 0
+        )
+
+    return {'name': 'msgspec', 'loads': decoder.decode, 'dumps': dumps,
+            'decode_usage_line': decode_usage_line, 'errors': errors}
+
+
+_FACTORIES = {'msgspec': _msgspec_backend, 'orjson': _orjson_backend, 'json': _stdlib_backend}
+
+
+def create_backend(name):
+    """
+    백엔드 생성 (벤치마크/테스트에서 직접 비교할 때)
+
+    Returns:
+        dict: {"name", "loads", "dumps", "decode_usage_line", "errors"}
+
+    Raises:
+        ImportError: 설치되지 않은 경우
+    """
+    return _FACTORIES[name]()
+
+
+def select_backend():
+    """환경 변수 지정 → 설치된 것 중 선호 순서"""
+    installed = available_backends()
+    requested = os.environ.get(BACKEND_ENV)
+    if requested in installed:
+        return create_backend(requested)
+    return create_backend(installed[0])
+
+
+# 모든 백엔드의 디코딩 오류는 ValueError 하위 클래스 (orjson.JSONDecodeError, msgspec.DecodeError)
+DECODE_ERRORS = (ValueError,)
+
+_backend = None      # 선택된 백엔드 (처음 decode_usage_line 또는 환경 변수 지정 시)
+_stdlib = None
+
+
+def backend():
+    """선택된 백엔드 (없으면 지금 선택)"""
+    global _backend, decode_usage_line
+    if _backend is None:
+        _backend = select_backend()
+        # 이후 호출은 백엔드 함수로 바로 (줄마다 한 단계 덜 거침)
+        decode_usage_line = _backend['decode_usage_line']
+    return _backend
+
+
+def _document_backend():
+    """작은 문서용: 선택된 백엔드, 아직 없으면 표준 json"""
+    global _stdlib
+    if _backend is not None or os.environ.get(BACKEND_ENV):
+        return backend()
+    if _stdlib is None:
+        _stdlib = _stdlib_backend()
+    return _stdlib
+
+
+def decode_usage_line(line):
+    """트랜스크립트 한 줄 → (timestamp, input, output, cache_read, cache_creation) 또는 None"""
+    return backend()['decode_usage_line'](line)
+
+
+def loads(data):
+    """bytes/str → 객체"""
+    return _document_backend()['loads'](data)
+
+
+def dumps(obj, indent=False):
+    """객체 → UTF-8 bytes"""
+    return _document_backend()['dumps'](obj, indent)
+
+
+def load(f):
+    """바이너리 파일 객체 → 객체"""
+    return loads(f.read())
+
+
+def dump(obj, f, indent=False):
+    """객체 → 바이너리 파일 객체"""
+    f.write(dumps(obj, indent))
+
+
+def __getattr__(name):
+    # BACKEND: 선택된 백엔드 이름 (조회하면 선택)
+    if name == 'BACKEND':
+        return backend()['name']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
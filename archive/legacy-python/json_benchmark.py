@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - JSON Backend Benchmark
+설치된 JSON 백엔드(json_backend)별 비용 비교
+
+시나리오:
+- decode:  트랜스크립트 줄 → usage 필드 (parse_usage_line과 같은 "assistant" 사전 필터 포함)
+           줄/초, MB/초
+- encode:  monitor_once() 출력 → 들여쓰기 JSON bytes (save_output, --once 응답)
+           µs/회
+
+트랜스크립트는 ~/.claude/projects의 실제 파일을 쓰고 (--synthetic이면 합성 줄),
+출력은 기존 ~/.claude_usage.json을 쓰고, 없으면 `monitor_daemon.py --once`로 만든다.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import json_backend
+from monitor_daemon import OUTPUT_FILE
+from usage_scanner import find_all_sessions
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+# 실제 트랜스크립트에서 읽을 최대 바이트
+MAX_SAMPLE_BYTES = 64 * 1024 * 1024
+
+
+def synthetic_lines(count):
+    """실제 트랜스크립트와 비슷한 구성 (assistant 응답 + 긴 tool 결과 user 줄)"""
+    lines = []
+    for i in range(count):
+        timestamp = f'2025-01-02T{10 + i // 3600 % 14:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000Z'
+        lines.append(json.dumps({
+            'parentUuid': f'{i:08x}-0000-4000-8000-000000000000', 'isSidechain': False,
+            'userType': 'external', 'cwd': '/home/user/project', 'sessionId': 'session', 'version': '1.0.0',
+            'type': 'user', 'timestamp': timestamp,
+            'message': {'role': 'user', 'content': [{'type': 'tool_result', 'tool_use_id': f'toolu_{i}',
+                                                     'content': 'def main():\n    pass\n' * 40}]}
+        }).encode('utf-8'))
+        lines.append(json.dumps({
+            'parentUuid': f'{i:08x}-0000-4000-8000-000000000001', 'isSidechain': False,
+            'userType': 'external', 'cwd': '/home/user/project', 'sessionId': 'session', 'version': '1.0.0',
+            'type': 'assistant', 'timestamp': timestamp, 'requestId': f'req_{i}',
+            'message': {
+                'id': f'msg_{i}', 'type': 'message', 'role': 'assistant', 'model': 'claude',
+                'content': [{'type': 'text', 'text': '변경 사항을 확인했습니다. ' * 20},
+                            {'type': 'tool_use', 'id': f'toolu_{i}', 'name': 'Read',
+                             'input': {'file_path': '/home/user/project/main.py'}}],
+                'stop_reason': 'tool_use', 'stop_sequence': None,
+                'usage': {'input_tokens': 4, 'cache_creation_input_tokens': 1200 + i % 500,
+                          'cache_read_input_tokens': 30000 + i, 'output_tokens': 150 + i % 300,
+                          'service_tier': 'standard'}
+            }
+        }).encode('utf-8'))
+    return lines
+
+
+def transcript_lines(max_bytes=MAX_SAMPLE_BYTES):
+    """실제 트랜스크립트 줄 (최근 파일부터 max_bytes까지)"""
+    lines = []
+    total = 0
+    for path in sorted(find_all_sessions(), key=lambda p: p.stat_result.st_mtime, reverse=True):
+        if path.suffix != '.jsonl':
+            continue
+        with open(path, 'rb') as f:
+            for line in f:
+                lines.append(line.rstrip(b'\n'))
+                total += len(line)
+                if total >= max_bytes:
+                    return lines
+    return lines
+
+
+def load_daemon_output():
+    """벤치마크용 데몬 출력 (dict)"""
+    if OUTPUT_FILE.exists():
+        return json.loads(OUTPUT_FILE.read_text())
+    result = subprocess.run([sys.executable, str(SCRIPT_DIR / 'monitor_daemon.py'), '--once'],
+                            capture_output=True, text=True, cwd=SCRIPT_DIR, check=False)
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return None
+
+
+def decode_all(decode, lines):
+    count = 0
+    for line in lines:
+        if b'"assistant"' in line and decode(line) is not None:
+            count += 1
+    return count
+
+
+def best_of(func, repeat):
+    """repeat회 중 최소 시간 (초)"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Benchmark the JSON backends on transcripts and daemon output')
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help='Use N synthetic message pairs instead of the local transcripts')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Runs per scenario, best is reported (default: 5)')
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.synthetic) if args.synthetic else transcript_lines()
+    if not lines:
+        print('❌ No transcripts to benchmark (use --synthetic N)')
+        return 1
+    size = sum(len(line) + 1 for line in lines)
+
+    data = load_daemon_output()
+    if data is None:
+        print('❌ No daemon output to benchmark (run monitor_daemon.py --once first)')
+        return 1
+
+    backends = [json_backend.create_backend(name) for name in json_backend.available_backends()]
+    reference = None
+    results = {}
+    for backend in backends:
+        events = decode_all(backend['decode_usage_line'], lines)
+        if reference is None:
+            reference = events
+        elif events != reference:
+            print(f"❌ {backend['name']} decoded {events} usage records, expected {reference}")
+            return 1
+
+        decode_seconds = best_of(lambda: decode_all(backend['decode_usage_line'], lines), args.repeat)
+        encode_runs = 200
+        encode_seconds = best_of(lambda: [backend['dumps'](data, True) for _ in range(encode_runs)],
+                                 args.repeat) / encode_runs
+        results[backend['name']] = (decode_seconds, encode_seconds)
+
+    baseline_decode, baseline_encode = results['json']
+    print(f"Transcripts: {len(lines):,} lines, {size / 1024 / 1024:.1f} MB, {reference:,} usage records")
+    print(f"Output: {len(json_backend.dumps(data, True)):,} bytes (selected backend: {json_backend.BACKEND})")
+    print(f"{'backend':<10}{'lines/s':>12}{'MB/s':>8}{'decode':>9}{'µs/encode':>11}{'encode':>9}")
+    for name, (decode_seconds, encode_seconds) in results.items():
+        print(f"{name:<10}{len(lines) / decode_seconds:>12,.0f}{size / 1024 / 1024 / decode_seconds:>8.1f}"
+              f"{baseline_decode / decode_seconds:>8.1f}x{encode_seconds * 1e6:>11.1f}"
+              f"{baseline_encode / encode_seconds:>8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -4,20 +4,24 @@ Claude Monitor - Limit Learner
 P90 분석을 통한 동적 limit 학습
 """
 
-import json
 import os
 from pathlib import Path
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import statistics
 
+import json_backend
+from records import SessionSnapshot
+
 
 HISTORY_FILE = Path.home() / '.claude-monitor' / 'session_history.json'
 CONFIG_FILE = Path.home() / '.claude-monitor' / 'config.json'
+# 세션 기록에서 SessionSnapshot인 필드 (메모리에서는 레코드, 파일에서는 dict)
+SNAPSHOT_FIELDS = ('first_snapshot', 'latest_snapshot', 'peak_usage')
 
 
 def load_history():
-    """히스토리 파일 로드"""
+    """히스토리 파일 로드 (세션 스냅샷은 SessionSnapshot으로)"""
     if not HISTORY_FILE.exists():
         return {
             'sessions': [],
@@ -39,15 +43,23 @@ def load_history():
             }
         }
 
-    with open(HISTORY_FILE, 'r') as f:
-        return json.load(f)
+    with open(HISTORY_FILE, 'rb') as f:
+        history = json_backend.load(f)
+    for session in history['sessions']:
+        for key in SNAPSHOT_FIELDS:
+            session[key] = SessionSnapshot.from_dict(session[key])
+    return history
 
 
 def save_history(history):
-    """히스토리 파일 저장"""
+    """히스토리 파일 저장 (세션 스냅샷은 dict로)"""
+    sessions = [
+        {**session, **{key: session[key].to_dict() for key in SNAPSHOT_FIELDS}}
+        for session in history['sessions']
+    ]
     HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=2)
+    with open(HISTORY_FILE, 'wb') as f:
+        json_backend.dump({**history, 'sessions': sessions}, f, indent=True)
 
 
 def record_session_snapshot(usage_data, window_start, window_end, percentages, tz):
@@ -62,30 +74,44 @@ def record_session_snapshot(usage_data, window_start, window_end, percentages, t
         tz: Timezone
     """
     history = load_history()
-
     now = datetime.now(tz)
+
+    update_session_history(history, usage_data, window_start, window_end, percentages, now)
+    prune_session_history(history, now)
+
+    save_history(history)
+
+
+def update_session_history(history, usage_data, window_start, window_end, percentages, now):
+    """
+    히스토리(메모리)에 세션 스냅샷 반영 (replay 백필에서도 사용)
+
+    Args:
+        history: load_history() 결과 (제자리 갱신)
+        usage_data: 토큰 사용량 데이터
+        window_start: 세션 시작 시간
+        window_end: 세션 종료 시간
+        percentages: 퍼센트 정보
+        now: 스냅샷 시간
+    """
     window_start_str = window_start.isoformat()
 
     # 이미 같은 윈도우의 스냅샷이 있는지 확인
     existing_session = None
-    for session in history['sessions']:
+    for session in reversed(history['sessions']):
         if session['window_start'] == window_start_str:
             existing_session = session
             break
 
     # 스냅샷 데이터
-    snapshot = {
-        'output_tokens': usage_data['output_tokens'],
-        'percentage': percentages['output_percentage'],
-        'timestamp': now.isoformat()
-    }
+    snapshot = SessionSnapshot(usage_data['output_tokens'], percentages['output_percentage'], now.isoformat())
 
     if existing_session:
         # 기존 세션 업데이트
         existing_session['latest_snapshot'] = snapshot
 
         # Peak usage 업데이트
-        if snapshot['output_tokens'] > existing_session['peak_usage']['output_tokens']:
+        if snapshot.output_tokens > existing_session['peak_usage'].output_tokens:
             existing_session['peak_usage'] = snapshot
     else:
         # 새 세션 추가
@@ -99,15 +125,15 @@ def record_session_snapshot(usage_data, window_start, window_end, percentages, t
         }
         history['sessions'].append(new_session)
 
-    # 오래된 세션 정리 (30일 이상)
-    cutoff = now - timedelta(days=30)
+
+def prune_session_history(history, now, days=30):
+    """오래된 세션 정리 (기본 30일 이상)"""
+    cutoff = now - timedelta(days=days)
     history['sessions'] = [
         s for s in history['sessions']
         if datetime.fromisoformat(s['window_start']) > cutoff
     ]
 
-    save_history(history)
-
 
 def analyze_and_learn_limits():
     """
@@ -126,21 +152,21 @@ def analyze_and_learn_limits():
 
         # 50% 이상 사용한 세션 분석 (더 많은 데이터 수집)
         # 높은 퍼센트일수록 신뢰도가 높으므로 가중치 적용
-        if peak['percentage'] >= 50:
+        if peak.percentage >= 50:
             # 실제 limit 역산: output_tokens / (percentage / 100)
             # 예: 140,000 tokens / 0.46 = 304,348 total tokens
             # 304,348 tokens / 300 minutes = 1,014 TPM
-            estimated_total_tokens = peak['output_tokens'] / (peak['percentage'] / 100)
+            estimated_total_tokens = peak.output_tokens / (peak.percentage / 100)
             estimated_tpm = estimated_total_tokens / 300  # 5시간 = 300분
 
             # 신뢰도 가중치: 높은 퍼센트일수록 신뢰도 높음
             # 50% → 0.5, 70% → 0.7, 90% → 0.9
-            confidence_weight = peak['percentage'] / 100
+            confidence_weight = peak.percentage / 100
 
             session_data_points.append({
                 'tpm': estimated_tpm,
-                'percentage': peak['percentage'],
-                'tokens': peak['output_tokens'],
+                'percentage': peak.percentage,
+                'tokens': peak.output_tokens,
                 'weight': confidence_weight,
                 'window_start': session['window_start']
             })
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Memory Budget
+데몬의 RSS(상주 메모리)를 예산 안으로 유지
+
+    python3 monitor_daemon.py --max-rss 64M
+
+매 tick 끝에 RSS를 확인하고, 예산의 SOFT_LIMIT_RATIO를 넘으면 등록된 캐시를
+싼 것부터 하나씩 비운다 (재구성 가능한 캐시만 등록). 모두 비워도 예산을
+넘으면 경고만 출력한다.
+"""
+
+import gc
+import os
+import re
+import sys
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+SOFT_LIMIT_RATIO = 0.85
+
+SIZE_UNITS = {
+    '': 1,
+    'K': 1024,
+    'M': 1024 ** 2,
+    'G': 1024 ** 3
+}
+
+
+def parse_size(text):
+    """
+    크기 문자열 → 바이트 ('64M', '512K', '1G', '1048576')
+
+    Raises:
+        ValueError: 형식이 잘못된 경우
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?\s*', str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f'Invalid size: {text!r} (e.g. 64M, 512K, 1G)')
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size):
+    """바이트 → 사람이 읽기 쉬운 문자열"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}GB'
+
+
+def current_rss_bytes():
+    """
+    현재 프로세스 RSS (bytes)
+
+    Linux는 /proc/self/statm의 현재 값, 그 외에는 최대 RSS(ru_maxrss)로 근사
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if RESOURCE_AVAILABLE:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 bytes, Linux는 KB
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    return 0
+
+
+class MemoryBudget:
+    """
+    RSS 예산과 비울 수 있는 캐시 목록
+
+    shedder: 인자 없이 호출하면 캐시를 비우는 함수. 비우는 비용(재구성 비용)이
+    싼 것부터 등록한다.
+    """
+
+    def __init__(self, max_bytes, soft_ratio=SOFT_LIMIT_RATIO):
+        self.max_bytes = max_bytes
+        self.soft_bytes = int(max_bytes * soft_ratio)
+        self.shedders = []
+        self.last_rss = 0
+        self.shed_count = 0
+
+    def register(self, name, shedder):
+        """비울 수 있는 캐시 등록"""
+        self.shedders.append((name, shedder))
+
+    def check(self):
+        """
+        RSS 확인 후 필요하면 캐시 비우기
+
+        Returns:
+            list: 이번에 비운 캐시 이름
+        """
+        rss = current_rss_bytes()
+        shed = []
+
+        for name, shedder in self.shedders:
+            if rss < self.soft_bytes:
+                break
+            shedder()
+            gc.collect()
+            shed.append(name)
+            rss = current_rss_bytes()
+
+        self.last_rss = rss
+        self.shed_count += len(shed)
+
+        if rss > self.max_bytes:
+            print(f"Warning: RSS {format_size(rss)} exceeds budget {format_size(self.max_bytes)} "
+                  f"after shedding all caches")
+
+        return shed
+
+    def stats(self):
+        """출력용 통계"""
+        return {
+            'rss_bytes': self.last_rss,
+            'max_rss_bytes': self.max_bytes,
+            'shed_count': self.shed_count
+        }
@@ -4,276 +4,319 @@ Claude Usage Monitor - Daemon v2
 세션(5시간) 및 주간 사용량을 모니터링하고 JSON 출력
 """
 
-import json
-import os
 import sys
+
+if __name__ == '__main__':
+    # --once 빠른 경로: 데몬이 응답하면 아래 모듈을 import하기 전에 출력하고 종료 (SwiftBar/cron 시작 시간)
+    from daemon_socket import answer_once
+    if answer_once(sys.argv[1:]):
+        sys.exit(0)
+
+import copy
+import os
+import re
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-import argparse
 
-# Calibration learner import
+from timezone_windows import fixed_session_bounds, weekly_bounds, epoch_to_datetime, get_zone
+from usage_scanner import find_all_sessions
+from usage_engine import create_usage_state, update_usage_state, usage_summary, shed_recent_events, dormant_cutoff
+import json_backend
+from usage_index import load_usage_index, save_usage_index
+from config_store import ConfigError, read_config, thaw
+from usage_sources import SourceRunner, create_sources, merge_observations
+
 try:
-    from calibration_learner import get_calibrated_value, get_session_window_key, get_weekly_window_key
-    CALIBRATION_ENABLED = True
+    import fcntl
 except ImportError:
-    CALIBRATION_ENABLED = False
+    fcntl = None  # flock 미지원 환경: PID 확인으로 대체
+
+# notifications, calibration_learner, 리스너 모듈(forecaster 등)은 처음 사용할 때 import,
+# 데몬 전용 모듈(signal, 소켓 서버, 체크포인트, 메모리 예산)은 데몬 함수 안에서 import (--once 시작 시간 단축)
+_calibration = None
 
 
 CONFIG_FILE = Path.home() / '.claude-monitor' / 'config.json'
 OUTPUT_FILE = Path.home() / '.claude_usage.json'
 NOTIFICATION_STATE_FILE = Path.home() / '.claude-monitor' / 'notification_state.json'
 PID_FILE = Path.home() / '.claude-monitor' / 'daemon.pid'
+EXTENSION_USAGE_FILE = Path('/tmp/claude-web-usage.json')
+
+# RateTracker 지표 → 출력/limit 키 (config rate_limits와 같은 이름)
+RATE_METRICS = {
+    'requests': 'requests_per_minute',
+    'input_tokens': 'input_tokens_per_minute',
+    'output_tokens': 'output_tokens_per_minute'
+}
+
+# 데몬 체크포인트 주기 (SIGTERM/Ctrl+C 시에도 저장)
+CHECKPOINT_INTERVAL_SECONDS = 300
+
+# 설정 키 → 그 키에 의존하는 파생 상태 (설정이 바뀌면 해당 상태만 다시 만듦)
+# rate_limits, 임계값, timezone, reset_schedule은 매 tick 설정에서 직접 읽고,
+# 윈도우 경계가 바뀌면 prepare_windows가 최근 이벤트 버퍼로 다시 계산하므로 없음
+CONFIG_DEPENDENTS = {
+    'notifications.backends': 'notification_engine',
+    'notifications.webhook_url': 'notification_engine',
+    'notifications.coalesce_seconds': 'notification_engine',
+    'notifications.max_per_minute': 'notification_engine',
+    'forecast.half_life_minutes': 'forecaster',
+    'rate_limits.session.window_hours': 'session_listeners',
+    'anomaly.threshold_sigmas': 'anomaly_detector',
+    'anomaly.min_tokens_per_minute': 'anomaly_detector',
+    'sources': 'source_runner'
+}
+
+# 데몬 시그널 (핸들러는 플래그만 세우고, tick 사이에 처리)
+DAEMON_SIGNALS = {
+    'SIGTERM': 'stop',      # 체크포인트 저장 후 종료
+    'SIGHUP': 'reload',     # 설정 다시 읽기 (캐시 유지)
+    'SIGUSR1': 'stats'      # 내부 통계 출력
+}
+SIGNAL_POLL_SECONDS = 1.0
+
+# --force로 넘겨받을 때 기존 데몬 종료 대기 시간
+TAKEOVER_TIMEOUT_SECONDS = 30.0
+# 잠금은 걸렸는데 PID가 비어 있을 때 (기존 데몬이 막 잠금을 잡고 아직 쓰기 전) 다시 읽는 시간
+PID_READ_RETRY_SECONDS = 1.0
+
+# 단일 인스턴스 잠금 (acquire_pid_lock에서 연 PID 파일, 프로세스 종료 시 자동 해제)
+_pid_lock = None
+
+# 알림 엔진 (get_notification_engine에서 생성)
+_notification_engine = None
+
+# 외부 사용량 소스 (get_source_runner에서 생성)
+_source_runner = None
+
+
+def load_calibration():
+    """
+    Calibration learner 모듈 (처음 호출할 때 import)
+
+    Returns:
+        module: calibration_learner (사용할 수 없으면 None)
+    """
+    global _calibration
+    if _calibration is None:
+        try:
+            import calibration_learner
+            for name in ('get_calibrated_value', 'get_session_window_key',
+                         'get_weekly_window_key', 'clear_calibration_cache',
+                         'export_models_cache', 'restore_models_cache'):
+                getattr(calibration_learner, name)
+            _calibration = calibration_learner
+        except (ImportError, AttributeError):
+            _calibration = False
+    return _calibration or None
 
 
 def load_config():
-    """설정 파일 로드"""
+    """
+    설정 파일 로드 (스키마 검증 + 기본값, 읽기 전용)
+
+    Returns:
+        Mapping: 검증된 설정 (없거나 잘못되었으면 None)
+    """
     if not CONFIG_FILE.exists():
         print(f"❌ Configuration not found at {CONFIG_FILE}")
         print("   Please run: python3 src/config_manager.py")
         return None
 
-    with open(CONFIG_FILE, 'r') as f:
-        config = json.load(f)
+    try:
+        return read_config(CONFIG_FILE)
+    except ConfigError as e:
+        print(f"❌ Invalid configuration in {CONFIG_FILE}")
+        for error in e.errors:
+            print(f"   - {error}")
+        return None
 
-    # Timezone 설정 추가 (없으면 기본값 사용)
-    if 'display_settings' not in config:
-        config['display_settings'] = {}
-    if 'timezone' not in config['display_settings']:
-        config['display_settings']['timezone'] = 'Asia/Seoul'
-    if 'timezone_abbr' not in config['display_settings']:
-        config['display_settings']['timezone_abbr'] = 'KST'
 
-    return config
+def get_fixed_session_window(now, config=None):
+    """
+    고정된 5시간 세션 윈도우 계산 (config 기반)
 
+    config의 session_base_hour를 기준으로 5시간 윈도우 계산
+    예: base=14 → 14:00-19:00, 19:00-00:00, 00:00-04:00, 04:00-09:00, 09:00-14:00
+    예: base=15 → 15:00-20:00, 20:00-01:00, 01:00-05:00, 05:00-10:00, 10:00-15:00
 
-def find_all_sessions():
-    """모든 Claude 프로젝트의 세션 파일 찾기"""
-    home = Path.home()
-    projects_dir = home / '.claude' / 'projects'
+    경계는 display_settings.timezone 기준 UTC epoch로 계산 (DST 안전)
 
-    if not projects_dir.exists():
-        return []
+    Returns:
+        tuple: (window_start, window_end, next_reset)
+    """
+    # Config에서 base hour 읽기 (기본: 14)
+    base_hour = 14
+    if config and 'reset_schedule' in config:
+        base_hour = config['reset_schedule'].get('session_base_hour', 14)
 
-    session_files = list(projects_dir.rglob('*.jsonl'))
-    return session_files
+    # Config의 timezone 우선, 없으면 now의 timezone
+    if config and 'display_settings' in config and 'timezone' in config['display_settings']:
+        tz_name = config['display_settings']['timezone']
+    else:
+        tz_name = getattr(now.tzinfo, 'key', 'Asia/Seoul')
 
+    start_epoch, end_epoch = fixed_session_bounds(now.timestamp(), tz_name, base_hour)
 
-def get_rolling_session_window(session_files, now, tz):
-    """
-    Rolling 5시간 세션 윈도우 계산 (사용 안 함)
+    window_start = epoch_to_datetime(start_epoch, tz_name)
+    window_end = epoch_to_datetime(end_epoch, tz_name)
 
-    현재 세션의 가장 오래된 메시지 시작 시점부터 +5시간
+    # 다음 리셋 시간
+    next_reset = window_end
 
-    Args:
-        session_files: 세션 파일 리스트
-        now: 현재 시간
-        tz: Timezone
+    return window_start, window_end, next_reset
+
+
+# 요일 이름 → weekday (월=0 ... 일=6)
+WEEKDAY_NAMES = {
+    '월': 0, '화': 1, '수': 2, '목': 3, '금': 4, '토': 5, '일': 6,
+    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6
+}
+
+
+def parse_weekly_reset_text(text):
+    """
+    Extension이 스크래핑한 주간 리셋 시간 파싱
+
+    예: "(화) 오전 10:59에" → (1, 10, 59)
+        "(금) 오후 3:00"   → (4, 15, 0)
+        "Tue 10:59 AM"     → (1, 10, 59)
 
     Returns:
-        tuple: (window_start, window_end, next_reset)
+        tuple: (weekday, hour, minute), 파싱 실패시 None
     """
-    # 일단 현재 시간부터 5시간 전까지 모든 메시지 스캔
-    potential_start = now - timedelta(hours=5)
+    if not text:
+        return None
 
-    oldest_message_time = None
+    match = re.search(r'\(?\s*([월화수목금토일])\s*\)?\s*(오전|오후)?\s*(\d{1,2}):(\d{2})', text)
+    if match:
+        day, meridiem, hour, minute = match.groups()
+    else:
+        match = re.search(r'\b(mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?,?\s+(\d{1,2}):(\d{2})\s*(am|pm)?',
+                          text, re.IGNORECASE)
+        if not match:
+            return None
+        day, hour, minute, meridiem = match.groups()
+        day = day.lower()
+        meridiem = {'am': '오전', 'pm': '오후'}.get((meridiem or '').lower())
+
+    hour = int(hour)
+    minute = int(minute)
+    if meridiem == '오후' and hour < 12:
+        hour += 12
+    elif meridiem == '오전' and hour == 12:
+        hour = 0
+
+    if hour > 23 or minute > 59:
+        return None
 
-    # 모든 세션 파일에서 5시간 내 가장 오래된 메시지 찾기
-    for session_file in session_files:
-        try:
-            with open(session_file, 'r') as f:
-                for line in f:
-                    try:
-                        data = json.loads(line.strip())
+    return WEEKDAY_NAMES[day], hour, minute
 
-                        if data.get('type') == 'assistant' and 'message' in data:
-                            timestamp_str = data.get('timestamp')
-                            if not timestamp_str:
-                                continue
 
-                            msg_time = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                            msg_time = msg_time.astimezone(tz)
+def parse_session_reset_text(text):
+    """
+    Extension이 스크래핑한 세션 리셋까지 남은 시간 파싱
 
-                            # 5시간 이내의 메시지만
-                            if msg_time >= potential_start and msg_time <= now:
-                                if oldest_message_time is None or msg_time < oldest_message_time:
-                                    oldest_message_time = msg_time
-                    except:
-                        continue
-        except:
-            continue
-
-    # 가장 오래된 메시지가 있으면 그 시점부터 +5시간
-    if oldest_message_time:
-        window_start = oldest_message_time
-        window_end = oldest_message_time + timedelta(hours=5)
-        next_reset = window_end
-    else:
-        # 메시지가 없으면 현재 시간 기준
-        window_start = now
-        window_end = now + timedelta(hours=5)
-        next_reset = window_end
+    예: "3시간 50분 후" → 13800
+        "50분 후"       → 3000
+        "4 hr 12 min"   → 15120
 
-    return window_start, window_end, next_reset
+    Returns:
+        int: 남은 시간 (초), 파싱 실패시 None
+    """
+    if not text:
+        return None
+
+    hours = re.search(r'(\d+)\s*(?:시간|hours?|hrs?\b|h\b)', text, re.IGNORECASE)
+    minutes = re.search(r'(\d+)\s*(?:분|minutes?|mins?\b|m\b)', text, re.IGNORECASE)
+    if not hours and not minutes:
+        return None
 
+    return (int(hours.group(1)) if hours else 0) * 3600 + (int(minutes.group(1)) if minutes else 0) * 60
 
-def get_fixed_session_window(now, config=None):
+
+def get_weekly_anchor(config=None, extension_data=None):
     """
-    고정된 5시간 세션 윈도우 계산 (config 기반)
+    주간 리셋 anchor 결정
 
-    config의 session_base_hour를 기준으로 5시간 윈도우 계산
-    예: base=14 → 14:00-19:00, 19:00-00:00, 00:00-04:00, 04:00-09:00, 09:00-14:00
-    예: base=15 → 15:00-20:00, 20:00-01:00, 01:00-05:00, 05:00-10:00, 10:00-15:00
+    우선순위:
+    1. config의 reset_schedule.weekly_reset ({"weekday": "tue", "time": "10:59"})
+    2. Extension이 스크래핑한 weekly reset_time
+       (데몬 소켓으로 받은 extension_data, 없으면 /tmp/claude-web-usage.json)
 
     Returns:
-        tuple: (window_start, window_end, next_reset)
+        dict: {'weekday', 'hour', 'minute', 'source'}, anchor가 없으면 None
     """
-    # Config에서 base hour 읽기 (기본: 14)
-    base_hour = 14
+    weekly_reset = None
     if config and 'reset_schedule' in config:
-        base_hour = config['reset_schedule'].get('session_base_hour', 14)
+        weekly_reset = config['reset_schedule'].get('weekly_reset')
 
-    hour = now.hour
-
-    # Base hour를 기준으로 5개의 5시간 윈도우 생성
-    windows = []
-    current_start = base_hour
-    for _ in range(5):
-        current_end = (current_start + 5) % 24
-        windows.append((current_start, current_end))
-        current_start = current_end
-
-    # 현재 시간이 속한 윈도우 찾기
-    start_hour = None
-    end_hour = None
-    for win_start, win_end in windows:
-        if win_end < win_start:  # 자정을 넘어가는 경우
-            if hour >= win_start or hour < win_end:
-                start_hour = win_start
-                end_hour = win_end
-                break
-        else:  # 같은 날 내
-            if win_start <= hour < win_end:
-                start_hour = win_start
-                end_hour = win_end
-                break
-
-    # 찾지 못하면 기본값 (base_hour 시작)
-    if start_hour is None:
-        start_hour = base_hour
-        end_hour = (base_hour + 5) % 24
-
-    # 시작 시간 계산
-    if hour < start_hour:
-        # 전날에서 시작
-        window_start = now.replace(hour=start_hour, minute=0, second=0, microsecond=0) - timedelta(days=1)
-    else:
-        window_start = now.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    if weekly_reset:
+        try:
+            weekday = weekly_reset['weekday']
+            if isinstance(weekday, str):
+                key = weekday.strip().lower()
+                weekday = WEEKDAY_NAMES[key[:3] if key.isascii() else key[:1]]
+            hour, minute = (int(part) for part in str(weekly_reset.get('time', '00:00')).split(':'))
+            if 0 <= int(weekday) <= 6 and 0 <= hour <= 23 and 0 <= minute <= 59:
+                return {'weekday': int(weekday), 'hour': hour, 'minute': minute, 'source': 'config'}
+        except (KeyError, ValueError, TypeError):
+            pass
+        print(f"Warning: Invalid reset_schedule.weekly_reset: {weekly_reset}")
 
-    # 종료 시간 계산
-    if end_hour < start_hour:
-        # 다음날로 넘어감
-        window_end = (window_start + timedelta(days=1)).replace(hour=end_hour, minute=0, second=0, microsecond=0)
-    else:
-        window_end = window_start.replace(hour=end_hour, minute=0, second=0, microsecond=0)
+    try:
+        if extension_data is None:
+            with open(EXTENSION_USAGE_FILE, 'rb') as f:
+                extension_data = json_backend.load(f)
+        parsed = parse_weekly_reset_text(extension_data.get('weekly', {}).get('reset_time'))
+    except (OSError, ValueError, AttributeError, *json_backend.DECODE_ERRORS):
+        parsed = None
 
-    # 다음 리셋 시간
-    next_reset = window_end
+    if parsed:
+        weekday, hour, minute = parsed
+        return {'weekday': weekday, 'hour': hour, 'minute': minute, 'source': 'extension'}
 
-    return window_start, window_end, next_reset
+    return None
 
 
-def get_weekly_window(now):
+def get_weekly_window(now, config=None, anchor=None):
     """
     주간 윈도우 계산 (7일 = 168시간)
 
-    현재 시간으로부터 7일 전
+    - anchor가 있으면: 매주 anchor 요일/시각에 리셋되는 고정 윈도우
+    - anchor가 없으면: 현재 시간으로부터 7일 전 (rolling)
+
+    Args:
+        now: 현재 시간
+        config: 설정 정보
+        anchor: get_weekly_anchor() 결과
 
     Returns:
         tuple: (window_start, window_end, next_reset)
     """
-    window_end = now
-    window_start = now - timedelta(days=7)
+    if anchor is None:
+        window_end = now
+        window_start = now - timedelta(days=7)
 
-    # 다음 리셋은 매주 화요일 (가정)
-    # 실제로는 결제일 기준이지만, 일단 7일 롤링으로 처리
-    next_reset = now + timedelta(days=1)  # 임시
-
-    return window_start, window_end, next_reset
+        # Rolling 윈도우는 고정 리셋이 없음 (임시값)
+        next_reset = now + timedelta(days=1)
 
+        return window_start, window_end, next_reset
 
-def parse_sessions_in_window(session_files, window_start, window_end, tz):
-    """
-    특정 시간 윈도우 내의 모든 세션에서 토큰 사용량 집계
-
-    Args:
-        session_files: 세션 파일 리스트
-        window_start: 윈도우 시작 시간 (datetime)
-        window_end: 윈도우 종료 시간 (datetime)
-        tz: Timezone
+    if config and 'display_settings' in config and 'timezone' in config['display_settings']:
+        tz_name = config['display_settings']['timezone']
+    else:
+        tz_name = getattr(now.tzinfo, 'key', 'Asia/Seoul')
 
-    Returns:
-        dict: 사용량 정보
-    """
-    usage_data = {
-        'input_tokens': 0,
-        'output_tokens': 0,
-        'cache_read_tokens': 0,
-        'cache_creation_tokens': 0,
-        'total_counted_tokens': 0,
-        'messages_count': 0,
-        'oldest_message_time': None,
-        'latest_message_time': None
-    }
+    start_epoch, reset_epoch = weekly_bounds(
+        now.timestamp(), tz_name, anchor['weekday'], anchor['hour'], anchor['minute'])
 
-    for session_file in session_files:
-        with open(session_file, 'r') as f:
-            for line in f:
-                try:
-                    data = json.loads(line.strip())
-
-                    # assistant 메시지에서 usage 정보 추출
-                    if data.get('type') == 'assistant' and 'message' in data:
-                        message = data['message']
-
-                        # 타임스탬프 확인
-                        timestamp_str = data.get('timestamp')
-                        if not timestamp_str:
-                            continue
-
-                        msg_time = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        msg_time = msg_time.astimezone(tz)
-
-                        # 윈도우 내의 메시지만 집계
-                        if msg_time < window_start or msg_time > window_end:
-                            continue
-
-                        # 시간 추적
-                        if usage_data['oldest_message_time'] is None:
-                            usage_data['oldest_message_time'] = msg_time
-                        usage_data['latest_message_time'] = msg_time
-
-                        if 'usage' in message:
-                            usage = message['usage']
-
-                            usage_data['input_tokens'] += usage.get('input_tokens', 0)
-                            usage_data['output_tokens'] += usage.get('output_tokens', 0)
-                            usage_data['cache_read_tokens'] += usage.get('cache_read_input_tokens', 0)
-                            usage_data['cache_creation_tokens'] += usage.get('cache_creation_input_tokens', 0)
-                            usage_data['messages_count'] += 1
-
-                except (json.JSONDecodeError, Exception):
-                    continue
-
-    # Cache read tokens는 rate limit에 카운트되지 않음
-    usage_data['total_counted_tokens'] = (
-        usage_data['input_tokens'] +
-        usage_data['output_tokens'] +
-        usage_data['cache_creation_tokens']
-    )
+    window_start = epoch_to_datetime(start_epoch, tz_name)
+    window_end = epoch_to_datetime(reset_epoch, tz_name)
+    next_reset = window_end
 
-    return usage_data
+    return window_start, window_end, next_reset
 
 
 def calculate_usage_percentage(usage, limits):
@@ -322,54 +365,18 @@ def generate_progress_bar(percentage, width=10):
     return f"[{int(percentage)}% {bar}]"
 
 
-def load_notification_state():
-    """알림 상태 파일 로드"""
-    if not NOTIFICATION_STATE_FILE.exists():
-        return {
-            'session_window_start': None,
-            'notified_thresholds': []
-        }
-
-    try:
-        with open(NOTIFICATION_STATE_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {
-            'session_window_start': None,
-            'notified_thresholds': []
-        }
-
-
-def save_notification_state(state):
-    """알림 상태 파일 저장"""
-    NOTIFICATION_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(NOTIFICATION_STATE_FILE, 'w') as f:
-        json.dump(state, f, indent=2)
-
-
-def send_macos_notification(title, message, subtitle=None):
-    """
-    macOS 알림 전송 (osascript 사용)
-
-    Args:
-        title: 알림 제목
-        message: 알림 메시지
-        subtitle: 알림 부제목 (선택)
-    """
-    try:
-        # AppleScript로 알림 전송
-        script = f'display notification "{message}" with title "{title}"'
-        if subtitle:
-            script = f'display notification "{message}" with title "{title}" subtitle "{subtitle}"'
-
-        os.system(f"osascript -e '{script}'")
-    except Exception as e:
-        print(f"Failed to send notification: {e}")
+def get_notification_engine(config):
+    """알림 엔진 (프로세스당 1개, 상태는 메모리에 유지)"""
+    global _notification_engine
+    if _notification_engine is None:
+        from notifications import create_notification_engine
+        _notification_engine = create_notification_engine(config, NOTIFICATION_STATE_FILE)
+    return _notification_engine
 
 
 def check_and_send_notifications(config, session_percentage, session_window_start):
     """
-    임계값을 확인하고 알림 전송
+    임계값을 확인하고 알림 전송 (비동기)
 
     Args:
         config: 설정 정보
@@ -386,42 +393,76 @@ def check_and_send_notifications(config, session_percentage, session_window_star
     # 임계값 가져오기
     thresholds = config.get('notifications', {}).get('thresholds', [80, 90, 95])
 
-    # 알림 상태 로드
-    state = load_notification_state()
+    return get_notification_engine(config).check_thresholds(
+        thresholds,
+        session_percentage,
+        session_window_start,
+        config['display_settings']['timezone_abbr']
+    )
 
-    # 세션 윈도우가 바뀌면 상태 리셋
-    if state.get('session_window_start') != session_window_start:
-        state = {
-            'session_window_start': session_window_start,
-            'notified_thresholds': []
-        }
-        save_notification_state(state)
 
-    # 임계값 확인 및 알림 전송
-    notified = []
-    for threshold in sorted(thresholds):
-        # 이미 알림을 보낸 임계값은 건너뛰기
-        if threshold in state['notified_thresholds']:
-            continue
+def check_forecast_notifications(config, forecasts):
+    """
+    limit 조기 도달 예측 알림
 
-        # 현재 사용량이 임계값을 넘으면 알림 전송
-        if session_percentage >= threshold:
-            tz_abbr = config['display_settings']['timezone_abbr']
-            send_macos_notification(
-                title="⚠️ Claude Usage Alert",
-                message=f"Session usage has reached {session_percentage}%",
-                subtitle=f"Threshold: {threshold}% ({tz_abbr})"
-            )
+    Args:
+        config: 설정 정보
+        forecasts: {name: (window_start_iso, forecast)}
+    """
+    if not config.get('notifications', {}).get('enabled', True):
+        return
+
+    alert_minutes = config.get('forecast', {}).get('alert_minutes', 60)
+    engine = get_notification_engine(config)
+    for name, (window_start, forecast) in forecasts.items():
+        engine.check_forecast(name, window_start, forecast, forecast['status_line'],
+                              alert_minutes, config['display_settings']['timezone_abbr'])
+
+
+def check_anomaly_notifications(config, alerts):
+    """
+    runaway loop 알림 (high priority)
+
+    Args:
+        config: 설정 정보
+        alerts: LoopDetector.drain() 결과
+    """
+    if not alerts or not config.get('notifications', {}).get('enabled', True):
+        return
+    if not config.get('anomaly', {}).get('enabled', True):
+        return
+
+    from anomaly_detector import describe_alert
+
+    engine = get_notification_engine(config)
+    for alert in alerts:
+        engine.notify_anomaly(alert, describe_alert(alert), config['display_settings']['timezone_abbr'])
+
+
+def build_forecast(forecaster, now, display_percentage, limits, reset_time, tz_name):
+    """
+    윈도우별 소진 시각 예측 (출력 JSON용)
+
+    Args:
+        reset_time: 리셋 시간 (rolling 윈도우는 None)
+
+    Returns:
+        dict: 예측 정보 (exhaustion_time, status_line 포함)
+    """
+    from forecaster import describe_forecast
 
-            # 상태 업데이트
-            state['notified_thresholds'].append(threshold)
-            notified.append(threshold)
+    reset_epoch = reset_time.timestamp() if reset_time is not None else None
+    forecast = forecaster.forecast_window(now.timestamp(), display_percentage, limits, reset_epoch)
 
-    # 상태 저장
-    if notified:
-        save_notification_state(state)
+    exhaustion_time = None
+    if forecast['exhaustion_epoch'] is not None:
+        exhaustion_time = epoch_to_datetime(forecast['exhaustion_epoch'], tz_name)
 
-    return notified
+    forecast['exhaustion_time'] = exhaustion_time.isoformat() if exhaustion_time else None
+    forecast['status_line'] = describe_forecast(forecast, exhaustion_time)
+    del forecast['exhaustion_epoch']
+
+    return forecast
 
 
 def calculate_time_until_reset(now, reset_time):
@@ -472,12 +513,22 @@ def calculate_time_until_reset(now, reset_time):
     }
 
 
-def monitor_once(config):
-    """한 번 모니터링 실행"""
+def monitor_once(config, state=None, scheduler=None, history=None):
+    """
+    한 번 모니터링 실행
+
+    Args:
+        config: 설정 정보
+        state: 증분 집계 상태 (데몬 모드에서 tick 간 유지).
+               None이면 새 상태로 전체 스캔
+        scheduler: scan_scheduler.ScanScheduler (데몬 모드, tick당 스캔 예산).
+                   None이면 예산 없이 모두 읽음
+        history: usage_history.UsageHistory (데몬 모드, 장기 기록)
+    """
     # Timezone 설정
     tz_name = config['display_settings']['timezone']
     tz_abbr = config['display_settings']['timezone_abbr']
-    tz = ZoneInfo(tz_name)
+    tz = get_zone(tz_name)
 
     # 세션 파일 찾기
     session_files = find_all_sessions()
@@ -495,35 +546,380 @@ def monitor_once(config):
     # 현재 시간
     now = datetime.now(tz)
 
+    # 외부 소스(extension, manual)는 트랜스크립트 처리와 동시에 읽음
+    source_runner = get_source_runner(config)
+    source_runner.start(now.timestamp())
+
+    # 윈도우 계산 (세션 5시간 고정, 주간 anchor 또는 7일 rolling)
+    weekly_anchor = get_weekly_anchor(config, source_runner.pushed('extension'))
+    windows = get_monitor_windows(now, config, weekly_anchor)
+
+    # 새 이벤트만 누적 (윈도우가 바뀌면 누적기 초기화)
+    if state is None:
+        state = create_usage_state()
+    bounds = window_bounds(windows)
+    listeners = get_listeners(state, config, now.timestamp())
+    budget = None
+    if scheduler is None:
+        update_usage_state(state, session_files, bounds, now.timestamp(), listeners=listeners)
+    else:
+        # 예산 안에서 최근 파일부터 읽고, 남은 작업은 다음 tick으로 이월
+        budget = scheduler.start_tick()
+        update_usage_state(state, scheduler.order(session_files), bounds, now.timestamp(),
+                           listeners=listeners, budget=budget)
+        scheduler.end_tick(budget, session_files, state['cursors'], dormant_cutoff(bounds))
+    provisional = scheduler is not None and scheduler.provisional
+
+    # 장기 기록 (현재 윈도우 스캔이 끝난 tick에만, 같은 tick 예산의 남은 부분으로 backfill)
+    if history is not None and not provisional:
+        history.update(session_files, now.timestamp(), budget)
+        if scheduler is not None:
+            scheduler.record(budget)
+
+    # backlog가 남아 있으면 부분 집계 → 알림 보류
+    data = build_output(config, state, now, windows, notify=not provisional)
+    data['provisional'] = provisional
+    if scheduler is not None:
+        data['scan'] = scheduler.status()
+
+    # 소스별 관측값 병합 (실제 퍼센트로 로컬 추정치를 anchor)
+    # 부분 집계 추정치는 anchor 기준으로 남기지 않음
+    source_history = state.setdefault('source_history', {})
+    if provisional:
+        source_history = copy.deepcopy(source_history)
+    data['snapshot'] = merge_observations(
+        source_history,
+        transcript_observation(data, windows, now.timestamp()),
+        source_runner.collect(),
+        now.timestamp(),
+        errors=source_runner.errors,
+        stale_after={source.name: source.stale_after for source in source_runner.sources}
+    )
+    data['session']['reset_comparison'] = compare_session_resets(data, tz_name)
+    return data
+
+
+def get_source_runner(config):
+    """외부 사용량 소스 (프로세스당 1개, 설정의 sources가 바뀌면 다시 만듦)"""
+    global _source_runner
+    if _source_runner is None:
+        _source_runner = SourceRunner(create_sources(config))
+    return _source_runner
+
+
+def accept_pushed_usage(config, message):
+    """
+    데몬 소켓으로 받은 관측값을 소스에 반영 (claude-usage-sync Native Messaging 호스트)
+
+    {"type": "usage", "source": "extension", "usage": {/tmp/claude-web-usage.json 형식}}
+
+    Returns:
+        bool: 반영 여부
+    """
+    if not isinstance(message, dict) or message.get('type') != 'usage':
+        return False
+    usage = message.get('usage')
+    if not isinstance(usage, dict):
+        return False
+    return get_source_runner(config).push(message.get('source', 'extension'), usage, time.time())
+
+
+def display_percentage(data, window):
+    """표시용 퍼센트 (캘리브레이션된 값이 있으면 그것을 사용)"""
+    calibration = data['calibration'][window] if data['calibration']['enabled'] else None
+    if calibration:
+        return calibration['calibrated_percentage']
+    return data[window]['percentages']['max_percentage']
+
+
+def transcript_observation(data, windows, now_epoch):
+    """build_output() 결과 → transcripts 소스 관측값 (로컬 추정치)"""
+    observation = {
+        'source': 'transcripts',
+        'observed_at': now_epoch,
+        'ground_truth': False
+    }
+    for window in ('session', 'weekly'):
+        observation[window] = {
+            'percentage': display_percentage(data, window),
+            'window_start': windows[window][0].timestamp()
+        }
+    return observation
+
+
+def snapshot_windows(data):
+    """
+    monitor_once() 결과 → 공유 스냅샷 윈도우 값 (usage_shm.SnapshotWriter.publish)
+
+    퍼센트는 외부 소스로 anchor된 값 (없으면 표시용 퍼센트), 시간은 epoch 초
+    """
+    if data['status'] != 'active':
+        return {}
+
+    windows = {}
+    for window in ('session', 'weekly'):
+        merged = data.get('snapshot', {}).get(window)
+        windows[window] = {
+            'percentage': merged['percentage'] if merged else display_percentage(data, window),
+            'estimated_percentage': merged['estimated_percentage'] if merged else None,
+            'reset_at': datetime.fromisoformat(data[window]['reset']['iso']).timestamp(),
+            'window_start': datetime.fromisoformat(data[window]['window']['start']).timestamp(),
+            'window_end': datetime.fromisoformat(data[window]['window']['end']).timestamp(),
+            'anchored': bool(merged and merged['anchor'])
+        }
+    return windows
+
+
+def get_monitor_windows(now, config, weekly_anchor):
+    """
+    세션/주간 윈도우 계산
+
+    Args:
+        now: 현재 시간 (aware datetime)
+        config: 설정 정보
+        weekly_anchor: get_weekly_anchor() 결과 (None이면 7일 rolling)
+
+    Returns:
+        dict: {'session': (start, end, reset), 'weekly': (start, end, reset), 'weekly_anchor': anchor}
+    """
+    return {
+        'session': get_fixed_session_window(now, config),
+        'weekly': get_weekly_window(now, config, weekly_anchor),
+        'weekly_anchor': weekly_anchor
+    }
+
+
+def window_bounds(windows):
+    """get_monitor_windows() 결과 → update_usage_state용 epoch 경계"""
+    session_start, session_end, _ = windows['session']
+    weekly_start, weekly_end, _ = windows['weekly']
+    return {
+        'session': (session_start.timestamp(), session_end.timestamp(), False),
+        'weekly': (weekly_start.timestamp(), weekly_end.timestamp(), windows['weekly_anchor'] is None)
+    }
+
+
+def get_forecaster(state, config):
+    """상태에 저장된 forecaster (없으면 생성)"""
+    if 'forecaster' not in state:
+        from forecaster import BurnRateForecaster, DEFAULT_HALF_LIFE_MINUTES
+        forecast_config = config.get('forecast', {})
+        state['forecaster'] = BurnRateForecaster(
+            half_life_minutes=forecast_config.get('half_life_minutes', DEFAULT_HALF_LIFE_MINUTES))
+    return state['forecaster']
+
+
+def get_rate_tracker(state, config):
+    """
+    상태에 저장된 RPM/TPM tracker (없으면 생성)
+
+    새로 만들 때는 최근 이벤트 버퍼로 채움 (이전 버전 체크포인트/인덱스, 세션 윈도우 변경)
+    """
+    if 'rate_tracker' not in state:
+        from rate_tracker import RateTracker
+        tracker = RateTracker(config['rate_limits']['session']['window_hours'] * 60)
+        for event in state.get('recent_events', ()):
+            tracker.add_event(event)
+        state['rate_tracker'] = tracker
+    return state['rate_tracker']
+
+
+def get_session_detector(state, config):
+    """
+    상태에 저장된 rolling 세션 detector (없으면 생성)
+
+    새로 만들 때는 최근 이벤트 버퍼로 채움
+    """
+    if 'session_detector' not in state:
+        from session_detector import RollingSessionDetector
+        detector = RollingSessionDetector(config['rate_limits']['session']['window_hours'])
+        for event in state.get('recent_events', ()):
+            detector.add_event(event)
+        state['session_detector'] = detector
+    return state['session_detector']
+
+
+def create_anomaly_detector(config, replay=False):
+    """설정으로 runaway loop detector 생성 (replay: 오래된 이벤트도 모든 시점 판정)"""
+    from anomaly_detector import LoopDetector, DEFAULT_THRESHOLD_SIGMAS, DEFAULT_MIN_RATE, MAX_ALERT_DELAY_SECONDS
+
+    anomaly_config = config.get('anomaly', {})
+    return LoopDetector(anomaly_config.get('threshold_sigmas', DEFAULT_THRESHOLD_SIGMAS),
+                        anomaly_config.get('min_tokens_per_minute', DEFAULT_MIN_RATE),
+                        None if replay else MAX_ALERT_DELAY_SECONDS)
+
+
+def get_anomaly_detector(state, config):
+    """
+    상태에 저장된 runaway loop detector (없으면 생성)
+
+    새로 만들 때는 최근 이벤트 버퍼를 시간순으로 넣어 baseline을 채움 (알림 없음)
+    """
+    if 'anomaly_detector' not in state:
+        detector = create_anomaly_detector(config)
+        for event in sorted(state.get('recent_events', ()), key=lambda e: e.timestamp):
+            detector.add_event(event)
+        state['anomaly_detector'] = detector
+    return state['anomaly_detector']
+
+
+def get_listeners(state, config, now_epoch):
+    """
+    증분 리스너 (forecaster, rate tracker, rolling 세션 detector, runaway loop detector)
+
+    현재 시간으로 advance한 뒤 update_usage_state/ingest_events에 넘김
+    """
+    listeners = [get_forecaster(state, config), get_rate_tracker(state, config),
+                 get_session_detector(state, config), get_anomaly_detector(state, config)]
+    for listener in listeners:
+        listener.advance(now_epoch)
+    return listeners
+
+
+def build_rates(tracker, now, window_start, limits, tz_name):
+    """
+    분당 요청/토큰 속도 (출력 JSON용)
+
+    Returns:
+        dict: {
+            "current": {"requests_per_minute": {"value", "percentage_of_limit"}, ...},  # 최근 60초
+            "peak": {"requests_per_minute": {"value", "minute", "percentage_of_limit"}, ...}  # 윈도우 안 가장 바빴던 분
+        }
+        limit이 설정되지 않은 지표는 percentage_of_limit이 None
+    """
+    tracker.advance(now.timestamp())
+    current = tracker.current()
+    peaks = tracker.peaks(window_start.timestamp())
+
+    rates = {'current': {}, 'peak': {}}
+    for metric, key in RATE_METRICS.items():
+        limit = limits.get(key)
+        rates['current'][key] = {
+            'value': current[metric],
+            'percentage_of_limit': round(current[metric] / limit * 100, 1) if limit else None
+        }
+        peak = peaks[metric]
+        rates['peak'][key] = None if peak is None else {
+            'value': peak['value'],
+            'minute': epoch_to_datetime(peak['minute_epoch'], tz_name).isoformat(),
+            'percentage_of_limit': round(peak['value'] / limit * 100, 1) if limit else None
+        }
+    return rates
+
+
+def build_rolling_session(detector, state, now, limits, tz_name):
+    """
+    rolling 세션 (이전 세션이 끝난 뒤 첫 메시지 + window_hours, 고정 윈도우와 병행)
+
+    Returns:
+        dict: 세션 정보, 기록이 없으면 None
+    """
+    detector.flush(state.get('recent_events', ()))
+    session = detector.session(now.timestamp())
+    if session is None:
+        return None
+
+    summary = usage_summary(session['usage'])
+    reset = epoch_to_datetime(session['reset'], tz_name)
+    return {
+        'active': session['active'],
+        'start': epoch_to_datetime(session['start'], tz_name).isoformat(),
+        'reset': reset.isoformat(),
+        'time_until_reset': calculate_time_until_reset(now, reset) if session['active'] else None,
+        'messages_count': summary['messages_count'],
+        'percentages': calculate_usage_percentage(summary, limits)
+    }
+
+
+def build_anomalies(detector, tz_name):
+    """runaway loop 감지 상태 + 최근 알림 (출력 JSON용)"""
+    alerts = []
+    for alert in detector.recent:
+        alert = dict(alert)
+        alert['time'] = epoch_to_datetime(alert.pop('epoch'), tz_name).isoformat()
+        alerts.append(alert)
+    return dict(detector.status(), alerts=alerts)
+
+
+def compare_session_resets(data, tz_name):
+    """
+    Extension이 스크래핑한 세션 리셋 시간과 고정/rolling 윈도우 리셋 비교
+
+    스크래핑 문구는 분 단위 ("3시간 50분 후")이므로 ±1분 오차
+
+    Returns:
+        dict: {"source", "observed_reset", "fixed_error_minutes", "rolling_error_minutes"}
+        (양수면 모니터 리셋이 늦음), 관측값이 없으면 None
+    """
+    anchor = (data['snapshot'].get('session') or {}).get('anchor')
+    if not anchor:
+        return None
+    remaining = parse_session_reset_text(anchor.get('reset_time'))
+    if remaining is None:
+        return None
+
+    observed_reset = datetime.fromisoformat(anchor['observed_at']).timestamp() + remaining
+    fixed_reset = datetime.fromisoformat(data['session']['reset']['iso']).timestamp()
+    rolling = data['session'].get('rolling')
+
+    return {
+        'source': anchor['source'],
+        'observed_reset': epoch_to_datetime(observed_reset, tz_name).isoformat(),
+        'fixed_error_minutes': round((fixed_reset - observed_reset) / 60, 1),
+        'rolling_error_minutes': (
+            round((datetime.fromisoformat(rolling['reset']).timestamp() - observed_reset) / 60, 1)
+            if rolling else None)
+    }
+
+
+def build_output(config, state, now, windows, notify=True):
+    """
+    누적 상태로 출력 데이터 생성
+
+    Args:
+        config: 설정 정보
+        state: 이번 tick까지 누적된 상태
+        now: 현재 시간 (replay에서는 시뮬레이션 시간)
+        windows: get_monitor_windows() 결과
+        notify: False면 알림 생략 (replay)
+
+    Returns:
+        dict: 출력 데이터
+    """
+    tz_name = config['display_settings']['timezone']
+    tz_abbr = config['display_settings']['timezone_abbr']
+
     # Config에서 limit 로드
     session_limits = config['rate_limits']['session']
     weekly_limits = config['rate_limits']['weekly']
 
-    # 세션 윈도우 계산 (5시간 고정)
-    session_start, session_end, session_reset = get_fixed_session_window(now, config)
-    session_usage = parse_sessions_in_window(session_files, session_start, session_end, tz)
+    session_start, session_end, session_reset = windows['session']
+    weekly_start, weekly_end, weekly_reset = windows['weekly']
+    weekly_anchor = windows['weekly_anchor']
+    forecaster = get_forecaster(state, config)
+
+    session_usage = usage_summary(state['windows']['session'])
     session_percentages = calculate_usage_percentage(session_usage, session_limits)
 
     # 세션 리셋까지 남은 시간 계산
     session_time_until_reset = calculate_time_until_reset(now, session_reset)
 
-    # 주간 윈도우 계산 (7일)
-    weekly_start, weekly_end, weekly_reset = get_weekly_window(now)
-    weekly_usage = parse_sessions_in_window(session_files, weekly_start, weekly_end, tz)
+    weekly_usage = usage_summary(state['windows']['weekly'])
     weekly_percentages = calculate_usage_percentage(weekly_usage, weekly_limits)
 
     # 주간 리셋까지 남은 시간 계산
     weekly_time_until_reset = calculate_time_until_reset(now, weekly_reset)
 
     # Calibration 적용 (세션)
+    calibrator = load_calibration()
     session_calibration_info = None
     session_display_percentage = session_percentages['max_percentage']  # 기본값
 
-    if CALIBRATION_ENABLED:
+    if calibrator is not None:
         try:
-            window_key = get_session_window_key(session_start)
+            window_key = calibrator.get_session_window_key(session_start)
             monitor_value = session_percentages['max_percentage'] / 100.0
-            calibration = get_calibrated_value(monitor_value, window_key)
+            calibration = calibrator.get_calibrated_value(monitor_value, window_key)
 
             session_calibration_info = {
                 'original_percentage': session_percentages['max_percentage'],
@@ -547,11 +943,11 @@ def monitor_once(config):
     weekly_calibration_info = None
     weekly_display_percentage = weekly_percentages['max_percentage']  # 기본값
 
-    if CALIBRATION_ENABLED:
+    if calibrator is not None:
         try:
-            weekly_window_key = get_weekly_window_key()
+            weekly_window_key = calibrator.get_weekly_window_key()
             weekly_monitor_value = weekly_percentages['max_percentage'] / 100.0
-            weekly_calibration = get_calibrated_value(weekly_monitor_value, weekly_window_key)
+            weekly_calibration = calibrator.get_calibrated_value(weekly_monitor_value, weekly_window_key)
 
             weekly_calibration_info = {
                 'original_percentage': weekly_percentages['max_percentage'],
@@ -569,21 +965,64 @@ def monitor_once(config):
         except Exception as e:
             print(f"Warning: Weekly calibration failed: {e}")
 
+    # 소진 시각 예측 (캘리브레이션된 값 기준)
+    session_forecast = build_forecast(
+        forecaster, now, session_display_percentage, session_limits, session_reset, tz_name)
+    weekly_forecast = build_forecast(
+        forecaster, now, weekly_display_percentage, weekly_limits,
+        weekly_reset if weekly_anchor is not None else None, tz_name)
+
+    # 분당 burst (세션 윈도우 안에서)
+    session_rates = build_rates(get_rate_tracker(state, config), now, session_start, session_limits, tz_name)
+
+    # rolling 세션 (고정 윈도우와 비교용, multi-root 합계에는 없음)
+    session_detector = state.get('session_detector')
+    session_rolling = None
+    if session_detector is not None:
+        session_rolling = build_rolling_session(session_detector, state, now, session_limits, tz_name)
+
+    # runaway loop 감지 (multi-root 합계에는 없음)
+    anomaly_detector = state.get('anomaly_detector')
+    anomalies = None
+    if anomaly_detector is not None:
+        anomaly_detector.flush(state['recent_events'])
+        anomalies = build_anomalies(anomaly_detector, tz_name)
+
     # 알림 체크 및 전송 (캘리브레이션된 값 기준)
-    notified_thresholds = check_and_send_notifications(
-        config,
-        session_display_percentage,
-        session_start.isoformat()
-    )
+    notified_thresholds = []
+    if notify:
+        notified_thresholds = check_and_send_notifications(
+            config,
+            session_display_percentage,
+            session_start.isoformat()
+        )
+        check_forecast_notifications(config, {
+            'session': (session_start.isoformat(), session_forecast),
+            # rolling 윈도우는 시작점이 매 tick 바뀌므로 하루 1회로 제한
+            'weekly': (weekly_start.isoformat() if weekly_anchor is not None else f"rolling:{now.date()}",
+                       weekly_forecast)
+        })
+        if anomaly_detector is not None:
+            check_anomaly_notifications(config, anomaly_detector.drain())
+
+    # 주간 표시 문구
+    if weekly_anchor is None:
+        weekly_note = '7일 rolling 윈도우'
+        weekly_status_line = f"{weekly_display_percentage}% used (7 days)"
+    else:
+        weekly_note = f"주간 고정 윈도우 ({weekly_reset.strftime('%a %H:%M')} 리셋, {weekly_anchor['source']})"
+        weekly_status_line = (f"{weekly_display_percentage}% used, resets in "
+                              f"{weekly_time_until_reset['human_readable']} "
+                              f"({weekly_reset.strftime('%a %H:%M')} {tz_abbr})")
 
     # 출력 데이터 생성
     output = {
         'status': 'active',
-        'plan': config['plan'],
+        'plan': thaw(config['plan']),
         'timezone': tz_name,
         'timezone_abbr': tz_abbr,
         'calibration': {
-            'enabled': CALIBRATION_ENABLED,
+            'enabled': calibrator is not None,
             'session': session_calibration_info,
             'weekly': weekly_calibration_info,
             # Legacy compatibility (세션 정보를 'info'에도 유지)
@@ -594,6 +1033,7 @@ def monitor_once(config):
             'thresholds': config.get('notifications', {}).get('thresholds', [80, 90, 95]),
             'notified_this_session': notified_thresholds
         },
+        'anomalies': anomalies,
         'session': {
             'usage': {
                 'input_tokens': session_usage['input_tokens'],
@@ -604,6 +1044,8 @@ def monitor_once(config):
                 'messages_count': session_usage['messages_count']
             },
             'percentages': session_percentages,
+            'forecast': session_forecast,
+            'rates': session_rates,
             'limits': {
                 'input_tokens_per_minute': session_limits['input_tokens_per_minute'],
                 'output_tokens_per_minute': session_limits['output_tokens_per_minute'],
@@ -622,6 +1064,7 @@ def monitor_once(config):
                 'time_until_reset': session_time_until_reset,
                 'note': f'{session_limits["window_hours"]}시간 rolling 윈도우'
             },
+            'rolling': session_rolling,
             'display': {
                 'progress_bar': generate_progress_bar(session_display_percentage),
                 'status_line': f"{session_display_percentage}% used, resets in {session_time_until_reset['human_readable']} ({session_reset.strftime('%H:%M')} {tz_abbr})"
@@ -637,6 +1080,7 @@ def monitor_once(config):
                 'messages_count': weekly_usage['messages_count']
             },
             'percentages': weekly_percentages,
+            'forecast': weekly_forecast,
             'limits': {
                 'input_tokens_per_minute': weekly_limits['input_tokens_per_minute'],
                 'output_tokens_per_minute': weekly_limits['output_tokens_per_minute'],
@@ -653,14 +1097,15 @@ def monitor_once(config):
                 'timezone': tz_name,
                 'timezone_abbr': tz_abbr,
                 'time_until_reset': weekly_time_until_reset,
-                'note': '7일 rolling 윈도우'
+                'anchor': weekly_anchor,
+                'note': weekly_note
             },
             'display': {
                 'progress_bar': generate_progress_bar(weekly_display_percentage),
-                'status_line': f"{weekly_display_percentage}% used (7 days)"
+                'status_line': weekly_status_line
             }
         },
-        'timestamp': datetime.now(tz).isoformat()
+        'timestamp': now.isoformat()
     }
 
     return output
@@ -668,8 +1113,8 @@ def monitor_once(config):
 
 def save_output(data):
     """출력 파일 저장"""
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    with open(OUTPUT_FILE, 'wb') as f:
+        json_backend.dump(data, f, indent=True)
 
 
 def check_pid():
@@ -703,103 +1148,514 @@ def write_pid():
         f.write(str(os.getpid()))
 
 
+def read_pid():
+    """PID 파일의 PID (없거나 비어 있으면 None)"""
+    try:
+        return int(PID_FILE.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def acquire_pid_lock(takeover=False, timeout=TAKEOVER_TIMEOUT_SECONDS):
+    """
+    PID 파일에 flock을 걸어 단일 인스턴스 보장
+
+    check_pid() → write_pid() 사이에 다른 데몬이 끼어들 수 있는 경쟁이 없고,
+    비정상 종료 시에도 커널이 잠금을 풀어 오래된 PID 파일 정리가 필요 없다.
+    PID 파일은 지우지 않는다 (지운 파일에 잠금을 건 프로세스와 새 파일에
+    잠금을 건 프로세스가 동시에 실행될 수 있으므로).
+
+    Args:
+        takeover: 실행 중인 데몬에 SIGTERM을 보내고 잠금을 넘겨받음 (--force)
+        timeout: 기존 데몬 종료 대기 시간 (초)
+
+    Returns:
+        bool: 잠금 획득 여부
+    """
+    global _pid_lock
+    import signal
+
+    if fcntl is None:
+        if not takeover and not check_pid():
+            return False
+        write_pid()
+        return True
+
+    PID_FILE.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = os.fdopen(os.open(PID_FILE, os.O_RDWR | os.O_CREAT, 0o644), 'r+')
+    deadline = None
+    pid_retry_until = None
+
+    while True:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            old_pid = read_pid()
+            if not takeover:
+                print(f"⚠️  Daemon already running with PID {old_pid}")
+                print(f"   To restart, run: {sys.argv[0]} --force")
+                lock_file.close()
+                return False
+
+            if deadline is None:
+                if old_pid is None:
+                    if pid_retry_until is None:
+                        pid_retry_until = time.time() + PID_READ_RETRY_SECONDS
+                    if time.time() < pid_retry_until:
+                        time.sleep(0.05)
+                        continue
+                print(f"🔁 Stopping running daemon (PID {old_pid})")
+                if old_pid is not None:
+                    try:
+                        os.kill(old_pid, signal.SIGTERM)
+                    except OSError:
+                        pass
+                deadline = time.time() + timeout
+            elif time.time() > deadline:
+                print(f"❌ Daemon (PID {old_pid}) did not stop within {timeout:.0f}s")
+                lock_file.close()
+                return False
+            time.sleep(0.1)
+
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    _pid_lock = lock_file
+    return True
+
+
 def cleanup_pid():
-    """PID 파일 삭제"""
-    if PID_FILE.exists():
-        PID_FILE.unlink()
+    """PID 잠금 해제 (flock 미지원 환경에서는 PID 파일 삭제)"""
+    global _pid_lock
+
+    if fcntl is None:
+        if PID_FILE.exists():
+            PID_FILE.unlink()
+        return
+
+    if _pid_lock is not None:
+        _pid_lock.seek(0)
+        _pid_lock.truncate()
+        _pid_lock.close()
+        _pid_lock = None
+
+
+def create_memory_budget(max_rss, states):
+    """
+    데몬용 메모리 예산 (재구성 비용이 싼 캐시부터 비움)
+
+    Args:
+        max_rss: 최대 RSS (bytes)
+        states: 증분 집계 상태 리스트 (최근 이벤트 버퍼를 비울 대상)
+    """
+    from memory_budget import MemoryBudget
+    import cold_storage
+
+    budget = MemoryBudget(max_rss)
+    budget.register('compressed_index', cold_storage.drop_index_cache)
+    calibrator = load_calibration()
+    if calibrator is not None:
+        budget.register('calibration_models', calibrator.clear_calibration_cache)
+
+    def shed_states():
+        now_epoch = time.time()
+        for state in states:
+            shed_recent_events(state, now_epoch)
+
+    budget.register('recent_events', shed_states)
+    return budget
+
 
+def save_daemon_checkpoint(state):
+    """집계 상태, 캘리브레이션 모델 캐시, 알림 상태를 체크포인트로 저장"""
+    from usage_index import save_checkpoint
 
-def daemon_mode(config, interval=60):
+    calibrator = load_calibration()
+    save_checkpoint(
+        state,
+        calibrator.export_models_cache() if calibrator is not None else None,
+        _notification_engine.state if _notification_engine is not None else None
+    )
+
+
+def restore_daemon_checkpoint(config):
+    """
+    체크포인트에서 데몬 상태 복원
+
+    Returns:
+        dict: 증분 집계 상태 (체크포인트가 없거나 트랜스크립트가 바뀌었으면 새 상태)
+    """
+    from usage_index import load_checkpoint
+
+    checkpoint = load_checkpoint()
+    if checkpoint is None:
+        return create_usage_state()
+
+    saved_at = datetime.fromtimestamp(checkpoint['saved_at']).strftime('%Y-%m-%d %H:%M:%S')
+
+    if checkpoint['calibration_models'] is not None:
+        calibrator = load_calibration()
+        if calibrator is not None:
+            calibrator.restore_models_cache(checkpoint['calibration_models'])
+
+    if checkpoint['notification_state'] is not None:
+        get_notification_engine(config).restore_state(
+            checkpoint['notification_state'], checkpoint['saved_at'])
+
+    state = checkpoint['usage_state']
+    if state is None:
+        return create_usage_state()
+
+    print(f"   Checkpoint: {saved_at} ({len(state['cursors'])} files)")
+    return state
+
+
+def config_dependents(changed):
+    """바뀐 키 경로에 의존하는 파생 상태 이름 (섹션 전체가 바뀐 경우 포함)"""
+    dependents = set()
+    for path in changed:
+        for key, dependent in CONFIG_DEPENDENTS.items():
+            if path == key or key.startswith(path + '.') or path.startswith(key + '.'):
+                dependents.add(dependent)
+    return dependents
+
+
+def apply_config_change(config, changed, state):
+    """
+    바뀐 설정 키에 의존하는 파생 상태만 갱신 (집계 상태와 캐시는 유지)
+
+    Args:
+        config: 새 설정
+        changed: 바뀐 키 경로 (diff_config)
+        state: 증분 집계 상태
+
+    Returns:
+        set: 갱신한 파생 상태 이름
+    """
+    global _notification_engine, _source_runner
+
+    dependents = config_dependents(changed)
+
+    if 'notification_engine' in dependents and _notification_engine is not None:
+        # 새 백엔드로 다시 만듦 (알림 상태는 파일에 저장되어 있음)
+        _notification_engine.close()
+        _notification_engine = None
+
+    if 'source_runner' in dependents and _source_runner is not None:
+        _source_runner.close()
+        _source_runner = None
+
+    if 'forecaster' in dependents and 'forecaster' in state:
+        from forecaster import DEFAULT_HALF_LIFE_MINUTES
+        forecast_config = config.get('forecast', {})
+        state['forecaster'].set_half_life(
+            forecast_config.get('half_life_minutes', DEFAULT_HALF_LIFE_MINUTES))
+
+    if 'session_listeners' in dependents:
+        # ring/세션 길이가 바뀜 → 다음 tick에 최근 이벤트 버퍼로 다시 채움
+        state.pop('rate_tracker', None)
+        state.pop('session_detector', None)
+
+    if 'anomaly_detector' in dependents and 'anomaly_detector' in state:
+        from anomaly_detector import DEFAULT_THRESHOLD_SIGMAS, DEFAULT_MIN_RATE
+        anomaly_config = config.get('anomaly', {})
+        state['anomaly_detector'].set_threshold(
+            anomaly_config.get('threshold_sigmas', DEFAULT_THRESHOLD_SIGMAS),
+            anomaly_config.get('min_tokens_per_minute', DEFAULT_MIN_RATE))
+
+    return dependents
+
+
+def collect_daemon_stats(state, started_at, ticks, last_tick_seconds, memory_budget=None, scheduler=None,
+                         history=None):
+    """SIGUSR1: 데몬 내부 통계"""
+    from memory_budget import current_rss_bytes
+
+    cursors = state['cursors']
+    stats = {
+        'pid': os.getpid(),
+        'uptime_seconds': round(time.time() - started_at),
+        'ticks': ticks,
+        'last_tick_ms': round(last_tick_seconds * 1000, 1),
+        'files_tracked': len(cursors),
+        'bytes_indexed': sum(cursor['offset'] for cursor in cursors.values()),
+        'recent_events': len(state['recent_events']),
+        'windows': {
+            name: usage.messages_count for name, usage in state['windows'].items()
+        },
+        'rss_bytes': current_rss_bytes()
+    }
+    if 'forecaster' in state:
+        stats['forecast_buckets'] = len(state['forecaster'].buckets)
+    if 'anomaly_detector' in state:
+        stats['anomaly'] = state['anomaly_detector'].status()
+    if memory_budget is not None:
+        stats['memory_budget'] = memory_budget.stats()
+    if scheduler is not None:
+        stats['scan'] = scheduler.status()
+    if history is not None:
+        stats['history'] = history.stats()
+    return stats
+
+
+def daemon_mode(config, interval=60, max_rss=None, scan_budget_bytes=None, scan_cpu_seconds=None,
+                nice=None, idle_io=False):
     """데몬 모드로 지속 실행"""
+    # 데몬 전용 (--once 시작 시간에 포함되지 않도록)
+    import signal
+    from memory_budget import format_size
+    from daemon_socket import OutputServer
+    from config_store import ConfigWatcher
+    from usage_shm import SNAPSHOT_FILE, SnapshotWriter
+    from scan_scheduler import DEFAULT_TICK_BYTES, DEFAULT_TICK_CPU_SECONDS, ScanScheduler, lower_priority
+    from usage_history import HISTORY_FILE, load_usage_history
+
+    # 빌드 등 같은 머신의 다른 작업에 양보
+    priority = lower_priority(nice, idle_io)
+    scheduler = ScanScheduler(scan_budget_bytes or DEFAULT_TICK_BYTES,
+                              scan_cpu_seconds or DEFAULT_TICK_CPU_SECONDS)
+
     # Timezone 설정
     tz_name = config['display_settings']['timezone']
-    tz = ZoneInfo(tz_name)
+    tz = get_zone(tz_name)
 
     print(f"🚀 Claude Usage Monitor Daemon v2 started")
     print(f"   PID: {os.getpid()}")
     print(f"   Plan: {config['plan']['name']}")
     print(f"   Timezone: {tz_name}")
     print(f"   Output: {OUTPUT_FILE}")
+    print(f"   Snapshot: {SNAPSHOT_FILE}")
+    print(f"   History: {HISTORY_FILE}")
     print(f"   Interval: {interval}s")
+    if max_rss is not None:
+        print(f"   Memory budget: {format_size(max_rss)} RSS")
+    print(f"   Scan budget: {format_size(scheduler.max_bytes)}, "
+          f"{scheduler.max_cpu_seconds * 1000:.0f} ms CPU per tick")
+    if priority:
+        print(f"   Priority: {', '.join(priority)}")
+    print(f"   Config: {CONFIG_FILE} (changes apply between ticks)")
+    print(f"   Signals: HUP reloads config, USR1 dumps stats")
     print(f"   Press Ctrl+C to stop\\n")
 
+    # 증분 집계 상태 (tick 간 유지 → 새로 추가된 줄만 파싱, 재시작 시 체크포인트에서 이어감)
+    state = restore_daemon_checkpoint(config)
+    history = load_usage_history()
+    memory_budget = create_memory_budget(max_rss, [state]) if max_rss is not None else None
+
+    # --once 요청에 최신 출력을 바로 응답
+    output_server = OutputServer()
+    if not output_server.start():
+        output_server = None
+
+    # 자주 읽는 로컬 리더(메뉴바, 프롬프트)용 공유 메모리 스냅샷 (usage_shm.SnapshotReader)
+    snapshot_writer = SnapshotWriter()
+
+    # 시그널 핸들러는 플래그만 세우고, tick 사이(대기 중)에 처리
+    # (tick 도중 종료/재설정으로 반쯤 반영된 상태가 남지 않도록)
+    signals = {action: False for action in DAEMON_SIGNALS.values()}
+
+    def handle_signal(signum, frame):
+        signals[DAEMON_SIGNALS[signal.Signals(signum).name]] = True
+
+    for name in DAEMON_SIGNALS:
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handle_signal)
+
+    started_at = time.time()
+    last_checkpoint = started_at
+    ticks = 0
+    tick_seconds = 0.0
+    in_tick = False
+
+    # config.json 변경 감지 (tick 사이에 설정을 통째로 교체, SIGHUP은 즉시 다시 읽음)
+    watcher = ConfigWatcher(config, CONFIG_FILE)
+
     try:
         while True:
+            changed = watcher.poll(force=signals['reload'])
+            signals['reload'] = False
+            if changed:
+                config = watcher.config
+                tz = get_zone(config['display_settings']['timezone'])
+                dependents = apply_config_change(config, changed, state)
+                print(f"[{datetime.now(tz).strftime('%H:%M:%S')}] "
+                      f"Config reloaded: {', '.join(sorted(changed))}"
+                      + (f" (refreshed {', '.join(sorted(dependents))})" if dependents else ''))
+
+            # Native Messaging 호스트가 보낸 관측값 (파일 없이 소스에 반영)
+            if output_server is not None:
+                for message in output_server.drain_messages():
+                    if not accept_pushed_usage(config, message):
+                        print(f"[{datetime.now(tz).strftime('%H:%M:%S')}] Ignored socket message: "
+                              f"{str(message)[:80]}")
+
+            in_tick = True
+            tick_started = time.time()
+
             # 모니터링 실행
-            data = monitor_once(config)
+            data = monitor_once(config, state, scheduler, history)
 
             # 파일 저장
             save_output(data)
+            if output_server is not None:
+                output_server.publish(json_backend.dumps(data, indent=True))
+            snapshot_writer.publish(data['status'], snapshot_windows(data))
+
+            # 메모리 예산 확인
+            if memory_budget is not None:
+                shed = memory_budget.check()
+                if shed:
+                    print(f"[{datetime.now(tz).strftime('%H:%M:%S')}] "
+                          f"Memory: shed {', '.join(shed)} (RSS {format_size(memory_budget.last_rss)})")
+
+            # 주기적 체크포인트
+            if time.time() - last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS:
+                save_daemon_checkpoint(state)
+                if history.dirty:
+                    history.save()
+                last_checkpoint = time.time()
+
+            ticks += 1
+            tick_seconds = time.time() - tick_started
+            in_tick = False
 
             # 상태 출력
             if data['status'] == 'active':
                 session_bar = data['session']['display']['progress_bar']
                 # 캘리브레이션된 값이 있으면 그것을 사용, 아니면 원본 사용
-                if data['calibration']['enabled'] and data['calibration']['session']:
-                    session_pct = data['calibration']['session']['calibrated_percentage']
-                else:
-                    session_pct = data['session']['percentages']['max_percentage']
-
-                if data['calibration']['enabled'] and data['calibration']['weekly']:
-                    weekly_pct = data['calibration']['weekly']['calibrated_percentage']
-                else:
-                    weekly_pct = data['weekly']['percentages']['max_percentage']
+                session_pct = display_percentage(data, 'session')
+                weekly_pct = display_percentage(data, 'weekly')
 
                 print(f"[{datetime.now(tz).strftime('%H:%M:%S')}] "
                       f"Session: {session_bar} {session_pct}% | "
-                      f"Weekly: {weekly_pct}%")
+                      f"Weekly: {weekly_pct}%"
+                      + (f" | provisional, {format_size(scheduler.backlog_bytes)} left to scan"
+                         if scheduler.provisional else ''))
             else:
                 print(f"[{datetime.now(tz).strftime('%H:%M:%S')}] "
                       f"No active session")
 
-            # 대기
-            time.sleep(interval)
-
-    except KeyboardInterrupt:
+            # 대기 (종료/재설정 요청이나 소켓 관측값이 오면 바로 깨어남, backlog가 남아 있거나
+            # 임계값 근처인 프로젝트가 있으면 짧게)
+            wait = scheduler.next_interval(interval)
+            if 'anomaly_detector' in state:
+                wait = state['anomaly_detector'].next_interval(wait)
+            deadline = time.time() + wait
+            while not signals['stop'] and not signals['reload']:
+                if signals['stats']:
+                    signals['stats'] = False
+                    stats = collect_daemon_stats(state, started_at, ticks, tick_seconds, memory_budget,
+                                                 scheduler, history)
+                    print(f"[{datetime.now(tz).strftime('%H:%M:%S')}] Stats: {json_backend.dumps(stats).decode('utf-8')}")
+                remaining = deadline - time.time()
+                if remaining <= 0 or (output_server is not None and output_server.has_messages()):
+                    break
+                time.sleep(min(remaining, SIGNAL_POLL_SECONDS))
+
+            if signals['stop']:
+                raise SystemExit(0)
+
+    except (KeyboardInterrupt, SystemExit):
+        # tick 도중 Ctrl+C로 중단되면 마지막 주기 체크포인트를 유지
+        if not in_tick:
+            save_daemon_checkpoint(state)
+            if history.dirty:
+                history.save()
         print("\\n\\n✅ Daemon stopped")
         cleanup_pid()
     except Exception as e:
         print(f"\\n\\n❌ Daemon crashed: {e}")
         cleanup_pid()
         raise
+    finally:
+        if output_server is not None:
+            output_server.close()
+        snapshot_writer.close()
+
+
+def run_once(rescan=False):
+    """
+    한 번만 실행 (저장된 증분 인덱스 이후에 추가된 줄만 읽음, usage_once.py도 사용)
+
+    Args:
+        rescan: 저장된 인덱스를 무시하고 모든 트랜스크립트 스캔
+
+    Returns:
+        int: 종료 코드
+    """
+    config = load_config()
+    if not config:
+        return 1
+
+    state = None if rescan else load_usage_index()
+    if state is None:
+        state = create_usage_state()
+
+    data = monitor_once(config, state)
+    save_usage_index(state)
+    save_output(data)
+    print(json_backend.dumps(data, indent=True).decode('utf-8'))
+
+    # 대기 중인 알림 전송 완료 후 종료
+    if _notification_engine is not None:
+        _notification_engine.close()
+    if _source_runner is not None:
+        _source_runner.close()
+    return 0
 
 
 def main():
-    """메인 함수"""
+    """메인 함수 (--once의 데몬 소켓 응답은 모듈 맨 위에서 처리)"""
+    import argparse
+    from memory_budget import parse_size
+
     parser = argparse.ArgumentParser(description='Claude Usage Monitor Daemon v2')
     parser.add_argument('--once', action='store_true',
                         help='Run once and exit (default: daemon mode)')
     parser.add_argument('--interval', type=int, default=60,
                         help='Update interval in seconds (default: 60)')
     parser.add_argument('--force', action='store_true',
-                        help='Force start even if daemon is already running')
+                        help='Stop a running daemon (SIGTERM) and take over')
+    parser.add_argument('--max-rss', type=parse_size,
+                        help='Memory budget for the daemon, e.g. 64M (sheds caches before exceeding it)')
+    parser.add_argument('--rescan', action='store_true',
+                        help='With --once: ignore the running daemon and the saved index, rescan all transcripts')
+    parser.add_argument('--scan-budget', type=parse_size,
+                        help='Transcript bytes to read per tick, e.g. 64M (default: 128M, rest carried over)')
+    parser.add_argument('--scan-cpu-ms', type=int,
+                        help='CPU time for transcript parsing per tick in ms (default: 500, rest carried over)')
+    parser.add_argument('--nice', type=int,
+                        help='Increase the daemon niceness by this amount')
+    parser.add_argument('--idle-io', action='store_true',
+                        help='Run the daemon with idle I/O priority (Linux ioprio, macOS throttled I/O)')
 
     args = parser.parse_args()
 
+    if args.once:
+        return run_once(args.rescan)
+
     # 설정 로드
     config = load_config()
     if not config:
         return 1
 
-    if args.once:
-        # 한 번만 실행
-        data = monitor_once(config)
-        save_output(data)
-        print(json.dumps(data, indent=2))
-    else:
-        # 데몬 모드 - PID 확인
-        if not args.force and not check_pid():
-            return 1
-
-        # PID 파일 생성
-        write_pid()
+    # 데몬 모드 - 단일 인스턴스 잠금 (--force: 실행 중인 데몬을 종료시키고 넘겨받음)
+    if not acquire_pid_lock(takeover=args.force):
+        return 1
 
-        try:
-            # 데몬 실행
-            daemon_mode(config, args.interval)
-        finally:
-            # 종료 시 PID 파일 삭제
-            cleanup_pid()
+    try:
+        # 데몬 실행
+        daemon_mode(config, args.interval, args.max_rss, args.scan_budget,
+                    args.scan_cpu_ms / 1000 if args.scan_cpu_ms else None, args.nice, args.idle_io)
+    finally:
+        # 종료 시 PID 파일 삭제
+        cleanup_pid()
+        if _notification_engine is not None:
+            _notification_engine.close()
+        if _source_runner is not None:
+            _source_runner.close()
 
     return 0
 
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Multi-Root Aggregation
+공유 빌드 호스트에서 여러 홈 디렉토리/볼륨의 사용량을 한 데몬으로 집계
+
+    python3 multi_root.py --roots '/home/*' /mnt/ci-cache
+
+- 루트별로 별도의 증분 상태(커서, 윈도우 누적기, forecaster, rate tracker, rolling 세션) 유지
+  (rolling 세션은 사용자별 경계라 합계 출력에는 없음)
+- 루트별 출력 (OUTPUT_DIR/<name>.json) + 합계 출력 (~/.claude_usage.json)
+- tick마다 바이트 예산 안에서 루트를 라운드 로빈으로 조금씩 스캔하여
+  큰 트리 하나가 다른 루트의 갱신을 막지 않도록 함
+  (예산 안에 다 못 읽은 루트는 scan_pending으로 표시하고 다음 tick에 이어서 읽음)
+
+알림은 보내지 않는다 (여러 사용자의 사용량을 데몬 실행자에게 알릴 이유가 없음).
+"""
+
+import argparse
+import glob
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from memory_budget import parse_size, format_size
+from monitor_daemon import (
+    OUTPUT_FILE,
+    create_memory_budget,
+    load_config,
+    get_weekly_anchor,
+    get_monitor_windows,
+    window_bounds,
+    get_forecaster,
+    get_rate_tracker,
+    get_listeners,
+    build_output,
+)
+from usage_engine import create_usage_state, update_usage_state, merge_usage
+from usage_scanner import ScanBudget, find_all_sessions
+
+
+OUTPUT_DIR = Path.home() / '.claude-monitor' / 'roots'
+
+# 한 tick에 모든 루트를 합쳐 읽을 최대 바이트
+DEFAULT_TICK_BUDGET_BYTES = 256 * 1024 * 1024
+# 라운드 로빈 한 차례에 루트 하나가 읽을 바이트
+SCAN_QUANTUM_BYTES = 8 * 1024 * 1024
+
+
+def expand_roots(patterns):
+    """
+    루트 패턴(glob) → 디렉토리 리스트
+
+    Args:
+        patterns: ['/home/*', '/mnt/volume', ...]
+
+    Returns:
+        list: 중복 없는 Path 리스트 (패턴 순서 유지)
+    """
+    roots = []
+    seen = set()
+    for pattern in patterns:
+        for match in sorted(glob.glob(str(Path(pattern).expanduser()))):
+            path = Path(match).resolve()
+            if path.is_dir() and path not in seen:
+                seen.add(path)
+                roots.append(path)
+    return roots
+
+
+def root_projects_dir(root):
+    """루트 → 프로젝트 디렉토리 (홈 디렉토리면 .claude/projects, 아니면 루트 자체)"""
+    projects_dir = root / '.claude' / 'projects'
+    if projects_dir.is_dir():
+        return projects_dir
+    return root
+
+
+def root_name(root):
+    """루트 경로 → 출력 파일 이름 (/home/alice → home_alice)"""
+    return '_'.join(part for part in root.parts if part != root.anchor) or 'root'
+
+
+def create_root_state(root):
+    """루트별 증분 상태 생성"""
+    return {
+        'root': root,
+        'name': root_name(root),
+        'projects_dir': root_projects_dir(root),
+        'usage_state': create_usage_state(),
+        'session_files': [],
+        'listeners': [],
+        'scan_pending': False
+    }
+
+
+def scan_roots(config, roots, bounds, now_epoch, tick,
+               tick_budget_bytes=DEFAULT_TICK_BUDGET_BYTES, quantum_bytes=SCAN_QUANTUM_BYTES):
+    """
+    바이트 예산 안에서 루트들을 라운드 로빈으로 증분 스캔
+
+    루트마다 한 차례에 quantum_bytes까지만 읽고 다음 루트로 넘어간다.
+    시작 루트는 tick마다 바뀌어 예산이 모자랄 때도 특정 루트만 밀리지 않음.
+
+    Args:
+        config: 설정 정보
+        roots: create_root_state() 리스트
+        bounds: window_bounds() 결과
+        now_epoch: 현재 시간 (UTC epoch)
+        tick: tick 번호 (시작 루트 결정)
+        tick_budget_bytes: 이번 tick 전체 바이트 예산
+        quantum_bytes: 루트별 한 차례 바이트 예산
+    """
+    if not roots:
+        return
+
+    offset = tick % len(roots)
+    pending = roots[offset:] + roots[:offset]
+    remaining = tick_budget_bytes
+
+    for root in roots:
+        root['session_files'] = find_all_sessions(root['projects_dir'])
+        root['listeners'] = get_listeners(root['usage_state'], config, now_epoch)
+
+    # 모든 루트는 최소 한 번 스캔 (윈도우 경계 반영), 이후 차례는 남은 예산 안에서만
+    first_round = True
+    while pending:
+        next_pending = []
+        for index, root in enumerate(pending):
+            if remaining <= 0 and not first_round:
+                next_pending.extend(pending[index:])
+                break
+            allowance = max(min(quantum_bytes, remaining), 1)
+            budget = ScanBudget(allowance)
+            state = root['usage_state']
+            update_usage_state(state, root['session_files'], bounds, now_epoch,
+                               listeners=root['listeners'], budget=budget)
+            remaining -= allowance - budget.remaining_bytes
+            if budget.exhausted:
+                next_pending.append(root)
+
+        pending = next_pending
+        first_round = False
+        if remaining <= 0:
+            break
+
+    for root in roots:
+        root['scan_pending'] = root in pending
+
+
+def build_combined_state(config, roots, now_epoch):
+    """루트별 누적기/forecaster/rate tracker를 합친 상태 (build_output용)"""
+    window_names = roots[0]['usage_state']['windows'].keys()
+    combined = {
+        'windows': {
+            name: merge_usage([root['usage_state']['windows'][name] for root in roots])
+            for name in window_names
+        }
+    }
+
+    forecaster = get_forecaster(combined, config)
+    forecaster.advance(now_epoch)
+    forecaster.merge(get_forecaster(root['usage_state'], config) for root in roots)
+
+    rate_tracker = get_rate_tracker(combined, config)
+    rate_tracker.advance(now_epoch)
+    rate_tracker.merge(get_rate_tracker(root['usage_state'], config) for root in roots)
+    return combined
+
+
+def root_info(root):
+    """출력에 포함할 루트 정보"""
+    return {
+        'name': root['name'],
+        'path': str(root['root']),
+        'session_files': len(root['session_files']),
+        'scan_pending': root['scan_pending']
+    }
+
+
+def monitor_roots(config, roots, tick=0, tick_budget_bytes=DEFAULT_TICK_BUDGET_BYTES):
+    """
+    모든 루트를 한 번 모니터링
+
+    Returns:
+        tuple: (combined_output, {name: root_output})
+    """
+    tz = ZoneInfo(config['display_settings']['timezone'])
+    now = datetime.now(tz)
+    now_epoch = now.timestamp()
+
+    windows = get_monitor_windows(now, config, get_weekly_anchor(config))
+    scan_roots(config, roots, window_bounds(windows), now_epoch, tick, tick_budget_bytes)
+
+    root_outputs = {}
+    for root in roots:
+        output = build_output(config, root['usage_state'], now, windows, notify=False)
+        output['root'] = root_info(root)
+        root_outputs[root['name']] = output
+
+    combined = build_output(config, build_combined_state(config, roots, now_epoch), now, windows, notify=False)
+    combined['mode'] = 'multi_root'
+    combined['scan_pending'] = any(root['scan_pending'] for root in roots)
+    combined['roots'] = [
+        dict(root_info(root),
+             session_percentage=root_outputs[root['name']]['session']['percentages']['max_percentage'],
+             weekly_percentage=root_outputs[root['name']]['weekly']['percentages']['max_percentage'])
+        for root in roots
+    ]
+
+    return combined, root_outputs
+
+
+def save_outputs(combined, root_outputs, output_dir=OUTPUT_DIR, combined_file=OUTPUT_FILE):
+    """루트별 출력과 합계 출력 저장"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, output in root_outputs.items():
+        with open(output_dir / f'{name}.json', 'w') as f:
+            json.dump(output, f, indent=2)
+
+    with open(combined_file, 'w') as f:
+        json.dump(combined, f, indent=2)
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Claude Usage Monitor (multi-root)')
+    parser.add_argument('--roots', nargs='+', required=True,
+                        help="Home directories or volumes to aggregate (glob patterns, e.g. '/home/*')")
+    parser.add_argument('--once', action='store_true',
+                        help='Run once and exit (default: daemon mode)')
+    parser.add_argument('--interval', type=int, default=60,
+                        help='Update interval in seconds (default: 60)')
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR,
+                        help=f'Directory for per-root outputs (default: {OUTPUT_DIR})')
+    parser.add_argument('--scan-budget-mb', type=int, default=DEFAULT_TICK_BUDGET_BYTES // (1024 * 1024),
+                        help='Bytes of transcripts to read per tick across all roots, in MB (default: 256)')
+    parser.add_argument('--max-rss', type=parse_size,
+                        help='Memory budget for the daemon, e.g. 64M (sheds caches before exceeding it)')
+
+    args = parser.parse_args()
+
+    config = load_config()
+    if not config:
+        return 1
+
+    root_paths = expand_roots(args.roots)
+    if not root_paths:
+        print("❌ No matching root directories")
+        return 1
+
+    roots = [create_root_state(root) for root in root_paths]
+    tick_budget_bytes = args.scan_budget_mb * 1024 * 1024
+
+    if args.once:
+        # 한 번 실행: 예산 없이 모두 읽음
+        combined, root_outputs = monitor_roots(config, roots, 0, float('inf'))
+        save_outputs(combined, root_outputs, args.output_dir)
+        print(json.dumps(combined['roots'], indent=2))
+        return 0
+
+    print(f"🚀 Claude Usage Monitor (multi-root) started")
+    print(f"   Roots: {len(roots)}")
+    for root in roots:
+        print(f"     - {root['root']} → {args.output_dir / (root['name'] + '.json')}")
+    print(f"   Combined output: {OUTPUT_FILE}")
+    print(f"   Interval: {args.interval}s, scan budget {args.scan_budget_mb}MB/tick")
+    if args.max_rss is not None:
+        print(f"   Memory budget: {format_size(args.max_rss)} RSS")
+    print(f"   Press Ctrl+C to stop\n")
+
+    memory_budget = None
+    if args.max_rss is not None:
+        memory_budget = create_memory_budget(args.max_rss, [root['usage_state'] for root in roots])
+
+    tick = 0
+    try:
+        while True:
+            combined, root_outputs = monitor_roots(config, roots, tick, tick_budget_bytes)
+            save_outputs(combined, root_outputs, args.output_dir)
+
+            pending = sum(1 for root in roots if root['scan_pending'])
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] "
+                  f"Combined session: {combined['session']['percentages']['max_percentage']}% | "
+                  f"Weekly: {combined['weekly']['percentages']['max_percentage']}%"
+                  + (f" | {pending} root(s) still scanning" if pending else ''))
+
+            if memory_budget is not None:
+                shed = memory_budget.check()
+                if shed:
+                    print(f"   Memory: shed {', '.join(shed)} (RSS {format_size(memory_budget.last_rss)})")
+
+            tick += 1
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n\n✅ Daemon stopped")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
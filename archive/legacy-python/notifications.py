@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Notifications
+임계값 알림 상태 관리 및 비동기 전송
+
+- 알림 상태는 메모리에 유지하고 변경될 때만 파일에 저장
+- 전송은 백그라운드 스레드에서 처리 (tick을 막지 않음)
+- 여러 백엔드 지원: osascript(macOS), notify-send/D-Bus(Linux),
+  webhook(로컬 endpoint), stdout, memory(테스트/헤드리스)
+- 짧은 시간 내 여러 알림은 하나로 합치고(coalescing), 분당 전송 수 제한
+
+subprocess, urllib.request는 실제 전송할 때만 import (--once 시작 시간 단축)
+"""
+
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+NOTIFICATION_STATE_FILE = Path.home() / '.claude-monitor' / 'notification_state.json'
+
+DEFAULT_COALESCE_SECONDS = 2.0
+DEFAULT_MAX_PER_MINUTE = 4
+LOCAL_WEBHOOK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def escape_applescript(text):
+    """AppleScript 문자열 리터럴용 escape"""
+    return str(text).replace('\\', '\\\\').replace('"', '\\"')
+
+
+class StdoutBackend:
+    """표준 출력 백엔드"""
+
+    name = 'stdout'
+
+    def send(self, notification):
+        subtitle = f" ({notification['subtitle']})" if notification.get('subtitle') else ''
+        print(f"🔔 {notification['title']}: {notification['message']}{subtitle}")
+        sys.stdout.flush()
+
+
+class MemoryBackend:
+    """메모리 백엔드 (테스트/헤드리스 실행용) - 전송된 알림을 리스트에 보관"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, notification):
+        self.sent.append(notification)
+
+
+class OsascriptBackend:
+    """macOS 알림 센터 (osascript, 셸 없이 인자로 전달)"""
+
+    name = 'osascript'
+
+    def send(self, notification):
+        script = (f'display notification "{escape_applescript(notification["message"])}" '
+                  f'with title "{escape_applescript(notification["title"])}"')
+        if notification.get('subtitle'):
+            script += f' subtitle "{escape_applescript(notification["subtitle"])}"'
+
+        import subprocess
+        subprocess.run(['osascript', '-e', script],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+
+
+class NotifySendBackend:
+    """Linux 데스크톱 알림 (notify-send, 없으면 gdbus로 D-Bus 직접 호출)"""
+
+    name = 'notify-send'
+
+    def send(self, notification):
+        body = notification['message']
+        if notification.get('subtitle'):
+            body = f"{body}\n{notification['subtitle']}"
+        urgency = 'critical' if notification.get('priority') == 'high' else 'normal'
+
+        import shutil
+        import subprocess
+        if shutil.which('notify-send'):
+            subprocess.run(['notify-send', '-a', 'Claude Monitor', '-u', urgency,
+                            notification['title'], body],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+            return
+
+        subprocess.run(['gdbus', 'call', '--session',
+                        '--dest', 'org.freedesktop.Notifications',
+                        '--object-path', '/org/freedesktop/Notifications',
+                        '--method', 'org.freedesktop.Notifications.Notify',
+                        'Claude Monitor', '0', '', notification['title'], body,
+                        '[]', '{}', '10000'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+
+
+class WebhookBackend:
+    """로컬 webhook (JSON POST) - 외부 호스트로는 전송하지 않음"""
+
+    name = 'webhook'
+
+    def __init__(self, url):
+        host = urlparse(url).hostname
+        if host not in LOCAL_WEBHOOK_HOSTS:
+            raise ValueError(f"Webhook must point to a local endpoint: {url}")
+        self.url = url
+
+    def send(self, notification):
+        import urllib.request
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(notification).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+
+
+def default_backend_names():
+    """플랫폼 기본 백엔드"""
+    if sys.platform == 'darwin':
+        return ['osascript']
+    import shutil
+    if sys.platform.startswith('linux') and (shutil.which('notify-send') or shutil.which('gdbus')):
+        return ['notify-send']
+    return ['stdout']
+
+
+def create_backends(notification_config):
+    """
+    설정에서 백엔드 생성
+
+    notifications.backends: ["osascript", "webhook", ...] (없으면 플랫폼 기본값)
+    notifications.webhook_url: "http://127.0.0.1:8765/notify"
+    """
+    names = notification_config.get('backends') or default_backend_names()
+
+    backends = []
+    for name in names:
+        try:
+            if name == 'osascript':
+                backends.append(OsascriptBackend())
+            elif name in ('notify-send', 'dbus'):
+                backends.append(NotifySendBackend())
+            elif name == 'webhook':
+                backends.append(WebhookBackend(notification_config['webhook_url']))
+            elif name == 'stdout':
+                backends.append(StdoutBackend())
+            elif name == 'memory':
+                backends.append(MemoryBackend())
+            else:
+                print(f"Warning: Unknown notification backend: {name}")
+        except (KeyError, ValueError) as e:
+            print(f"Warning: Notification backend {name} disabled: {e}")
+
+    return backends
+
+
+def coalesce_notifications(notifications):
+    """
+    여러 알림을 하나로 합침
+
+    가장 높은 우선순위/마지막 알림의 제목을 사용하고 메시지를 줄 단위로 합친다.
+    """
+    if len(notifications) == 1:
+        return notifications[0]
+
+    high = [n for n in notifications if n.get('priority') == 'high']
+    lead = (high or notifications)[-1]
+
+    messages = []
+    for notification in notifications:
+        if notification['message'] not in messages:
+            messages.append(notification['message'])
+
+    merged = dict(lead)
+    merged['message'] = '\n'.join(messages)
+    merged['coalesced'] = len(notifications)
+    return merged
+
+
+class NotificationEngine:
+    """
+    알림 엔진
+
+    - check_thresholds(): 세션별 임계값 상태를 메모리에서 확인, 변경 시에만 저장
+    - notify(): 알림을 큐에 넣고 즉시 반환 (백그라운드 스레드에서 전송)
+    """
+
+    def __init__(self, backends, state_file=NOTIFICATION_STATE_FILE,
+                 coalesce_seconds=DEFAULT_COALESCE_SECONDS, max_per_minute=DEFAULT_MAX_PER_MINUTE):
+        self.backends = backends
+        self.state_file = state_file
+        self.coalesce_seconds = coalesce_seconds
+        self.max_per_minute = max_per_minute
+
+        self.state = self._load_state()
+        self.sent_times = []
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _load_state(self):
+        """알림 상태 파일 로드 (시작 시 1회)"""
+        default = {
+            'session_window_start': None,
+            'notified_thresholds': []
+        }
+        if self.state_file is None or not self.state_file.exists():
+            return default
+
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            state.setdefault('session_window_start', None)
+            state.setdefault('notified_thresholds', [])
+            return state
+        except (OSError, ValueError):
+            return default
+
+    def _save_state(self):
+        """알림 상태 파일 저장 (임시 파일 → rename)"""
+        if self.state_file is None:
+            return
+
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def restore_state(self, state, saved_at):
+        """
+        체크포인트의 알림 상태 복원
+
+        상태 파일은 바뀔 때마다 저장되므로, 파일이 없거나 체크포인트보다
+        오래된 경우에만 체크포인트 쪽을 사용한다.
+
+        Returns:
+            bool: 복원 여부
+        """
+        if self.state_file is not None:
+            try:
+                if self.state_file.stat().st_mtime >= saved_at:
+                    return False
+            except OSError:
+                pass
+
+        self.state = dict(state)
+        self.state.setdefault('session_window_start', None)
+        self.state.setdefault('notified_thresholds', [])
+        self._save_state()
+        return True
+
+    def check_thresholds(self, thresholds, percentage, window_start, tz_abbr='KST'):
+        """
+        임계값을 확인하고 새로 넘은 임계값에 대해 알림 전송
+
+        Args:
+            thresholds: 임계값 리스트 (%)
+            percentage: 현재 세션 사용량 (%)
+            window_start: 현재 세션 시작 시간 (ISO format)
+            tz_abbr: 표시용 timezone 약어
+
+        Returns:
+            list: 이번에 알림을 보낸 임계값 리스트
+        """
+        changed = False
+
+        # 세션 윈도우가 바뀌면 상태 리셋
+        if self.state.get('session_window_start') != window_start:
+            self.state['session_window_start'] = window_start
+            self.state['notified_thresholds'] = []
+            changed = True
+
+        notified = [
+            threshold for threshold in sorted(thresholds)
+            if threshold not in self.state['notified_thresholds'] and percentage >= threshold
+        ]
+
+        if notified:
+            # 한 tick에 여러 임계값을 넘으면 가장 높은 것만 알림
+            self.notify({
+                'title': "⚠️ Claude Usage Alert",
+                'message': f"Session usage has reached {percentage}%",
+                'subtitle': f"Threshold: {notified[-1]}% ({tz_abbr})",
+                'priority': 'high' if notified[-1] >= 95 else 'normal',
+                'key': 'session_threshold'
+            })
+            self.state['notified_thresholds'].extend(notified)
+            changed = True
+
+        if changed:
+            self._save_state()
+
+        return notified
+
+    def check_forecast(self, name, window_start, forecast, message, alert_minutes=60, tz_abbr='KST'):
+        """
+        limit 조기 도달 예측 알림 (윈도우당 1회)
+
+        Args:
+            name: 윈도우 이름 ('session' 또는 'weekly')
+            window_start: 윈도우 시작 시간 (ISO format)
+            forecast: BurnRateForecaster.forecast_window() 결과
+            message: 알림 메시지 (describe_forecast)
+            alert_minutes: limit 도달까지 이 시간(분) 이내면 알림
+
+        Returns:
+            bool: 알림 전송 여부
+        """
+        if not forecast['hits_limit_before_reset'] or forecast['minutes_to_limit'] > alert_minutes:
+            return False
+
+        forecast_alerts = self.state.setdefault('forecast_alerts', {})
+        if forecast_alerts.get(name) == window_start:
+            return False
+
+        self.notify({
+            'title': f"⏱️ Claude {name.capitalize()} Forecast",
+            'message': message,
+            'subtitle': f"{forecast['percent_per_hour']}%/h ({tz_abbr})",
+            'priority': 'high',
+            'key': f'{name}_forecast'
+        })
+        forecast_alerts[name] = window_start
+        self._save_state()
+        return True
+
+    def notify_anomaly(self, alert, message, tz_abbr='KST'):
+        """
+        runaway loop 알림 (프로젝트별 cooldown은 anomaly_detector에서 처리)
+
+        Args:
+            alert: LoopDetector 알림
+            message: 알림 메시지 (describe_alert)
+        """
+        self.notify({
+            'title': "🚨 Claude Runaway Loop",
+            'message': message,
+            'subtitle': f"{alert['project']} ({tz_abbr})",
+            'priority': 'high',
+            'key': f"anomaly:{alert['project']}"
+        })
+
+    def notify(self, notification):
+        """알림을 큐에 추가 (블로킹 없음)"""
+        notification.setdefault('timestamp', time.time())
+        self._queue.put(notification)
+
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='notification-dispatch', daemon=True)
+                self._worker.start()
+
+    def _collect(self, batch, deadline):
+        """
+        deadline까지 큐에 들어온 알림을 batch에 추가
+
+        Returns:
+            bool: 종료 신호(None)를 받았으면 True
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if item is None:
+                return True
+            batch.append(item)
+
+    def _run(self):
+        """전송 스레드: coalescing + 분당 전송 수 제한"""
+        while True:
+            notification = self._queue.get()
+            if notification is None:
+                return
+
+            # coalescing 윈도우 동안 추가 알림 수집
+            batch = [notification]
+            stop = self._collect(batch, time.monotonic() + self.coalesce_seconds)
+
+            # 분당 전송 수 제한 - 초과하면 다음 슬롯까지 대기 (그동안 들어온 알림도 합침)
+            now = time.monotonic()
+            self.sent_times = [t for t in self.sent_times if now - t < 60]
+            if not stop and len(self.sent_times) >= self.max_per_minute:
+                stop = self._collect(batch, self.sent_times[0] + 60)
+
+            self._dispatch(coalesce_notifications(batch))
+
+            if stop:
+                return
+
+    def _dispatch(self, notification):
+        """모든 백엔드로 전송 (백엔드 실패는 다른 백엔드에 영향 없음)"""
+        self.sent_times.append(time.monotonic())
+        for backend in self.backends:
+            try:
+                backend.send(notification)
+            except Exception as e:
+                print(f"Failed to send notification via {backend.name}: {e}")
+
+    def close(self, timeout=5.0):
+        """대기 중인 알림 전송 후 스레드 종료 (--once 종료 시)"""
+        with self._lock:
+            worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        self._queue.put(None)
+        worker.join(timeout)
+
+
+def create_notification_engine(config, state_file=NOTIFICATION_STATE_FILE):
+    """설정에서 알림 엔진 생성"""
+    notification_config = config.get('notifications', {})
+    return NotificationEngine(
+        create_backends(notification_config),
+        state_file=state_file,
+        coalesce_seconds=notification_config.get('coalesce_seconds', DEFAULT_COALESCE_SECONDS),
+        max_per_minute=notification_config.get('max_per_minute', DEFAULT_MAX_PER_MINUTE)
+    )
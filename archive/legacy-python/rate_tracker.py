@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Rate Tracker
+분당 요청 수(RPM) / input·output 분당 토큰(TPM)의 sliding window 추적
+
+calculate_usage_percentage는 윈도우 전체 합계만 보므로, 합계는 여유가 있어도
+짧은 burst가 분당 throttling에 걸리는 것은 드러나지 않는다.
+
+- 초 단위 ring buffer (60칸) + 누적 합: 최근 60초의 RPM/TPM
+- 분 단위 ring buffer (세션 윈도우 길이): 분별 합계
+- 단조 감소 deque: 윈도우 안에서 가장 바빴던 분 (지표별)
+- 이벤트당 O(1) (ring 이동은 지나간 칸 수만큼, 분할상환 O(1))
+
+트랜스크립트는 파일 단위로 읽으므로 이벤트가 시간순이 아닐 수 있다.
+이미 닫힌 분에 늦게 들어온 이벤트는 ring에만 더하고, deque는 다음 조회 때
+ring에서 한 번 다시 만든다.
+
+input 기준은 input + cache_creation (calculate_usage_percentage와 동일)
+"""
+
+from collections import deque
+
+
+METRICS = ('requests', 'input_tokens', 'output_tokens')
+SECOND_SLOTS = 60
+DEFAULT_WINDOW_MINUTES = 5 * 60
+
+
+class SlidingMax:
+    """단조 감소 deque로 sliding window 최댓값 (push/expire 분할상환 O(1))"""
+
+    __slots__ = ('entries',)
+
+    def __init__(self):
+        self.entries = deque()   # (minute, value), minute 증가 / value 감소
+
+    def push(self, minute, value):
+        entries = self.entries
+        while entries and entries[-1][1] <= value:
+            entries.pop()
+        entries.append((minute, value))
+
+    def expire(self, start_minute):
+        entries = self.entries
+        while entries and entries[0][0] < start_minute:
+            entries.popleft()
+
+    def peak(self):
+        """(minute, value), 없으면 None"""
+        return self.entries[0] if self.entries else None
+
+
+class RateTracker:
+    """
+    RPM/TPM sliding window (usage_engine 리스너: add_event(event), reset())
+
+    advance(now)를 ingest 전에 호출하고, 조회는 current()/peaks(start)
+    """
+
+    __slots__ = ('window_minutes', 'second_ids', 'second_totals', 'current_totals', 'head_second',
+                 'minute_ids', 'minute_totals', 'head_minute', 'peaks_by_metric', 'peak_start_minute', 'stale')
+
+    def __init__(self, window_minutes=DEFAULT_WINDOW_MINUTES):
+        self.window_minutes = int(window_minutes)
+        self.reset()
+
+    def reset(self):
+        """전체 재스캔 시 초기화"""
+        self.second_ids = [None] * SECOND_SLOTS
+        self.second_totals = [[0, 0, 0] for _ in range(SECOND_SLOTS)]
+        self.current_totals = [0, 0, 0]
+        self.head_second = None
+
+        self.minute_ids = [None] * self.window_minutes
+        self.minute_totals = [[0, 0, 0] for _ in range(self.window_minutes)]
+        self.head_minute = None
+        self.peaks_by_metric = [SlidingMax() for _ in METRICS]
+        self.peak_start_minute = None   # deque에서 이미 만료시킨 조회 시작
+        self.stale = False
+
+    def _advance_seconds(self, second):
+        if self.head_second is not None and second <= self.head_second:
+            return
+        start = second - SECOND_SLOTS + 1
+        if self.head_second is not None:
+            start = max(start, self.head_second + 1)
+        for target in range(start, second + 1):
+            slot = target % SECOND_SLOTS
+            if self.second_ids[slot] is not None:
+                totals = self.second_totals[slot]
+                for i in range(3):
+                    self.current_totals[i] -= totals[i]
+                    totals[i] = 0
+            self.second_ids[slot] = target
+        self.head_second = second
+
+    def _advance_minutes(self, minute):
+        if self.head_minute is not None and minute <= self.head_minute:
+            return
+        if self.head_minute is not None:
+            # 닫히는 분(head)을 deque에 추가 (빈 분은 최댓값이 될 수 없으므로 생략)
+            slot = self.head_minute % self.window_minutes
+            totals = self.minute_totals[slot]
+            if self.minute_ids[slot] == self.head_minute and any(totals):
+                for peaks, value in zip(self.peaks_by_metric, totals):
+                    peaks.push(self.head_minute, value)
+
+        start = minute - self.window_minutes + 1
+        if self.head_minute is not None:
+            start = max(start, self.head_minute + 1)
+        for target in range(start, minute + 1):
+            slot = target % self.window_minutes
+            self.minute_ids[slot] = target
+            totals = self.minute_totals[slot]
+            totals[0] = totals[1] = totals[2] = 0
+        self.head_minute = minute
+
+        for peaks in self.peaks_by_metric:
+            peaks.expire(minute - self.window_minutes + 1)
+
+    def advance(self, now_epoch):
+        """현재 시간으로 ring 이동 (ingest 전, 조회 전에 호출)"""
+        self._advance_seconds(int(now_epoch))
+        self._advance_minutes(int(now_epoch // 60))
+
+    def add_event(self, event):
+        """새 usage 이벤트 누적 (O(1))"""
+        values = (event.messages, event.input_tokens + event.cache_creation_tokens, event.output_tokens)
+
+        minute = int(event.timestamp // 60)
+        if self.head_minute is None or minute > self.head_minute:
+            self._advance_minutes(minute)
+        elif minute <= self.head_minute - self.window_minutes:
+            return   # 윈도우보다 오래된 이벤트
+        elif minute < self.head_minute:
+            self.stale = True   # 이미 deque에 들어간 분
+        totals = self.minute_totals[minute % self.window_minutes]
+        for i in range(3):
+            totals[i] += values[i]
+
+        second = int(event.timestamp)
+        if self.head_second is None or second > self.head_second:
+            self._advance_seconds(second)
+        elif second <= self.head_second - SECOND_SLOTS:
+            return
+        totals = self.second_totals[second % SECOND_SLOTS]
+        for i in range(3):
+            totals[i] += values[i]
+            self.current_totals[i] += values[i]
+
+    def _rebuild_peaks(self):
+        """늦게 들어온 이벤트 반영: 닫힌 분들로 deque 재구성"""
+        self.peaks_by_metric = [SlidingMax() for _ in METRICS]
+        start = self.head_minute - self.window_minutes + 1
+        for minute in range(start, self.head_minute):
+            slot = minute % self.window_minutes
+            totals = self.minute_totals[slot]
+            if self.minute_ids[slot] == minute and any(totals):
+                for peaks, value in zip(self.peaks_by_metric, totals):
+                    peaks.push(minute, value)
+        self.stale = False
+
+    def current(self):
+        """
+        최근 60초 합계 (advance 이후 호출)
+
+        Returns:
+            dict: {'requests': n, 'input_tokens': n, 'output_tokens': n}
+        """
+        return dict(zip(METRICS, self.current_totals))
+
+    def peaks(self, start_epoch):
+        """
+        start_epoch 이후 가장 바빴던 분 (지표별, 진행 중인 분 포함)
+
+        Returns:
+            dict: {metric: {'minute_epoch': 분 시작, 'value': 합계}} (기록이 없으면 None)
+        """
+        if self.head_minute is None:
+            return {metric: None for metric in METRICS}
+        start_minute = int(start_epoch // 60)
+        # 늦게 들어온 이벤트가 있거나, 이전 조회보다 이른 시작(설정 변경)이면 다시 만듦
+        if self.stale or (self.peak_start_minute is not None and start_minute < self.peak_start_minute):
+            self._rebuild_peaks()
+        self.peak_start_minute = start_minute
+
+        head_slot = self.head_minute % self.window_minutes
+        open_totals = self.minute_totals[head_slot]
+
+        result = {}
+        for index, (metric, peaks) in enumerate(zip(METRICS, self.peaks_by_metric)):
+            peaks.expire(start_minute)
+            best = peaks.peak()
+            if open_totals[index] and (best is None or open_totals[index] >= best[1]):
+                best = (self.head_minute, open_totals[index])
+            result[metric] = {'minute_epoch': best[0] * 60, 'value': best[1]} if best else None
+        return result
+
+    def merge(self, others):
+        """
+        다른 tracker들의 ring을 더함 (multi-root 합계용)
+
+        모두 같은 윈도우 길이이고 같은 시간으로 advance된 상태여야 함
+        (같은 칸에 같은 초/분이 있을 때만 더함)
+        """
+        for other in others:
+            for slot, minute in enumerate(other.minute_ids):
+                if minute is not None and self.minute_ids[slot] == minute:
+                    target = self.minute_totals[slot]
+                    for i in range(3):
+                        target[i] += other.minute_totals[slot][i]
+            for slot, second in enumerate(other.second_ids):
+                if second is not None and self.second_ids[slot] == second:
+                    target = self.second_totals[slot]
+                    for i in range(3):
+                        target[i] += other.second_totals[slot][i]
+                        self.current_totals[i] += other.second_totals[slot][i]
+        self.stale = True
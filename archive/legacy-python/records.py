@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Records
+사용량 레코드 타입 (__slots__)
+
+메시지마다 dict를 만들면 레코드당 수백 바이트와 key 해시 조회 비용이 든다.
+고정 필드는 __slots__ 클래스로 표현하고, JSON으로 저장하는 레코드는
+to_dict()/from_dict()로 기존 파일 형식을 그대로 유지한다.
+
+- UsageEvent: 트랜스크립트 한 줄의 usage (usage_scanner, cold_storage)
+- WindowUsage: 윈도우 누적기 (usage_engine)
+- CalibrationPoint: 캘리브레이션 기록 (calibration_learner)
+- SessionSnapshot: 세션 스냅샷 (limit_learner)
+
+--benchmark: dict 대비 메모리 사용량 비교 (기본 100만 이벤트)
+"""
+
+import time
+
+
+class UsageEvent:
+    """usage 이벤트 (messages: 합쳐진 메시지 수, 압축 요약 이벤트는 1보다 큼)"""
+
+    __slots__ = (
+        'timestamp',
+        'input_tokens',
+        'output_tokens',
+        'cache_read_tokens',
+        'cache_creation_tokens',
+        'messages',
+        'file'
+    )
+
+    def __init__(self, timestamp, input_tokens=0, output_tokens=0, cache_read_tokens=0,
+                 cache_creation_tokens=0, messages=1, file=None):
+        self.timestamp = timestamp
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_read_tokens = cache_read_tokens
+        self.cache_creation_tokens = cache_creation_tokens
+        self.messages = messages
+        self.file = file
+
+    def __repr__(self):
+        return (f'UsageEvent(timestamp={self.timestamp}, input={self.input_tokens}, '
+                f'output={self.output_tokens}, cache_read={self.cache_read_tokens}, '
+                f'cache_creation={self.cache_creation_tokens}, messages={self.messages})')
+
+
+class WindowUsage:
+    """
+    윈도우 누적기
+
+    rolling 윈도우는 종료 경계 없이(window_end = inf) 시작 경계만 이동하며,
+    buckets(minute -> [input, output, cache_read, cache_creation, count])와
+    만료 순서용 bucket_heap을 사용한다.
+    """
+
+    __slots__ = (
+        'window_start',
+        'window_end',
+        'rolling',
+        'span',
+        'input_tokens',
+        'output_tokens',
+        'cache_read_tokens',
+        'cache_creation_tokens',
+        'messages_count',
+        'oldest_message_time',
+        'latest_message_time',
+        'buckets',
+        'bucket_heap'
+    )
+
+    def __init__(self, window_start, window_end, rolling=False):
+        self.window_start = window_start
+        self.window_end = window_end
+        self.rolling = rolling
+        self.span = None
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+        self.messages_count = 0
+        self.oldest_message_time = None
+        self.latest_message_time = None
+        self.buckets = None
+        self.bucket_heap = None
+
+        if rolling:
+            self.span = window_end - window_start
+            self.window_end = float('inf')
+            self.buckets = {}
+            self.bucket_heap = []
+
+
+class CalibrationPoint:
+    """캘리브레이션 기록 포인트 (값은 0.0 ~ 1.0)"""
+
+    __slots__ = ('timestamp', 'monitor_value', 'actual_value', 'offset', 'absolute_error')
+
+    def __init__(self, timestamp, monitor_value, actual_value, offset=None, absolute_error=None):
+        self.timestamp = timestamp
+        self.monitor_value = monitor_value
+        self.actual_value = actual_value
+        self.offset = actual_value - monitor_value if offset is None else offset
+        self.absolute_error = abs(self.offset) if absolute_error is None else absolute_error
+
+    @classmethod
+    def create(cls, timestamp, monitor_value, actual_value):
+        """새 기록 (저장 형식에 맞게 반올림)"""
+        offset = actual_value - monitor_value
+        return cls(timestamp, round(monitor_value, 4), round(actual_value, 4),
+                   round(offset, 4), round(abs(offset), 4))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['timestamp'], data['monitor_value'], data['actual_value'],
+                   data.get('offset'), data.get('absolute_error'))
+
+    def to_dict(self):
+        return {
+            'timestamp': self.timestamp,
+            'monitor_value': self.monitor_value,
+            'actual_value': self.actual_value,
+            'offset': self.offset,
+            'absolute_error': self.absolute_error
+        }
+
+
+class SessionSnapshot:
+    """세션 사용량 스냅샷 (limit 학습용)"""
+
+    __slots__ = ('output_tokens', 'percentage', 'timestamp')
+
+    def __init__(self, output_tokens, percentage, timestamp):
+        self.output_tokens = output_tokens
+        self.percentage = percentage
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['output_tokens'], data['percentage'], data['timestamp'])
+
+    def to_dict(self):
+        return {
+            'output_tokens': self.output_tokens,
+            'percentage': self.percentage,
+            'timestamp': self.timestamp
+        }
+
+
+def make_dict_event(i, path):
+    """이전 형식 (dict) 이벤트"""
+    return {
+        'timestamp': 1735689600.0 + i,
+        'input_tokens': i % 500,
+        'output_tokens': i % 3000,
+        'cache_read_tokens': i % 7000,
+        'cache_creation_tokens': i % 900,
+        'file': path
+    }
+
+
+def make_slots_event(i, path):
+    """__slots__ (UsageEvent) 이벤트 (make_dict_event와 같은 값)"""
+    return UsageEvent(1735689600.0 + i, i % 500, i % 3000, i % 7000, i % 900, 1, path)
+
+
+def measure(factory, count, path):
+    """count개 레코드 생성 시 메모리/시간"""
+    import tracemalloc
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = [factory(i, path) for i in range(count)]
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current, peak, elapsed
+
+
+def main():
+    """메인 함수 (메모리 벤치마크)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Claude Monitor record types')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare memory of dict vs __slots__ usage events')
+    parser.add_argument('--events', type=int, default=1_000_000,
+                        help='Number of events (default: 1,000,000)')
+
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        return 0
+
+    path = '/home/user/.claude/projects/example/session.jsonl'
+    results = {}
+    for name, factory in (('dict', make_dict_event), ('__slots__', make_slots_event)):
+        results[name] = measure(factory, args.events, path)
+
+    print(f"\n📊 {args.events:,} usage events")
+    for name, (current, peak, elapsed) in results.items():
+        print(f"   {name:<10} {current / 1024 / 1024:8.1f} MB "
+              f"({current / args.events:5.0f} B/event), built in {elapsed:.2f}s")
+
+    dict_bytes = results['dict'][0]
+    slots_bytes = results['__slots__'][0]
+    print(f"\n   Reduction: {(1 - slots_bytes / dict_bytes) * 100:.0f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Replay
+과거 시점에 모니터가 보여줬을 출력을 재현 (historical replay / backfill)
+
+모든 트랜스크립트를 한 번만 읽어 시간순으로 정렬한 뒤
+(--start/--end가 있으면 zone map으로 그 구간의 블록만 읽음), 시뮬레이션 시간을
+K분씩 진행하며 증분 윈도우 누적기에 이벤트를 흘려 넣고 monitor_once와
+같은 형식의 출력을 만든다. 매 tick마다 재스캔하지 않는다.
+
+용도:
+- limit_learner용 session_history.json 백필 (--backfill-history)
+- 캘리브레이션 offset 평가 (--evaluate-calibration)
+- 회귀 벤치마크 (--benchmark: tick/s, 출력 digest)
+- runaway loop 감지 재현 (--anomalies: 데몬이 보냈을 알림, 이벤트 시각 기준)
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime
+
+from calibration_learner import load_calibration_data
+from limit_learner import load_history, save_history, update_session_history, prune_session_history
+from monitor_daemon import (
+    load_config,
+    get_weekly_anchor,
+    get_monitor_windows,
+    window_bounds,
+    get_listeners,
+    build_output,
+    create_anomaly_detector,
+)
+from anomaly_detector import describe_alert
+from timezone_windows import epoch_to_datetime
+from usage_engine import create_usage_state, prepare_windows, ingest_events
+from usage_scanner import load_all_events
+
+
+# 최근 이벤트 버퍼(6시간)가 윈도우 재구성을 보장하는 최대 tick 간격
+MAX_STEP_MINUTES = 300
+
+
+def iter_replay(config, events, start_epoch, end_epoch, step_minutes=5, weekly_anchor=None, extra_ticks=(),
+                anomalies=None):
+    """
+    시뮬레이션 시간을 진행하며 출력 생성
+
+    Args:
+        config: 설정 정보
+        events: 시간순 usage 이벤트
+        start_epoch: 시작 시간 (UTC epoch)
+        end_epoch: 종료 시간 (UTC epoch)
+        step_minutes: tick 간격 K (분)
+        weekly_anchor: 주간 anchor (None이면 7일 rolling)
+        extra_ticks: 정규 tick 외에 출력을 만들 시점들 (예: 캘리브레이션 기록 시점)
+        anomalies: runaway loop 알림을 모을 리스트 (None이면 버림)
+
+    Yields:
+        tuple: (epoch, output, is_regular_tick)
+    """
+    tz_name = config['display_settings']['timezone']
+    state = create_usage_state()
+    # tick 간격과 관계없이 모든 이벤트를 판정 (데몬은 최근 이벤트로만 알림)
+    state['anomaly_detector'] = create_anomaly_detector(config, replay=True)
+
+    timestamps = [event.timestamp for event in events]
+    index = 0
+
+    step = step_minutes * 60
+    regular = range(int(start_epoch), int(end_epoch) + 1, step)
+    extra = sorted(t for t in extra_ticks if start_epoch <= t <= end_epoch)
+    ticks = sorted([(t, True) for t in regular] + [(t, False) for t in extra])
+
+    for tick, is_regular in ticks:
+        now = epoch_to_datetime(tick, tz_name)
+        windows = get_monitor_windows(now, config, weekly_anchor)
+
+        listeners = get_listeners(state, config, tick)
+        if prepare_windows(state, window_bounds(windows), tick, listeners):
+            # 버퍼가 새 윈도우를 보장하지 못함 → 지금까지의 이벤트 재투입
+            ingest_events(state, events[:index], tick, listeners)
+
+        next_index = bisect.bisect_right(timestamps, tick, lo=index)
+        ingest_events(state, events[index:next_index], tick, listeners)
+        index = next_index
+
+        alerts = state['anomaly_detector'].drain()
+        if anomalies is not None:
+            anomalies.extend(alerts)
+
+        yield tick, build_output(config, state, now, windows, notify=False), is_regular
+
+
+def calibration_points(data=None):
+    """캘리브레이션 기록 포인트 (epoch, window_key, CalibrationPoint) 리스트"""
+    if data is None:
+        data = load_calibration_data()
+
+    points = []
+    for window_key, window_data in data.items():
+        for point in window_data['history']:
+            try:
+                epoch = datetime.fromisoformat(point.timestamp).timestamp()
+            except ValueError:
+                continue
+            points.append((epoch, window_key, point))
+    return sorted(points, key=lambda item: item[0])
+
+
+def summarize_calibration(comparisons):
+    """
+    캘리브레이션 평가 요약
+
+    Args:
+        comparisons: [(recorded_monitor, replayed_monitor, actual), ...] (0.0 ~ 1.0)
+    """
+    if not comparisons:
+        return {'samples': 0}
+
+    count = len(comparisons)
+    recorded_offsets = [actual - recorded for recorded, _, actual in comparisons]
+    replayed_offsets = [actual - replayed for _, replayed, actual in comparisons]
+    mean_offset = sum(replayed_offsets) / count
+
+    return {
+        'samples': count,
+        'recorded_offset_mean': round(sum(recorded_offsets) / count, 4),
+        'replayed_offset_mean': round(mean_offset, 4),
+        'replayed_mae': round(sum(abs(o) for o in replayed_offsets) / count, 4),
+        # 평균 offset을 적용했을 때 남는 오차
+        'residual_mae': round(sum(abs(o - mean_offset) for o in replayed_offsets) / count, 4),
+        'monitor_drift_mean': round(sum(r - m for m, r, _ in comparisons) / count, 4)
+    }
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Claude Usage Monitor Replay')
+    parser.add_argument('--start', help='Replay start (ISO 8601, default: first message)')
+    parser.add_argument('--end', help='Replay end (ISO 8601, default: last message)')
+    parser.add_argument('--step', type=int, default=5,
+                        help='Simulated minutes between ticks (default: 5)')
+    parser.add_argument('--output',
+                        help="Write each tick's output as JSON lines ('-' for stdout)")
+    parser.add_argument('--backfill-history', action='store_true',
+                        help='Backfill session_history.json for limit_learner')
+    parser.add_argument('--evaluate-calibration', action='store_true',
+                        help='Compare replayed monitor values against calibration history')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Report ticks/s and an output digest for regression checks')
+    parser.add_argument('--anomalies', action='store_true',
+                        help='List the runaway loop alerts the daemon would have sent')
+
+    args = parser.parse_args()
+
+    if not 1 <= args.step <= MAX_STEP_MINUTES:
+        parser.error(f'--step must be between 1 and {MAX_STEP_MINUTES} minutes')
+
+    config = load_config()
+    if not config:
+        return 1
+
+    # 첫 tick의 윈도우는 --start보다 최대 window_hours만큼 일찍 시작
+    range_start = range_end = None
+    if args.start:
+        lookback = max(limits['window_hours'] for limits in config['rate_limits'].values()) * 3600
+        range_start = datetime.fromisoformat(args.start).timestamp() - lookback
+    if args.end:
+        range_end = datetime.fromisoformat(args.end).timestamp() + 1
+
+    load_started = time.perf_counter()
+    events = load_all_events(start=range_start, end=range_end)
+    load_seconds = time.perf_counter() - load_started
+
+    if not events:
+        print("No usage events found.", file=sys.stderr)
+        return 1
+
+    start_epoch = datetime.fromisoformat(args.start).timestamp() if args.start else events[0].timestamp
+    # 기본 종료: 마지막 메시지가 포함되는 다음 tick
+    end_epoch = datetime.fromisoformat(args.end).timestamp() if args.end else events[-1].timestamp + args.step * 60
+    # tick을 분 경계에 맞춤
+    start_epoch = int(start_epoch) // 60 * 60
+
+    weekly_anchor = get_weekly_anchor(config)
+
+    points = calibration_points() if args.evaluate_calibration else []
+    point_index = {}
+    for epoch, _, point in points:
+        point_index.setdefault(epoch, []).append(point)
+
+    out = None
+    if args.output == '-':
+        out = sys.stdout
+    elif args.output:
+        out = open(args.output, 'w')
+
+    history = load_history() if args.backfill_history else None
+    digest = hashlib.sha256() if args.benchmark else None
+    comparisons = []
+    anomalies = [] if args.anomalies else None
+    regular_ticks = 0
+
+    replay_started = time.perf_counter()
+    for epoch, output, is_regular in iter_replay(config, events, start_epoch, end_epoch, args.step,
+                                                 weekly_anchor, extra_ticks=point_index.keys(),
+                                                 anomalies=anomalies):
+        if not is_regular:
+            # 캘리브레이션 기록 시점: 재현한 모니터 값과 비교
+            replayed = output['session']['percentages']['max_percentage'] / 100.0
+            for point in point_index[epoch]:
+                comparisons.append((point.monitor_value, replayed, point.actual_value))
+            continue
+
+        regular_ticks += 1
+
+        if out is not None or digest is not None:
+            line = json.dumps(output, ensure_ascii=False, sort_keys=True)
+            if out is not None:
+                out.write(line + '\n')
+            if digest is not None:
+                digest.update(line.encode('utf-8'))
+
+        if history is not None:
+            session = output['session']
+            update_session_history(
+                history,
+                session['usage'],
+                datetime.fromisoformat(session['window']['start']),
+                datetime.fromisoformat(session['window']['end']),
+                session['percentages'],
+                datetime.fromisoformat(output['timestamp'])
+            )
+    replay_seconds = time.perf_counter() - replay_started
+
+    if out is not None and out is not sys.stdout:
+        out.close()
+
+    report = sys.stderr if out is sys.stdout else sys.stdout
+
+    if history is not None:
+        prune_session_history(history, epoch_to_datetime(time.time(), config['display_settings']['timezone']))
+        save_history(history)
+        print(f"✅ Backfilled session history ({len(history['sessions'])} sessions)", file=report)
+
+    if args.evaluate_calibration:
+        summary = summarize_calibration(comparisons)
+        print(f"\n📊 Calibration evaluation ({summary['samples']} points)", file=report)
+        if summary['samples']:
+            print(f"   Recorded offset mean: {summary['recorded_offset_mean'] * 100:+.2f}%", file=report)
+            print(f"   Replayed offset mean: {summary['replayed_offset_mean'] * 100:+.2f}%", file=report)
+            print(f"   Replayed MAE:         {summary['replayed_mae'] * 100:.2f}%", file=report)
+            print(f"   Residual MAE:         {summary['residual_mae'] * 100:.2f}%", file=report)
+            print(f"   Monitor drift:        {summary['monitor_drift_mean'] * 100:+.2f}%", file=report)
+
+    if anomalies is not None:
+        tz_name = config['display_settings']['timezone']
+        print(f"\n🚨 Runaway loop alerts ({len(anomalies)})", file=report)
+        for alert in anomalies:
+            print(f"   {epoch_to_datetime(alert['epoch'], tz_name).strftime('%Y-%m-%d %H:%M:%S')}  "
+                  f"{describe_alert(alert)}", file=report)
+            print(f"      baseline {alert['baseline_per_minute']:,}/min, threshold "
+                  f"{alert['threshold_per_minute']:,}/min, {alert['file']}", file=report)
+
+    if args.benchmark:
+        ticks_per_second = regular_ticks / replay_seconds if replay_seconds > 0 else float('inf')
+        print(f"\n⏱️  Replay benchmark", file=report)
+        print(f"   Events:  {len(events):,} (loaded in {load_seconds:.2f}s)", file=report)
+        print(f"   Ticks:   {regular_ticks:,} every {args.step}m in {replay_seconds:.2f}s", file=report)
+        print(f"   Rate:    {ticks_per_second:,.0f} simulated ticks/s", file=report)
+        print(f"   Digest:  {digest.hexdigest()[:16]}", file=report)
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Scan Scheduler
+데몬 tick마다 트랜스크립트 스캔에 CPU 시간/읽기 바이트 예산을 두어
+콜드 스타트나 대량 backfill이 한 tick에 코어를 오래 점유하지 않도록 나눠 처리
+
+- tick마다 ScanBudget(바이트, CPU 시간)을 만들어 iter_new_events에 넘김
+  (다 쓰면 중간에 멈추고 커서는 보존 → 남은 작업은 다음 tick에서 이어서 읽음)
+- 최근에 수정된 파일부터 읽음 (현재 세션/주간 윈도우에 들어갈 이벤트가 먼저 반영됨)
+- 예산을 다 써서 backlog가 남은 동안은 결과를 provisional로 표시하고,
+  다음 tick을 BACKLOG_INTERVAL_SECONDS 뒤로 당겨 backlog를 빨리 비움
+  (tick 사이에 쉬므로 CPU 점유율은 대략 예산 / (예산 + 간격))
+- 장기 기록(usage_history) backfill은 현재 윈도우 스캔이 끝난 뒤 같은 예산의 남은 부분만 사용
+- 선택: 데몬 프로세스를 os.nice / idle I/O 우선순위로 낮춤
+  (Linux ioprio_set, macOS setiopolicy_np)
+"""
+
+import os
+import sys
+
+from usage_scanner import ScanBudget, file_stat, pending_scan_bytes
+
+
+# tick당 기본 예산 (평소 tick은 새로 추가된 몇 KB만 읽으므로 콜드 스타트/backfill에만 걸림)
+DEFAULT_TICK_BYTES = 128 * 1024 * 1024
+DEFAULT_TICK_CPU_SECONDS = 0.5
+# backlog가 남아 있을 때 다음 tick까지 대기 시간
+BACKLOG_INTERVAL_SECONDS = 2
+
+# Linux ioprio_set (glibc wrapper 없음 → syscall 번호 직접 사용)
+IOPRIO_SET_SYSCALLS = {'x86_64': 251, 'i386': 289, 'i686': 289, 'aarch64': 30, 'arm64': 30,
+                       'riscv64': 30, 'armv7l': 314, 'ppc64le': 273}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+# macOS setiopolicy_np
+IOPOL_TYPE_DISK = 0
+IOPOL_SCOPE_PROCESS = 0
+IOPOL_THROTTLE = 3
+
+
+def _mtime(session_file):
+    try:
+        return file_stat(session_file).st_mtime
+    except OSError:
+        return float('-inf')
+
+
+class ScanScheduler:
+    """
+    tick별 스캔 예산과 이월된 backlog 추적
+
+    order()로 정렬한 파일과 start_tick()의 budget을 update_usage_state에 넘기고,
+    스캔 후 end_tick() 호출
+    """
+
+    def __init__(self, max_bytes=DEFAULT_TICK_BYTES, max_cpu_seconds=DEFAULT_TICK_CPU_SECONDS):
+        self.max_bytes = max_bytes
+        self.max_cpu_seconds = max_cpu_seconds
+        self.provisional = False
+        self.backlog_bytes = 0
+        self.backlog_files = 0
+        self.throttled_ticks = 0       # 연속으로 예산을 다 쓴 tick 수
+        self.last_bytes = 0
+        self.last_cpu_seconds = 0.0
+
+    def order(self, session_files):
+        """스캔 순서: 최근에 수정된 파일부터 (stat 실패한 파일은 마지막)"""
+        return sorted(session_files, key=_mtime, reverse=True)
+
+    def start_tick(self):
+        """이번 tick의 ScanBudget"""
+        return ScanBudget(self.max_bytes, self.max_cpu_seconds)
+
+    def end_tick(self, budget, session_files, cursors, dormant_before=None):
+        """
+        스캔 결과 반영
+
+        예산을 다 쓰지 않았으면 읽을 수 있는 것은 모두 읽은 것
+        (쓰는 중인 마지막 줄 등 남은 바이트가 있어도 provisional 아님)
+        """
+        self.record(budget)
+        if budget.exhausted:
+            self.backlog_bytes, self.backlog_files = pending_scan_bytes(session_files, cursors, dormant_before)
+        else:
+            self.backlog_bytes, self.backlog_files = 0, 0
+        self.provisional = self.backlog_bytes > 0
+        self.throttled_ticks = self.throttled_ticks + 1 if self.provisional else 0
+
+    def record(self, budget):
+        """이번 tick에 쓴 예산 (남은 예산을 장기 기록 등이 이어서 쓴 뒤 다시 호출)"""
+        self.last_bytes = budget.read_bytes
+        self.last_cpu_seconds = budget.cpu_seconds
+
+    def next_interval(self, interval):
+        """다음 tick까지 대기 시간 (backlog가 남아 있으면 짧게)"""
+        if self.provisional:
+            return min(interval, BACKLOG_INTERVAL_SECONDS)
+        return interval
+
+    def status(self):
+        """출력에 포함할 스캔 상태"""
+        return {
+            'provisional': self.provisional,
+            'backlog_bytes': self.backlog_bytes,
+            'backlog_files': self.backlog_files,
+            'throttled_ticks': self.throttled_ticks,
+            'last_tick': {
+                'bytes_read': self.last_bytes,
+                'cpu_ms': round(self.last_cpu_seconds * 1000, 1)
+            },
+            'budget': {
+                'bytes': self.max_bytes,
+                'cpu_ms': round(self.max_cpu_seconds * 1000) if self.max_cpu_seconds is not None else None
+            }
+        }
+
+
+def set_idle_io_priority():
+    """
+    현재 프로세스의 디스크 I/O를 idle/throttle 우선순위로 낮춤
+
+    Returns:
+        bool: 적용 여부 (지원하지 않는 플랫폼이면 False)
+    """
+    import ctypes
+    import ctypes.util
+    import platform
+
+    libc_name = ctypes.util.find_library('c')
+    if libc_name is None:
+        return False
+    try:
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if sys.platform.startswith('linux'):
+            number = IOPRIO_SET_SYSCALLS.get(platform.machine())
+            if number is None:
+                return False
+            return libc.syscall(number, IOPRIO_WHO_PROCESS, 0, IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT) == 0
+        if sys.platform == 'darwin':
+            return libc.setiopolicy_np(IOPOL_TYPE_DISK, IOPOL_SCOPE_PROCESS, IOPOL_THROTTLE) == 0
+    except (OSError, AttributeError):
+        return False
+    return False
+
+
+def lower_priority(nice=None, idle_io=False):
+    """
+    데몬 프로세스 우선순위 낮추기 (같은 머신의 빌드 등에 양보)
+
+    Args:
+        nice: os.nice 증가량 (None이면 그대로)
+        idle_io: True면 idle I/O 우선순위
+
+    Returns:
+        list: 적용된 항목 설명
+    """
+    applied = []
+    if nice:
+        try:
+            applied.append(f"nice {os.nice(nice)}")
+        except OSError as e:
+            print(f"Warning: os.nice failed: {e}")
+    if idle_io:
+        if set_idle_io_priority():
+            applied.append('idle I/O')
+        else:
+            print("Warning: idle I/O priority is not supported on this platform")
+    return applied
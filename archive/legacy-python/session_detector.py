@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Rolling Session Detector
+usage 이벤트로 rolling 세션 경계를 증분 추적 (고정 윈도우 엔진과 병행)
+
+rolling 세션: 이전 세션이 끝난 뒤 첫 메시지에서 시작하여 정확히 window_hours 뒤 리셋
+(session_base_hour 기준 고정 윈도우와 extension이 스크래핑한 리셋 시간을 비교하기 위함)
+
+- 이벤트당 O(1): 현재 세션 누적기에 더하거나, 세션이 끝났으면 새 세션 시작
+- 트랜스크립트는 파일 단위로 읽으므로 이벤트를 모아 두었다가 시간순으로 정렬해 처리
+- 이전에 처리한 이벤트보다 이른 이벤트:
+  - 현재/지난 세션 안이면 그 누적기에 더함
+  - 세션 사이 빈 구간이면 이후 세션 시작이 바뀔 수 있으므로
+    flush(recent_events)에서 그 구간부터 다시 계산
+    (최근 이벤트 버퍼 밖의 세션 경계는 복원할 수 없어 버퍼의 첫 이벤트부터 시작)
+"""
+
+from collections import deque
+from operator import attrgetter
+
+from records import WindowUsage
+from usage_engine import add_event
+
+
+DEFAULT_WINDOW_HOURS = 5
+# 늦은 이벤트 배정/비교용으로 보관하는 지난 세션 수
+HISTORY_SESSIONS = 8
+# 정렬 전에 모아 두는 최대 이벤트 수 (첫 전체 스캔의 메모리 상한)
+MAX_PENDING_EVENTS = 65536
+
+_by_timestamp = attrgetter('timestamp')
+
+
+class RollingSessionDetector:
+    """
+    rolling 세션 상태 기계 (usage_engine 리스너: add_event(event), reset())
+
+    advance(now)를 ingest 전에 호출하고, 조회 전에 flush(recent_events)
+    """
+
+    __slots__ = ('span', 'current', 'history', 'pending', 'rebuild_from')
+
+    def __init__(self, window_hours=DEFAULT_WINDOW_HOURS):
+        self.span = window_hours * 3600
+        self.reset()
+
+    def reset(self):
+        """전체 재스캔 시 초기화"""
+        self.current = None                              # 현재(또는 마지막) 세션 누적기
+        self.history = deque(maxlen=HISTORY_SESSIONS)    # 끝난 세션 누적기 (오래된 순)
+        self.pending = []
+        self.rebuild_from = None                         # 다시 계산할 시작 경계 (없으면 None)
+
+    def _start(self, timestamp):
+        if self.current is not None:
+            self.history.append(self.current)
+        self.current = WindowUsage(timestamp, timestamp + self.span)
+
+    def _step(self, event):
+        timestamp = event.timestamp
+        current = self.current
+        if current is None or timestamp >= current.window_end:
+            self._start(timestamp)
+            add_event(self.current, event)
+        elif timestamp >= current.window_start:
+            add_event(current, event)
+        else:
+            self._late(event)
+
+    def _late(self, event):
+        """현재 세션 시작보다 이른 이벤트"""
+        timestamp = event.timestamp
+        boundary = float('-inf')
+        for usage in reversed(self.history):
+            if usage.window_start <= timestamp < usage.window_end:
+                add_event(usage, event)
+                return
+            if usage.window_end <= timestamp:
+                boundary = usage.window_end
+                break
+
+        # 세션 사이 빈 구간: 이 이벤트가 다음 세션의 시작일 수 있음
+        if self.rebuild_from is None or boundary < self.rebuild_from:
+            self.rebuild_from = boundary
+
+    def _drain(self):
+        if not self.pending:
+            return
+        pending = sorted(self.pending, key=_by_timestamp)
+        self.pending = []
+        for event in pending:
+            self._step(event)
+
+    def _rebuild(self, events):
+        """rebuild_from 이후 세션 경계를 최근 이벤트로 다시 계산"""
+        since = self.rebuild_from
+        self.rebuild_from = None
+
+        kept = [usage for usage in self.history if usage.window_end <= since]
+        self.history = deque(kept, maxlen=HISTORY_SESSIONS)
+        self.current = self.history.pop() if self.history else None
+
+        for event in sorted((e for e in events if e.timestamp >= since), key=_by_timestamp):
+            self._step(event)
+
+    def advance(self, now_epoch):
+        """지난 tick에 모은 이벤트 처리 (ingest 전에 호출)"""
+        self._drain()
+
+    def add_event(self, event):
+        """새 usage 이벤트 (모아 두었다가 flush/advance에서 시간순 처리)"""
+        self.pending.append(event)
+        if len(self.pending) >= MAX_PENDING_EVENTS:
+            self._drain()
+
+    def flush(self, recent_events=()):
+        """
+        모은 이벤트 처리 (조회 전에 호출)
+
+        Args:
+            recent_events: 세션 경계를 다시 계산해야 할 때 사용할 최근 이벤트 (usage state 버퍼)
+        """
+        self._drain()
+        if self.rebuild_from is not None:
+            self._rebuild(recent_events)
+
+    def session(self, now_epoch):
+        """
+        now 시점의 rolling 세션 (flush 이후 호출)
+
+        Returns:
+            dict: {
+                "active": now가 세션 안이면 True (끝났으면 다음 메시지에서 새 세션 시작),
+                "start": 세션 시작 (UTC epoch), "reset": 리셋 (UTC epoch),
+                "usage": WindowUsage (usage_summary()에 넘길 수 있음)
+            }
+            기록이 없으면 None
+        """
+        current = self.current
+        if current is None:
+            return None
+        return {
+            'active': current.window_start <= now_epoch < current.window_end,
+            'start': current.window_start,
+            'reset': current.window_end,
+            'usage': current
+        }
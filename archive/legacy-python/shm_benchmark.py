@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Snapshot Read Benchmark
+로컬 리더가 현재 사용량을 읽는 비용 비교 (초당 읽기 횟수)
+
+시나리오:
+- json-file:    ~/.claude_usage.json 열기 + json.load + 퍼센트/리셋 시간 추출 (기존 방식)
+- shm-read:     SnapshotReader.read() (매핑 1회 후 메모리 읽기, dict 반환)
+- shm-values:   SnapshotReader.read_values() (tuple, dict 생성 없음)
+- shm-contended: 다른 프로세스가 쉬지 않고 publish하는 중에 shm-read
+
+같은 데몬 출력으로 두 형식을 임시 디렉토리에 만들어 비교한다.
+출력은 기존 ~/.claude_usage.json을 쓰고, 없으면 `monitor_daemon.py --once`로 만든다.
+"""
+
+import argparse
+import json
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from monitor_daemon import OUTPUT_FILE, snapshot_windows
+from usage_shm import SnapshotReader, SnapshotWriter
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def load_daemon_output():
+    """벤치마크용 데몬 출력 (dict)"""
+    if OUTPUT_FILE.exists():
+        return json.loads(OUTPUT_FILE.read_text())
+    result = subprocess.run([sys.executable, str(SCRIPT_DIR / 'monitor_daemon.py'), '--once'],
+                            capture_output=True, text=True, cwd=SCRIPT_DIR, check=False)
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return None
+
+
+def read_json_file(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if data['status'] != 'active':
+        return None
+    return (data['session']['percentages']['max_percentage'], data['session']['reset']['iso'],
+            data['weekly']['percentages']['max_percentage'], data['weekly']['reset']['iso'])
+
+
+def measure(read, seconds):
+    """seconds 동안 반복 호출 → 초당 횟수"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            read()
+        count += 100
+    return count / seconds
+
+
+def hammer(path, status, windows, stop):
+    """다른 프로세스에서 쉬지 않고 publish (contended 시나리오)"""
+    writer = SnapshotWriter(path)
+    while not stop.is_set():
+        writer.publish(status, windows)
+    writer.close()
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Benchmark shared snapshot reads against the JSON output file')
+    parser.add_argument('--seconds', type=float, default=1.0,
+                        help='Duration per scenario (default: 1.0)')
+    args = parser.parse_args()
+
+    data = load_daemon_output()
+    if data is None or data.get('status') != 'active':
+        print('❌ No active daemon output to benchmark (run monitor_daemon.py --once first)')
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file = Path(tmp_dir) / 'claude_usage.json'
+        shm_file = Path(tmp_dir) / 'usage.shm'
+        json_size = json_file.write_text(json.dumps(data, indent=2))
+
+        windows = snapshot_windows(data)
+        writer = SnapshotWriter(shm_file)
+        writer.publish(data['status'], windows, datetime.fromisoformat(data['timestamp']).timestamp())
+        reader = SnapshotReader(shm_file)
+
+        results = {
+            'json-file': measure(lambda: read_json_file(json_file), args.seconds),
+            'shm-read': measure(reader.read, args.seconds),
+            'shm-values': measure(reader.read_values, args.seconds),
+        }
+
+        stop = multiprocessing.Event()
+        process = multiprocessing.Process(target=hammer, args=(shm_file, data['status'], windows, stop))
+        process.start()
+        time.sleep(0.2)
+        results['shm-contended'] = measure(reader.read, args.seconds)
+        stop.set()
+        process.join()
+
+        reader.close()
+        writer.close()
+
+    baseline = results['json-file']
+    print(f"JSON output: {json_size:,} characters")
+    print(f"{'scenario':<15}{'reads/s':>14}{'µs/read':>10}{'vs json':>9}")
+    for name, rate in results.items():
+        print(f"{name:<15}{rate:>14,.0f}{1e6 / rate:>10.2f}{rate / baseline:>8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
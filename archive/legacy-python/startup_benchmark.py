@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Startup Benchmark
+`--once`의 시작 시간 측정 (SwiftBar/cron 호출 경로)
+
+시나리오:
+- python:       인터프리터 자체 (`python3 -c pass`, 기준선)
+- import:       monitor_daemon import만
+- once-rescan:  monitor_daemon.py --once --rescan (모든 트랜스크립트 스캔)
+- once-index:   usage_once.py (저장된 증분 인덱스 사용)
+- once-daemon:  usage_once.py (데몬 소켓 응답)
+
+인터프리터 시작 시간은 기계마다 크게 다르므로 기준선 대비 추가 시간도 함께 출력한다.
+once-index 또는 once-daemon의 중앙값이 --target-ms를 넘으면 종료 코드 1.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from daemon_socket import OutputServer
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MONITOR = str(SCRIPT_DIR / 'monitor_daemon.py')
+ONCE = str(SCRIPT_DIR / 'usage_once.py')
+
+
+def time_command(args, runs, env=None):
+    """명령을 runs번 실행한 wall time 리스트 (ms)"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       cwd=SCRIPT_DIR, env=env, check=False)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run_daemon_scenario(runs):
+    """데몬 소켓 응답 시나리오 (임시 HOME에 소켓 서버를 띄움)"""
+    output_file = Path.home() / '.claude_usage.json'
+    payload = output_file.read_bytes() if output_file.exists() else json.dumps({'status': 'active'}).encode()
+
+    with tempfile.TemporaryDirectory() as tmp_home:
+        server = OutputServer(Path(tmp_home) / '.claude-monitor' / 'daemon.sock')
+        if not server.start():
+            return None
+        server.publish(payload)
+        try:
+            return time_command([sys.executable, ONCE], runs, dict(os.environ, HOME=tmp_home))
+        finally:
+            server.close()
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Benchmark --once startup')
+    parser.add_argument('--runs', type=int, default=10,
+                        help='Runs per scenario (default: 10)')
+    parser.add_argument('--target-ms', type=float, default=50.0,
+                        help='Target for --once with an index or daemon (default: 50)')
+
+    args = parser.parse_args()
+
+    scenarios = {
+        'python': time_command([sys.executable, '-c', 'pass'], args.runs),
+        'import': time_command([sys.executable, '-c', 'import monitor_daemon'], args.runs),
+        'once-rescan': time_command([sys.executable, MONITOR, '--once', '--rescan'], args.runs),
+        # 첫 실행이 인덱스를 만들고, 이후 실행은 증분
+        'once-index': time_command([sys.executable, ONCE], args.runs + 1)[1:],
+    }
+    daemon_timings = run_daemon_scenario(args.runs)
+    if daemon_timings is not None:
+        scenarios['once-daemon'] = daemon_timings
+
+    baseline = statistics.median(scenarios['python'])
+
+    print(f"\n⏱️  Startup benchmark ({args.runs} runs, median / min)")
+    for name, timings in scenarios.items():
+        median = statistics.median(timings)
+        extra = '' if name == 'python' else f"  (+{median - baseline:.1f} ms over interpreter)"
+        print(f"   {name:<12} {median:7.1f} ms / {min(timings):7.1f} ms{extra}")
+
+    over_target = []
+    for name in ('once-index', 'once-daemon'):
+        if name in scenarios:
+            median = statistics.median(scenarios[name])
+            status = '✅' if median <= args.target_ms else '❌'
+            print(f"\n   {status} {name}: {median:.1f} ms (target {args.target_ms:.0f} ms)")
+            if median > args.target_ms:
+                over_target.append(name)
+
+    # 목표를 넘으면 실패 (CI/수동 확인에서 시작 시간 회귀를 놓치지 않도록)
+    return 1 if over_target else 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+runaway loop detector 테스트
+
+실행: python3 test_anomaly_detector.py  (또는 pytest)
+"""
+
+import tempfile
+from pathlib import Path
+
+import anomaly_detector
+from anomaly_detector import LoopDetector, project_of
+from records import UsageEvent
+from transcript_fixtures import assistant_line, write_transcript
+from usage_scanner import load_all_events
+
+
+BASE = 1_700_000_040   # 분 경계 (epoch % 60 == 0)
+ROOT = Path('/home/user/.claude/projects')
+MAIN = ROOT / '-home-user-app' / 'session.jsonl'
+AGENT = ROOT / '-home-user-app' / 'session' / 'subagents' / 'agent-1.jsonl'
+OTHER = ROOT / '-home-user-docs' / 'notes.jsonl'
+
+
+def event(timestamp, output_tokens, file=MAIN):
+    return UsageEvent(timestamp=timestamp, input_tokens=10, output_tokens=output_tokens, file=file)
+
+
+def steady(minutes, file=MAIN, start=BASE):
+    """평소 작업: 분당 두 번, 800~1600 output 토큰"""
+    events = []
+    for minute in range(minutes):
+        events.append(event(start + minute * 60 + 5, 400 + minute % 5 * 100, file))
+        events.append(event(start + minute * 60 + 35, 400 + minute % 3 * 200, file))
+    return events
+
+
+def loop(start, minutes, file=AGENT):
+    """루프: 5초마다 응답, 분당 ~24000 output 토큰"""
+    return [event(start + second, 2000, file) for second in range(0, minutes * 60, 5)]
+
+
+def feed(detector, events, now=None):
+    detector.advance(now if now is not None else events[-1].timestamp)
+    for e in events:
+        detector.add_event(e)
+
+
+def test_project_of():
+    assert project_of(MAIN) == '-home-user-app'
+    assert project_of(AGENT) == '-home-user-app'
+    assert project_of('/tmp/other/session.jsonl') == 'other'
+    assert project_of(None) is None
+
+
+def test_steady_usage_does_not_alert():
+    detector = LoopDetector()
+    feed(detector, steady(240))
+    assert detector.drain() == []
+    rate = detector.projects['-home-user-app']
+    assert rate.samples >= anomaly_detector.MIN_SAMPLES
+    assert 1000 < rate.mean < 1400
+
+
+def test_loop_alerts_within_seconds_naming_project_and_file():
+    detector = LoopDetector()
+    events = steady(120) + steady(120, OTHER)
+    events.sort(key=lambda e: e.timestamp)
+    feed(detector, events)
+
+    start = BASE + 120 * 60
+    burst = loop(start, 20)
+    for e in burst:
+        detector.advance(e.timestamp)
+        detector.add_event(e)
+        if detector.pending:
+            break
+    [alert] = detector.drain()
+    assert alert['project'] == '-home-user-app'
+    assert alert['file'] == str(AGENT)
+    assert alert['epoch'] - start < 60
+    assert alert['output_tokens_per_minute'] > alert['threshold_per_minute']
+    assert detector.next_interval(60) == anomaly_detector.WATCH_INTERVAL_SECONDS
+
+    # 루프가 계속되어도 cooldown 동안 다시 알리지 않고, 다른 프로젝트는 영향 없음
+    for e in burst:
+        detector.advance(e.timestamp)
+        detector.add_event(e)
+    assert detector.drain() == []
+    assert detector.projects['-home-user-docs'].mean < 1400
+    # 자른 값만 반영 → baseline이 루프 속도로 따라가지 않음
+    assert detector.projects['-home-user-app'].mean < 5000
+
+
+def test_old_events_and_late_files():
+    # 시작 시 전체 스캔: 오래된 루프는 baseline에만 반영하고 알리지 않음
+    detector = LoopDetector()
+    history = steady(120) + loop(BASE + 120 * 60, 10)
+    feed(detector, history, now=BASE + 2 * 86400)
+    assert detector.drain() == []
+
+    # 같은 프로젝트의 다른 트랜스크립트가 몇 분 늦게 읽혀도 같은 분에 합침 (ring보다 늦으면 stale)
+    detector = LoopDetector()
+    feed(detector, steady(120))
+    head = detector.projects['-home-user-app'].head
+    detector.add_event(event((head - 2) * 60 + 10, 300, AGENT))
+    assert detector.late_events == 0
+    detector.add_event(event((head - 10) * 60, 300, AGENT))
+    assert detector.late_events == 1 and detector.stale
+    assert not LoopDetector().flush([])
+
+    # 최근 파일부터 읽은 첫 전체 스캔: 루프 파일을 먼저 읽어 baseline이 없음 → flush로 시간순 재구성
+    detector = LoopDetector()
+    recent = steady(120) + loop(BASE + 120 * 60, 3)
+    feed(detector, [e for e in recent if e.file == AGENT] + [e for e in recent if e.file == MAIN])
+    assert detector.drain() == [] and detector.stale
+    assert detector.flush(recent)
+    [alert] = detector.drain()
+    assert alert['file'] == str(AGENT) and not detector.stale
+
+    # reset 후에도 cooldown 유지 (재스캔으로 같은 루프를 다시 알리지 않음)
+    detector.reset()
+    feed(detector, recent)
+    assert detector.drain() == []
+
+
+def test_replay_from_transcripts():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project = Path(tmp_dir) / 'projects' / '-home-user-app'
+        project.mkdir(parents=True)
+        for path, events in ((project / 'session.jsonl', steady(180)),
+                             (project / 'agent.jsonl', loop(BASE + 180 * 60, 15))):
+            write_transcript(path, [assistant_line(e.timestamp, 1, e.output_tokens) for e in events])
+
+        # replay.py와 같이 시간순으로 흘려 넣음 (모든 시점 판정)
+        detector = LoopDetector(max_alert_delay=None)
+        feed(detector, load_all_events([project / 'session.jsonl', project / 'agent.jsonl']))
+        [alert] = detector.drain()
+        assert alert['project'] == '-home-user-app'
+        assert alert['file'] == str(project / 'agent.jsonl')
+        assert BASE + 180 * 60 <= alert['epoch'] < BASE + 181 * 60
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+claude-usage-sync 테스트 (검증, SwiftBar 렌더링/캐시, 다운로드 동기화, 임시 디렉토리)
+
+scripts/claude-usage-sync는 확장자 없는 단독 스크립트 → 파일 경로로 로드
+실행: python3 test_claude_usage_sync.py  (또는 pytest)
+"""
+
+import json
+import os
+import tempfile
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from pathlib import Path
+
+
+SCRIPT = Path(__file__).resolve().parents[2] / 'scripts' / 'claude-usage-sync'
+
+
+def load_sync():
+    loader = SourceFileLoader('claude_usage_sync', str(SCRIPT))
+    module = module_from_spec(spec_from_loader(loader.name, loader))
+    loader.exec_module(module)
+    return module
+
+
+sync = load_sync()
+
+
+def download(session, weekly, **extra):
+    return json.dumps({'session': session, 'weekly': weekly, **extra})
+
+
+def test_validate_usage_fields():
+    values = sync.validate_usage_fields({'session': 0, 'weekly': 100, 'sessionResetTime': ' 2시간 후 '})
+    assert values == {'session': 0, 'weekly': 100, 'session_reset': '2시간 후', 'weekly_reset': ''}
+
+    for data in ([], {'session': 10}, {'session': True, 'weekly': 1}, {'session': '10', 'weekly': 1},
+                 {'session': -1, 'weekly': 1}, {'session': 10, 'weekly': 100.5},
+                 {'session': float('nan'), 'weekly': 1}, {'session': 1, 'weekly': 1, 'weeklyResetTime': 3}):
+        try:
+            sync.validate_usage_fields(data)
+        except ValueError:
+            continue
+        raise AssertionError(f'accepted {data!r}')
+
+
+def test_render_swiftbar_thresholds():
+    def title(session):
+        return sync.render_swiftbar(sync.build_usage(session, 10)).split('\n')[0]
+
+    assert title(0) == '🟢 0%'
+    assert title(49.5) == '🟢 49.5%'
+    assert title(50) == '🟡 50%'
+    assert title(79) == '🟡 79%'
+    assert title(80) == '🔴 80%'
+    assert title(100) == '🔴 100%'
+
+    # 0%는 값이 있는 것 (없음/잘못된 값과 구분)
+    text = sync.render_swiftbar(sync.build_usage(0, 0, '5시간 후', '(화) 오전 10:59에'))
+    assert '--Current: 0% | color=green' in text
+    assert '📈 Weekly Usage ((화) 오전 10:59에)' in text and '--Current: 0%\n' in text
+    assert sync.render_swiftbar({'session': {}}) == sync.render_invalid()
+    assert sync.render_swiftbar({'session': {'percentage': False}}) == sync.render_invalid()
+    assert '--Current: ?%' in sync.render_swiftbar({'session': {'percentage': 5}})
+
+
+def test_swiftbar_output_cache_freshness():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        usage_file = Path(tmp_dir) / 'claude-web-usage.json'
+        cache_file = Path(tmp_dir) / 'claude-swiftbar.txt'
+        assert sync.swiftbar_output(usage_file, cache_file) == sync.render_no_data()
+
+        # 캐시가 더 최근 → 파싱 없이 그대로
+        sync.publish(sync.build_usage(30, 10), usage_file, cache_file, refresh=False)
+        cache_file.write_text('cached\n')
+        assert sync.swiftbar_output(usage_file, cache_file) == 'cached\n'
+
+        # 다른 도구가 사용량 파일을 새로 씀 → 다시 렌더링하고 캐시 갱신
+        usage_file.write_text(json.dumps(sync.build_usage(85, 10)))
+        stat = cache_file.stat()
+        os.utime(usage_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        text = sync.swiftbar_output(usage_file, cache_file)
+        assert text.startswith('🔴 85%')
+        assert cache_file.read_text() == text
+
+        # 깨진 파일은 캐시를 덮어쓰지 않음
+        usage_file.write_text('{"session": ')
+        os.utime(usage_file, ns=(stat.st_atime_ns, cache_file.stat().st_mtime_ns + 1_000_000_000))
+        assert sync.swiftbar_output(usage_file, cache_file) == sync.render_invalid()
+        assert cache_file.read_text() == text
+
+        # 데몬에 전달해 사용량 파일이 없으면 캐시
+        usage_file.unlink()
+        assert sync.swiftbar_output(usage_file, cache_file) == text
+
+
+def test_sync_download_keep_truncated():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        download_file = Path(tmp_dir) / 'claude-auto-usage.json'
+        usage_file = Path(tmp_dir) / 'claude-web-usage.json'
+        cache_file = Path(tmp_dir) / 'claude-swiftbar.txt'
+        files = {'usage_file': usage_file, 'cache_file': cache_file, 'refresh': False}
+
+        # 쓰는 중(잘린 JSON) → 남겨 두고 다음 이벤트에 다시 판정
+        download_file.write_text(download(42, 7)[:10])
+        try:
+            sync.sync_download(download_file, keep_truncated=True, **files)
+            raise AssertionError('truncated JSON accepted')
+        except json.JSONDecodeError:
+            pass
+        assert download_file.exists() and not usage_file.exists()
+
+        # 확정된 깨진 파일은 삭제
+        try:
+            sync.sync_download(download_file, **files)
+            raise AssertionError('truncated JSON accepted')
+        except json.JSONDecodeError:
+            pass
+        assert not download_file.exists()
+
+        # 필드 오류는 keep_truncated여도 삭제
+        download_file.write_text(download(150, 7))
+        try:
+            sync.sync_download(download_file, keep_truncated=True, **files)
+            raise AssertionError('out of range accepted')
+        except ValueError:
+            pass
+        assert not download_file.exists() and not usage_file.exists()
+
+        download_file.write_text(download(42, 7, weeklyResetTime='(화) 오전 10:59에'))
+        usage = sync.sync_download(download_file, keep_truncated=True, **files)
+        assert not download_file.exists()
+        assert json.loads(usage_file.read_text()) == usage
+        assert usage['session']['percentage'] == 42 and usage['weekly']['reset_time'] == '(화) 오전 10:59에'
+        assert cache_file.read_text().startswith('🟢 42%')
+
+
+def test_manual_writes_manual_source_only():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manual_file = Path(tmp_dir) / 'monitor' / 'manual_usage.json'
+        cache_file = Path(tmp_dir) / 'claude-swiftbar.txt'
+        assert sync.cmd_manual(120, 5, manual_file, cache_file, refresh=False) == 1
+        assert not manual_file.exists()
+
+        assert sync.cmd_manual(22, 25.5, manual_file, cache_file, refresh=False) == 0
+        usage = json.loads(manual_file.read_text())
+        assert usage['source'] == 'manual_input'
+        assert usage['session']['percentage'] == 22 and usage['weekly']['percentage'] == 25.5
+        assert cache_file.read_text().startswith('🟢 22%')
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
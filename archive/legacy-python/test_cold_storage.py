@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+압축 트랜스크립트 테스트 (gzip, 임시 디렉토리)
+
+실행: python3 test_cold_storage.py  (또는 pytest)
+"""
+
+import gzip
+import json
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import cold_storage
+from transcript_fixtures import assistant_line, user_line, write_transcript
+from usage_engine import create_usage_state, update_usage_state
+from usage_scanner import find_all_sessions
+
+
+WINDOWS = {'weekly': (1735689600.0, 1736294400.0, False)}  # 2025-01-01 ~ 2025-01-08 UTC
+NOW = 1736000000.0
+
+
+def sample_lines(count):
+    """분마다 assistant 한 줄 + user 한 줄 (2025-01-02 10시부터)"""
+    lines = []
+    for i in range(count):
+        lines.append(assistant_line(f'2025-01-02T{10 + i // 60:02d}:{i % 60:02d}:{(i * 7) % 60:02d}.000Z',
+                                    10 + i, 100 + i, cache_read=5, cache_creation=1))
+        lines.append(user_line('2025-01-02T10:00:00.000Z'))
+    return lines
+
+
+def totals(state):
+    usage = state['windows']['weekly']
+    return tuple(getattr(usage, field) for field in (
+        'input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_creation_tokens', 'messages_count'))
+
+
+@contextmanager
+def transcript_tree():
+    """임시 트랜스크립트 트리 + 임시 인덱스 파일"""
+    original_index_file = cold_storage.COMPRESSED_INDEX_FILE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cold_storage.COMPRESSED_INDEX_FILE = Path(tmp_dir) / 'compressed_index.json'
+        cold_storage._index = None
+        projects = Path(tmp_dir) / 'projects'
+        write_transcript(projects / 'a' / 's1.jsonl', sample_lines(90))
+        write_transcript(projects / 'b' / 's2.jsonl', sample_lines(30))
+        try:
+            yield projects
+        finally:
+            cold_storage.COMPRESSED_INDEX_FILE = original_index_file
+            cold_storage._index = None
+
+
+def test_totals_stable_across_compression():
+    with transcript_tree() as projects:
+        state = create_usage_state()
+        update_usage_state(state, find_all_sessions(projects), WINDOWS, NOW)
+        before = totals(state)
+        assert before[4] == 120
+
+        cold_storage.compress_transcript(projects / 'a' / 's1.jsonl')
+        files = find_all_sessions(projects)
+        assert sorted(path.name for path in files) == ['s1.jsonl.gz', 's2.jsonl']
+
+        # 실행 중인 데몬: 이미 읽은 원본은 다시 세지 않음
+        update_usage_state(state, files, WINDOWS, NOW)
+        assert totals(state) == before
+
+        # 새로 시작: 요약으로 같은 합계
+        fresh = create_usage_state()
+        update_usage_state(fresh, files, WINDOWS, NOW)
+        assert totals(fresh) == before
+
+
+def test_compressed_file_summarised_once():
+    with transcript_tree() as projects:
+        source = projects / 'b' / 's2.jsonl'
+        target = source.with_name('s2.jsonl.gz')
+        with open(source, 'rb') as f, gzip.open(target, 'wb') as out:
+            out.write(f.read())
+        source.unlink()
+
+        first = create_usage_state()
+        update_usage_state(first, find_all_sessions(projects), WINDOWS, NOW)
+        index = json.loads(cold_storage.COMPRESSED_INDEX_FILE.read_text())
+        assert len(index['summaries']) == 1
+
+        # 인덱스가 있으면 다시 압축을 풀지 않음
+        cold_storage._index = None
+        original_open = cold_storage.open_compressed
+        cold_storage.open_compressed = None
+        try:
+            second = create_usage_state()
+            update_usage_state(second, find_all_sessions(projects), WINDOWS, NOW)
+        finally:
+            cold_storage.open_compressed = original_open
+        assert totals(second) == totals(first)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
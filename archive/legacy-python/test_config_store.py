@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+설정 검증/변경 감지 테스트
+
+실행: python3 test_config_store.py  (또는 pytest)
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from config_store import ConfigError, ConfigWatcher, diff_config, read_config, thaw, validate_config
+from monitor_daemon import config_dependents
+
+
+def minimal_config():
+    return {
+        'plan': {'name': 'Team Premium (Claude Code)'},
+        'rate_limits': {
+            'session': {'input_tokens_per_minute': 40000, 'output_tokens_per_minute': 1611},
+            'weekly': {'input_tokens_per_minute': 40000, 'output_tokens_per_minute': 193}
+        },
+        'notifications': {'thresholds': [80, 90, 95]}
+    }
+
+
+def test_defaults_and_read_only():
+    config = validate_config(minimal_config())
+    assert config['display_settings']['timezone'] == 'Asia/Seoul'
+    assert config['rate_limits']['session']['window_hours'] == 5
+    assert config['rate_limits']['weekly']['window_hours'] == 168
+    assert config.get('forecast', {}).get('half_life_minutes', 15) == 15
+    assert config['notifications']['thresholds'] == (80, 90, 95)
+
+    try:
+        config['plan']['name'] = 'x'
+        assert False, 'config should be read-only'
+    except TypeError:
+        pass
+
+    assert json.loads(json.dumps(thaw(config)))['notifications']['thresholds'] == [80, 90, 95]
+
+
+def test_all_errors_reported():
+    raw = minimal_config()
+    del raw['rate_limits']['weekly']['output_tokens_per_minute']
+    raw['rate_limits']['session']['window_hours'] = '5'
+    raw['notifications']['thresholds'] = [80, 120]
+    raw['display_settings'] = {'timezone': 'Nowhere/City'}
+
+    try:
+        validate_config(raw)
+        assert False, 'expected ConfigError'
+    except ConfigError as e:
+        assert len(e.errors) == 4
+        assert 'rate_limits.weekly.output_tokens_per_minute: missing' in e.errors
+
+
+def test_diff_and_dependents():
+    old = validate_config(minimal_config())
+    raw = minimal_config()
+    raw['notifications']['thresholds'] = [50]
+    raw['notifications']['backends'] = ['stdout']
+    raw['rate_limits']['session']['output_tokens_per_minute'] = 3000
+    new = validate_config(raw)
+
+    changed = diff_config(old, new)
+    assert changed == {
+        'notifications.thresholds',
+        'notifications.backends',
+        'rate_limits.session.output_tokens_per_minute'
+    }
+    assert config_dependents(changed) == {'notification_engine'}
+    assert config_dependents({'rate_limits.session.output_tokens_per_minute'}) == set()
+    assert config_dependents({'forecast'}) == {'forecaster'}
+
+
+def test_watcher_keeps_config_on_invalid_file():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_file = Path(tmp_dir) / 'config.json'
+        config_file.write_text(json.dumps(minimal_config()))
+        watcher = ConfigWatcher(read_config(config_file), config_file)
+        assert watcher.poll() == set()
+
+        raw = minimal_config()
+        raw['notifications']['thresholds'] = [70]
+        config_file.write_text(json.dumps(raw))
+        os.utime(config_file, ns=(0, 10 ** 18))
+        assert watcher.poll() == {'notifications.thresholds'}
+        assert watcher.config['notifications']['thresholds'] == (70,)
+
+        config_file.write_text('{"plan": ')
+        os.utime(config_file, ns=(0, 2 * 10 ** 18))
+        assert watcher.poll() == set()
+        assert watcher.config['notifications']['thresholds'] == (70,)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+데몬 소켓 테스트 (출력 조회, 관측값 전달, 임시 디렉토리)
+
+실행: python3 test_daemon_socket.py  (또는 pytest)
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from daemon_socket import OutputServer, query_daemon, send_to_daemon
+from monitor_daemon import get_weekly_anchor
+from usage_sources import SourceRunner, UsageFileSource
+
+
+def usage_document(timestamp, session, weekly_reset=None):
+    """claude-usage-sync build_usage 형식"""
+    return {
+        'timestamp': timestamp,
+        'source': 'chrome_extension',
+        'session': {'percentage': session, 'reset_time': '1시간 50분 후'},
+        'weekly': {'percentage': 17, 'reset_time': weekly_reset}
+    }
+
+
+def wait_for_messages(server, timeout=2.0):
+    deadline = time.time() + timeout
+    while not server.has_messages() and time.time() < deadline:
+        time.sleep(0.001)
+    return server.drain_messages()
+
+
+def test_query_and_push_share_socket():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        socket_file = Path(tmp_dir) / 'daemon.sock'
+        message = {'type': 'usage', 'source': 'extension', 'usage': usage_document('2026-01-01T00:00:00Z', 42)}
+        # 데몬 없음 → 호출자가 파일로 대체
+        assert query_daemon(socket_file) is None
+        assert not send_to_daemon(message, socket_file)
+
+        server = OutputServer(socket_file)
+        assert server.start()
+        try:
+            server.publish(b'{"status": "active"}')
+            # 조회만 하는 클라이언트는 메시지를 남기지 않음
+            assert query_daemon(socket_file) == b'{"status": "active"}'
+            assert send_to_daemon(message, socket_file)
+            assert wait_for_messages(server) == [message]
+            assert not server.has_messages()
+
+            # 깨진 JSON은 버리고 다음 연결은 정상 처리
+            import socket
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(socket_file))
+                while client.recv(4096):
+                    pass
+                client.sendall(b'{"type": ')
+            assert query_daemon(socket_file) == b'{"status": "active"}'
+            assert server.drain_messages() == []
+        finally:
+            server.close()
+
+
+def test_pushed_observation_preferred_when_newer():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        usage_file = Path(tmp_dir) / 'usage.json'
+        usage_file.write_text(json.dumps(usage_document('2026-01-01T00:00:00Z', 30)))
+        runner = SourceRunner([UsageFileSource('extension', usage_file)])
+        try:
+            assert runner.pushed('extension') is None
+            assert not runner.push('manual', usage_document('2026-01-01T00:10:00Z', 50), 0)
+
+            pushed = usage_document('2026-01-01T00:10:00Z', 50, '(화) 오전 10:59에')
+            assert runner.push('extension', pushed, 0)
+            runner.start(0)
+            [observation] = runner.collect()
+            assert observation['session']['percentage'] == 50.0
+            assert runner.pushed('extension') is pushed
+
+            # 파일이 더 최근이면 파일 (데몬이 멈춘 동안 호스트가 파일에 기록)
+            usage_file.write_text(json.dumps(usage_document('2026-01-01T00:20:00Z', 60)))
+            runner.start(0)
+            [observation] = runner.collect()
+            assert observation['session']['percentage'] == 60.0
+        finally:
+            runner.close()
+
+        # 소켓으로 받은 weekly reset_time이 주간 anchor가 됨
+        anchor = get_weekly_anchor({}, pushed)
+        assert anchor == {'weekday': 1, 'hour': 10, 'minute': 59, 'source': 'extension'}
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
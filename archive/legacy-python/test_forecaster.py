@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+burn rate forecaster 테스트 (EWMA 속도, 반감기, limit 도달 예측)
+
+실행: python3 test_forecaster.py  (또는 pytest)
+"""
+
+import math
+
+from forecaster import BurnRateForecaster, describe_forecast
+from records import UsageEvent
+
+
+NOW = 1_700_000_040   # 분 경계 (epoch % 60 == 0)
+HORIZON = 200         # 반감기 10분 × 20 → 시작 전 구간의 영향은 1e-6 미만
+
+# 5시간 윈도우, output 100 tokens/min → 윈도우 limit 30,000 (1,000 tokens = 3.33%)
+LIMITS = {'window_hours': 5, 'input_tokens_per_minute': 1000, 'output_tokens_per_minute': 100}
+
+
+def steady_forecaster(minutes, output_tokens=1000, end=NOW, half_life=10):
+    """end 직전 minutes분 동안 분당 output_tokens (분마다 두 번에 나눠서)"""
+    forecaster = BurnRateForecaster(half_life_minutes=half_life, horizon_minutes=HORIZON)
+    forecaster.advance(end)
+    for minute in range(minutes):
+        start = end - (minutes - minute) * 60
+        forecaster.add_event(UsageEvent(start + 10, input_tokens=5, output_tokens=output_tokens // 2,
+                                        cache_creation_tokens=5))
+        forecaster.add_event(UsageEvent(start + 40, output_tokens=output_tokens // 2))
+    return forecaster
+
+
+def test_constant_rate_projection():
+    forecaster = steady_forecaster(HORIZON)
+    rates = forecaster.rates(NOW)
+    assert math.isclose(rates['output'], 1000, rel_tol=1e-5)
+    # input 속도는 input + cache_creation
+    assert math.isclose(rates['input'], 10, rel_tol=1e-5)
+
+    # 분당 3.33% → 40%에서 60분 뒤 리셋이면 240%
+    forecast = forecaster.forecast_window(NOW, 40.0, LIMITS, NOW + 60 * 60)
+    assert forecast['percent_per_hour'] == 200.0
+    assert forecast['projected_percentage_at_reset'] == 240.0
+    assert forecast['tokens_per_minute'] == {'input': 10.0, 'output': 1000.0}
+
+    # 진행 중인 분은 속도에 넣지 않음
+    forecaster.add_event(UsageEvent(NOW + 5, output_tokens=50_000))
+    assert math.isclose(forecaster.rates(NOW + 30)['output'], rates['output'])
+
+
+def test_half_life_decay():
+    forecaster = steady_forecaster(HORIZON)
+    base = forecaster.rates(NOW)['output']
+    # 사용이 멈추면 반감기마다 절반
+    assert math.isclose(forecaster.rates(NOW + 10 * 60)['output'], base / 2, rel_tol=1e-5)
+    assert math.isclose(forecaster.rates(NOW + 20 * 60)['output'], base / 4, rel_tol=1e-5)
+
+    # 반감기를 바꾸면 bucket은 그대로 두고 감쇠만 바뀜
+    forecaster.set_half_life(5)
+    assert math.isclose(forecaster.rates(NOW + 10 * 60)['output'], base / 4, rel_tol=1e-5)
+
+    # 새 사용량은 첫 분에 alpha만큼 반영 (반감기 10분 → 6.7%)
+    forecaster = steady_forecaster(1, output_tokens=1000)
+    assert math.isclose(forecaster.rates(NOW)['output'], 1000 * (1 - 0.5 ** 0.1))
+
+    # horizon 밖 bucket은 advance에서 정리되고, 그보다 오래된 이벤트는 무시
+    forecaster = steady_forecaster(HORIZON)
+    forecaster.advance(NOW + HORIZON * 60)
+    assert forecaster.buckets == {}
+    forecaster.add_event(UsageEvent(NOW - 60, output_tokens=1000))
+    assert forecaster.buckets == {}
+
+
+def test_hits_limit_before_reset():
+    forecaster = steady_forecaster(HORIZON)
+
+    # 90% + 분당 3.33% → 3분 뒤 100%, 리셋 60분 전
+    forecast = forecaster.forecast_window(NOW, 90.0, LIMITS, NOW + 63 * 60)
+    assert forecast['hits_limit_before_reset']
+    assert forecast['minutes_to_limit'] == 3.0
+    assert forecast['minutes_before_reset'] == 60.0
+    assert math.isclose(forecast['exhaustion_epoch'], NOW + 180, abs_tol=0.01)
+    assert describe_forecast(forecast) == 'At the current pace you hit 100%, 60 minutes before reset'
+
+    # 리셋이 먼저 오면 도달하지 않음
+    forecast = forecaster.forecast_window(NOW, 90.0, LIMITS, NOW + 2 * 60)
+    assert not forecast['hits_limit_before_reset']
+    assert forecast['exhaustion_epoch'] is None and forecast['minutes_before_reset'] is None
+    assert forecast['projected_percentage_at_reset'] == 96.7
+    assert describe_forecast(forecast) == 'On pace for 96.7% at reset'
+
+    # rolling 윈도우 (리셋 없음): 속도가 있으면 언젠가 도달
+    forecast = forecaster.forecast_window(NOW, 90.0, LIMITS, None)
+    assert forecast['hits_limit_before_reset'] and forecast['minutes_before_reset'] is None
+    assert describe_forecast(forecast) == 'At the current pace you hit 100%'
+
+    # 이미 100%
+    forecast = forecaster.forecast_window(NOW, 100.0, LIMITS, NOW + 3600)
+    assert forecast['minutes_to_limit'] == 0.0
+    assert describe_forecast(forecast) == 'Limit reached'
+
+    # 사용 없음
+    idle = BurnRateForecaster()
+    forecast = idle.forecast_window(NOW, 10.0, LIMITS, None)
+    assert not forecast['hits_limit_before_reset']
+    assert describe_forecast(forecast) == 'No usage in recent minutes'
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
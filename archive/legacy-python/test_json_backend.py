@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+JSON 백엔드 테스트 (설치된 백엔드마다 표준 json과 같은 결과인지)
+
+실행: python3 test_json_backend.py  (또는 pytest)
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import json_backend
+
+
+def assistant(usage, **extra):
+    record = {'type': 'assistant', 'timestamp': '2025-01-02T10:00:00.000Z',
+              'message': {'id': 'msg', 'content': [{'type': 'text', 'text': '안녕'}], 'usage': usage}}
+    record.update(extra)
+    return json.dumps(record)
+
+
+LINES = [
+    assistant({'input_tokens': 10, 'output_tokens': 20, 'cache_read_input_tokens': 3,
+               'cache_creation_input_tokens': 4, 'service_tier': 'standard'}),
+    assistant({'input_tokens': 5, 'output_tokens': None}),               # null → 0
+    assistant({}),                                                        # 빈 usage
+    assistant(None),
+    assistant({'input_tokens': 1}, timestamp=None),
+    json.dumps({'type': 'assistant', 'timestamp': '2025-01-02T10:00:00Z', 'message': 'assistant'}),
+    json.dumps({'type': 'user', 'timestamp': '2025-01-02T10:00:00Z', 'message': {'role': 'assistant'}}),
+    json.dumps(['assistant']),
+    '{"type": "assistant", "message": {"usage"',                          # 쓰는 중인 줄
+    'not json "assistant"',
+]
+
+
+def test_decode_usage_line_matches_stdlib():
+    reference = json_backend.create_backend('json')['decode_usage_line']
+    expected = [reference(line.encode('utf-8')) for line in LINES]
+    assert expected[0] == ('2025-01-02T10:00:00.000Z', 10, 20, 3, 4)
+    assert expected[1] == ('2025-01-02T10:00:00.000Z', 5, 0, 0, 0)
+    assert expected[2:] == [None] * (len(LINES) - 2)
+
+    for name in json_backend.available_backends():
+        decode = json_backend.create_backend(name)['decode_usage_line']
+        assert [decode(line.encode('utf-8')) for line in LINES] == expected, name
+        assert [decode(line) for line in LINES] == expected, name
+
+
+def test_dumps_round_trip():
+    data = {'status': 'active', 'note': '7일 rolling 윈도우', 'values': [1, 2.5, None, True],
+            'nested': {'tuple': (1, 2)}, 3: 'int key'}
+    expected = json.loads(json.dumps(data))
+
+    for name in json_backend.available_backends():
+        backend = json_backend.create_backend(name)
+        for indent in (False, True):
+            encoded = backend['dumps'](data, indent)
+            assert isinstance(encoded, bytes)
+            assert json.loads(encoded) == expected, name
+            assert backend['loads'](encoded) == expected, name
+        assert '7일'.encode('utf-8') in encoded           # ensure_ascii 없음
+        assert encoded.startswith(b'{\n  "')               # 2칸 들여쓰기
+
+
+def test_module_functions_use_selected_backend():
+    assert json_backend.BACKEND in json_backend.available_backends()
+    buffer = io.BytesIO()
+    json_backend.dump({'a': [1]}, buffer, indent=True)
+    buffer.seek(0)
+    assert json_backend.load(buffer) == {'a': [1]}
+    try:
+        json_backend.loads(b'{"a": ')
+    except json_backend.DECODE_ERRORS:
+        pass
+    else:
+        raise AssertionError('invalid JSON decoded')
+
+
+def test_backend_selected_lazily():
+    # import와 작은 문서 인코딩은 빠른 백엔드를 import하지 않고, 첫 대량 디코딩에서 선택
+    code = ("import sys, json_backend\n"
+            "json_backend.loads(json_backend.dumps({'a': 1}))\n"
+            "assert json_backend._backend is None\n"
+            "assert 'msgspec' not in sys.modules and 'orjson' not in sys.modules\n"
+            "json_backend.decode_usage_line(b'{}')\n"
+            "print(json_backend.BACKEND)")
+    env = {key: value for key, value in os.environ.items() if key != json_backend.BACKEND_ENV}
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env,
+                            cwd=Path(__file__).resolve().parent, check=True)
+    assert result.stdout.strip() == json_backend.available_backends()[0]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+메모리 예산 테스트 (크기 파싱, 캐시 비우는 순서)
+
+실행: python3 test_memory_budget.py  (또는 pytest)
+"""
+
+import memory_budget
+from memory_budget import MemoryBudget, format_size, parse_size
+
+
+MB = 1024 * 1024
+
+
+def test_parse_size():
+    assert parse_size('64M') == 64 * MB
+    assert parse_size('512k') == 512 * 1024
+    assert parse_size('1G') == 1024 * MB
+    assert parse_size('1.5M') == int(1.5 * MB)
+    assert parse_size(' 64 MiB ') == 64 * MB
+    assert parse_size('64MB') == 64 * MB
+    assert parse_size('1048576') == MB
+    assert parse_size(4096) == 4096
+    for text in ('', 'M', '64T', '-1M', '64 M B', 'lots'):
+        try:
+            parse_size(text)
+        except ValueError:
+            continue
+        raise AssertionError(f'accepted {text!r}')
+    assert format_size(512) == '512B' and format_size(64 * MB) == '64.0MB'
+
+
+def run_check(budget, rss_values):
+    """current_rss_bytes가 rss_values를 차례로 돌려주도록 바꿔서 check()"""
+    saved = memory_budget.current_rss_bytes
+    values = iter(rss_values)
+    memory_budget.current_rss_bytes = lambda: next(values)
+    try:
+        return budget.check()
+    finally:
+        memory_budget.current_rss_bytes = saved
+
+
+def test_check_sheds_cheapest_first_until_below_soft_limit():
+    calls = []
+    budget = MemoryBudget(100 * MB)
+    for name in ('compressed_index', 'calibration_models', 'recent_events'):
+        budget.register(name, lambda name=name: calls.append(name))
+    assert budget.soft_bytes == 85 * MB
+
+    # soft limit 미만 → 비우지 않음
+    assert run_check(budget, [80 * MB]) == []
+    assert calls == []
+
+    # 첫 캐시를 비운 뒤에도 soft limit 이상 → 다음 캐시, 미만이 되면 멈춤
+    assert run_check(budget, [95 * MB, 90 * MB, 84 * MB]) == ['compressed_index', 'calibration_models']
+    assert calls == ['compressed_index', 'calibration_models']
+    assert budget.stats() == {'rss_bytes': 84 * MB, 'max_rss_bytes': 100 * MB, 'shed_count': 2}
+
+    # 모두 비워도 예산 초과 → 경고만 (다음 tick에 다시 처음부터)
+    calls.clear()
+    assert run_check(budget, [120 * MB, 119 * MB, 118 * MB, 117 * MB]) == \
+        ['compressed_index', 'calibration_models', 'recent_events']
+    assert budget.last_rss == 117 * MB and budget.shed_count == 5
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
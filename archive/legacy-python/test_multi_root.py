@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+multi-root 집계 테스트 (라운드 로빈 예산, 이월, 합계, 임시 디렉토리)
+
+실행: python3 test_multi_root.py  (또는 pytest)
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import usage_scanner
+from config_store import validate_config
+from multi_root import build_combined_state, create_root_state, monitor_roots, scan_roots
+from transcript_fixtures import assistant_line, write_transcript
+
+
+WINDOWS = {'weekly': (1735689600.0, 1736294400.0, False)}  # 2025-01-01 ~ 2025-01-08 UTC
+NOW = 1736000000.0
+CHUNK = 4096
+
+LIMITS = {'input_tokens_per_minute': 40000, 'output_tokens_per_minute': 1600}
+CONFIG = validate_config({
+    'plan': {'name': 'Test'},
+    'rate_limits': {'session': LIMITS, 'weekly': LIMITS},
+    'reset_schedule': {'weekly_reset': {'weekday': 'tue', 'time': '10:59'}},
+    'notifications': {'enabled': False},
+    'sources': {'enabled': []}
+})
+
+
+def make_root(tmp_dir, name, count, home=True, start=NOW - 86400, output_tokens=2):
+    """home이면 <root>/.claude/projects, 아니면 루트 자체가 프로젝트 디렉토리 (초마다 한 줄)"""
+    root = Path(tmp_dir) / name
+    projects = root / '.claude' / 'projects' if home else root
+    write_transcript(projects / 'p' / 's.jsonl', [assistant_line(start + i, 1, output_tokens) for i in range(count)])
+    return create_root_state(root)
+
+
+def read_offset(root):
+    return sum(cursor['offset'] for cursor in root['usage_state']['cursors'].values())
+
+
+def with_chunk_size(test):
+    saved = usage_scanner.READ_CHUNK_SIZE
+    usage_scanner.READ_CHUNK_SIZE = CHUNK
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test(tmp_dir)
+    finally:
+        usage_scanner.READ_CHUNK_SIZE = saved
+
+
+def test_scan_roots_round_robin_quantum():
+    def check(tmp_dir):
+        # 루트마다 quantum 4개 이상
+        roots = [make_root(tmp_dir, name, 150) for name in ('a', 'b', 'c')]
+        assert all(root['projects_dir'].name == 'projects' for root in roots)
+
+        # tick 1: b → c → a 한 차례씩, 남은 1 quantum은 시작 루트(b)
+        scan_roots(CONFIG, roots, WINDOWS, NOW, 1, tick_budget_bytes=4 * CHUNK, quantum_bytes=CHUNK)
+        a, b, c = (read_offset(root) for root in roots)
+        assert CHUNK < b <= 2 * CHUNK
+        assert 0 < a <= CHUNK and 0 < c <= CHUNK
+        assert all(root['scan_pending'] for root in roots)
+
+        # tick 2: 시작 루트가 c로 바뀜 (같은 루트만 밀리지 않음)
+        scan_roots(CONFIG, roots, WINDOWS, NOW, 2, tick_budget_bytes=4 * CHUNK, quantum_bytes=CHUNK)
+        a2, b2, c2 = (read_offset(root) for root in roots)
+        assert CHUNK < c2 - c <= 2 * CHUNK
+        assert 0 < a2 - a <= CHUNK and 0 < b2 - b <= CHUNK
+
+    with_chunk_size(check)
+
+
+def test_scan_pending_carries_over():
+    def check(tmp_dir):
+        roots = [make_root(tmp_dir, 'alice', 150), make_root(tmp_dir, 'bob', 120),
+                 make_root(tmp_dir, 'ci-cache', 10, home=False)]
+        assert roots[2]['projects_dir'] == Path(tmp_dir) / 'ci-cache'
+
+        # 예산이 모자라도 모든 루트를 한 번씩 → 작은 루트는 첫 tick에 끝남
+        scan_roots(CONFIG, roots, WINDOWS, NOW, 0, tick_budget_bytes=3 * CHUNK, quantum_bytes=CHUNK)
+        assert [root['scan_pending'] for root in roots] == [True, True, False]
+        assert roots[2]['usage_state']['windows']['weekly'].messages_count == 10
+
+        ticks = 1
+        while any(root['scan_pending'] for root in roots):
+            scan_roots(CONFIG, roots, WINDOWS, NOW, ticks, tick_budget_bytes=3 * CHUNK, quantum_bytes=CHUNK)
+            ticks += 1
+        assert ticks > 2
+        # 이월된 루트도 커서에서 이어 읽어 중복/누락 없음
+        assert [root['usage_state']['windows']['weekly'].messages_count for root in roots] == [150, 120, 10]
+        combined = build_combined_state(CONFIG, roots, NOW)
+        assert combined['windows']['weekly'].messages_count == 280
+
+    with_chunk_size(check)
+
+
+def test_combined_totals_equal_sum_of_roots():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 현재 세션/주간 윈도우 안 (monitor_roots는 실제 현재 시각 사용)
+        start = time.time() - 120
+        roots = [make_root(tmp_dir, 'alice', 40, start=start, output_tokens=3),
+                 make_root(tmp_dir, 'bob', 25, start=start, output_tokens=7),
+                 make_root(tmp_dir, 'ci-cache', 10, home=False, start=start, output_tokens=11)]
+
+        combined, root_outputs = monitor_roots(CONFIG, roots)
+        assert not combined['scan_pending']
+        assert [root['name'] for root in combined['roots']] == [root['name'] for root in roots]
+        for window in ('session', 'weekly'):
+            usage = combined[window]['usage']
+            for key, value in usage.items():
+                assert value == sum(output[window]['usage'][key] for output in root_outputs.values()), (window, key)
+            assert usage['output_tokens'] == 40 * 3 + 25 * 7 + 10 * 11
+            assert usage['messages_count'] == 75
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
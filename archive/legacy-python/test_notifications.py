@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+알림 엔진 테스트 (memory 백엔드, 헤드리스)
+
+실행: python3 test_notifications.py  (또는 pytest)
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from notifications import (
+    MemoryBackend,
+    NotificationEngine,
+    coalesce_notifications,
+    escape_applescript,
+)
+
+
+def make_engine(tmp_dir, **kwargs):
+    backend = MemoryBackend()
+    state_file = Path(tmp_dir) / 'notification_state.json'
+    engine = NotificationEngine([backend], state_file=state_file, coalesce_seconds=0.05, **kwargs)
+    return engine, backend, state_file
+
+
+def test_thresholds_notified_once_per_window():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine, backend, state_file = make_engine(tmp_dir)
+
+        assert engine.check_thresholds([80, 90, 95], 91.0, '2025-01-01T14:00:00+09:00') == [80, 90]
+        assert engine.check_thresholds([80, 90, 95], 92.0, '2025-01-01T14:00:00+09:00') == []
+        engine.close()
+
+        assert len(backend.sent) == 1
+        assert 'Threshold: 90%' in backend.sent[0]['subtitle']
+        assert json.loads(state_file.read_text())['notified_thresholds'] == [80, 90]
+
+        # 새 세션 윈도우 → 상태 리셋
+        engine, backend, _ = make_engine(tmp_dir)
+        assert engine.check_thresholds([80, 90, 95], 85.0, '2025-01-01T19:00:00+09:00') == [80]
+        engine.close()
+
+
+def test_state_saved_only_on_change():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine, _, state_file = make_engine(tmp_dir)
+        engine.check_thresholds([80], 10.0, 'w1')
+        mtime = state_file.stat().st_mtime_ns
+
+        for _ in range(5):
+            engine.check_thresholds([80], 10.0, 'w1')
+        assert state_file.stat().st_mtime_ns == mtime
+
+
+def test_burst_is_coalesced():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine, backend, _ = make_engine(tmp_dir)
+        for i in range(5):
+            engine.notify({'title': 'T', 'message': f'm{i}'})
+        engine.close()
+
+        assert len(backend.sent) == 1
+        assert backend.sent[0]['coalesced'] == 5
+
+
+def test_coalesce_prefers_high_priority():
+    merged = coalesce_notifications([
+        {'title': 'low', 'message': 'a'},
+        {'title': 'high', 'message': 'b', 'priority': 'high'},
+        {'title': 'low', 'message': 'a'},
+    ])
+    assert merged['title'] == 'high'
+    assert merged['message'] == 'a\nb'
+
+
+def test_applescript_escaping():
+    assert escape_applescript('say "hi" \\ bye') == 'say \\"hi\\" \\\\ bye'
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+데몬 단일 인스턴스 잠금(flock) 테스트 (임시 디렉토리, 잠금을 잡은 자식 프로세스)
+
+실행: python3 test_pid_lock.py  (또는 pytest)
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import monitor_daemon
+
+
+# 잠금을 잡고 delay초 뒤에 PID를 기록하는 다른 데몬 (SIGTERM 기본 동작으로 종료)
+HOLDER = '''
+import fcntl, os, sys, time
+f = open(sys.argv[1], 'a+')
+fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+print('locked', flush=True)
+time.sleep(float(sys.argv[2]))
+f.seek(0)
+f.truncate()
+f.write(str(os.getpid()))
+f.flush()
+time.sleep(60)
+'''
+
+
+def start_holder(pid_file, delay=0.0):
+    pid_file.parent.mkdir(parents=True, exist_ok=True)
+    holder = subprocess.Popen([sys.executable, '-c', HOLDER, str(pid_file), str(delay)],
+                              stdout=subprocess.PIPE, text=True)
+    assert holder.stdout.readline().strip() == 'locked'
+    return holder
+
+
+def with_pid_file(test):
+    saved = monitor_daemon.PID_FILE
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            monitor_daemon.PID_FILE = Path(tmp_dir) / 'monitor' / 'daemon.pid'
+            test(monitor_daemon.PID_FILE)
+    finally:
+        monitor_daemon.cleanup_pid()
+        monitor_daemon.PID_FILE = saved
+
+
+def test_second_instance_refused():
+    def check(pid_file):
+        assert monitor_daemon.acquire_pid_lock()
+        assert monitor_daemon.read_pid() == os.getpid()
+        # 같은 파일을 새로 열어 잠그는 두 번째 인스턴스 → 거부, PID 유지
+        assert not monitor_daemon.acquire_pid_lock()
+        assert monitor_daemon.read_pid() == os.getpid()
+
+        # 해제 후에는 다시 획득 (PID 파일은 남기고 비움)
+        monitor_daemon.cleanup_pid()
+        assert pid_file.exists() and monitor_daemon.read_pid() is None
+        assert monitor_daemon.acquire_pid_lock()
+
+    with_pid_file(check)
+
+
+def test_force_takeover():
+    def check(pid_file):
+        holder = start_holder(pid_file)
+        try:
+            while monitor_daemon.read_pid() != holder.pid:
+                time.sleep(0.01)
+            assert not monitor_daemon.acquire_pid_lock()
+            assert holder.poll() is None
+
+            assert monitor_daemon.acquire_pid_lock(takeover=True, timeout=5)
+            assert holder.wait(5) == -signal.SIGTERM
+            assert monitor_daemon.read_pid() == os.getpid()
+        finally:
+            holder.kill()
+            holder.wait()
+
+    with_pid_file(check)
+
+
+def test_takeover_waits_for_pid():
+    def check(pid_file):
+        # 잠금은 잡았지만 PID를 아직 쓰지 않은 데몬 → PID를 다시 읽은 뒤 SIGTERM
+        holder = start_holder(pid_file, delay=0.3)
+        try:
+            assert monitor_daemon.read_pid() is None
+            assert monitor_daemon.acquire_pid_lock(takeover=True, timeout=2)
+            assert holder.wait(5) == -signal.SIGTERM
+        finally:
+            holder.kill()
+            holder.wait()
+
+    with_pid_file(check)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+RPM/TPM sliding window 테스트
+
+실행: python3 test_rate_tracker.py  (또는 pytest)
+"""
+
+from records import UsageEvent
+from rate_tracker import RateTracker
+
+
+BASE = 1_700_000_040   # 분 경계 (epoch % 60 == 0)
+
+
+def event(timestamp, input_tokens=100, output_tokens=10, messages=1):
+    return UsageEvent(timestamp=timestamp, input_tokens=input_tokens, output_tokens=output_tokens,
+                      messages=messages)
+
+
+def feed(tracker, events, now):
+    tracker.advance(now)
+    for e in events:
+        tracker.add_event(e)
+
+
+def test_current_is_last_60_seconds():
+    tracker = RateTracker(window_minutes=10)
+    feed(tracker, [event(BASE), event(BASE + 30), event(BASE + 59, input_tokens=50)], BASE + 59)
+    assert tracker.current() == {'requests': 3, 'input_tokens': 250, 'output_tokens': 30}
+
+    # 60초가 지난 이벤트는 빠짐
+    tracker.advance(BASE + 75)
+    assert tracker.current() == {'requests': 2, 'input_tokens': 150, 'output_tokens': 20}
+    tracker.advance(BASE + 300)
+    assert tracker.current() == {'requests': 0, 'input_tokens': 0, 'output_tokens': 0}
+
+
+def test_peak_minute_per_metric():
+    tracker = RateTracker(window_minutes=10)
+    events = [event(BASE + 5), event(BASE + 6),                            # 0분: 2회
+              event(BASE + 65, input_tokens=5000),                          # 1분: 토큰 최대
+              event(BASE + 125), event(BASE + 126), event(BASE + 127)]      # 2분: 요청 최대
+    feed(tracker, events, BASE + 200)
+
+    peaks = tracker.peaks(BASE)
+    assert peaks['requests'] == {'minute_epoch': BASE + 120, 'value': 3}
+    assert peaks['input_tokens'] == {'minute_epoch': BASE + 60, 'value': 5000}
+    assert peaks['output_tokens'] == {'minute_epoch': BASE + 120, 'value': 30}
+
+    # 조회 시작 이후만 (세션 시작)
+    assert tracker.peaks(BASE + 120)['input_tokens'] == {'minute_epoch': BASE + 120, 'value': 300}
+
+
+def test_open_minute_counts_as_peak():
+    tracker = RateTracker(window_minutes=10)
+    feed(tracker, [event(BASE + 1)], BASE + 70)
+    tracker.add_event(event(BASE + 61))
+    tracker.add_event(event(BASE + 62))
+    assert tracker.peaks(BASE)['requests'] == {'minute_epoch': BASE + 60, 'value': 2}
+
+
+def test_peaks_expire_with_window():
+    tracker = RateTracker(window_minutes=3)
+    feed(tracker, [event(BASE, input_tokens=9000), event(BASE + 60)], BASE + 60)
+    assert tracker.peaks(BASE)['input_tokens']['value'] == 9000
+
+    tracker.advance(BASE + 4 * 60)
+    assert tracker.peaks(BASE)['input_tokens'] is None
+    tracker.add_event(event(BASE + 4 * 60 + 1))
+    assert tracker.peaks(BASE)['input_tokens'] == {'minute_epoch': BASE + 240, 'value': 100}
+
+
+def test_late_event_rebuilds_peaks():
+    tracker = RateTracker(window_minutes=10)
+    feed(tracker, [event(BASE + 5), event(BASE + 125), event(BASE + 126)], BASE + 200)
+    assert tracker.peaks(BASE)['requests'] == {'minute_epoch': BASE + 120, 'value': 2}
+
+    # 다른 파일에서 늦게 읽힌 이전 분 이벤트
+    for offset in (6, 7, 8):
+        tracker.add_event(event(BASE + offset))
+    assert tracker.peaks(BASE)['requests'] == {'minute_epoch': BASE, 'value': 4}
+
+    # 윈도우보다 오래된 이벤트는 무시
+    tracker.add_event(event(BASE - 3600))
+    assert tracker.peaks(BASE - 3600)['requests'] == {'minute_epoch': BASE, 'value': 4}
+
+
+def test_merge_adds_matching_slots():
+    first, second, combined = (RateTracker(window_minutes=10) for _ in range(3))
+    feed(first, [event(BASE + 10), event(BASE + 70)], BASE + 90)
+    feed(second, [event(BASE + 75, input_tokens=400)], BASE + 90)
+    combined.advance(BASE + 90)
+    combined.merge([first, second])
+
+    assert combined.current() == {'requests': 2, 'input_tokens': 500, 'output_tokens': 20}
+    peaks = combined.peaks(BASE)
+    assert peaks['requests'] == {'minute_epoch': BASE + 60, 'value': 2}
+    assert peaks['input_tokens'] == {'minute_epoch': BASE + 60, 'value': 500}
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+레코드 타입 테스트 (JSON 형식 유지, 학습기 저장/로드 경계, 임시 디렉토리)
+
+실행: python3 test_records.py  (또는 pytest)
+"""
+
+import json
+import pickle
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import calibration_learner
+import limit_learner
+from records import CalibrationPoint, SessionSnapshot, UsageEvent, make_dict_event, make_slots_event
+
+
+def test_benchmark_factories_build_the_same_event():
+    path = '/tmp/session.jsonl'
+    for i in (0, 1, 12_345):
+        event = make_slots_event(i, path)
+        assert {field: getattr(event, field) for field in make_dict_event(i, path)} == make_dict_event(i, path)
+        assert not hasattr(event, '__dict__')
+
+    # 체크포인트/인덱스에 그대로 pickle됨
+    restored = pickle.loads(pickle.dumps(event, protocol=pickle.HIGHEST_PROTOCOL))
+    assert [getattr(restored, field) for field in UsageEvent.__slots__] == \
+        [getattr(event, field) for field in UsageEvent.__slots__]
+
+
+def test_calibration_point_keeps_file_format():
+    point = CalibrationPoint.create('2025-01-08T10:00:00+09:00', 0.123456, 0.2)
+    assert point.to_dict() == {'timestamp': '2025-01-08T10:00:00+09:00', 'monitor_value': 0.1235,
+                               'actual_value': 0.2, 'offset': 0.0765, 'absolute_error': 0.0765}
+    assert CalibrationPoint.from_dict(point.to_dict()).to_dict() == point.to_dict()
+
+    # offset이 없는 옛 기록은 값에서 계산
+    legacy = CalibrationPoint.from_dict({'timestamp': 't', 'monitor_value': 0.5, 'actual_value': 0.25})
+    assert (legacy.offset, legacy.absolute_error) == (-0.25, 0.25)
+
+
+def test_learners_keep_records_in_memory_and_dicts_on_disk():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        saved = limit_learner.HISTORY_FILE, calibration_learner.CALIBRATION_DATA_FILE
+        limit_learner.HISTORY_FILE = Path(tmp_dir) / 'session_history.json'
+        calibration_learner.CALIBRATION_DATA_FILE = Path(tmp_dir) / 'calibration_data.json'
+        try:
+            now = datetime(2025, 1, 8, 10, 0, tzinfo=timezone.utc)
+            start = now - timedelta(hours=1)
+            history = limit_learner.load_history()
+            for minutes, output_tokens in ((0, 100), (30, 300), (60, 200)):
+                limit_learner.update_session_history(
+                    history, {'output_tokens': output_tokens}, start, start + timedelta(hours=5),
+                    {'output_percentage': output_tokens / 10}, now + timedelta(minutes=minutes))
+            [session] = history['sessions']
+            assert isinstance(session['peak_usage'], SessionSnapshot)
+            assert (session['first_snapshot'].output_tokens, session['peak_usage'].output_tokens,
+                    session['latest_snapshot'].output_tokens) == (100, 300, 200)
+
+            limit_learner.save_history(history)
+            on_disk = json.loads(limit_learner.HISTORY_FILE.read_text())['sessions'][0]
+            assert on_disk['peak_usage'] == session['peak_usage'].to_dict()
+            [loaded] = limit_learner.load_history()['sessions']
+            assert loaded['latest_snapshot'].to_dict() == session['latest_snapshot'].to_dict()
+
+            point = calibration_learner.record_calibration_point('09:00-14:00', 0.4, 0.5)
+            data = calibration_learner.load_calibration_data()
+            assert [p.to_dict() for p in data['09:00-14:00']['history']] == [point.to_dict()]
+            on_disk = json.loads(calibration_learner.CALIBRATION_DATA_FILE.read_text())
+            assert on_disk['09:00-14:00']['history'] == [point.to_dict()]
+            for actual in (0.5, 0.6):
+                calibration_learner.record_calibration_point('09:00-14:00', 0.4, actual)
+            model = calibration_learner.update_calibration_model('09:00-14:00')
+            assert (model['sample_count'], model['offset_mean']) == (3, 0.1333)
+        finally:
+            limit_learner.HISTORY_FILE, calibration_learner.CALIBRATION_DATA_FILE = saved
+            calibration_learner.clear_calibration_cache()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
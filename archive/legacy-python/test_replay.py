@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+historical replay 테스트 (합성 트랜스크립트, 임시 디렉토리)
+
+tick마다 재생한 윈도우 합계가 그 시점의 cold monitor_once와 같은지,
+--backfill-history / --evaluate-calibration이 재생 결과를 쓰는지 확인
+
+실행: python3 test_replay.py  (또는 pytest)
+"""
+
+import io
+import json
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+import limit_learner
+import monitor_daemon
+import replay
+from config_store import validate_config
+from records import CalibrationPoint
+from transcript_fixtures import assistant_line, iso, write_transcript
+from usage_scanner import find_all_sessions, load_all_events
+
+
+# prune_session_history가 실제 현재 시각 기준 30일을 남기므로 최근 시점으로 생성
+BASE = (int(time.time()) // 3600 - 30) * 3600
+HOURS = 26
+STEP_MINUTES = 45
+
+LIMITS = {'input_tokens_per_minute': 40000, 'output_tokens_per_minute': 1600}
+CONFIG = validate_config({
+    'plan': {'name': 'Test'},
+    'rate_limits': {'session': LIMITS, 'weekly': LIMITS},
+    'reset_schedule': {'weekly_reset': {'weekday': 'tue', 'time': '10:59'}},
+    'notifications': {'enabled': False},
+    'sources': {'enabled': []}
+})
+
+
+class FixedDatetime(datetime):
+    """monitor_once의 datetime.now를 재생 tick 시각으로 고정"""
+
+    epoch = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.fromtimestamp(cls.epoch, tz)
+
+
+def transcript_lines():
+    """두 프로젝트, 7~11분 간격, 한가한 시간대(2시간) 포함 → {프로젝트: [(epoch, 줄)]}"""
+    transcripts = {}
+    for project, offset, step in (('-home-user-app', 0, 7 * 60), ('-home-user-docs', 150, 11 * 60)):
+        lines = transcripts[project] = []
+        for index, epoch in enumerate(range(BASE + offset, BASE + HOURS * 3600, step)):
+            if (epoch - BASE) // 3600 % 8 in (3, 4):
+                continue
+            lines.append((epoch, assistant_line(epoch, 100 + index % 7 * 30, 200 + index % 5 * 150,
+                                                cache_read=5000, cache_creation=index % 3 * 1000)))
+    return transcripts
+
+
+TRANSCRIPTS = transcript_lines()
+
+
+def write_transcripts(projects, until=None):
+    """until(epoch)까지 기록된 트랜스크립트 (그 시점의 디스크 상태)"""
+    for project, lines in TRANSCRIPTS.items():
+        write_transcript(projects / project / 'session.jsonl',
+                         [line for epoch, line in lines if until is None or epoch <= until])
+    return projects
+
+
+def cold_output(tmp_dir, epoch):
+    """그 시각까지의 트랜스크립트를 새 상태로 전체 스캔한 monitor_once 결과 (시각 고정)"""
+    projects = write_transcripts(tmp_dir / f'cold-{epoch}', until=epoch)
+    FixedDatetime.epoch = epoch
+    monitor_daemon.find_all_sessions = lambda: find_all_sessions(projects)
+    return monitor_daemon.monitor_once(CONFIG)
+
+
+def run_with_transcripts(test):
+    saved = (monitor_daemon.find_all_sessions, monitor_daemon.datetime, monitor_daemon._source_runner)
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            projects = write_transcripts(Path(tmp_dir) / 'projects')
+            monitor_daemon.datetime = FixedDatetime
+            monitor_daemon._source_runner = None
+            test(Path(tmp_dir), load_all_events(find_all_sessions(projects)))
+    finally:
+        monitor_daemon.find_all_sessions, monitor_daemon.datetime, monitor_daemon._source_runner = saved
+
+
+def run_main(argv, events):
+    """replay.main (설정/이벤트 로드만 대체) → 출력"""
+    saved = (sys.argv, replay.load_config, replay.load_all_events)
+    sys.argv = ['replay.py'] + argv
+    replay.load_config = lambda: CONFIG
+    replay.load_all_events = lambda start=None, end=None: events
+    out = io.StringIO()
+    try:
+        with redirect_stdout(out):
+            assert replay.main() == 0
+    finally:
+        sys.argv, replay.load_config, replay.load_all_events = saved
+    return out.getvalue()
+
+
+def test_replay_ticks_match_cold_monitor_once():
+    def check(tmp_dir, events):
+        anchor = monitor_daemon.get_weekly_anchor(CONFIG)
+        ticks = 0
+        sessions = set()
+        for epoch, output, is_regular in replay.iter_replay(CONFIG, events, BASE, BASE + HOURS * 3600,
+                                                            STEP_MINUTES, anchor):
+            assert is_regular
+            cold = cold_output(tmp_dir, epoch)
+            for window in ('session', 'weekly'):
+                assert output[window]['usage'] == cold[window]['usage'], (epoch, window)
+                assert output[window]['window'] == cold[window]['window'], (epoch, window)
+            sessions.add(output['session']['window']['start'])
+            ticks += 1
+        assert ticks == HOURS * 60 // STEP_MINUTES + 1
+        # 세션 윈도우가 여러 번 바뀌고 한가한 시간대를 지나도 일치
+        assert len(sessions) >= 4
+        assert cold['weekly']['usage']['output_tokens'] > 0
+
+    run_with_transcripts(check)
+
+
+def test_backfill_history():
+    def check(tmp_dir, events):
+        saved = limit_learner.HISTORY_FILE
+        limit_learner.HISTORY_FILE = tmp_dir / 'session_history.json'
+        try:
+            report = run_main(['--backfill-history', '--step', '60'], events)
+            history = json.loads(limit_learner.HISTORY_FILE.read_text())
+        finally:
+            limit_learner.HISTORY_FILE = saved
+        assert f"Backfilled session history ({len(history['sessions'])} sessions)" in report
+
+        # 세션 윈도우별 마지막 tick 출력 = cold monitor_once
+        peaks = {}
+        for epoch, output, _ in replay.iter_replay(CONFIG, events, BASE // 60 * 60,
+                                                   events[-1].timestamp + 3600, 60):
+            session = output['session']
+            peaks[session['window']['start']] = (epoch, session['usage']['output_tokens'])
+        assert [s['window_start'] for s in history['sessions']] == list(peaks)
+        for session in history['sessions']:
+            epoch, output_tokens = peaks[session['window_start']]
+            assert session['peak_usage']['output_tokens'] == output_tokens
+            assert session['latest_snapshot']['output_tokens'] == \
+                cold_output(tmp_dir, epoch)['session']['usage']['output_tokens']
+
+    run_with_transcripts(check)
+
+
+def test_evaluate_calibration():
+    def check(tmp_dir, events):
+        # 정규 tick 사이의 기록 시점도 그 시각의 값으로 재현
+        epochs = [BASE + 5 * 3600 + 17 * 60 + 13, BASE + 20 * 3600 + 41 * 60]
+        points = [CalibrationPoint(datetime.fromtimestamp(epoch, timezone.utc).isoformat(), 0.1, 0.3)
+                  for epoch in epochs]
+        broken = [CalibrationPoint('yesterday', 0.1, 0.3)]
+        saved = replay.load_calibration_data
+        replay.load_calibration_data = lambda: {'session': {'history': points}, 'broken': {'history': broken}}
+        try:
+            report = run_main(['--evaluate-calibration', '--start', iso(BASE + 3600).replace('Z', '+00:00'),
+                               '--end', iso(BASE + HOURS * 3600).replace('Z', '+00:00')], events)
+        finally:
+            replay.load_calibration_data = saved
+
+        replayed = [cold_output(tmp_dir, epoch)['session']['percentages']['max_percentage'] / 100.0
+                    for epoch in epochs]
+        summary = replay.summarize_calibration([(0.1, value, 0.3) for value in replayed])
+        assert '📊 Calibration evaluation (2 points)' in report
+        assert f"Recorded offset mean: {20.0:+.2f}%" in report
+        assert f"Replayed offset mean: {summary['replayed_offset_mean'] * 100:+.2f}%" in report
+        assert f"Monitor drift:        {summary['monitor_drift_mean'] * 100:+.2f}%" in report
+        assert summary['replayed_offset_mean'] != 0.2
+
+    run_with_transcripts(check)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
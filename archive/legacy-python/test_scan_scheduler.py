@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+tick별 스캔 예산(바이트/CPU) 스케줄러 테스트
+
+실행: python3 test_scan_scheduler.py  (또는 pytest)
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import monitor_daemon
+import usage_scanner
+from config_store import validate_config
+from scan_scheduler import ScanScheduler
+from transcript_fixtures import assistant_line, write_transcript
+from usage_engine import create_usage_state, update_usage_state
+from usage_history import UsageHistory
+from usage_scanner import find_all_sessions, pending_scan_bytes
+
+
+WINDOWS = {'weekly': (1735689600.0, 1736294400.0, False)}  # 2025-01-01 ~ 2025-01-08 UTC
+NOW = 1736000000.0
+CHUNK = 4096
+
+
+def second_lines(count):
+    """2025-01-02 10시부터 초마다 한 줄"""
+    return [assistant_line(f'2025-01-02T{10 + i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000Z', 1, 2)
+            for i in range(count)]
+
+
+def run_tick(scheduler, state, projects):
+    session_files = find_all_sessions(projects)
+    budget = scheduler.start_tick()
+    update_usage_state(state, scheduler.order(session_files), WINDOWS, NOW, budget=budget)
+    scheduler.end_tick(budget, session_files, state['cursors'])
+
+
+def scan_tree(tmp_dir):
+    projects = Path(tmp_dir) / 'projects'
+    write_transcript(projects / 'a' / 'old.jsonl', second_lines(300), mtime=NOW - 86400)
+    write_transcript(projects / 'b' / 'new.jsonl', second_lines(300), mtime=NOW - 60)
+    return projects
+
+
+def test_backlog_carries_over_until_drained():
+    saved = usage_scanner.READ_CHUNK_SIZE
+    usage_scanner.READ_CHUNK_SIZE = CHUNK
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            projects = scan_tree(tmp_dir)
+            total = sum(path.stat().st_size for path in projects.rglob('*.jsonl'))
+            scheduler = ScanScheduler(max_bytes=3 * CHUNK, max_cpu_seconds=None)
+            state = create_usage_state()
+
+            # 첫 tick: 최근 파일부터 예산만큼
+            run_tick(scheduler, state, projects)
+            assert scheduler.provisional
+            assert list(state['cursors']) == [str(projects / 'b' / 'new.jsonl')]
+            # 커서는 마지막 완전한 줄까지
+            assert scheduler.backlog_bytes == total - state['cursors'][str(projects / 'b' / 'new.jsonl')]['offset']
+
+            ticks = 1
+            while scheduler.provisional:
+                run_tick(scheduler, state, projects)
+                ticks += 1
+            assert ticks >= total // (3 * CHUNK)
+            assert state['windows']['weekly'].messages_count == 600
+            assert scheduler.backlog_bytes == 0 and scheduler.throttled_ticks == 0
+            assert scheduler.next_interval(60) == 60
+    finally:
+        usage_scanner.READ_CHUNK_SIZE = saved
+
+
+def test_cpu_budget_stops_scan():
+    saved = usage_scanner.READ_CHUNK_SIZE
+    usage_scanner.READ_CHUNK_SIZE = CHUNK
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            projects = scan_tree(tmp_dir)
+            # CPU 예산 0 → chunk 하나만 읽고 멈춤
+            scheduler = ScanScheduler(max_bytes=float('inf'), max_cpu_seconds=0)
+            state = create_usage_state()
+            run_tick(scheduler, state, projects)
+            assert scheduler.provisional
+            assert scheduler.last_bytes == CHUNK
+            assert scheduler.next_interval(60) < 60
+            assert scheduler.status()['backlog_files'] == 2
+    finally:
+        usage_scanner.READ_CHUNK_SIZE = saved
+
+
+def test_history_backfill_shares_tick_budget():
+    saved = (usage_scanner.READ_CHUNK_SIZE, monitor_daemon.find_all_sessions)
+    usage_scanner.READ_CHUNK_SIZE = CHUNK
+    limits = {'input_tokens_per_minute': 40000, 'output_tokens_per_minute': 1600}
+    config = validate_config({'plan': {'name': 'Test'}, 'rate_limits': {'session': limits, 'weekly': limits},
+                              'notifications': {'enabled': False}, 'sources': {'enabled': []}})
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            projects = Path(tmp_dir) / 'projects'
+            # 방금 수정된 파일 → 현재 윈도우 스캔이 모두 읽음 (휴면 아님)
+            write_transcript(projects / 'a' / 's.jsonl', second_lines(300), mtime=time.time())
+            total = (projects / 'a' / 's.jsonl').stat().st_size
+            monitor_daemon.find_all_sessions = lambda: find_all_sessions(projects)
+
+            scheduler = ScanScheduler(max_bytes=total + total // 2, max_cpu_seconds=None)
+            history = UsageHistory()
+            data = monitor_daemon.monitor_once(config, create_usage_state(), scheduler, history)
+            assert not data['provisional']
+
+            # 장기 기록은 남은 예산만큼만 읽고 나머지는 다음 tick으로
+            history_bytes = sum(cursor['offset'] for cursor in history.cursors.values())
+            assert 0 < history_bytes < total
+            assert total + history_bytes <= scheduler.last_bytes <= scheduler.max_bytes + CHUNK
+    finally:
+        usage_scanner.READ_CHUNK_SIZE, monitor_daemon.find_all_sessions = saved
+
+
+def test_pending_bytes_skip_dormant_and_read_files():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        projects = scan_tree(tmp_dir)
+        session_files = find_all_sessions(projects)
+        new_size = (projects / 'b' / 'new.jsonl').stat().st_size
+
+        assert pending_scan_bytes(session_files, {}, dormant_before=NOW - 3600) == (new_size, 1)
+        cursors = {}
+        list(usage_scanner.iter_new_events(session_files, cursors))
+        assert pending_scan_bytes(session_files, cursors) == (0, 0)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Rolling 세션 detector 테스트
+
+실행: python3 test_session_detector.py  (또는 pytest)
+"""
+
+from records import UsageEvent
+from session_detector import RollingSessionDetector
+from monitor_daemon import parse_session_reset_text
+
+
+BASE = 1_700_000_000
+HOUR = 3600
+
+
+def event(timestamp, input_tokens=100):
+    return UsageEvent(timestamp=timestamp, input_tokens=input_tokens, output_tokens=10)
+
+
+def feed(detector, timestamps, recent_events=()):
+    for timestamp in timestamps:
+        detector.add_event(event(timestamp))
+    detector.flush(recent_events)
+
+
+def test_session_starts_at_first_message():
+    detector = RollingSessionDetector(window_hours=5)
+    assert detector.session(BASE) is None
+
+    feed(detector, [BASE + 125, BASE + HOUR, BASE + 4 * HOUR])
+    session = detector.session(BASE + 4 * HOUR)
+    assert session['active']
+    assert session['start'] == BASE + 125
+    assert session['reset'] == BASE + 125 + 5 * HOUR
+    assert session['usage'].messages_count == 3
+    assert session['usage'].input_tokens == 300
+
+
+def test_next_message_after_expiry_starts_new_session():
+    detector = RollingSessionDetector(window_hours=5)
+    feed(detector, [BASE])
+    assert not detector.session(BASE + 5 * HOUR)['active']   # 리셋 시각은 다음 세션에 포함되지 않음
+
+    feed(detector, [BASE + 7 * HOUR + 30])
+    session = detector.session(BASE + 7 * HOUR + 60)
+    assert session['start'] == BASE + 7 * HOUR + 30
+    assert session['usage'].messages_count == 1
+    assert list(detector.history)[-1].window_end == BASE + 5 * HOUR
+
+
+def test_events_within_batch_are_ordered():
+    detector = RollingSessionDetector(window_hours=5)
+    # 파일 단위로 읽어 시간순이 아닌 batch
+    feed(detector, [BASE + 6 * HOUR, BASE + 2 * HOUR, BASE + 8 * HOUR, BASE])
+    assert detector.session(BASE + 8 * HOUR)['start'] == BASE + 6 * HOUR
+    assert [usage.window_start for usage in detector.history] == [BASE]
+    assert detector.history[0].messages_count == 2
+
+
+def test_late_event_inside_previous_session():
+    detector = RollingSessionDetector(window_hours=5)
+    feed(detector, [BASE, BASE + 6 * HOUR])
+    feed(detector, [BASE + HOUR])
+    assert detector.history[0].messages_count == 2
+    assert detector.session(BASE + 6 * HOUR)['start'] == BASE + 6 * HOUR
+
+
+def test_late_event_in_gap_rebuilds_boundaries():
+    detector = RollingSessionDetector(window_hours=5)
+    events = [event(BASE), event(BASE + 9 * HOUR)]
+    for e in events:
+        detector.add_event(e)
+    detector.flush(events)
+    assert detector.session(BASE + 9 * HOUR)['start'] == BASE + 9 * HOUR
+
+    # 다른 파일에서 늦게 읽힌 빈 구간의 메시지 → 이 메시지부터 새 세션, 9시간 메시지는 그 안
+    late = event(BASE + 6 * HOUR)
+    events.append(late)
+    detector.add_event(late)
+    detector.flush(events)
+    session = detector.session(BASE + 9 * HOUR)
+    assert session['start'] == BASE + 6 * HOUR
+    assert session['reset'] == BASE + 11 * HOUR
+    assert session['usage'].messages_count == 2
+    assert [usage.window_start for usage in detector.history] == [BASE]
+
+
+def test_reset_clears_state():
+    detector = RollingSessionDetector(window_hours=5)
+    feed(detector, [BASE])
+    detector.reset()
+    assert detector.session(BASE) is None
+
+
+def test_parse_session_reset_text():
+    assert parse_session_reset_text('3시간 50분 후') == 3 * HOUR + 50 * 60
+    assert parse_session_reset_text('50분 후') == 50 * 60
+    assert parse_session_reset_text('4시간 후') == 4 * HOUR
+    assert parse_session_reset_text('Resets in 4 hr 12 min') == 4 * HOUR + 12 * 60
+    assert parse_session_reset_text('(화) 오전 10:59에') is None
+    assert parse_session_reset_text(None) is None
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
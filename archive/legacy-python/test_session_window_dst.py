@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+DST 세션 윈도우 속성 테스트
+여러 timezone/연도의 모든 시각(1시간 간격)에 대해 epoch 기반 윈도우 경계 검증
+
+실행: python3 test_session_window_dst.py  (또는 pytest)
+"""
+
+import calendar
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from timezone_windows import (
+    HOUR_SECONDS,
+    find_session_hours,
+    fixed_session_bounds,
+    utc_offset_at,
+    wall_to_epoch,
+)
+
+
+TIMEZONES = [
+    'America/New_York',     # 북반구, 02:00 전환
+    'Europe/London',        # 북반구, 01:00 전환
+    'Australia/Sydney',     # 남반구
+    'America/Santiago',     # 자정 전환
+    'Asia/Seoul',           # DST 없음
+]
+YEARS = [2023, 2024, 2025]
+BASE_HOURS = [14, 2]
+
+
+def iter_hours(year):
+    """연도의 모든 시각 (UTC epoch, 1시간 간격 + 30분 오프셋)"""
+    start = calendar.timegm((year, 1, 1, 0, 0, 0))
+    end = calendar.timegm((year + 1, 1, 1, 0, 0, 0))
+    for epoch in range(start, end, HOUR_SECONDS):
+        yield epoch + 1800
+
+
+def reference_bounds(epoch, tz_name, base_hour):
+    """zoneinfo(fold=0)로 계산한 기준 윈도우 경계"""
+    tz = ZoneInfo(tz_name)
+    local = datetime.fromtimestamp(epoch, tz)
+    start_hour, end_hour = find_session_hours(local.hour, base_hour)
+
+    start_date = local.date()
+    if local.hour < start_hour:
+        start_date -= timedelta(days=1)
+    end_date = start_date + timedelta(days=1) if end_hour < start_hour else start_date
+
+    start = datetime.combine(start_date, time(start_hour), tzinfo=tz)
+    end = datetime.combine(end_date, time(end_hour), tzinfo=tz)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def test_offsets_match_zoneinfo():
+    """캐시된 전환 테이블의 offset == zoneinfo offset"""
+    for tz_name in TIMEZONES:
+        tz = ZoneInfo(tz_name)
+        for year in YEARS:
+            for epoch in iter_hours(year):
+                for probe in (epoch - 1800, epoch):
+                    expected = datetime.fromtimestamp(probe, tz).utcoffset().total_seconds()
+                    assert utc_offset_at(tz_name, probe) == expected, (tz_name, probe)
+
+
+def test_wall_to_epoch_matches_fold0():
+    """로컬 벽시계 -> epoch 변환이 zoneinfo fold=0 규칙과 일치"""
+    for tz_name in TIMEZONES:
+        tz = ZoneInfo(tz_name)
+        for year in YEARS:
+            for epoch in iter_hours(year):
+                wall_dt = datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None, minute=0)
+                wall = calendar.timegm(wall_dt.timetuple())
+                expected = int(wall_dt.replace(tzinfo=tz).timestamp())
+                assert wall_to_epoch(tz_name, wall) == expected, (tz_name, wall_dt)
+
+
+def test_session_bounds_every_hour():
+    """모든 시각에서 start <= now < end, 기준 계산과 일치, 길이 5h±1h"""
+    for tz_name in TIMEZONES:
+        for year in YEARS:
+            for base_hour in BASE_HOURS:
+                for epoch in iter_hours(year):
+                    start, end = fixed_session_bounds(epoch, tz_name, base_hour)
+
+                    assert start <= epoch < end, (tz_name, base_hour, epoch, start, end)
+                    assert (start, end) == reference_bounds(epoch, tz_name, base_hour), \
+                        (tz_name, base_hour, epoch)
+                    assert 4 * HOUR_SECONDS <= end - start <= 6 * HOUR_SECONDS, \
+                        (tz_name, base_hour, epoch)
+
+
+def test_no_hour_counted_twice_across_fall_back():
+    """가을 DST 종료일의 반복 시간(01:00-02:00)이 정확히 한 윈도우에만 포함"""
+    tz_name = 'America/New_York'
+    # 2024-11-03 05:00 UTC = 01:00 EDT, 06:00 UTC = 01:00 EST
+    repeated_start = calendar.timegm((2024, 11, 3, 5, 0, 0))
+    repeated_end = repeated_start + 2 * HOUR_SECONDS
+
+    windows = {
+        fixed_session_bounds(epoch, tz_name, 15)
+        for epoch in range(repeated_start - 6 * HOUR_SECONDS, repeated_end + 6 * HOUR_SECONDS, 600)
+    }
+
+    for epoch in range(repeated_start, repeated_end, 600):
+        containing = [w for w in windows if w[0] <= epoch < w[1]]
+        assert len(containing) == 1, (epoch, containing)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
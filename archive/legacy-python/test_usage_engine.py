@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+증분 집계 엔진 + 주간 anchor 테스트 (임시 디렉토리)
+
+실행: python3 test_usage_engine.py  (또는 pytest)
+"""
+
+import tempfile
+from pathlib import Path
+
+from monitor_daemon import (
+    get_monitor_windows,
+    get_weekly_anchor,
+    get_weekly_window,
+    parse_weekly_reset_text,
+    window_bounds,
+)
+from timezone_windows import epoch_to_datetime, weekly_bounds
+from transcript_fixtures import assistant_line, write_transcript
+from usage_engine import create_usage_state, update_usage_state
+
+
+TZ = 'Asia/Seoul'
+NOW = 1736301540.0   # 2025-01-08 (수) 10:59 KST
+WEEK = 7 * 86400
+
+
+class ResetCounter:
+    """전체 재스캔 횟수를 세는 리스너"""
+
+    def __init__(self):
+        self.resets = 0
+
+    def add_event(self, event):
+        pass
+
+    def reset(self):
+        self.resets += 1
+
+
+def write_events(path, epochs, output_tokens=10):
+    """epoch마다 한 줄씩 파일 끝에 추가"""
+    write_transcript(path, [assistant_line(epoch, 1, output_tokens) for epoch in epochs], append=True)
+
+
+def rolling_windows(now, session_hours=5):
+    """고정 세션(NOW 기준) + 7일 rolling 주간"""
+    return {
+        'session': (NOW - session_hours * 3600, NOW + 3600, False),
+        'weekly': (now - WEEK, now, True)
+    }
+
+
+def test_incremental_scan_matches_cold_scan():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'p' / 's.jsonl'
+        write_events(path, [NOW - 3 * 86400, NOW - 3600, NOW - 60])
+
+        state = create_usage_state()
+        assert update_usage_state(state, [path], rolling_windows(NOW), NOW) == 3
+        # 추가된 줄만 읽음
+        write_events(path, [NOW - 30, NOW - 10])
+        assert update_usage_state(state, [path], rolling_windows(NOW), NOW) == 2
+        assert update_usage_state(state, [path], rolling_windows(NOW), NOW) == 0
+
+        cold = create_usage_state()
+        update_usage_state(cold, [path], rolling_windows(NOW), NOW)
+        for name in ('session', 'weekly'):
+            assert state['windows'][name].messages_count == cold['windows'][name].messages_count
+        assert state['windows']['session'].messages_count == 4
+        assert state['windows']['weekly'].messages_count == 5
+
+
+def test_rolling_window_survives_full_rescan():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'p' / 's.jsonl'
+        write_events(path, [NOW - 3 * 86400, NOW - 7 * 3600, NOW - 60])
+        state = create_usage_state()
+        counter = ResetCounter()
+        update_usage_state(state, [path], rolling_windows(NOW), NOW, listeners=[counter])
+
+        # 세션 윈도우가 버퍼보다 이른 시작으로 바뀜 → 재스캔 1회
+        now = NOW + 60
+        update_usage_state(state, [path], rolling_windows(now, session_hours=8), now, listeners=[counter])
+        assert counter.resets == 1
+        weekly = state['windows']['weekly']
+        assert weekly.span == WEEK and weekly.messages_count == 3
+        assert state['windows']['session'].messages_count == 2
+
+        # 재구성된 rolling 윈도우는 같은 길이 → 이후 tick은 증분
+        for tick in range(1, 4):
+            now = NOW + 60 + tick * 60
+            update_usage_state(state, [path], rolling_windows(now, session_hours=8), now, listeners=[counter])
+        assert counter.resets == 1
+        assert state['windows']['weekly'].span == WEEK
+
+
+def test_rewritten_transcript_rescans_instead_of_double_counting():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'p' / 's.jsonl'
+        write_events(path, [NOW - 120, NOW - 60], output_tokens=100)
+        state = create_usage_state()
+        counter = ResetCounter()
+        update_usage_state(state, [path], rolling_windows(NOW), NOW, listeners=[counter])
+        assert state['windows']['weekly'].output_tokens == 200
+
+        # 한 줄을 더해 원자적으로 교체 (새 inode) → 재스캔, 전체 스캔과 같은 합계
+        replacement = path.with_suffix('.tmp')
+        write_events(replacement, [NOW - 120, NOW - 60, NOW - 30], output_tokens=100)
+        replacement.replace(path)
+        update_usage_state(state, [path], rolling_windows(NOW), NOW, listeners=[counter])
+        assert counter.resets == 1
+        assert state['windows']['weekly'].output_tokens == 300
+
+        # 같은 파일을 한 줄로 줄임 (offset보다 작아짐)
+        write_transcript(path, [assistant_line(NOW - 30, 1, 100)])
+        update_usage_state(state, [path], rolling_windows(NOW), NOW, listeners=[counter])
+        assert counter.resets == 2
+        cold = create_usage_state()
+        update_usage_state(cold, [path], rolling_windows(NOW), NOW)
+        for name in ('session', 'weekly'):
+            assert state['windows'][name].output_tokens == cold['windows'][name].output_tokens == 100
+
+        # 이후 tick은 다시 증분
+        write_events(path, [NOW - 10], output_tokens=100)
+        assert update_usage_state(state, [path], rolling_windows(NOW), NOW, listeners=[counter]) == 1
+        assert counter.resets == 2
+
+
+def test_parse_weekly_reset_text():
+    assert parse_weekly_reset_text('(화) 오전 10:59에') == (1, 10, 59)
+    assert parse_weekly_reset_text('(금) 오후 3:00') == (4, 15, 0)
+    assert parse_weekly_reset_text('(일) 오전 12:30') == (6, 0, 30)
+    assert parse_weekly_reset_text('Tue 10:59 AM') == (1, 10, 59)
+    assert parse_weekly_reset_text('Resets Fri, 3:00 PM') == (4, 15, 0)
+    assert parse_weekly_reset_text('(화) 25:00') is None
+    assert parse_weekly_reset_text('') is None
+    assert parse_weekly_reset_text('곧 리셋') is None
+
+
+def test_weekly_bounds_reset_at_anchor():
+    # 화요일 10:59 KST anchor, 지금은 수요일 10:59 → 어제 시작, 다음 주 화요일 리셋
+    start, reset = weekly_bounds(NOW, TZ, 1, 10, 59)
+    assert reset - start == WEEK
+    assert start == NOW - 86400 and reset == NOW + 6 * 86400
+
+    # 리셋 시각 정각에 새 윈도우 시작
+    assert weekly_bounds(start, TZ, 1, 10, 59) == (start, reset)
+    assert weekly_bounds(start - 1, TZ, 1, 10, 59) == (start - WEEK, start)
+
+    # DST 지역: 리셋 벽시계 시각 유지 (3월 전환 주는 1시간 짧음)
+    start, reset = weekly_bounds(1741600000, 'America/New_York', 1, 10, 0)   # 2025-03-10 (월)
+    assert epoch_to_datetime(start, 'America/New_York').strftime('%a %H:%M') == 'Tue 10:00'
+    assert reset - start == WEEK - 3600
+
+
+def test_weekly_anchor_from_config():
+    config = {'display_settings': {'timezone': TZ},
+              'reset_schedule': {'weekly_reset': {'weekday': '화', 'time': '10:59'}}}
+    anchor = get_weekly_anchor(config)
+    assert anchor == {'weekday': 1, 'hour': 10, 'minute': 59, 'source': 'config'}
+
+    now = epoch_to_datetime(NOW, TZ)
+    start, end, next_reset = get_weekly_window(now, config, anchor)
+    assert start.timestamp() == NOW - 86400 and next_reset == end
+    assert window_bounds(get_monitor_windows(now, config, anchor))['weekly'] == (NOW - 86400, NOW + 6 * 86400, False)
+
+    # anchor 없음 → 7일 rolling
+    start, end, _ = get_weekly_window(now, config, None)
+    assert (end - start).total_seconds() == WEEK
+
+
+def test_fixed_weekly_window_resets_at_anchor():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'p' / 's.jsonl'
+        write_events(path, [NOW - 2 * 86400, NOW - 3600, NOW - 60])
+        start, reset = weekly_bounds(NOW, TZ, 1, 10, 59)
+
+        state = create_usage_state()
+        update_usage_state(state, [path], {'weekly': (start, reset, False)}, NOW)
+        assert state['windows']['weekly'].messages_count == 2
+
+        # 리셋 통과 → 새 윈도우는 최근 이벤트 버퍼에서 재구성 (리셋 이후 이벤트만)
+        counter = ResetCounter()
+        write_events(path, [reset + 30])
+        now = reset + 60
+        next_start, next_reset = weekly_bounds(now, TZ, 1, 10, 59)
+        assert next_start == reset
+        update_usage_state(state, [path], {'weekly': (next_start, next_reset, False)}, now, listeners=[counter])
+        assert state['windows']['weekly'].messages_count == 1
+        assert counter.resets == 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
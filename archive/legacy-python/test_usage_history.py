@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+tier별 장기 사용량 기록 테스트
+
+실행: python3 test_usage_history.py  (또는 pytest)
+"""
+
+import tempfile
+from pathlib import Path
+
+import usage_history
+from records import UsageEvent
+from transcript_fixtures import assistant_line, write_transcript
+from usage_history import UsageHistory, load_usage_history
+
+
+DAY = 86400
+NOW = 1_750_000_000 // DAY * DAY + 12 * 3600   # UTC 정오
+
+
+def event(timestamp, input_tokens=100):
+    return UsageEvent(timestamp=timestamp, input_tokens=input_tokens, output_tokens=10)
+
+
+def tier_sizes(history):
+    return [len(buckets) for buckets in history.tiers]
+
+
+def test_events_land_in_tier_by_age():
+    history = UsageHistory()
+    for age in (30, 90, 20 * DAY, 21 * DAY, 400 * DAY):
+        history.add_event(event(NOW - age), NOW)
+    assert tier_sizes(history) == [2, 2, 1]
+
+    total = history.query(0, NOW + 60)
+    assert total['messages_count'] == 5 and total['input_tokens'] == 500
+    assert total['exact'] and total['resolution_seconds'] == DAY
+
+    recent = history.query(NOW - 3600, NOW)
+    assert recent['messages_count'] == 2 and recent['resolution_seconds'] == 60
+
+
+def test_query_marks_partial_coarse_buckets():
+    history = UsageHistory()
+    history.add_event(event(NOW - 30 * DAY + 600), NOW)      # 시간 bucket
+    start = (NOW - 30 * DAY) // 3600 * 3600
+    inside = history.query(start, start + 3600)
+    assert inside['messages_count'] == 1 and inside['exact']
+    # 구간이 bucket 중간에서 시작 → 포함하지 않고 exact=False
+    partial = history.query(start + 1800, start + 7200)
+    assert partial['messages_count'] == 0 and not partial['exact']
+
+
+def test_compaction_is_incremental_and_preserves_totals():
+    history = UsageHistory()
+    for minute in range(3 * 24 * 60):                          # 3일치 분 bucket
+        history.add_event(event(NOW - 2 * DAY - minute * 60), NOW)
+    assert tier_sizes(history) == [3 * 24 * 60, 0, 0]
+    before = history.query(0, NOW + 60)
+
+    # 15일 뒤: 13일 전 이전 bucket은 시간 bucket으로 (tick당 limit개)
+    later = NOW + 15 * DAY
+    assert history.compact(later, limit=1000) == 1000
+    moved = 1000
+    while True:
+        step = history.compact(later, limit=1000)
+        if not step:
+            break
+        moved += step
+    expected_minutes = sum(1 for minute in range(3 * 24 * 60)
+                           if NOW - 2 * DAY - minute * 60 >= later - 14 * DAY)
+    assert tier_sizes(history)[0] == expected_minutes
+    assert moved == 3 * 24 * 60 - expected_minutes
+    after = history.query(0, later)
+    assert {key: after[key] for key in usage_history.FIELDS} == {key: before[key] for key in usage_history.FIELDS}
+
+    # 200일 뒤: 모두 일 bucket
+    while history.compact(NOW + 200 * DAY):
+        pass
+    assert tier_sizes(history) == [0, 0, 4]
+    assert history.query(0, NOW + 200 * DAY)['messages_count'] == 3 * 24 * 60
+
+
+def test_ingest_reads_each_line_once_and_round_trips():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = write_transcript(Path(tmp_dir) / 'p' / 's.jsonl',
+                                [assistant_line(NOW - age, 7, 1) for age in (60, 20 * DAY, 300 * DAY)])
+
+        history = UsageHistory()
+        assert history.ingest([path], NOW) == 3
+        assert history.ingest([path], NOW) == 0
+        assert tier_sizes(history) == [1, 1, 1]
+
+        history_file = Path(tmp_dir) / 'history.pickle'
+        history.save(history_file)
+        restored = load_usage_history(history_file)
+        assert restored.tiers == history.tiers and restored.cursors == history.cursors
+        assert restored.compact(NOW + 15 * DAY) == 1
+        assert load_usage_history(Path(tmp_dir) / 'missing.pickle').tiers == [{}, {}, {}]
+
+
+def write_lines(path, ages, output_tokens=100):
+    """NOW 기준 나이(초)마다 한 줄 (제자리에서 새로 씀)"""
+    write_transcript(path, [assistant_line(NOW - age, 1, output_tokens) for age in ages])
+
+
+def test_rewritten_transcript_adds_only_later_events():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 's.jsonl'
+        other = Path(tmp_dir) / 'o.jsonl'
+        write_lines(path, (300 * DAY, 3600))
+        write_lines(other, (60,))
+        history = UsageHistory()
+        assert history.ingest([path, other], NOW) == 3
+
+        # 한 줄을 더해 원자적으로 교체 (새 inode) → 새 줄만
+        replacement = Path(tmp_dir) / 's.tmp'
+        write_lines(replacement, (300 * DAY, 3600, 120))
+        replacement.replace(path)
+        assert history.ingest([path, other], NOW) == 1
+        assert history.query(0, NOW)['output_tokens'] == 400
+        assert str(other) in history.cursors
+
+        # 줄여서 다시 씀 → 더할 것 없음, 이후 추가된 줄은 평소처럼
+        write_lines(path, (120,))
+        assert history.ingest([path, other], NOW) == 0
+        write_transcript(path, [assistant_line('2099-01-01T00:00:00Z', 1, 100)], append=True)
+        assert history.ingest([path, other], NOW) == 1
+        assert history.query(0, NOW + 100 * 365 * DAY)['output_tokens'] == 500
+
+        # 사라진 파일의 기록 정리
+        history.ingest([path], NOW)
+        assert set(history.latest) == {str(path)}
+
+        history_file = Path(tmp_dir) / 'history.pickle'
+        history.save(history_file)
+        assert load_usage_history(history_file).latest == history.latest
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
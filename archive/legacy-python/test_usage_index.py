@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+데몬 체크포인트 테스트 (임시 디렉토리)
+
+실행: python3 test_usage_index.py  (또는 pytest)
+"""
+
+import tempfile
+from pathlib import Path
+
+import cold_storage
+import usage_index
+from forecaster import BurnRateForecaster
+from test_cold_storage import WINDOWS, NOW, sample_lines, totals, transcript_tree
+from transcript_fixtures import write_transcript
+from usage_engine import create_usage_state, update_usage_state
+from usage_index import load_checkpoint, load_usage_index, save_checkpoint, save_usage_index
+from usage_scanner import find_all_sessions
+
+
+def checkpointed_state(projects, checkpoint_file):
+    state = create_usage_state()
+    update_usage_state(state, find_all_sessions(projects), WINDOWS, NOW)
+    save_checkpoint(state, None, {'session_window_start': 'x', 'notified_thresholds': [50]},
+                    checkpoint_file=checkpoint_file)
+    return state
+
+
+def test_checkpoint_resumes_incrementally():
+    with transcript_tree() as projects:
+        checkpoint_file = projects.parent / 'checkpoint.pickle'
+        state = checkpointed_state(projects, checkpoint_file)
+
+        # 저장 이후 추가된 줄만 읽어 전체 재스캔과 같은 결과
+        write_transcript(projects / 'c' / 's3.jsonl', sample_lines(10))
+        with open(projects / 'a' / 's1.jsonl', 'a') as f:
+            f.write((projects / 'b' / 's2.jsonl').read_text())
+
+        checkpoint = load_checkpoint(checkpoint_file)
+        restored = checkpoint['usage_state']
+        assert restored is not None
+        assert checkpoint['notification_state']['notified_thresholds'] == [50]
+        update_usage_state(restored, find_all_sessions(projects), WINDOWS, NOW)
+
+        rescanned = create_usage_state()
+        update_usage_state(rescanned, find_all_sessions(projects), WINDOWS, NOW)
+        assert totals(restored) == totals(rescanned) != totals(state)
+
+
+def test_checkpoint_rejected_when_transcript_rewritten():
+    with transcript_tree() as projects:
+        checkpoint_file = projects.parent / 'checkpoint.pickle'
+        checkpointed_state(projects, checkpoint_file)
+
+        # 줄어든 파일 → 집계 상태만 버리고 나머지는 유지
+        write_transcript(projects / 'a' / 's1.jsonl', sample_lines(5))
+        checkpoint = load_checkpoint(checkpoint_file)
+        assert checkpoint['usage_state'] is None
+        assert checkpoint['notification_state'] is not None
+
+
+def test_checkpoint_survives_compression():
+    with transcript_tree() as projects:
+        checkpoint_file = projects.parent / 'checkpoint.pickle'
+        state = checkpointed_state(projects, checkpoint_file)
+
+        cold_storage.compress_transcript(projects / 'a' / 's1.jsonl', use_zstd=False)
+        restored = load_checkpoint(checkpoint_file)['usage_state']
+        assert restored is not None
+        update_usage_state(restored, find_all_sessions(projects), WINDOWS, NOW)
+        assert totals(restored) == totals(state)
+
+
+def test_missing_checkpoint():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        assert load_checkpoint(Path(tmp_dir) / 'checkpoint.pickle') is None
+
+
+
+def test_state_classes_declare_slots():
+    import importlib
+    for module_name, class_name in usage_index.STATE_CLASSES:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        # 선언하지 않은 필드는 pickle 버전에 반영되지 않으므로 인스턴스 __dict__가 없어야 함
+        assert '__slots__' in vars(cls) and '__dict__' not in dir(cls), class_name
+
+
+def test_checkpoint_rejected_when_listener_fields_change():
+    import forecaster
+    with transcript_tree() as projects:
+        checkpoint_file = projects.parent / 'checkpoint.pickle'
+        index_file = projects.parent / 'usage_index.pickle'
+        state = checkpointed_state(projects, checkpoint_file)
+        state['forecaster'] = BurnRateForecaster()
+        save_usage_index(state, index_file)
+        assert load_usage_index(index_file) is not None
+
+        # 리스너에 필드 추가 → 저장된 객체에는 없으므로 둘 다 버리고 전체 스캔
+        class ExtendedForecaster(BurnRateForecaster):
+            __slots__ = ('last_value',)
+
+        usage_index._state_schema = None
+        forecaster.BurnRateForecaster = ExtendedForecaster
+        try:
+            assert load_checkpoint(checkpoint_file) is None
+            assert load_usage_index(index_file) is None
+        finally:
+            forecaster.BurnRateForecaster = BurnRateForecaster
+            usage_index._state_schema = None
+        assert load_checkpoint(checkpoint_file)['usage_state'] is not None
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
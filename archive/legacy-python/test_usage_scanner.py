@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+트랜스크립트 디렉토리 탐색(scandir + thread pool) 테스트
+
+실행: python3 test_usage_scanner.py  (또는 pytest)
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import usage_scanner
+from transcript_fixtures import assistant_line, write_transcript
+from usage_scanner import find_all_sessions, iter_new_events, walk_sessions
+
+
+def second_line(second, input_tokens=10):
+    return assistant_line(f'2025-01-02T10:00:{second:02d}.000Z', input_tokens)
+
+
+def make_tree(root):
+    for project in range(5):
+        for nested in ('', 'subagents/', 'subagents/deep/'):
+            directory = root / f'p{project}' / nested
+            directory.mkdir(parents=True, exist_ok=True)
+            write_transcript(directory / f's{project}.jsonl', [second_line(project)])
+            (directory / 'notes.txt').write_text('x')
+    (root / 'p0' / 'old.jsonl.gz').write_bytes(b'')
+    (root / 'p1' / 's1.jsonl.gz').write_bytes(b'')     # 압축 중 (원본이 남아 있음)
+    (root / 'p0' / 'dir.jsonl').mkdir()                 # 디렉토리는 제외
+
+
+def test_walk_matches_rglob_with_stat():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        make_tree(root)
+        expected = sorted(path for path in root.rglob('*.jsonl') if path.is_file())
+
+        for workers in (1, 4):
+            files = [path for path in walk_sessions(root, workers) if path.suffix == '.jsonl']
+            assert files == expected
+            for path in files:
+                assert path.stat_result.st_size == os.stat(path).st_size
+                assert usage_scanner.file_stat(path) is path.stat_result
+
+        assert walk_sessions(root / 'missing') == []
+
+
+def test_find_all_sessions_skips_compressed_duplicates():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        make_tree(root)
+        names = [str(path.relative_to(root)) for path in find_all_sessions(root)]
+        assert 'p0/old.jsonl.gz' in names
+        assert 'p1/s1.jsonl.gz' not in names
+        assert len(names) == 16
+
+
+def test_cursor_stays_within_walked_size():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        path = root / 'p' / 's.jsonl'
+        path.parent.mkdir()
+        write_transcript(path, [second_line(1), second_line(2)])
+        files = find_all_sessions(root)
+
+        # 탐색 이후에 추가된 줄은 다음 탐색에서 읽음 (같은 stat으로 다시 스캔해도 중복 없음)
+        write_transcript(path, [second_line(3, input_tokens=500)], append=True)
+        cursors = {}
+        assert [e.input_tokens for e in iter_new_events(files, cursors)] == [10, 10]
+        assert list(iter_new_events(files, cursors)) == []
+        assert [e.input_tokens for e in iter_new_events(find_all_sessions(root), cursors)] == [500]
+
+
+
+def test_dormant_cursors_evicted():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        done, partial, unread = (root / 'p' / name for name in ('done.jsonl', 'partial.jsonl', 'new.jsonl'))
+        done.parent.mkdir()
+        for path in (done, partial):
+            write_transcript(path, [second_line(1), second_line(2)])
+        cutoff = os.stat(done).st_mtime + 3600
+
+        cursors = {}
+        list(iter_new_events(find_all_sessions(root), cursors))
+        write_transcript(partial, [second_line(3, input_tokens=500)], append=True)
+        write_transcript(unread, [second_line(4)])
+
+        # 다 읽은 휴면 파일 → 커서 삭제, 덜 읽은 휴면 파일 → 마저 읽음, 커서 없는 휴면 파일 → 읽지 않음
+        events = list(iter_new_events(find_all_sessions(root), cursors, dormant_before=cutoff))
+        assert [e.input_tokens for e in events] == [500]
+        assert sorted(cursors) == [str(partial)]
+        assert list(iter_new_events(find_all_sessions(root), cursors, dormant_before=cutoff)) == []
+        assert cursors == {}
+
+        # 다시 수정되면 처음부터 읽음 (옛 이벤트는 윈도우가 무시)
+        os.utime(done, (cutoff + 60, cutoff + 60))
+        events = list(iter_new_events(find_all_sessions(root), cursors, dormant_before=cutoff))
+        assert [(e.file, e.input_tokens) for e in events] == [(str(done), 10), (str(done), 10)]
+        assert sorted(cursors) == [str(done)]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
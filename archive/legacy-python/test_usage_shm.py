@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+공유 메모리 스냅샷(seqlock) 테스트
+
+실행: python3 test_usage_shm.py  (또는 pytest)
+"""
+
+import multiprocessing
+import tempfile
+from pathlib import Path
+
+import usage_shm
+from usage_shm import SnapshotReader, SnapshotWriter, read_snapshot
+
+
+def windows(session, weekly):
+    return {
+        'session': {'percentage': session, 'estimated_percentage': session - 1, 'reset_at': 1000.0 + session,
+                    'window_start': 0.0, 'window_end': 18000.0, 'anchored': True},
+        'weekly': {'percentage': weekly, 'reset_at': 2000.0 + weekly}
+    }
+
+
+def test_publish_and_read():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'usage.shm'
+        assert read_snapshot(path) is None
+
+        writer = SnapshotWriter(path)
+        reader = SnapshotReader(path)
+        assert reader.read() is None   # 아직 publish 전
+
+        writer.publish('active', windows(42.5, 17.0), published_at=123.0)
+        snapshot = reader.read()
+        assert snapshot['published_at'] == 123.0
+        assert snapshot['status'] == 'active'
+        assert snapshot['session'] == {'percentage': 42.5, 'estimated_percentage': 41.5, 'reset_at': 1042.5,
+                                       'window_start': 0.0, 'window_end': 18000.0, 'anchored': True}
+        assert snapshot['weekly']['percentage'] == 17.0
+        assert snapshot['weekly']['window_start'] is None
+        assert not snapshot['weekly']['anchored']
+
+        # 같은 매핑으로 다음 값도 보임
+        writer.publish('no_session', {})
+        assert reader.read()['status'] == 'no_session'
+        assert reader.read()['session']['percentage'] is None
+
+        writer.close()
+        reader.close()
+
+
+def test_torn_payload_rejected():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'usage.shm'
+        writer = SnapshotWriter(path)
+        writer.publish('active', windows(10.0, 20.0))
+        reader = SnapshotReader(path)
+
+        # 기록 도중(홀수 seq)에는 값을 돌려주지 않음
+        usage_shm.SEQ.pack_into(writer._map, usage_shm.SEQ_OFFSET, writer._seq + 1)
+        assert reader.read_values() is None
+
+        # seq는 짝수지만 payload가 섞인 경우 (CRC)
+        usage_shm.SEQ.pack_into(writer._map, usage_shm.SEQ_OFFSET, writer._seq + 2)
+        writer._map[usage_shm.PAYLOAD_OFFSET + 24] ^= 0xFF
+        assert reader.read_values() is None
+
+        # 기록 도중 종료된 파일을 다음 데몬이 열면 첫 publish 전까지 "기록 없음"
+        usage_shm.SEQ.pack_into(writer._map, usage_shm.SEQ_OFFSET, 7)
+        writer.close()
+        writer = SnapshotWriter(path)
+        assert reader.read() is None
+        writer.publish('active', windows(30.0, 40.0))
+        assert reader.read()['session']['percentage'] == 30.0
+        writer.close()
+        reader.close()
+
+
+def publish_pairs(path, count):
+    writer = SnapshotWriter(path)
+    for i in range(count):
+        writer.publish('active', windows(float(i), float(i) + 0.5))
+    writer.close()
+
+
+def test_concurrent_reader_sees_consistent_pairs():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'usage.shm'
+        SnapshotWriter(path).publish('active', windows(0.0, 0.5))
+
+        process = multiprocessing.Process(target=publish_pairs, args=(path, 20000))
+        process.start()
+        reader = SnapshotReader(path)
+        reads = 0
+        while process.is_alive() or reads == 0:
+            snapshot = reader.read()
+            if snapshot is None:
+                continue
+            reads += 1
+            session = snapshot['session']
+            # 한 번의 publish에서 나온 값만 섞이지 않고 보여야 함
+            assert snapshot['weekly']['percentage'] == session['percentage'] + 0.5
+            assert session['reset_at'] == 1000.0 + session['percentage']
+        process.join()
+        assert process.exitcode == 0
+        assert reader.read()['session']['percentage'] == 19999.0
+        reader.close()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+사용량 소스 병합 테스트
+
+실행: python3 test_usage_sources.py  (또는 pytest)
+"""
+
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+from usage_sources import SourceRunner, UsageFileSource, estimate_at, merge_observations
+
+
+WINDOW_START = 1_000_000.0
+
+
+def estimate(now_epoch, session):
+    return {
+        'source': 'transcripts',
+        'observed_at': now_epoch,
+        'ground_truth': False,
+        'session': {'percentage': session, 'window_start': WINDOW_START}
+    }
+
+
+def extension(observed_at, session):
+    return {
+        'source': 'extension',
+        'observed_at': observed_at,
+        'ground_truth': True,
+        'session': {'percentage': session, 'reset_time': None}
+    }
+
+
+def test_anchor_adds_local_growth_since_observation():
+    history = {}
+    merge_observations(history, estimate(WINDOW_START + 60, 10.0), [], WINDOW_START + 60)
+    merge_observations(history, estimate(WINDOW_START + 120, 12.0), [], WINDOW_START + 120)
+
+    # 웹 표시값 30% (관측 시점 로컬 추정치 12%) 이후 로컬에서 5% 더 사용
+    snapshot = merge_observations(
+        history, estimate(WINDOW_START + 180, 17.0), [extension(WINDOW_START + 130, 30.0)], WINDOW_START + 180)
+    session = snapshot['session']
+    assert session['percentage'] == 35.0
+    assert session['estimated_percentage'] == 17.0
+    assert session['anchor']['estimate_at_observation'] == 12.0
+    assert session['source'] == 'extension+transcripts'
+    assert snapshot['sources']['extension']['fresh']
+
+
+def test_observation_from_previous_window_ignored():
+    history = {}
+    snapshot = merge_observations(
+        history, estimate(WINDOW_START + 60, 4.0), [extension(WINDOW_START - 60, 90.0)], WINDOW_START + 60)
+    assert snapshot['session']['percentage'] == 4.0
+    assert snapshot['session']['anchor'] is None
+
+
+def test_estimate_gap_not_trusted():
+    history = {}
+    merge_observations(history, estimate(WINDOW_START + 60, 10.0), [], WINDOW_START + 60)
+    # 데몬이 꺼져 있던 동안(1시간)의 추정치는 알 수 없음
+    merge_observations(history, estimate(WINDOW_START + 3660, 20.0), [], WINDOW_START + 3660)
+    assert estimate_at(history, 'session', WINDOW_START + 300) == 10.0
+    assert estimate_at(history, 'session', WINDOW_START + 1800) is None
+    assert estimate_at(history, 'session', WINDOW_START + 3660) == 20.0
+
+
+class SlowSource:
+    name = 'slow'
+    ground_truth = True
+    stale_after = 3600
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def poll(self, now_epoch):
+        self.release.wait(5)
+        return extension(now_epoch, 50.0) | {'source': self.name}
+
+
+def test_runner_collects_slow_source_later():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        usage_file = Path(tmp_dir) / 'usage.json'
+        usage_file.write_text(json.dumps({
+            'timestamp': '2026-01-01T00:00:00Z',
+            'source': 'chrome_extension',
+            'session': {'percentage': 42, 'reset_time': '2 hr'},
+            'weekly': {'percentage': None}
+        }))
+        slow = SlowSource()
+        runner = SourceRunner([UsageFileSource('extension', usage_file), slow], timeout=0.2)
+
+        runner.start(WINDOW_START)
+        observations = {o['source']: o for o in runner.collect()}
+        assert observations['extension']['session']['percentage'] == 42.0
+        assert 'weekly' not in observations['extension']
+        assert 'slow' not in observations
+
+        slow.release.set()
+        runner.start(WINDOW_START + 60)
+        observations = {o['source']: o for o in runner.collect()}
+        assert observations['slow']['session']['percentage'] == 50.0
+        runner.close()
+
+
+
+def test_out_of_range_percentage_ignored():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'manual_usage.json'
+        path.write_text(json.dumps({'timestamp': '2026-01-01T00:00:00Z', 'source': 'manual_input',
+                                    'session': {'percentage': 120}, 'weekly': {'percentage': 25}}))
+        observation = UsageFileSource('manual', path).poll(0)
+        assert 'session' not in observation
+        assert observation['weekly']['percentage'] == 25.0
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
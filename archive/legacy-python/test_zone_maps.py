@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+트랜스크립트 zone map(블록 요약) 테스트
+
+실행: python3 test_zone_maps.py  (또는 pytest)
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import usage_scanner
+import zone_maps
+from transcript_fixtures import assistant_line, user_line, write_transcript
+from usage_engine import add_event, new_window_usage, usage_summary
+
+
+BASE = 1_700_000_000
+BLOCK = 4096
+FIELDS = ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_creation_tokens', 'messages_count')
+
+
+@contextmanager
+def small_blocks():
+    """작은 블록/sidecar 임시 디렉토리로 교체"""
+    saved = (zone_maps.ZONE_MAP_DIR, zone_maps.BLOCK_SIZE, zone_maps.MIN_FILE_BYTES,
+             usage_scanner.READ_CHUNK_SIZE)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        zone_maps.ZONE_MAP_DIR = Path(tmp_dir) / 'zonemaps'
+        zone_maps.BLOCK_SIZE = usage_scanner.READ_CHUNK_SIZE = BLOCK
+        zone_maps.MIN_FILE_BYTES = 2 * BLOCK
+        try:
+            yield Path(tmp_dir)
+        finally:
+            (zone_maps.ZONE_MAP_DIR, zone_maps.BLOCK_SIZE, zone_maps.MIN_FILE_BYTES,
+             usage_scanner.READ_CHUNK_SIZE) = saved
+
+
+def transcript_lines(start_minute, count):
+    """분마다 user 한 줄 + assistant 한 줄"""
+    lines = []
+    for i in range(start_minute, start_minute + count):
+        lines.append(user_line(BASE + i * 60))
+        lines.append(assistant_line(BASE + i * 60, i, 2 * i, cache_read=3, cache_creation=i % 7))
+    return lines
+
+
+def full_parse(path, start, end):
+    usage = new_window_usage(start, end)
+    for event in usage_scanner.iter_new_events([path], {}):
+        add_event(usage, event)
+    return usage_summary(usage)
+
+
+def test_query_sums_inner_blocks_and_parses_boundaries():
+    with small_blocks() as tmp_dir:
+        path = tmp_dir / 'big.jsonl'
+        write_transcript(path, transcript_lines(0, 600))
+
+        start, end = BASE + 100 * 60 + 30, BASE + 400 * 60 + 30
+        usage, stats = zone_maps.query_range([path], start, end)
+        summary = usage_summary(usage)
+        expected = full_parse(path, start, end)
+        assert {key: summary[key] for key in FIELDS} == {key: expected[key] for key in FIELDS}
+        assert summary['messages_count'] == 300
+        assert summary['oldest_message_time'] == BASE + 101 * 60
+        assert summary['latest_message_time'] == BASE + 400 * 60
+
+        assert 1 <= stats['blocks_parsed'] <= 2   # 경계가 블록 사이에 걸리면 1개
+        assert stats['blocks_summed'] > 0 and stats['blocks_skipped'] > 0
+        assert stats['bytes_parsed'] <= 2 * BLOCK + 1024
+
+
+def test_append_extends_and_shrink_invalidates():
+    with small_blocks() as tmp_dir:
+        path = tmp_dir / 'big.jsonl'
+        write_transcript(path, transcript_lines(0, 300))
+        first = zone_maps.get_zone_map(str(path), os.stat(path))
+        assert first['size'] == os.stat(path).st_size
+
+        write_transcript(path, transcript_lines(300, 300), append=True)
+        stat = os.stat(path)
+        assert zone_maps.load_zone_map(str(path), stat) is not None   # 앞부분은 그대로 유효
+        extended = zone_maps.get_zone_map(str(path), stat)
+        assert extended['size'] == stat.st_size
+        assert sum(block[8] for block in extended['blocks']) == 600
+
+        # 파일이 줄어들거나 다른 파일로 바뀌면 버림
+        write_transcript(path, transcript_lines(0, 10))
+        assert zone_maps.load_zone_map(str(path), os.stat(path)) is None
+        replacement = tmp_dir / 'new.jsonl'
+        write_transcript(replacement, transcript_lines(0, 600))
+        os.replace(replacement, path)
+        assert zone_maps.load_zone_map(str(path), os.stat(path)) is None
+
+
+def test_scanner_builds_map_and_skips_dormant_prefix():
+    with small_blocks() as tmp_dir:
+        path = tmp_dir / 'big.jsonl'
+        write_transcript(path, transcript_lines(0, 600))
+
+        # 처음 읽을 때 함께 생성
+        events = list(usage_scanner.iter_new_events([path], {}))
+        assert len(events) == 600
+        zone_map = zone_maps.load_zone_map(str(path), os.stat(path))
+        assert zone_map['size'] == os.stat(path).st_size
+
+        # 재스캔: 기준 이전 블록은 읽지 않음 (기준 이후 이벤트는 모두 포함)
+        cursors = {}
+        cutoff = BASE + 500 * 60
+        rescanned = list(usage_scanner.iter_new_events([path], cursors, dormant_before=cutoff - 3600))
+        timestamps = [event.timestamp for event in rescanned]
+        assert len(rescanned) < 600
+        assert [t for t in timestamps if t >= cutoff] == [BASE + i * 60 for i in range(500, 600)]
+        assert cursors[str(path)]['offset'] == os.stat(path).st_size
+
+
+def test_range_load_matches_filtered_full_load():
+    with small_blocks() as tmp_dir:
+        big = tmp_dir / 'big.jsonl'
+        small = tmp_dir / 'small.jsonl'
+        write_transcript(big, transcript_lines(0, 600))
+        write_transcript(small, transcript_lines(200, 5))
+
+        start, end = BASE + 150 * 60, BASE + 250 * 60
+        loaded = usage_scanner.load_all_events([big, small], start=start, end=end)
+        expected = [event for event in usage_scanner.load_all_events([big, small]) if start <= event.timestamp < end]
+        assert [(e.timestamp, e.input_tokens) for e in loaded] == [(e.timestamp, e.input_tokens) for e in expected]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Timezone Windows
+UTC epoch 기반 세션 윈도우 경계 계산 (DST 안전)
+
+aware datetime에 replace(hour=...)/timedelta(days=1)를 적용하면
+DST 전환일에 윈도우 경계가 1시간 어긋나고, 같은 tzinfo끼리의 비교는
+fold를 무시하므로 반복되는 1시간의 메시지가 중복/누락 집계된다.
+여기서는 모든 경계를 UTC epoch(초)로 계산하고, zone별 전환 테이블을
+캐시하여 로컬 벽시계 시간 <-> epoch 변환에 사용한다.
+"""
+
+import bisect
+import calendar
+import time
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+
+DAY_SECONDS = 86400
+HOUR_SECONDS = 3600
+
+
+@lru_cache(maxsize=None)
+def get_zone(tz_name):
+    """ZoneInfo 객체 캐시 (zone별 1회 로드)"""
+    return ZoneInfo(tz_name)
+
+
+def _raw_offset(tz, epoch):
+    """epoch 시점의 UTC offset (초)"""
+    return int(datetime.fromtimestamp(epoch, tz).utcoffset().total_seconds())
+
+
+@lru_cache(maxsize=256)
+def get_transitions(tz_name, year):
+    """
+    특정 연도의 UTC offset 전환 테이블 (zone/연도별 캐시)
+
+    하루 간격으로 offset을 샘플링하고, 바뀐 구간은 1초 단위까지
+    이분 탐색하여 정확한 전환 시점을 찾는다.
+
+    Args:
+        tz_name: IANA timezone 이름 (예: 'America/New_York')
+        year: 연도 (UTC 기준)
+
+    Returns:
+        tuple: ((epoch, offset_seconds), ...) 오름차순.
+               첫 항목은 연도 시작 시점의 offset
+    """
+    tz = get_zone(tz_name)
+    year_start = calendar.timegm((year, 1, 1, 0, 0, 0))
+    year_end = calendar.timegm((year + 1, 1, 1, 0, 0, 0))
+
+    transitions = [(year_start, _raw_offset(tz, year_start))]
+    prev_epoch = year_start
+    prev_offset = transitions[0][1]
+
+    epoch = year_start + DAY_SECONDS
+    while prev_epoch < year_end:
+        epoch = min(epoch, year_end)
+        offset = _raw_offset(tz, epoch)
+        if offset != prev_offset:
+            # (lo, hi] 구간에서 offset이 바뀌는 첫 시점 탐색
+            lo, hi = prev_epoch, epoch
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if _raw_offset(tz, mid) == prev_offset:
+                    lo = mid
+                else:
+                    hi = mid
+            if hi < year_end:
+                transitions.append((hi, offset))
+            prev_offset = offset
+        prev_epoch = epoch
+        epoch += DAY_SECONDS
+
+    return tuple(transitions)
+
+
+@lru_cache(maxsize=256)
+def _transition_epochs(tz_name, year):
+    """bisect용 전환 시점 리스트"""
+    return [epoch for epoch, _ in get_transitions(tz_name, year)]
+
+
+def utc_offset_at(tz_name, epoch):
+    """
+    epoch 시점의 UTC offset (초) - 캐시된 전환 테이블 사용
+
+    Args:
+        tz_name: IANA timezone 이름
+        epoch: UTC epoch (초)
+
+    Returns:
+        int: UTC offset (초)
+    """
+    year = time.gmtime(epoch).tm_year
+    transitions = get_transitions(tz_name, year)
+    index = bisect.bisect_right(_transition_epochs(tz_name, year), epoch) - 1
+    return transitions[max(index, 0)][1]
+
+
+def epoch_to_wall(tz_name, epoch):
+    """UTC epoch -> 로컬 벽시계 시간 (naive epoch 초)"""
+    return epoch + utc_offset_at(tz_name, epoch)
+
+
+def wall_to_epoch(tz_name, wall):
+    """
+    로컬 벽시계 시간 -> UTC epoch
+
+    zoneinfo의 fold=0 규칙과 동일하게 처리:
+    - 반복되는 시간(가을 DST 종료): 첫 번째(이른) 시점
+    - 존재하지 않는 시간(봄 DST 시작): 전환 이전 offset 적용
+
+    Args:
+        tz_name: IANA timezone 이름
+        wall: 로컬 벽시계 시간 (1970-01-01 00:00 로컬 기준 초)
+
+    Returns:
+        int: UTC epoch (초)
+    """
+    before = utc_offset_at(tz_name, wall - DAY_SECONDS)
+    after = utc_offset_at(tz_name, wall + DAY_SECONDS)
+
+    candidates = []
+    for offset in {before, after}:
+        epoch = wall - offset
+        if utc_offset_at(tz_name, epoch) == offset:
+            candidates.append(epoch)
+
+    if candidates:
+        return min(candidates)
+
+    # 존재하지 않는 시간 (gap)
+    return wall - before
+
+
+def find_session_hours(hour, base_hour=14):
+    """
+    로컬 시(hour)가 속한 5시간 윈도우의 시작/종료 시 계산
+
+    예: base=14 → 14:00-19:00, 19:00-00:00, 00:00-05:00, 05:00-10:00, 10:00-15:00
+
+    Returns:
+        tuple: (start_hour, end_hour)
+    """
+    current_start = base_hour
+    for _ in range(5):
+        current_end = (current_start + 5) % 24
+        if current_end < current_start:  # 자정을 넘어가는 경우
+            if hour >= current_start or hour < current_end:
+                return current_start, current_end
+        elif current_start <= hour < current_end:
+            return current_start, current_end
+        current_start = current_end
+
+    # 찾지 못하면 기본값 (base_hour 시작)
+    return base_hour, (base_hour + 5) % 24
+
+
+def fixed_session_bounds(now_epoch, tz_name, base_hour=14):
+    """
+    고정 5시간 세션 윈도우 경계 (UTC epoch)
+
+    Args:
+        now_epoch: 현재 시간 (UTC epoch)
+        tz_name: 설정된 timezone (display_settings.timezone)
+        base_hour: 세션 기준 시 (reset_schedule.session_base_hour)
+
+    Returns:
+        tuple: (start_epoch, end_epoch)
+    """
+    wall = epoch_to_wall(tz_name, int(now_epoch))
+    local_day, seconds_of_day = divmod(wall, DAY_SECONDS)
+    hour = seconds_of_day // HOUR_SECONDS
+
+    start_hour, end_hour = find_session_hours(hour, base_hour)
+
+    # 시작 시점: 현재 시보다 크면 전날에서 시작
+    start_day = local_day - 1 if hour < start_hour else local_day
+    # 종료 시점: 자정을 넘어가면 다음날
+    end_day = start_day + 1 if end_hour < start_hour else start_day
+
+    start_epoch = wall_to_epoch(tz_name, start_day * DAY_SECONDS + start_hour * HOUR_SECONDS)
+    end_epoch = wall_to_epoch(tz_name, end_day * DAY_SECONDS + end_hour * HOUR_SECONDS)
+
+    return start_epoch, end_epoch
+
+
+def weekly_bounds(now_epoch, tz_name, weekday, hour, minute=0):
+    """
+    고정 주간 윈도우 경계 (UTC epoch)
+
+    매주 weekday hh:mm(로컬)에 리셋되는 주간 윈도우
+
+    Args:
+        now_epoch: 현재 시간 (UTC epoch)
+        tz_name: 설정된 timezone
+        weekday: 리셋 요일 (월=0 ... 일=6)
+        hour: 리셋 시 (0-23)
+        minute: 리셋 분
+
+    Returns:
+        tuple: (start_epoch, reset_epoch) - reset_epoch는 now 이후 첫 리셋
+    """
+    wall = epoch_to_wall(tz_name, int(now_epoch))
+    local_day = wall // DAY_SECONDS
+    # 1970-01-01은 목요일 (월=0 기준 3)
+    today_weekday = (local_day + 3) % 7
+    reset_day = local_day + (weekday - today_weekday) % 7
+    reset_offset = hour * HOUR_SECONDS + minute * 60
+
+    reset_epoch = wall_to_epoch(tz_name, reset_day * DAY_SECONDS + reset_offset)
+    if reset_epoch <= now_epoch:
+        reset_day += 7
+        reset_epoch = wall_to_epoch(tz_name, reset_day * DAY_SECONDS + reset_offset)
+
+    start_epoch = wall_to_epoch(tz_name, (reset_day - 7) * DAY_SECONDS + reset_offset)
+
+    return start_epoch, reset_epoch
+
+
+def epoch_to_datetime(epoch, tz_name):
+    """UTC epoch -> aware datetime (설정 timezone, fold 포함)"""
+    return datetime.fromtimestamp(epoch, get_zone(tz_name))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+테스트용 합성 트랜스크립트 (test_*.py가 공유)
+
+줄 형식과 파일 기록을 한 곳에 두어 테스트마다 다른 사본이 생기지 않게 한다.
+각 테스트는 시각/토큰 값만 정해서 줄 리스트를 만들고 write_transcript로 기록한다.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+
+def iso(epoch):
+    """UTC epoch → 트랜스크립트 timestamp ('...Z')"""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def assistant_line(timestamp, input_tokens=1, output_tokens=1, cache_read=None, cache_creation=None):
+    """
+    usage가 있는 assistant 메시지 한 줄 (개행 없음)
+
+    Args:
+        timestamp: UTC epoch 또는 ISO 문자열 (그대로 기록)
+        cache_read, cache_creation: None이면 필드 생략
+    """
+    if not isinstance(timestamp, str):
+        timestamp = iso(timestamp)
+    usage = {'input_tokens': input_tokens, 'output_tokens': output_tokens}
+    if cache_read is not None:
+        usage['cache_read_input_tokens'] = cache_read
+    if cache_creation is not None:
+        usage['cache_creation_input_tokens'] = cache_creation
+    return json.dumps({'type': 'assistant', 'timestamp': timestamp, 'message': {'usage': usage}})
+
+
+def user_line(timestamp):
+    """usage가 없는 user 메시지 한 줄 (집계에서 무시됨)"""
+    if not isinstance(timestamp, str):
+        timestamp = iso(timestamp)
+    return json.dumps({'type': 'user', 'timestamp': timestamp})
+
+
+def write_transcript(path, lines, append=False, mtime=None):
+    """
+    줄들을 트랜스크립트로 기록 (줄마다 개행, 상위 디렉토리 생성)
+
+    Args:
+        append: True면 기존 파일 끝에 추가 (같은 inode), 아니면 제자리에서 새로 씀
+        mtime: 지정하면 기록 후 수정 시각 변경 (휴면 판정 테스트)
+
+    Returns:
+        Path: path
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a' if append else 'w') as f:
+        f.write(''.join(line + '\n' for line in lines))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
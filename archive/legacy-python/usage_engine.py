@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Usage Engine
+윈도우별 누적기(accumulator)로 세션/주간 사용량을 증분 집계
+
+- 고정 윈도우 (세션 5시간, 주간 anchor): 경계가 바뀌면 초기화
+- Rolling 윈도우 (anchor 없는 주간 7일): 분 단위 bucket을 만료시키며 차감
+- 최근 이벤트 버퍼: 윈도우 경계가 바뀔 때 재스캔 없이 새 윈도우를 재구성
+"""
+
+import heapq
+
+from records import WindowUsage
+from usage_scanner import iter_new_events
+
+
+# 윈도우 재구성용 최근 이벤트 보관 시간 (세션 윈도우 5시간 + 여유)
+RECENT_EVENT_SECONDS = 6 * 3600
+# 버퍼 정리 주기 (cutoff보다 이만큼 오래된 이벤트가 생기면 정리)
+RECENT_PRUNE_SLACK_SECONDS = 600
+# 휴면 파일 판정 여유 (파일 mtime과 이벤트 timestamp 사이의 시계 오차 대비)
+DORMANT_SLACK_SECONDS = 3600
+
+USAGE_FIELDS = (
+    'input_tokens',
+    'output_tokens',
+    'cache_read_tokens',
+    'cache_creation_tokens'
+)
+
+
+def new_window_usage(start, end, rolling=False):
+    """
+    윈도우 누적기 생성
+
+    Args:
+        start: 윈도우 시작 (UTC epoch)
+        end: 윈도우 종료 (UTC epoch, 미포함)
+        rolling: True면 end - start 길이의 rolling 윈도우
+
+    Returns:
+        WindowUsage: 누적기
+    """
+    return WindowUsage(start, end, rolling)
+
+
+def empty_copy(usage):
+    """같은 경계의 빈 누적기"""
+    if usage.rolling:
+        # rolling 누적기의 window_end는 inf → 저장된 span으로 다시 만듦
+        # (window_end로 만들면 span이 inf가 되어 매 tick 전체 재스캔)
+        return WindowUsage(usage.window_start, usage.window_start + usage.span, True)
+    return WindowUsage(usage.window_start, usage.window_end)
+
+
+def add_event(usage, event):
+    """
+    이벤트를 누적기에 추가 (윈도우 밖이면 무시)
+
+    Returns:
+        bool: 추가 여부
+    """
+    timestamp = event.timestamp
+    if timestamp < usage.window_start or timestamp >= usage.window_end:
+        return False
+
+    usage.input_tokens += event.input_tokens
+    usage.output_tokens += event.output_tokens
+    usage.cache_read_tokens += event.cache_read_tokens
+    usage.cache_creation_tokens += event.cache_creation_tokens
+    usage.messages_count += event.messages
+
+    if usage.oldest_message_time is None or timestamp < usage.oldest_message_time:
+        usage.oldest_message_time = timestamp
+    if usage.latest_message_time is None or timestamp > usage.latest_message_time:
+        usage.latest_message_time = timestamp
+
+    if usage.rolling:
+        minute = int(timestamp // 60)
+        bucket = usage.buckets.get(minute)
+        if bucket is None:
+            bucket = [0, 0, 0, 0, 0]
+            usage.buckets[minute] = bucket
+            heapq.heappush(usage.bucket_heap, minute)
+        bucket[0] += event.input_tokens
+        bucket[1] += event.output_tokens
+        bucket[2] += event.cache_read_tokens
+        bucket[3] += event.cache_creation_tokens
+        bucket[4] += event.messages
+
+    return True
+
+
+def advance_rolling(usage, now_epoch):
+    """
+    Rolling 누적기를 현재 시간으로 이동 (만료된 분 bucket 차감)
+
+    분 단위로 만료되므로 윈도우 시작 경계는 최대 1분 오차
+    """
+    usage.window_start = now_epoch - usage.span
+    cutoff_minute = int(usage.window_start // 60)
+
+    heap = usage.bucket_heap
+    while heap and heap[0] < cutoff_minute:
+        minute = heapq.heappop(heap)
+        bucket = usage.buckets.pop(minute)
+        usage.input_tokens -= bucket[0]
+        usage.output_tokens -= bucket[1]
+        usage.cache_read_tokens -= bucket[2]
+        usage.cache_creation_tokens -= bucket[3]
+        usage.messages_count -= bucket[4]
+
+    if heap:
+        usage.oldest_message_time = max(heap[0] * 60, usage.window_start)
+    else:
+        usage.oldest_message_time = None
+        usage.latest_message_time = None
+
+
+def usage_summary(usage):
+    """
+    누적기를 출력용 사용량 dict로 변환 (build_output의 session/weekly usage)
+
+    Cache read tokens는 rate limit에 카운트되지 않음
+    """
+    summary = {field: getattr(usage, field) for field in USAGE_FIELDS}
+    summary['messages_count'] = usage.messages_count
+    summary['total_counted_tokens'] = (
+        usage.input_tokens +
+        usage.output_tokens +
+        usage.cache_creation_tokens
+    )
+    summary['oldest_message_time'] = usage.oldest_message_time
+    summary['latest_message_time'] = usage.latest_message_time
+    return summary
+
+
+def merge_usage(usages):
+    """
+    여러 누적기를 합친 누적기 (multi-root 합계용, 읽기 전용)
+
+    Args:
+        usages: 같은 윈도우 경계의 누적기 리스트
+
+    Returns:
+        WindowUsage: usage_summary()에 넘길 수 있는 누적기
+    """
+    usages = list(usages)
+    merged = WindowUsage(usages[0].window_start, usages[0].window_end) if usages else WindowUsage(0, 0)
+
+    for usage in usages:
+        merged.input_tokens += usage.input_tokens
+        merged.output_tokens += usage.output_tokens
+        merged.cache_read_tokens += usage.cache_read_tokens
+        merged.cache_creation_tokens += usage.cache_creation_tokens
+        merged.messages_count += usage.messages_count
+        oldest = usage.oldest_message_time
+        if oldest is not None and (merged.oldest_message_time is None or oldest < merged.oldest_message_time):
+            merged.oldest_message_time = oldest
+        latest = usage.latest_message_time
+        if latest is not None and (merged.latest_message_time is None or latest > merged.latest_message_time):
+            merged.latest_message_time = latest
+
+    return merged
+
+
+def create_usage_state():
+    """
+    증분 집계 상태 생성
+
+    구조:
+    {
+        "cursors": {path: cursor},
+        "recent_events": [...],      # 최근 RECENT_EVENT_SECONDS 이벤트
+        "recent_min": epoch,         # recent_events 중 가장 오래된 시점
+        "coverage_start": epoch,     # recent_events가 빠짐없이 보장하는 시작 시점
+        "buffer_since": epoch,       # 버퍼를 비운(shed) 시점 (없으면 None)
+        "windows": {name: usage}
+    }
+    """
+    return {
+        'cursors': {},
+        'recent_events': [],
+        'recent_min': None,
+        'coverage_start': None,
+        'buffer_since': None,
+        'windows': {}
+    }
+
+
+def _reset_state(state, listeners=()):
+    """전체 재스캔을 위해 상태 초기화 (리스너도 reset)"""
+    state['cursors'].clear()
+    state['recent_events'] = []
+    state['recent_min'] = None
+    state['coverage_start'] = None
+    state['buffer_since'] = None
+    for name, usage in list(state['windows'].items()):
+        state['windows'][name] = empty_copy(usage)
+    for listener in listeners:
+        listener.reset()
+
+
+def prepare_windows(state, windows, now_epoch, listeners=()):
+    """
+    이번 tick의 윈도우 경계 반영 (리셋 시점 통과 → 새 누적기)
+
+    새 윈도우는 최근 이벤트 버퍼로 재구성하고, 버퍼가 새 윈도우 시작을
+    보장하지 못하면 전체 재스캔을 위해 상태를 초기화한다.
+
+    Args:
+        state: create_usage_state() 상태 (제자리 갱신)
+        windows: {name: (start, end, rolling)} 이번 tick의 윈도우 경계
+        now_epoch: 현재 시간 (UTC epoch)
+        listeners: 재스캔 시 reset()을 호출할 객체 리스트
+
+    Returns:
+        bool: 전체 재스캔 필요 여부
+    """
+    needs_rescan = False
+
+    for name, (start, end, rolling) in windows.items():
+        usage = state['windows'].get(name)
+
+        if usage is not None and usage.rolling and rolling and usage.span == end - start:
+            advance_rolling(usage, now_epoch)
+            continue
+        if usage is not None and not rolling and not usage.rolling and \
+                (usage.window_start, usage.window_end) == (start, end):
+            continue
+
+        usage = new_window_usage(start, end, rolling)
+        state['windows'][name] = usage
+
+        if state['coverage_start'] is None:
+            continue  # 첫 스캔에서 채워짐
+        if start < state['coverage_start']:
+            needs_rescan = True
+            continue
+
+        # 최근 이벤트 버퍼로 재구성
+        for event in state['recent_events']:
+            add_event(usage, event)
+
+    if needs_rescan:
+        _reset_state(state, listeners)
+
+    return needs_rescan
+
+
+def ingest_events(state, events, now_epoch, listeners=()):
+    """
+    새 이벤트를 모든 윈도우 누적기/리스너에 추가
+
+    Args:
+        state: create_usage_state() 상태 (제자리 갱신)
+        events: usage 이벤트 iterable
+        now_epoch: 현재 시간 (UTC epoch)
+        listeners: 새 이벤트를 받을 객체 리스트 (add_event(event), reset() 구현)
+
+    Returns:
+        int: 추가한 이벤트 수
+    """
+    recent_cutoff = now_epoch - RECENT_EVENT_SECONDS
+    recent_events = state['recent_events']
+    recent_min = state.get('recent_min')
+    windows = list(state['windows'].values())
+    count = 0
+
+    for event in events:
+        count += 1
+        timestamp = event.timestamp
+        if timestamp >= recent_cutoff:
+            recent_events.append(event)
+            if recent_min is None or timestamp < recent_min:
+                recent_min = timestamp
+        for usage in windows:
+            add_event(usage, event)
+        for listener in listeners:
+            listener.add_event(event)
+
+    # 최근 이벤트 버퍼 정리 (여유 시간만큼 모아서 한 번에)
+    if recent_min is not None and recent_min < recent_cutoff - RECENT_PRUNE_SLACK_SECONDS:
+        recent_events = [e for e in recent_events if e.timestamp >= recent_cutoff]
+        recent_min = min((e.timestamp for e in recent_events), default=None)
+        state['recent_events'] = recent_events
+    state['recent_min'] = recent_min
+
+    # 버퍼를 비운 뒤에는 그 시점 이후만 보장
+    buffer_since = state.get('buffer_since')
+    if buffer_since is not None and buffer_since <= recent_cutoff:
+        state['buffer_since'] = buffer_since = None
+    state['coverage_start'] = recent_cutoff if buffer_since is None else buffer_since
+
+    return count
+
+
+def shed_recent_events(state, now_epoch):
+    """
+    메모리 절약을 위해 최근 이벤트 버퍼 비우기
+
+    버퍼가 다시 채워지기 전에 지금보다 이른 시점에서 시작하는 윈도우로 바뀌면
+    전체 재스캔으로 재구성된다.
+
+    Returns:
+        int: 버린 이벤트 수
+    """
+    dropped = len(state['recent_events'])
+    state['recent_events'] = []
+    state['recent_min'] = None
+    if state['coverage_start'] is not None:
+        state['buffer_since'] = now_epoch
+        state['coverage_start'] = now_epoch
+    return dropped
+
+
+def dormant_cutoff(windows):
+    """이 시점 이전에 수정된 파일은 어떤 윈도우에도 이벤트가 없음"""
+    if not windows:
+        return None
+    return min(start for start, _, _ in windows.values()) - DORMANT_SLACK_SECONDS
+
+
+def update_usage_state(state, session_files, windows, now_epoch, listeners=(), budget=None):
+    """
+    윈도우 경계 반영 후 세션 파일의 새 이벤트를 누적
+
+    다시 쓰인(줄어들었거나 inode가 바뀐) 트랜스크립트가 있으면 그 파일이 이미 더한
+    이벤트를 뺄 수 없으므로 prepare_windows 재스캔처럼 상태/리스너를 초기화하고 다시 읽는다.
+
+    Args:
+        state: create_usage_state() 상태 (제자리 갱신)
+        session_files: 세션 파일 리스트
+        windows: {name: (start, end, rolling)} 이번 tick의 윈도우 경계
+        now_epoch: 현재 시간 (UTC epoch)
+        listeners: 새 이벤트를 받을 객체 리스트 (add_event(event), reset() 구현)
+        budget: ScanBudget (예산을 다 쓰면 나머지는 다음 호출에서 이어서 읽음)
+
+    Returns:
+        int: 이번 tick에 새로 읽은 이벤트 수
+    """
+    prepare_windows(state, windows, now_epoch, listeners)
+    dormant_before = dormant_cutoff(windows)
+    rewritten = []
+    events = iter_new_events(session_files, state['cursors'], budget, dormant_before, rewritten)
+    count = ingest_events(state, events, now_epoch, listeners)
+    if rewritten:
+        _reset_state(state, listeners)
+        events = iter_new_events(session_files, state['cursors'], budget, dormant_before)
+        count = ingest_events(state, events, now_epoch, listeners)
+    return count
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Usage History
+주간 limit, limit 학습, 스케줄 조정 등 장기 분석용 사용량 기록 (tier별 자동 downsampling)
+
+- 분 단위 bucket은 14일, 시간 단위는 180일, 일 단위(UTC)는 무기한 보관
+- 보관 기간이 지난 bucket은 다음 tier bucket에 합침 (데몬 tick마다 COMPACT_BATCH개씩)
+- 이벤트는 나이에 맞는 tier에 바로 기록 (backfill한 몇 달 전 이벤트는 시간/일 단위로)
+- 각 이벤트는 정확히 한 bucket에만 있으므로 여러 tier에 걸친 조회는 bucket 합계
+  (조회 경계에 걸친 큰 bucket은 시작 시각 기준으로 포함하고 exact=False로 표시)
+- 자체 커서로 트랜스크립트를 읽어 윈도우/전체 재스캔과 관계없이 각 줄을 한 번만 집계
+  (다시 쓰인 트랜스크립트는 그 파일에서 기록한 마지막 이벤트보다 늦은 줄만 더함)
+- tier와 커서를 한 pickle에 함께 저장 (데몬 체크포인트 주기, 비정상 종료 시 저장된
+  커서 이후부터 다시 읽음) → 첫 몇 달 이후 파일 크기는 거의 일정
+  (분 ≤ 20160개, 시간 ≤ 4320개, 일은 하루 1개씩)
+
+    python3 usage_history.py --update               # 지금까지의 트랜스크립트 반영 + compaction
+    python3 usage_history.py --query 2025-01-01 2025-04-01
+    python3 usage_history.py --stats
+"""
+
+import heapq
+import json
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+
+from usage_index import _read_pickle, _write_pickle
+from usage_scanner import ScanBudget, find_all_sessions, iter_new_events
+
+
+HISTORY_FILE = Path.home() / '.claude-monitor' / 'usage_history.pickle'
+HISTORY_VERSION = 1
+
+# (이름, bucket 길이, 보관 기간) - 보관 기간이 지나면 다음 tier로 합침 (마지막 tier는 무기한)
+TIERS = (
+    ('minute', 60, 14 * 86400),
+    ('hour', 3600, 180 * 86400),
+    ('day', 86400, None),
+)
+FIELDS = ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_creation_tokens', 'messages_count')
+
+# tick당 다음 tier로 옮길 최대 bucket 수 (데몬이 오래 꺼져 있었을 때 나눠서 처리)
+COMPACT_BATCH = 2048
+# tick당 트랜스크립트 읽기 예산 (첫 backfill을 여러 tick에 나눔)
+HISTORY_TICK_BYTES = 32 * 1024 * 1024
+
+
+class UsageHistory:
+    """
+    tier별 usage bucket ({bucket 시작: [input, output, cache_read, cache_creation, 메시지 수]})
+
+    tier마다 bucket 시작 시각 heap을 두어 compaction이 가장 오래된 것부터 꺼냄
+    """
+
+    def __init__(self):
+        self.tiers = [{} for _ in TIERS]
+        self.heaps = [[] for _ in TIERS]
+        self.cursors = {}
+        # {path: 그 파일에서 기록한 가장 늦은 이벤트 시각} (다시 쓰인 파일의 중복 방지)
+        self.latest = {}
+        self.dirty = False
+
+    def _tier_for(self, timestamp, now_epoch):
+        """이벤트가 들어갈 tier (가장 촘촘하면서 보관 기간 안인 것)"""
+        for index, (_, span, retention) in enumerate(TIERS):
+            start = int(timestamp // span) * span
+            if retention is None or start >= now_epoch - retention:
+                return index, start
+
+    def _add(self, index, start, values):
+        buckets = self.tiers[index]
+        bucket = buckets.get(start)
+        if bucket is None:
+            buckets[start] = list(values)
+            heapq.heappush(self.heaps[index], start)
+        else:
+            for i in range(5):
+                bucket[i] += values[i]
+
+    def add_event(self, event, now_epoch):
+        """UsageEvent 기록"""
+        index, start = self._tier_for(event.timestamp, now_epoch)
+        self._add(index, start, (event.input_tokens, event.output_tokens, event.cache_read_tokens,
+                                 event.cache_creation_tokens, event.messages))
+        self.dirty = True
+
+    def ingest(self, session_files, now_epoch, budget=None):
+        """
+        트랜스크립트의 새 줄 반영 (자체 커서, 휴면 파일도 모두 읽음)
+
+        다시 쓰인(줄어들었거나 inode가 바뀐) 파일은 이미 기록한 이벤트를 뺄 수 없으므로
+        처음부터 다시 읽되 그 파일의 latest보다 늦은 이벤트만 더한다 (한 번에 끝까지 읽음,
+        latest가 없는 옛 기록의 파일은 새 줄부터).
+
+        Returns:
+            int: 기록한 이벤트 수
+        """
+        count = 0
+        latest = self.latest
+        rewritten = []
+        for event in iter_new_events(session_files, self.cursors, budget, rewritten=rewritten):
+            self.add_event(event, now_epoch)
+            if event.timestamp > latest.get(event.file, -math.inf):
+                latest[event.file] = event.timestamp
+            count += 1
+
+        if rewritten:
+            # 다른 파일의 커서를 지우지 않도록 다시 쓰인 파일만 별도 커서로 읽음
+            cursors = {}
+            marks = {path: latest.get(path, math.inf) for path in rewritten}
+            for event in iter_new_events(rewritten, cursors):
+                if event.timestamp > marks[event.file]:
+                    self.add_event(event, now_epoch)
+                    if event.timestamp > latest.get(event.file, -math.inf):
+                        latest[event.file] = event.timestamp
+                    count += 1
+            self.cursors.update(cursors)
+
+        # 사라진 파일 정리 (커서는 iter_new_events가 정리)
+        if len(latest) > len(self.cursors):
+            for path in [path for path in latest if path not in self.cursors]:
+                del latest[path]
+        return count
+
+    def compact(self, now_epoch, limit=COMPACT_BATCH):
+        """
+        보관 기간이 지난 bucket을 다음 tier로 합침 (최대 limit개)
+
+        Returns:
+            int: 옮긴 bucket 수
+        """
+        moved = 0
+        for index, (_, _, retention) in enumerate(TIERS[:-1]):
+            cutoff = now_epoch - retention
+            next_span = TIERS[index + 1][1]
+            buckets, heap = self.tiers[index], self.heaps[index]
+            while heap and heap[0] < cutoff and moved < limit:
+                start = heapq.heappop(heap)
+                values = buckets.pop(start)
+                self._add(index + 1, start // next_span * next_span, values)
+                moved += 1
+        if moved:
+            self.dirty = True
+        return moved
+
+    def update(self, session_files, now_epoch, budget=None):
+        """데몬 tick: 새 줄 반영 후 compaction (budget이 없으면 HISTORY_TICK_BYTES)"""
+        if budget is None:
+            budget = ScanBudget(HISTORY_TICK_BYTES)
+        self.ingest(session_files, now_epoch, budget)
+        self.compact(now_epoch)
+        return budget.exhausted
+
+    def query(self, start, end):
+        """
+        [start, end) 사용량 (tier를 가리지 않고 합산)
+
+        Returns:
+            dict: FIELDS 합계 + {
+                "exact": 경계에 걸친 bucket이 없으면 True,
+                "resolution_seconds": 사용한 가장 큰 bucket 길이 (bucket이 없으면 None)
+            }
+        """
+        totals = [0, 0, 0, 0, 0]
+        exact = True
+        resolution = None
+        for (_, span, _), buckets in zip(TIERS, self.tiers):
+            used = False
+            for bucket_start, values in buckets.items():
+                if bucket_start + span <= start or bucket_start >= end:
+                    continue
+                if bucket_start < start or bucket_start + span > end:
+                    # 경계에 걸친 bucket: 시작 시각이 구간 안이면 포함
+                    exact = False
+                    if bucket_start < start:
+                        continue
+                for i in range(5):
+                    totals[i] += values[i]
+                used = True
+            if used:
+                resolution = span
+        result = dict(zip(FIELDS, totals))
+        result['exact'] = exact
+        result['resolution_seconds'] = resolution
+        return result
+
+    def stats(self):
+        """tier별 bucket 수/기간"""
+        tiers = {}
+        for (name, span, retention), buckets in zip(TIERS, self.tiers):
+            tiers[name] = {
+                'buckets': len(buckets),
+                'oldest': min(buckets) if buckets else None,
+                'newest': max(buckets) if buckets else None,
+                'retention_days': retention // 86400 if retention is not None else None
+            }
+        return {'tiers': tiers, 'files_tracked': len(self.cursors)}
+
+    def save(self, history_file=None):
+        """tier + 커서 저장 (원자적 교체)"""
+        _write_pickle(history_file or HISTORY_FILE, {
+            'version': HISTORY_VERSION,
+            'saved_at': time.time(),
+            'tiers': self.tiers,
+            'cursors': self.cursors,
+            'latest': self.latest
+        })
+        self.dirty = False
+
+
+def load_usage_history(history_file=None):
+    """
+    저장된 기록 로드 (없거나 버전이 다르면 빈 기록 → 처음부터 backfill)
+    """
+    history = UsageHistory()
+    data = _read_pickle(history_file or HISTORY_FILE, HISTORY_VERSION)
+    if data is not None:
+        history.tiers = data['tiers']
+        history.cursors = data['cursors']
+        history.latest = data.get('latest', {})
+        history.heaps = [list(buckets) for buckets in history.tiers]
+        for heap in history.heaps:
+            heapq.heapify(heap)
+    return history
+
+
+def format_epoch(epoch):
+    return datetime.fromtimestamp(epoch).isoformat() if epoch is not None else None
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tiered long-term usage history')
+    parser.add_argument('--update', action='store_true',
+                        help='Ingest all new transcript lines and compact expired buckets')
+    parser.add_argument('--query', nargs=2, metavar=('START', 'END'),
+                        help='Sum usage in [START, END) (ISO 8601)')
+    parser.add_argument('--stats', action='store_true',
+                        help='Show bucket counts per tier')
+    args = parser.parse_args()
+
+    history = load_usage_history()
+
+    if args.update:
+        now_epoch = time.time()
+        started = time.perf_counter()
+        count = history.ingest(find_all_sessions(), now_epoch)
+        moved = 0
+        while True:
+            step = history.compact(now_epoch)
+            if not step:
+                break
+            moved += step
+        history.save()
+        print(f"✅ {count} new event(s), {moved} bucket(s) compacted ({time.perf_counter() - started:.2f}s)")
+
+    if args.query:
+        start, end = (datetime.fromisoformat(value).timestamp() for value in args.query)
+        print(json.dumps(history.query(start, end), indent=2))
+
+    if args.stats:
+        stats = history.stats()
+        for tier in stats['tiers'].values():
+            tier['oldest'] = format_epoch(tier['oldest'])
+            tier['newest'] = format_epoch(tier['newest'])
+        print(json.dumps(stats, indent=2))
+
+    if not (args.update or args.query or args.stats):
+        parser.print_help()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
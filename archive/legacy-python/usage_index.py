@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Usage Index
+--once 실행 사이에 증분 집계 상태(커서, 윈도우 누적기, 최근 이벤트, forecaster)를
+파일로 유지하여, 다음 실행은 그 이후에 추가된 줄만 읽는다.
+
+데몬도 같은 방식으로 체크포인트(집계 상태 + 캘리브레이션 모델 + 알림 상태)를
+주기적으로, 그리고 SIGTERM 시 저장하여 재시작 후 첫 tick부터 증분으로 이어간다.
+
+- pickle 바이너리 (버전이 다르거나 읽을 수 없으면 무시하고 전체 스캔)
+  버전 = (형식 버전, pickle되는 리스너/레코드 클래스의 __slots__) → 클래스에 필드가
+  추가/삭제되면 저장된 객체에 그 필드가 없으므로 버림
+- 로드 시 커서를 트랜스크립트의 현재 크기/mtime/inode와 대조하여,
+  다시 쓰였거나 줄어들었거나 삭제된 파일이 있으면 집계 상태를 버림
+  (누적기에서 해당 파일의 이벤트만 뺄 수 없으므로)
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import cold_storage
+
+
+USAGE_INDEX_FILE = Path.home() / '.claude-monitor' / 'usage_index.pickle'
+DAEMON_CHECKPOINT_FILE = Path.home() / '.claude-monitor' / 'daemon_checkpoint.pickle'
+USAGE_INDEX_VERSION = 1
+CHECKPOINT_VERSION = 1
+
+# 집계 상태에 pickle되는 클래스 (모듈, 클래스 이름) - 모두 __slots__로 필드를 선언하고
+# 그 구성이 상태 버전에 들어감 (선언하지 않은 필드는 대입할 때 AttributeError)
+STATE_CLASSES = (
+    ('records', 'UsageEvent'),
+    ('records', 'WindowUsage'),
+    ('forecaster', 'BurnRateForecaster'),
+    ('rate_tracker', 'RateTracker'),
+    ('rate_tracker', 'SlidingMax'),
+    ('session_detector', 'RollingSessionDetector'),
+    ('anomaly_detector', 'LoopDetector'),
+    ('anomaly_detector', 'ProjectRate'),
+)
+
+_state_schema = None
+
+
+def state_schema():
+    """pickle되는 클래스별 __slots__ (프로세스당 한 번 계산)"""
+    global _state_schema
+    if _state_schema is None:
+        # 리스너 모듈은 상태를 읽고 쓸 때만 필요 → 지연 import
+        import importlib
+        _state_schema = tuple(
+            (f'{module_name}.{class_name}',
+             tuple(getattr(importlib.import_module(module_name), class_name).__slots__))
+            for module_name, class_name in STATE_CLASSES
+        )
+    return _state_schema
+
+
+def state_version(version):
+    """집계 상태를 담는 파일의 버전 (형식 버전 + 클래스 필드 구성)"""
+    return (version, state_schema())
+
+
+def _read_pickle(path, version):
+    """버전이 맞는 pickle 레코드 로드 (없거나 다르면 None)"""
+    import pickle
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # 손상되었거나 클래스 정의가 바뀐 경우 → 전체 스캔
+        print(f"Warning: Ignoring {path.name}: {e}", file=sys.stderr)
+        return None
+
+    if not isinstance(data, dict) or data.get('version') != version:
+        return None
+    return data
+
+
+def _write_pickle(path, record):
+    """pickle 레코드 저장 (원자적 교체)"""
+    import pickle
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, path)
+
+
+def find_stale_cursors(cursors):
+    """
+    저장 이후 바뀐 트랜스크립트 찾기
+
+    - 압축 파일: inode/크기/mtime이 모두 같아야 함
+    - 일반 파일: 같은 inode이고 읽은 위치 이후로만 늘어났어야 함
+      (크기가 같은데 mtime이 다르면 제자리에서 다시 쓰인 것으로 간주)
+    - 사라진 파일: 압축본(.gz/.zst)으로 대체된 경우만 허용
+
+    Returns:
+        list: 집계 상태를 무효로 만드는 파일 경로
+    """
+    stale = []
+    for path, cursor in cursors.items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if not any(os.path.exists(path + suffix) for suffix in cold_storage.COMPRESSED_SUFFIXES):
+                stale.append(path)
+            continue
+
+        if stat.st_ino != cursor['inode']:
+            stale.append(path)
+        elif cold_storage.is_compressed(path):
+            if (stat.st_size, stat.st_mtime) != (cursor['size'], cursor['mtime']):
+                stale.append(path)
+        elif stat.st_size < cursor['offset'] or \
+                (stat.st_size == cursor['size'] and stat.st_mtime != cursor['mtime']):
+            stale.append(path)
+    return stale
+
+
+def validate_usage_state(state, source):
+    """
+    집계 상태 검증
+
+    Returns:
+        dict: 그대로 쓸 수 있는 상태 (바뀐 트랜스크립트가 있으면 None)
+    """
+    if state is None:
+        return None
+    stale = find_stale_cursors(state['cursors'])
+    if stale:
+        # --once는 stdout에 JSON만 출력하므로 stderr
+        print(f"Info: {source} outdated ({len(stale)} transcript(s) changed), rescanning", file=sys.stderr)
+        return None
+    return state
+
+
+def load_usage_index(index_file=USAGE_INDEX_FILE):
+    """
+    저장된 증분 집계 상태 로드
+
+    Returns:
+        dict: create_usage_state() 형식 상태
+              (없거나, 버전/클래스 필드가 다르거나, 트랜스크립트가 바뀌었으면 None)
+    """
+    data = _read_pickle(index_file, state_version(USAGE_INDEX_VERSION))
+    if data is None:
+        return None
+    return validate_usage_state(data['state'], 'Usage index')
+
+
+def save_usage_index(state, index_file=USAGE_INDEX_FILE):
+    """증분 집계 상태 저장 (원자적 교체)"""
+    _write_pickle(index_file, {
+        'version': state_version(USAGE_INDEX_VERSION),
+        'saved_at': time.time(),
+        'state': state
+    })
+
+
+def load_checkpoint(checkpoint_file=DAEMON_CHECKPOINT_FILE):
+    """
+    데몬 체크포인트 로드
+
+    Returns:
+        dict: {
+            "saved_at": epoch,
+            "usage_state": 집계 상태 (트랜스크립트가 바뀌었으면 None),
+            "calibration_models": 캘리브레이션 모델 캐시 (없으면 None),
+            "notification_state": 알림 상태 (없으면 None)
+        }
+        체크포인트가 없거나 버전/클래스 필드가 다르면 None
+    """
+    data = _read_pickle(checkpoint_file, state_version(CHECKPOINT_VERSION))
+    if data is None:
+        return None
+
+    return {
+        'saved_at': data['saved_at'],
+        'usage_state': validate_usage_state(data.get('usage_state'), 'Checkpoint'),
+        'calibration_models': data.get('calibration_models'),
+        'notification_state': data.get('notification_state')
+    }
+
+
+def save_checkpoint(usage_state, calibration_models=None, notification_state=None,
+                    checkpoint_file=DAEMON_CHECKPOINT_FILE):
+    """데몬 체크포인트 저장 (원자적 교체)"""
+    _write_pickle(checkpoint_file, {
+        'version': state_version(CHECKPOINT_VERSION),
+        'saved_at': time.time(),
+        'usage_state': usage_state,
+        'calibration_models': calibration_models,
+        'notification_state': notification_state
+    })
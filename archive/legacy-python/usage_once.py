@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Claude Usage Monitor - --once 진입점
+`monitor_daemon.py --once`와 같은 출력을 SwiftBar/cron처럼 자주 호출하는 곳에서 빠르게 얻기 위한 얇은 스크립트
+
+- 실행 중인 데몬이 있으면 소켓 응답을 바로 출력 (monitor_daemon과 무거운 모듈을 import하지 않음)
+- 없으면 monitor_daemon을 모듈로 import해 저장된 증분 인덱스로 실행 (argparse 없이 run_once)
+  (스크립트로 실행한 파일은 .pyc 캐시를 쓰지 않으므로 큰 monitor_daemon.py를 매번 컴파일하지 않음)
+
+    python3 usage_once.py              # = monitor_daemon.py --once
+    python3 usage_once.py --rescan     # = monitor_daemon.py --once --rescan
+"""
+
+import sys
+
+
+def main(argv):
+    """메인 함수 (argv: --rescan만 인식, 나머지 옵션은 monitor_daemon.py에서)"""
+    rescan = '--rescan' in argv
+    if not rescan:
+        from daemon_socket import query_daemon
+        payload = query_daemon()
+        if payload is not None:
+            sys.stdout.write(payload.decode('utf-8') + '\n')
+            return 0
+
+    import monitor_daemon
+    return monitor_daemon.run_once(rescan)
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv[1:]))
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Usage Scanner
+세션 파일(.jsonl)을 파일별 커서(byte offset)로 증분 읽기
+
+매 tick마다 모든 트랜스크립트를 처음부터 다시 읽지 않고,
+마지막으로 읽은 위치 이후에 추가된 줄만 파싱한다.
+압축된 트랜스크립트(.jsonl.gz, .jsonl.zst)는 cold_storage의 요약으로 한 번만 집계.
+큰 트랜스크립트를 처음부터 읽을 때는 zone_maps의 블록 요약을 만들거나 사용.
+"""
+
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cold_storage
+import json_backend
+import zone_maps
+from records import UsageEvent
+
+
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+# 디렉토리 탐색 thread 수 (NFS 등 메타데이터 왕복이 느린 홈 디렉토리에서 지연을 겹침)
+WALK_WORKERS = 8
+
+
+class SessionPath(type(Path())):
+    """
+    탐색 단계의 stat 결과를 함께 가진 트랜스크립트 경로
+
+    size/mtime/inode를 이후 단계(iter_new_events, zone_maps)에서 다시 stat하지 않고 사용
+    """
+
+    stat_result = None
+
+
+def file_stat(path):
+    """탐색에서 얻은 stat이 있으면 재사용, 없으면 os.stat"""
+    stat = getattr(path, 'stat_result', None)
+    return stat if stat is not None else os.stat(path)
+
+
+class ScanBudget:
+    """
+    한 번의 스캔에서 읽을 수 있는 바이트/CPU 시간 예산
+
+    예산을 다 쓰면 iter_new_events가 중간에 멈추고(커서는 보존),
+    exhausted가 True가 된다. 남은 작업은 다음 호출에서 이어서 처리.
+    CPU 시간은 생성 이후 현재 thread의 CPU 시간 (파싱 + 누적, chunk 단위로 확인)
+    """
+
+    def __init__(self, max_bytes, max_cpu_seconds=None):
+        self.remaining_bytes = max_bytes
+        self.read_bytes = 0
+        self.max_cpu_seconds = max_cpu_seconds
+        self.cpu_started = time.thread_time()
+        self.exhausted = False
+
+    @property
+    def cpu_seconds(self):
+        return time.thread_time() - self.cpu_started
+
+    def consume(self, size):
+        self.remaining_bytes -= size
+        self.read_bytes += size
+        if self.remaining_bytes <= 0:
+            self.exhausted = True
+        elif self.max_cpu_seconds is not None and self.cpu_seconds >= self.max_cpu_seconds:
+            self.exhausted = True
+
+
+def _scan_directory(directory, suffixes):
+    """
+    디렉토리 한 단계 읽기 (DirEntry의 d_type으로 종류 판별, 트랜스크립트만 stat)
+
+    Returns:
+        tuple: (하위 디렉토리 경로 리스트, [(트랜스크립트 경로, stat)])
+    """
+    subdirs = []
+    files = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    # rglob과 같이 디렉토리 심볼릭 링크는 따라가지 않음
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(suffixes):
+                        files.append((entry.path, entry.stat()))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return subdirs, files
+
+
+def walk_sessions(projects_dir, workers=WALK_WORKERS):
+    """
+    projects_dir 아래의 트랜스크립트(.jsonl, 압축본)를 stat과 함께 탐색
+
+    os.scandir로 디렉토리당 한 번 읽고, 하위 디렉토리는 thread pool로 동시에 탐색
+    (workers가 1 이하이면 순차)
+
+    Returns:
+        list: SessionPath (경로순, stat_result 포함)
+    """
+    suffixes = ('.jsonl',) + tuple('.jsonl' + suffix for suffix in cold_storage.COMPRESSED_SUFFIXES)
+    found = []
+    if workers <= 1:
+        pending = [str(projects_dir)]
+        while pending:
+            subdirs, files = _scan_directory(pending.pop(), suffixes)
+            pending.extend(subdirs)
+            found.extend(files)
+    else:
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(_scan_directory, str(projects_dir), suffixes)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    subdirs, files = future.result()
+                    found.extend(files)
+                    pending.update(pool.submit(_scan_directory, subdir, suffixes) for subdir in subdirs)
+
+    found.sort()
+    session_files = []
+    for path, stat in found:
+        session_file = SessionPath(path)
+        session_file.stat_result = stat
+        session_files.append(session_file)
+    return session_files
+
+
+def find_all_sessions(projects_dir=None, workers=WALK_WORKERS):
+    """
+    모든 Claude 프로젝트의 세션 파일 찾기
+
+    Args:
+        projects_dir: 프로젝트 디렉토리 (기본: ~/.claude/projects)
+        workers: 디렉토리 탐색 thread 수
+
+    Returns:
+        list: SessionPath (stat_result 포함)
+    """
+    if projects_dir is None:
+        projects_dir = Path.home() / '.claude' / 'projects'
+
+    session_files = walk_sessions(projects_dir, workers)
+
+    # 압축된 트랜스크립트 (압축 중이라 원본이 아직 남아 있으면 원본만 사용)
+    originals = {str(path) for path in session_files if not cold_storage.is_compressed(path)}
+    return [path for path in session_files
+            if not cold_storage.is_compressed(path) or cold_storage.uncompressed_path(path) not in originals]
+
+
+def load_all_events(session_files=None, start=None, end=None):
+    """
+    모든 세션 파일의 usage 이벤트를 시간순으로 로드 (backtest/replay용)
+
+    Args:
+        session_files: 세션 파일 리스트 (기본: 전체)
+        start, end: [start, end) 구간만 (UTC epoch, zone map으로 구간 밖 블록은 읽지 않음)
+
+    Returns:
+        list: 시간순 usage 이벤트
+    """
+    if session_files is None:
+        session_files = find_all_sessions()
+    if start is None and end is None:
+        events = list(iter_new_events(session_files, {}))
+    else:
+        events = list(zone_maps.iter_range_events(session_files, start, end))
+    events.sort(key=lambda event: event.timestamp)
+    return events
+
+
+def parse_usage_line(line):
+    """
+    트랜스크립트 한 줄에서 usage 이벤트 추출
+
+    Args:
+        line: JSONL 한 줄 (bytes 또는 str)
+
+    Returns:
+        UsageEvent: usage 이벤트 (assistant 메시지가 아니거나 usage가 없으면 None)
+    """
+    # assistant 메시지가 아니면 JSON 파싱 생략
+    if isinstance(line, bytes):
+        if b'"assistant"' not in line:
+            return None
+    elif '"assistant"' not in line:
+        return None
+
+    fields = json_backend.decode_usage_line(line)
+    if fields is None:
+        return None
+
+    timestamp_str, input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens = fields
+    try:
+        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00')).timestamp()
+    except (ValueError, AttributeError):
+        return None
+
+    return UsageEvent(timestamp, input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens)
+
+
+def new_cursor(inode):
+    """파일 커서 생성"""
+    return {
+        'offset': 0,
+        'size': 0,
+        'mtime': 0.0,
+        'inode': inode
+    }
+
+
+def iter_new_events(session_files, cursors, budget=None, dormant_before=None, rewritten=None):
+    """
+    커서 이후에 추가된 usage 이벤트를 순회
+
+    - 파일이 줄어들었거나 inode가 바뀌면(다시 쓰임) 처음부터 다시 읽음
+      rewritten 리스트를 넘기면 대신 그 경로를 기록하고 파일 끝으로 커서만 옮김
+      (이미 누적한 그 파일의 이벤트를 호출자가 정리해야 하므로 다시 내보내지 않음)
+    - 압축 파일은 바뀌지 않는 한 한 번만 요약 이벤트를 내보냄
+    - dormant_before 이전에 마지막으로 수정된 파일은 어떤 윈도우에도 들어갈 이벤트가
+      없으므로 읽지 않고 커서도 보관하지 않음 (다시 수정되면 처음부터 읽어도
+      윈도우 밖의 옛 이벤트는 무시되므로 중복 집계 없음)
+    - 큰 파일을 처음부터 읽을 때: zone map이 있으면 dormant_before 이전 이벤트만 있는
+      앞쪽 블록은 건너뛰고, 없으면 읽으면서 만듦
+    - 마지막 줄이 아직 쓰는 중(개행 없음)이면 다음 tick으로 미룸
+    - stat은 탐색 단계 결과(SessionPath.stat_result)를 재사용하고 그 크기까지만 읽음
+    - 사라진 파일의 커서는 삭제
+
+    Args:
+        session_files: 세션 파일 리스트
+        cursors: {path: cursor} (제자리 갱신)
+        budget: ScanBudget (None이면 제한 없음)
+        dormant_before: 휴면 판정 기준 시점 (UTC epoch, None이면 모두 읽음)
+        rewritten: 다시 쓰인 파일 경로를 추가할 리스트 (None이면 처음부터 다시 읽음)
+
+    Yields:
+        UsageEvent: usage 이벤트 (file 포함)
+    """
+    seen = set()
+
+    for session_file in session_files:
+        if budget is not None and budget.exhausted:
+            return
+
+        path = str(session_file)
+        seen.add(path)
+
+        try:
+            stat = file_stat(session_file)
+        except OSError:
+            continue
+
+        cursor = cursors.get(path)
+
+        if dormant_before is not None and stat.st_mtime < dormant_before:
+            # 휴면 파일: 다 읽은 커서는 내보내고(evict) 새로 읽지 않음
+            if cursor is not None and (cursor['offset'] >= stat.st_size or cold_storage.is_compressed(path)):
+                del cursors[path]
+                continue
+            if cursor is None:
+                continue
+
+        if cold_storage.is_compressed(path):
+            if cursor is not None and (cursor['inode'], cursor['size'], cursor['mtime']) == \
+                    (stat.st_ino, stat.st_size, stat.st_mtime):
+                continue
+            rewrite = cursor is not None
+            cursor = new_cursor(stat.st_ino)
+            cursor['size'] = stat.st_size
+            cursor['mtime'] = stat.st_mtime
+            if rewrite and rewritten is not None:
+                rewritten.append(path)
+                cursor['offset'] = stat.st_size
+                cursors[path] = cursor
+                continue
+            if budget is not None:
+                budget.consume(stat.st_size)
+            yield from cold_storage.iter_compressed_events(path, stat, cursors)
+            cursor['offset'] = stat.st_size
+            cursors[path] = cursor
+            continue
+
+        builder = None
+        if cursor is None or cursor['inode'] != stat.st_ino or stat.st_size < cursor['offset']:
+            rewrite = cursor is not None
+            cursor = new_cursor(stat.st_ino)
+            cursors[path] = cursor
+            if rewrite and rewritten is not None:
+                rewritten.append(path)
+                cursor['offset'] = cursor['size'] = stat.st_size
+                cursor['mtime'] = stat.st_mtime
+                continue
+            if stat.st_size >= zone_maps.MIN_FILE_BYTES:
+                zone_map = zone_maps.load_zone_map(path, stat)
+                if zone_map is None:
+                    builder = zone_maps.ZoneMapBuilder(path, stat)
+                elif dormant_before is not None:
+                    cursor['offset'] = zone_maps.skip_offset(zone_map, dormant_before)
+
+        cursor['size'] = stat.st_size
+        cursor['mtime'] = stat.st_mtime
+
+        if stat.st_size == cursor['offset']:
+            continue
+
+        try:
+            with open(path, 'rb') as f:
+                f.seek(cursor['offset'])
+                pending = b''
+                # stat 시점 크기까지만 읽음 (탐색 단계 stat을 재사용하므로 커서가 size를 넘지 않도록)
+                remaining = stat.st_size - cursor['offset']
+                while remaining > 0 and (budget is None or not budget.exhausted):
+                    chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    if budget is not None:
+                        budget.consume(len(chunk))
+
+                    chunk = pending + chunk
+                    last_newline = chunk.rfind(b'\n')
+                    if last_newline < 0:
+                        pending = chunk
+                        continue
+
+                    pending = chunk[last_newline + 1:]
+                    for line in chunk[:last_newline].split(b'\n'):
+                        event = parse_usage_line(line)
+                        if event is not None:
+                            event.file = path
+                            if builder is not None:
+                                builder.add_event(event)
+                            yield event
+
+                    cursor['offset'] += last_newline + 1
+                    if builder is not None:
+                        builder.close_block(cursor['offset'])
+            if builder is not None:
+                builder.save()
+        except OSError:
+            continue
+
+    # 사라진 파일 정리
+    for path in list(cursors):
+        if path not in seen:
+            del cursors[path]
+
+
+def pending_scan_bytes(session_files, cursors, dormant_before=None):
+    """
+    iter_new_events가 아직 읽지 않은 바이트 추정 (예산으로 미뤄진 backlog)
+
+    휴면 파일은 iter_new_events처럼 제외하고, zone map으로 건너뛸 부분도 포함하므로
+    실제보다 클 수 있음
+
+    Returns:
+        tuple: (바이트 수, 파일 수)
+    """
+    total = 0
+    files = 0
+    for session_file in session_files:
+        path = str(session_file)
+        try:
+            stat = file_stat(session_file)
+        except OSError:
+            continue
+
+        cursor = cursors.get(path)
+        if dormant_before is not None and stat.st_mtime < dormant_before and cursor is None:
+            continue
+
+        if cold_storage.is_compressed(path):
+            if cursor is not None and (cursor['inode'], cursor['size'], cursor['mtime']) == \
+                    (stat.st_ino, stat.st_size, stat.st_mtime):
+                continue
+            remaining = stat.st_size
+        elif cursor is None or cursor['inode'] != stat.st_ino or stat.st_size < cursor['offset']:
+            remaining = stat.st_size
+        else:
+            remaining = stat.st_size - cursor['offset']
+
+        if remaining > 0:
+            total += remaining
+            files += 1
+    return total, files
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Shared Snapshot
+데몬이 매 tick 현재 퍼센트/리셋 시간을 고정 레이아웃 mmap 파일에 기록하고,
+로컬 리더(메뉴바 플러그인, 셸 프롬프트, 에디터 상태줄)는 한 번 매핑한 뒤
+syscall 없이 메모리에서 바로 읽는다 (~/.claude_usage.json을 매번 열고 파싱하지 않음).
+
+- multiprocessing.shared_memory 대신 ~/.claude-monitor/usage.shm 파일을 매핑
+  (리소스 트래커가 프로세스 종료 시 세그먼트를 지우지 않고, 데몬 재시작 후에도
+   같은 inode를 재사용하므로 리더는 다시 매핑할 필요 없음)
+- seqlock: 기록 중에는 seq가 홀수, 끝나면 짝수
+  리더는 seq가 짝수이고 읽기 전후로 같을 때만 값을 사용
+- Python은 메모리 배리어를 지정할 수 없으므로 (ARM 등) payload에 CRC32를 넣어
+  섞인 값을 한 번 더 거름
+- 기록은 데몬 하나만 (flock 단일 인스턴스)
+
+레이아웃 (little-endian):
+  header  : magic(4s) version(H) payload_size(H) seq(Q)
+  payload : published_at(d) status(B)
+            window × 2 (session, weekly):
+              percentage(d) estimated_percentage(d) reset_at(d) window_start(d) window_end(d) anchored(B)
+            crc32(I)
+  값이 없으면 NaN (리더는 None으로 반환)
+"""
+
+import math
+import mmap
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+
+SNAPSHOT_FILE = Path.home() / '.claude-monitor' / 'usage.shm'
+SNAPSHOT_MAGIC = b'CMSS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_WINDOWS = ('session', 'weekly')
+WINDOW_FIELDS = ('percentage', 'estimated_percentage', 'reset_at', 'window_start', 'window_end')
+
+HEADER = struct.Struct('<4sHHQ')
+SEQ = struct.Struct('<Q')
+SEQ_OFFSET = 8
+BODY = struct.Struct('<dB7x' + 'dddddB7x' * len(SNAPSHOT_WINDOWS))
+CRC = struct.Struct('<I4x')
+PAYLOAD_OFFSET = HEADER.size
+CRC_OFFSET = PAYLOAD_OFFSET + BODY.size
+PAYLOAD_SIZE = BODY.size + CRC.size
+
+# 레이아웃이 늘어나도 파일 크기는 유지 (리더 매핑 크기 고정)
+SNAPSHOT_SIZE = mmap.PAGESIZE
+
+STATUS_CODES = {'no_session': 0, 'active': 1}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# 기록 중(홀수 seq)이거나 값이 섞였을 때 다시 읽는 횟수
+MAX_READ_ATTEMPTS = 1000
+
+
+def _number(value):
+    return math.nan if value is None else float(value)
+
+
+def _optional(value):
+    return None if math.isnan(value) else value
+
+
+class SnapshotWriter:
+    """스냅샷 기록 (데몬)"""
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < SNAPSHOT_SIZE:
+                os.ftruncate(fd, SNAPSHOT_SIZE)
+            self._map = mmap.mmap(fd, SNAPSHOT_SIZE)
+        finally:
+            os.close(fd)
+
+        # 이전 데몬의 스냅샷은 그대로 읽을 수 있게 두고 seq를 이어감
+        # 새 파일, 레이아웃 변경, 기록 도중 종료(홀수 seq)면 첫 publish 전까지 "기록 없음"(seq 0)
+        magic, version, payload_size, seq = HEADER.unpack_from(self._map, 0)
+        if (magic, version, payload_size) != (SNAPSHOT_MAGIC, SNAPSHOT_VERSION, PAYLOAD_SIZE) or seq & 1:
+            seq = 0
+        self._seq = seq
+        HEADER.pack_into(self._map, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, PAYLOAD_SIZE, self._seq)
+
+    def publish(self, status, windows, published_at=None):
+        """
+        스냅샷 교체
+
+        Args:
+            status: 'active' / 'no_session'
+            windows: {window: {"percentage", "estimated_percentage", "reset_at",
+                               "window_start", "window_end", "anchored"}} (epoch 초, 없으면 None)
+            published_at: 기록 시간 (기본: 현재)
+        """
+        values = [time.time() if published_at is None else published_at, STATUS_CODES.get(status, 0)]
+        for window in SNAPSHOT_WINDOWS:
+            fields = windows.get(window) or {}
+            values += [_number(fields.get(name)) for name in WINDOW_FIELDS]
+            values.append(1 if fields.get('anchored') else 0)
+
+        body = BODY.pack(*values)
+        payload = body + CRC.pack(zlib.crc32(body))
+
+        self._seq += 1
+        SEQ.pack_into(self._map, SEQ_OFFSET, self._seq)
+        self._map[PAYLOAD_OFFSET:PAYLOAD_OFFSET + PAYLOAD_SIZE] = payload
+        self._seq += 1
+        SEQ.pack_into(self._map, SEQ_OFFSET, self._seq)
+
+    def close(self):
+        self._map.close()
+
+
+class SnapshotReader:
+    """
+    스냅샷 읽기 (리더 프로세스)
+
+    처음 read()에서 파일을 매핑하고, 이후에는 매핑된 메모리만 읽는다.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = Path(path)
+        self._map = None
+
+    def _open(self):
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            if os.fstat(fd).st_size < SNAPSHOT_SIZE:
+                return False
+            self._map = mmap.mmap(fd, SNAPSHOT_SIZE, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        return True
+
+    def read_values(self):
+        """
+        일관된 payload 값 (BODY 순서 tuple)
+
+        Returns:
+            tuple: 아직 기록되지 않았거나, 레이아웃이 다르거나, 계속 기록 중이면 None
+        """
+        if self._map is None and not self._open():
+            return None
+
+        mapping = self._map
+        for _ in range(MAX_READ_ATTEMPTS):
+            magic, version, payload_size, seq = HEADER.unpack_from(mapping, 0)
+            if (magic, version, payload_size) != (SNAPSHOT_MAGIC, SNAPSHOT_VERSION, PAYLOAD_SIZE):
+                return None
+            if seq == 0:
+                return None
+            if seq & 1:
+                continue
+
+            payload = mapping[PAYLOAD_OFFSET:PAYLOAD_OFFSET + PAYLOAD_SIZE]
+            if SEQ.unpack_from(mapping, SEQ_OFFSET)[0] != seq:
+                continue
+            if zlib.crc32(payload[:BODY.size]) != CRC.unpack_from(payload, BODY.size)[0]:
+                continue
+            return BODY.unpack_from(payload)
+        return None
+
+    def read(self):
+        """
+        현재 스냅샷
+
+        Returns:
+            dict: {
+                "published_at": epoch, "status": "active",
+                "session": {"percentage", "estimated_percentage", "reset_at",
+                            "window_start", "window_end", "anchored"},
+                "weekly": {...}
+            }
+            없으면 None
+        """
+        values = self.read_values()
+        if values is None:
+            return None
+
+        snapshot = {'published_at': values[0], 'status': STATUS_NAMES.get(values[1], 'unknown')}
+        offset = 2
+        for window in SNAPSHOT_WINDOWS:
+            fields = values[offset:offset + len(WINDOW_FIELDS) + 1]
+            snapshot[window] = {name: _optional(value) for name, value in zip(WINDOW_FIELDS, fields)}
+            snapshot[window]['anchored'] = bool(fields[-1])
+            offset += len(WINDOW_FIELDS) + 1
+        return snapshot
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def read_snapshot(path=SNAPSHOT_FILE):
+    """1회 읽기 (반복해서 읽는 프로세스는 SnapshotReader를 유지)"""
+    reader = SnapshotReader(path)
+    try:
+        return reader.read()
+    finally:
+        reader.close()
+
+
+def format_prompt(snapshot):
+    """셸 프롬프트/상태줄용 한 줄 ("S 42% W 17%")"""
+    if snapshot is None or snapshot['status'] != 'active':
+        return ''
+    parts = []
+    for window, label in (('session', 'S'), ('weekly', 'W')):
+        percentage = snapshot[window]['percentage']
+        if percentage is not None:
+            parts.append(f'{label} {percentage:g}%')
+    return ' '.join(parts)
+
+
+def main():
+    """메인 함수"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Read the daemon usage snapshot (shared memory)')
+    parser.add_argument('--prompt', action='store_true',
+                        help='Print a one-line summary for shell prompts')
+    args = parser.parse_args()
+
+    snapshot = read_snapshot()
+    if args.prompt:
+        print(format_prompt(snapshot))
+        return 0
+    if snapshot is None:
+        print('No snapshot (is the daemon running?)')
+        return 1
+    print(json.dumps(snapshot, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
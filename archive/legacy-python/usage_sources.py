@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Usage Sources
+여러 사용량 소스의 관측값을 하나의 스냅샷으로 병합
+
+소스:
+- transcripts: 로컬 트랜스크립트 토큰으로 계산한 추정치 (monitor_daemon)
+- extension:   Chrome Extension이 스크래핑한 실제 퍼센트 (/tmp/claude-web-usage.json,
+               데몬이 실행 중이면 Native Messaging 호스트가 데몬 소켓으로 직접 전달 → push)
+- manual:      수동 입력한 실제 퍼센트 (~/.claude-monitor/manual_usage.json,
+               claude-manual-update = claude-usage-sync --manual이 기록)
+
+소스 인터페이스 (listener와 같은 duck typing):
+- name: 소스 이름
+- ground_truth: 실제 사용량(웹 표시값)이면 True
+- stale_after: 이 시간(초)이 지난 관측값은 fresh가 아님
+- poll(now_epoch): 관측값 dict 또는 None (데이터 없음)
+
+관측값:
+{
+    "source": name,
+    "observed_at": epoch,
+    "ground_truth": bool,
+    "session": {"percentage": float, "reset_time": str},
+    "weekly": {...}
+}
+
+병합 (anchor):
+실제 퍼센트 P0를 관측한 시점의 로컬 추정치 E0를 기록해 두었다가,
+현재 추정치 E와의 차이(그 이후 로컬에서 쓴 양)만큼 더한다: P0 + (E - E0)
+추정치 기록은 집계 상태에 저장되어 --once/재시작 후에도 유지된다.
+
+실행:
+    python3 usage_sources.py --status         # 소스별 관측값/freshness
+"""
+
+import bisect
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+EXTENSION_USAGE_FILE = Path('/tmp/claude-web-usage.json')
+MANUAL_USAGE_FILE = Path.home() / '.claude-monitor' / 'manual_usage.json'
+
+USAGE_WINDOWS = ('session', 'weekly')
+DEFAULT_STALE_AFTER_SECONDS = 3600
+DEFAULT_SOURCE_TIMEOUT_SECONDS = 2.0
+
+# anchor 시점의 추정치로 인정할 기록 간격 (이보다 오래된 기록이면 사이에 쓴 양을 모름)
+MAX_ESTIMATE_GAP_SECONDS = 600
+
+
+def parse_observed_at(value, fallback):
+    """ISO 시간 문자열 → epoch (없거나 잘못되었으면 fallback)"""
+    if not value:
+        return fallback
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return fallback
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def format_epoch(epoch):
+    """epoch → UTC ISO 문자열"""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class UsageFileSource:
+    """
+    웹 사용량 JSON 파일 소스 (claude-sync-from-extension, claude-manual-update 형식)
+
+    {"timestamp": ISO, "source": ..., "session": {"percentage", "reset_time"}, "weekly": {...}}
+
+    같은 형식의 문서를 push()로 직접 받을 수도 있다 (데몬 소켓, 파일 없이).
+    poll()은 파일과 push된 문서 중 더 최근 관측값을 사용한다.
+    """
+
+    ground_truth = True
+
+    def __init__(self, name, path, stale_after=DEFAULT_STALE_AFTER_SECONDS):
+        self.name = name
+        self.path = Path(path)
+        self.stale_after = stale_after
+        self.pushed = None       # (문서, 받은 시각)
+
+    def push(self, data, now_epoch):
+        """파일 대신 직접 받은 문서 (다음 poll부터 반영)"""
+        self.pushed = (data, now_epoch)
+
+    def poll(self, now_epoch):
+        pushed = self._observe(*self.pushed) if self.pushed is not None else None
+        try:
+            stat = os.stat(self.path)
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return pushed
+
+        observation = self._observe(data, stat.st_mtime)
+        if pushed is not None and pushed['observed_at'] >= observation['observed_at']:
+            return pushed
+        return observation
+
+    def _observe(self, data, fallback_epoch):
+        observation = {
+            'source': self.name,
+            'origin': data.get('source'),
+            'observed_at': parse_observed_at(data.get('timestamp'), fallback_epoch),
+            'ground_truth': self.ground_truth
+        }
+        for window in USAGE_WINDOWS:
+            value = data.get(window) or {}
+            percentage = value.get('percentage')
+            # claude-usage-sync validate_usage_fields와 같은 기준 (0~100 숫자만)
+            if isinstance(percentage, (int, float)) and not isinstance(percentage, bool) and 0 <= percentage <= 100:
+                observation[window] = {
+                    'percentage': float(percentage),
+                    'reset_time': value.get('reset_time') or None
+                }
+        return observation
+
+
+def create_extension_source(source_config):
+    return UsageFileSource('extension', source_config.get('path', EXTENSION_USAGE_FILE),
+                           source_config.get('stale_after_seconds', DEFAULT_STALE_AFTER_SECONDS))
+
+
+def create_manual_source(source_config):
+    # 수동 입력은 다시 입력할 때까지 유효하다고 보고 하루를 기본값으로 사용
+    return UsageFileSource('manual', source_config.get('path', MANUAL_USAGE_FILE),
+                           source_config.get('stale_after_seconds', 24 * 3600))
+
+
+# 소스 종류 → factory(source_config) (register_source로 추가)
+SOURCE_FACTORIES = {
+    'extension': create_extension_source,
+    'manual': create_manual_source
+}
+DEFAULT_SOURCES = ('extension', 'manual')
+
+
+def register_source(kind, factory):
+    """
+    소스 종류 등록 (플러그인)
+
+    Args:
+        kind: config의 sources.enabled에 쓰는 이름
+        factory: factory(source_config) → 소스 객체
+    """
+    SOURCE_FACTORIES[kind] = factory
+
+
+def create_sources(config):
+    """설정에 따라 외부 소스 생성 (sources.enabled, sources.<kind>)"""
+    sources_config = config.get('sources', {})
+    sources = []
+    for kind in sources_config.get('enabled', DEFAULT_SOURCES):
+        factory = SOURCE_FACTORIES.get(kind)
+        if factory is None:
+            print(f"Warning: Unknown usage source '{kind}'")
+            continue
+        sources.append(factory(sources_config.get(kind, {})))
+    return sources
+
+
+class SourceRunner:
+    """
+    외부 소스를 스레드 풀에서 동시에 읽음
+
+    start()로 읽기를 시작하고(트랜스크립트 처리와 동시에 진행), collect()로 수거한다.
+    timeout 안에 끝나지 않은 소스는 다음 collect()에서 수거하고,
+    그동안은 마지막 관측값을 사용한다 (freshness로 드러남).
+    """
+
+    def __init__(self, sources, timeout=DEFAULT_SOURCE_TIMEOUT_SECONDS):
+        self.sources = sources
+        self.timeout = timeout
+        self.latest = {}     # name -> 관측값
+        self.errors = {}     # name -> 오류 메시지
+        self._pending = {}   # name -> future
+        self._executor = None
+
+    def start(self, now_epoch):
+        """진행 중이 아닌 소스의 읽기 시작"""
+        if not self.sources:
+            return
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=len(self.sources),
+                                                thread_name_prefix='usage-source')
+        for source in self.sources:
+            if source.name not in self._pending:
+                self._pending[source.name] = self._executor.submit(source.poll, now_epoch)
+
+    def collect(self):
+        """
+        끝난 읽기 수거 (최대 timeout초 대기)
+
+        Returns:
+            list: 소스별 최신 관측값
+        """
+        if self._pending:
+            from concurrent.futures import wait
+            wait(list(self._pending.values()), timeout=self.timeout)
+
+        for name, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[name]
+            try:
+                observation = future.result()
+            except Exception as e:
+                self.errors[name] = str(e)
+                continue
+            self.errors.pop(name, None)
+            if observation is None:
+                self.latest.pop(name, None)
+            else:
+                self.latest[name] = observation
+
+        return list(self.latest.values())
+
+    def push(self, name, data, now_epoch):
+        """
+        소스에 직접 받은 문서 전달 (push를 지원하는 소스만)
+
+        Returns:
+            bool: 전달 여부 (해당 소스가 꺼져 있으면 False)
+        """
+        for source in self.sources:
+            if source.name == name and hasattr(source, 'push'):
+                source.push(data, now_epoch)
+                return True
+        return False
+
+    def pushed(self, name):
+        """소스가 마지막으로 push받은 문서 (없으면 None)"""
+        for source in self.sources:
+            if source.name == name and getattr(source, 'pushed', None) is not None:
+                return source.pushed[0]
+        return None
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def record_estimate(history, window, now_epoch, window_start, percentage):
+    """
+    로컬 추정치 기록 (anchor 계산용)
+
+    같은 값이 이어지는 구간은 하나의 run(시작, 마지막 확인 시각, 값)으로 저장한다.
+    윈도우 시작 이전에 끝난 run은 버린다 (고정 윈도우는 리셋 시 전부, rolling은 지난 부분만).
+    """
+    runs = history.setdefault(window, {'starts': [], 'ends': [], 'values': []})
+    starts, ends, values = runs['starts'], runs['ends'], runs['values']
+
+    expired = bisect.bisect_left(ends, window_start)
+    if expired:
+        del starts[:expired]
+        del ends[:expired]
+        del values[:expired]
+
+    if values and values[-1] == percentage and now_epoch - ends[-1] <= MAX_ESTIMATE_GAP_SECONDS:
+        ends[-1] = now_epoch
+    else:
+        starts.append(now_epoch)
+        ends.append(now_epoch)
+        values.append(percentage)
+
+
+def estimate_at(history, window, epoch):
+    """
+    epoch 시점의 로컬 추정치
+
+    Returns:
+        float: 추정치 (그 시점을 덮는 기록이 없으면 None. 데몬이 꺼져 있던 동안
+               쓴 양은 알 수 없으므로 마지막 확인 후 MAX_ESTIMATE_GAP_SECONDS까지만 인정)
+    """
+    runs = history.get(window)
+    if not runs:
+        return None
+    index = bisect.bisect_right(runs['starts'], epoch) - 1
+    if index < 0 or epoch - runs['ends'][index] > MAX_ESTIMATE_GAP_SECONDS:
+        return None
+    return runs['values'][index]
+
+
+def merge_observations(history, estimate, observations, now_epoch, errors=None, stale_after=None):
+    """
+    로컬 추정치와 외부 관측값을 하나의 스냅샷으로 병합
+
+    Args:
+        history: record_estimate() 기록 (집계 상태에 저장)
+        estimate: 트랜스크립트 관측값 ({window: {"percentage", "window_start"}} 포함)
+        observations: 외부 소스 관측값 리스트
+        now_epoch: 현재 시간
+        errors: {source: message}
+        stale_after: {source: seconds} (없으면 기본값)
+
+    Returns:
+        dict: {
+            "session": {"percentage", "estimated_percentage", "source", "anchor"},
+            "weekly": {...},
+            "sources": {name: {"observed_at", "age_seconds", "fresh", ...}}
+        }
+    """
+    stale_after = stale_after or {}
+    snapshot = {'sources': {}}
+
+    for observation in [estimate] + observations:
+        name = observation['source']
+        age = max(0.0, now_epoch - observation['observed_at'])
+        info = {
+            'observed_at': format_epoch(observation['observed_at']),
+            'age_seconds': round(age),
+            'fresh': age <= stale_after.get(name, DEFAULT_STALE_AFTER_SECONDS),
+            'ground_truth': observation['ground_truth']
+        }
+        if observation.get('origin'):
+            info['origin'] = observation['origin']
+        snapshot['sources'][name] = info
+
+    for name, message in (errors or {}).items():
+        snapshot['sources'].setdefault(name, {'fresh': False, 'ground_truth': True})['error'] = message
+
+    for window in USAGE_WINDOWS:
+        local = estimate.get(window)
+        if local is None:
+            continue
+        estimated = local['percentage']
+        record_estimate(history, window, now_epoch, local['window_start'], estimated)
+
+        # 현재 윈도우 안에서 관측된 가장 최근 실제값
+        candidates = [
+            observation for observation in observations
+            if observation['ground_truth'] and window in observation
+            and local['window_start'] <= observation['observed_at'] <= now_epoch
+        ]
+        merged = {
+            'percentage': estimated,
+            'estimated_percentage': estimated,
+            'source': estimate['source'],
+            'anchor': None
+        }
+
+        if candidates:
+            latest = max(candidates, key=lambda observation: observation['observed_at'])
+            actual = latest[window]['percentage']
+            baseline = estimate_at(history, window, latest['observed_at'])
+            fresh = snapshot['sources'][latest['source']]['fresh']
+
+            if baseline is not None:
+                # 실제값 + 그 이후 로컬에서 늘어난 양
+                merged['percentage'] = round(max(0.0, actual + estimated - baseline), 1)
+                merged['source'] = f"{latest['source']}+{estimate['source']}"
+            elif fresh:
+                # 관측 시점 추정치를 모르면 (기록 이전 관측) 실제값을 그대로 사용
+                merged['percentage'] = round(actual, 1)
+                merged['source'] = latest['source']
+
+            if baseline is not None or fresh:
+                merged['anchor'] = {
+                    'source': latest['source'],
+                    'percentage': actual,
+                    'observed_at': format_epoch(latest['observed_at']),
+                    'estimate_at_observation': baseline,
+                    'reset_time': latest[window].get('reset_time')
+                }
+
+        snapshot[window] = merged
+
+    return snapshot
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Claude Monitor usage sources')
+    parser.add_argument('--status', action='store_true',
+                        help='Show the latest observation of each external source')
+
+    args = parser.parse_args()
+
+    if args.status:
+        now_epoch = time.time()
+        runner = SourceRunner([SOURCE_FACTORIES[kind]({}) for kind in DEFAULT_SOURCES])
+        runner.start(now_epoch)
+        observations = {observation['source']: observation for observation in runner.collect()}
+        runner.close()
+
+        print("\n📡 Usage sources")
+        for source in runner.sources:
+            observation = observations.get(source.name)
+            if observation is None:
+                message = runner.errors.get(source.name, 'no data')
+                print(f"   {source.name:<10} {message}")
+                continue
+            age = now_epoch - observation['observed_at']
+            fresh = '✅' if age <= source.stale_after else '⚠️ stale'
+            values = ', '.join(f"{window} {observation[window]['percentage']:g}%"
+                               for window in USAGE_WINDOWS if window in observation)
+            print(f"   {source.name:<10} {values} ({age / 60:.0f} min ago) {fresh}")
+
+    if not args.status:
+        parser.print_help()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Transcript Walk Benchmark
+느린(네트워크) 홈 디렉토리에서 트랜스크립트 탐색 + stat 비용 비교
+
+메타데이터 호출(os.scandir 디렉토리 읽기, os.stat, DirEntry.stat)마다 지연을 주입하여
+NFS/SMB 홈 디렉토리의 왕복 지연을 흉내 낸다 (sleep은 GIL을 놓으므로 실제 syscall처럼 겹침).
+
+시나리오:
+- rglob+stat:  기존 방식 (확장자별 rglob + iter_new_events에서 파일마다 os.stat)
+- scandir:     walk_sessions(workers=1) (디렉토리당 scandir 1회, DirEntry stat 재사용)
+- scandir-N:   walk_sessions(workers=N) (하위 디렉토리를 thread pool로 동시에 탐색)
+
+임시 디렉토리에 프로젝트/세션/subagent 트리를 만들어 측정한다.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import cold_storage
+from usage_scanner import WALK_WORKERS, walk_sessions
+
+
+class SlowEntry:
+    """stat()에 지연을 주는 DirEntry 프록시 (d_type 기반 is_dir/is_file은 그대로)"""
+
+    __slots__ = ('_entry', '_delay')
+
+    def __init__(self, entry, delay):
+        self._entry = entry
+        self._delay = delay
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def stat(self, *, follow_symlinks=True):
+        time.sleep(self._delay)
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class SlowScandir:
+    """os.scandir 결과를 감싸 항목을 SlowEntry로 내보냄 (context manager 지원)"""
+
+    def __init__(self, iterator, delay):
+        self._iterator = iterator
+        self._delay = delay
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return SlowEntry(next(self._iterator), self._delay)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._iterator.close()
+
+    def close(self):
+        self._iterator.close()
+
+
+@contextmanager
+def injected_latency(delay):
+    """os.scandir/os.stat/DirEntry.stat 호출마다 delay초 지연"""
+    real_scandir, real_stat = os.scandir, os.stat
+
+    def slow_scandir(path='.'):
+        time.sleep(delay)
+        return SlowScandir(real_scandir(path), delay)
+
+    def slow_stat(path, *args, **kwargs):
+        time.sleep(delay)
+        return real_stat(path, *args, **kwargs)
+
+    os.scandir, os.stat = slow_scandir, slow_stat
+    try:
+        yield
+    finally:
+        os.scandir, os.stat = real_scandir, real_stat
+
+
+def build_tree(root, projects, sessions):
+    """projects × sessions 트랜스크립트 (세션마다 subagents 디렉토리 일부 포함)"""
+    count = 0
+    for project in range(projects):
+        project_dir = root / f'-home-user-project-{project}'
+        for session in range(sessions):
+            project_dir.mkdir(parents=True, exist_ok=True)
+            (project_dir / f'session-{session}.jsonl').write_text('{}\n')
+            count += 1
+            if session % 5 == 0:
+                subagents = project_dir / f'session-{session}' / 'subagents'
+                subagents.mkdir(parents=True)
+                for agent in range(3):
+                    (subagents / f'agent-{agent}.jsonl').write_text('{}\n')
+                    count += 1
+    return count
+
+
+def rglob_with_stat(projects_dir):
+    """기존 find_all_sessions + iter_new_events의 파일별 stat"""
+    session_files = list(projects_dir.rglob('*.jsonl'))
+    originals = {str(path) for path in session_files}
+    for suffix in cold_storage.COMPRESSED_SUFFIXES:
+        for path in projects_dir.rglob('*.jsonl' + suffix):
+            if cold_storage.uncompressed_path(path) not in originals:
+                session_files.append(path)
+    return [(path, os.stat(path)) for path in session_files]
+
+
+def measure(func, repeat):
+    """repeat회 중 최소 시간 (초)과 마지막 결과"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Benchmark transcript discovery on a slow filesystem')
+    parser.add_argument('--projects', type=int, default=30,
+                        help='Number of project directories (default: 30)')
+    parser.add_argument('--sessions', type=int, default=20,
+                        help='Transcripts per project (default: 20)')
+    parser.add_argument('--latency-ms', type=float, default=1.0,
+                        help='Injected latency per metadata call in ms (default: 1.0)')
+    parser.add_argument('--workers', type=int, default=WALK_WORKERS,
+                        help=f'Threads for the parallel walk (default: {WALK_WORKERS})')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per scenario, best is reported (default: 3)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        projects_dir = Path(tmp_dir) / 'projects'
+        count = build_tree(projects_dir, args.projects, args.sessions)
+
+        with injected_latency(args.latency_ms / 1000):
+            results = {
+                'rglob+stat': measure(lambda: rglob_with_stat(projects_dir), args.repeat),
+                'scandir': measure(lambda: walk_sessions(projects_dir, workers=1), args.repeat),
+                f'scandir-{args.workers}': measure(lambda: walk_sessions(projects_dir, workers=args.workers),
+                                                   args.repeat),
+            }
+
+    expected = sorted(str(path) for path, _ in results['rglob+stat'][1])
+    for name, (_, found) in list(results.items())[1:]:
+        paths = [str(path) for path in found]
+        if paths != expected:
+            print(f"❌ {name} found {len(paths)} transcript(s), expected {len(expected)}")
+            return 1
+
+    baseline = results['rglob+stat'][0]
+    print(f"{count:,} transcripts, {args.latency_ms:g} ms per metadata call")
+    print(f"{'scenario':<14}{'ms':>10}{'vs rglob':>10}")
+    for name, (elapsed, _) in results.items():
+        print(f"{name:<14}{elapsed * 1000:>10.1f}{baseline / elapsed:>9.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
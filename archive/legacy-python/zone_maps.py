@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Claude Monitor - Zone Maps
+큰 트랜스크립트의 블록 요약(sidecar)으로 과거 구간 조회 시 파싱 건너뛰기
+
+증분 tailing은 새로 추가된 줄만 읽지만, 전체 재스캔(주간 anchor 변경 등으로
+윈도우가 최근 이벤트 버퍼보다 이른 시점에서 시작), replay/backfill, 임의 구간
+조회는 수백 MB 트랜스크립트를 처음부터 다시 파싱해야 한다.
+
+- 트랜스크립트마다 ~1 MB 블록(줄 경계)별로
+  [시작 offset, 끝 offset, 최소 timestamp, 최대 timestamp,
+   input, output, cache_read, cache_creation, 메시지 수]
+  를 ~/.claude-monitor/zonemaps/<경로 해시>.json에 저장
+- 구간 조회: 구간 안에 완전히 들어가는 블록은 요약을 더하고, 걸친 블록만 파싱
+  (트랜스크립트는 시간순으로 추가되므로 보통 양 끝 두 블록)
+- 재스캔: 어떤 윈도우에도 들지 않는 앞쪽 블록은 읽지 않고 커서를 옮김
+- lazy 생성: usage_scanner가 처음부터 끝까지 읽을 때 함께 만들고,
+  조회 시 없으면 만들거나 뒤에 추가된 부분만 덧붙임
+- 파일이 줄어들었거나 inode가 바뀌면 버리고 다시 만듦
+
+작은 파일(MIN_FILE_BYTES 미만)은 sidecar 없이 그대로 파싱하고,
+압축 트랜스크립트는 cold_storage의 분 단위 요약을 사용한다.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cold_storage
+import usage_scanner
+
+
+ZONE_MAP_DIR = Path.home() / '.claude-monitor' / 'zonemaps'
+ZONE_MAP_VERSION = 1
+# usage_scanner.READ_CHUNK_SIZE와 같음 (스캔 chunk마다 블록 1개)
+BLOCK_SIZE = 1024 * 1024
+# 이보다 작은 파일은 sidecar 없이 그대로 파싱
+MIN_FILE_BYTES = 4 * BLOCK_SIZE
+
+
+def sidecar_path(path):
+    """트랜스크립트 경로 → sidecar 경로"""
+    import hashlib
+    digest = hashlib.sha1(str(path).encode('utf-8')).hexdigest()
+    return ZONE_MAP_DIR / f'{digest}.json'
+
+
+def load_zone_map(path, stat):
+    """
+    저장된 zone map
+
+    Returns:
+        dict: {"version", "path", "inode", "size", "blocks"}
+        없거나, 파일이 줄었거나, inode가 바뀌었으면 None
+    """
+    try:
+        with open(sidecar_path(path), 'r') as f:
+            zone_map = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(zone_map, dict) or zone_map.get('version') != ZONE_MAP_VERSION \
+            or zone_map.get('path') != str(path):
+        return None
+    if zone_map.get('inode') != stat.st_ino or zone_map.get('size', 0) > stat.st_size:
+        return None
+    return zone_map
+
+
+def save_zone_map(zone_map):
+    """zone map 저장 (원자적 교체)"""
+    sidecar = sidecar_path(zone_map['path'])
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = sidecar.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(zone_map, f)
+    os.replace(tmp_file, sidecar)
+
+
+def _new_block(offset):
+    return [offset, offset, None, None, 0, 0, 0, 0, 0]
+
+
+class ZoneMapBuilder:
+    """
+    스캔하면서 블록 요약 생성
+
+    add_event()로 블록의 이벤트를 더하고, 줄 경계 offset에서 close_block()
+    """
+
+    __slots__ = ('zone_map', 'block')
+
+    def __init__(self, path, stat, blocks=None):
+        blocks = blocks or []
+        self.zone_map = {
+            'version': ZONE_MAP_VERSION,
+            'path': str(path),
+            'inode': stat.st_ino,
+            'size': blocks[-1][1] if blocks else 0,
+            'blocks': blocks
+        }
+        self.block = _new_block(self.zone_map['size'])
+
+    def add_event(self, event):
+        block = self.block
+        timestamp = event.timestamp
+        if block[2] is None or timestamp < block[2]:
+            block[2] = timestamp
+        if block[3] is None or timestamp > block[3]:
+            block[3] = timestamp
+        block[4] += event.input_tokens
+        block[5] += event.output_tokens
+        block[6] += event.cache_read_tokens
+        block[7] += event.cache_creation_tokens
+        block[8] += event.messages
+
+    def close_block(self, offset):
+        """offset(줄 경계)까지를 한 블록으로"""
+        self.block[1] = offset
+        self.zone_map['blocks'].append(self.block)
+        self.zone_map['size'] = offset
+        self.block = _new_block(offset)
+
+    def save(self):
+        if self.zone_map['blocks']:
+            save_zone_map(self.zone_map)
+
+
+def get_zone_map(path, stat, build=True):
+    """
+    트랜스크립트의 zone map (lazy)
+
+    Args:
+        path: 트랜스크립트 경로
+        stat: os.stat 결과
+        build: False면 저장된 것만 사용 (뒤에 추가된 부분은 반영하지 않음)
+
+    Returns:
+        dict: zone map (만들 수 없으면 None)
+    """
+    zone_map = load_zone_map(path, stat)
+    if not build or (zone_map is not None and zone_map['size'] >= stat.st_size):
+        return zone_map
+
+    if zone_map is None:
+        builder = ZoneMapBuilder(path, stat)
+    else:
+        # 뒤에 추가됨: 마지막(짧은) 블록부터 다시 요약
+        blocks = zone_map['blocks']
+        if blocks and blocks[-1][1] - blocks[-1][0] < BLOCK_SIZE:
+            blocks.pop()
+        builder = ZoneMapBuilder(path, stat, blocks)
+
+    offset = builder.block[0]
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            pending = b''
+            while True:
+                chunk = f.read(BLOCK_SIZE)
+                if not chunk:
+                    break
+                chunk = pending + chunk
+                last_newline = chunk.rfind(b'\n')
+                if last_newline < 0:
+                    pending = chunk
+                    continue
+
+                pending = chunk[last_newline + 1:]
+                for line in chunk[:last_newline].split(b'\n'):
+                    event = usage_scanner.parse_usage_line(line)
+                    if event is not None:
+                        builder.add_event(event)
+                offset += last_newline + 1
+                builder.close_block(offset)
+    except OSError:
+        return None
+
+    builder.save()
+    return builder.zone_map
+
+
+def skip_offset(zone_map, before):
+    """before 이전 이벤트만 있는 앞쪽 블록들의 끝 offset (재스캔 시작 위치)"""
+    offset = 0
+    for block in zone_map['blocks']:
+        if block[3] is not None and block[3] >= before:
+            break
+        offset = block[1]
+    return offset
+
+
+def _iter_range_lines(f, start_offset, end_offset):
+    f.seek(start_offset)
+    remaining = end_offset - start_offset
+    pending = b''
+    while remaining > 0:
+        chunk = f.read(min(BLOCK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _iter_events(path, stat, start, end, summed=None, stats=None):
+    """
+    [start, end) 이벤트 순회 (블록 요약을 쓸 수 있으면 걸친 블록만 파싱)
+
+    summed가 주어지면 구간 안에 완전히 들어가는 블록은 파싱하지 않고 summed에 추가
+    """
+    if cold_storage.is_compressed(path):
+        for event in cold_storage.iter_compressed_events(path, stat, {}):
+            if start <= event.timestamp < end:
+                yield event
+        return
+
+    if stat.st_size < MIN_FILE_BYTES:
+        ranges = [(0, stat.st_size)]
+    else:
+        zone_map = get_zone_map(path, stat)
+        if zone_map is None:
+            return
+        ranges = []
+        for block in zone_map['blocks']:
+            min_ts, max_ts = block[2], block[3]
+            if min_ts is None or max_ts < start or min_ts >= end:
+                if stats is not None:
+                    stats['blocks_skipped'] += 1
+            elif summed is not None and start <= min_ts and max_ts < end:
+                summed.append(block)
+                if stats is not None:
+                    stats['blocks_summed'] += 1
+            else:
+                ranges.append((block[0], block[1]))
+                if stats is not None:
+                    stats['blocks_parsed'] += 1
+
+    try:
+        with open(path, 'rb') as f:
+            for start_offset, end_offset in ranges:
+                if stats is not None:
+                    stats['bytes_parsed'] += end_offset - start_offset
+                for line in _iter_range_lines(f, start_offset, end_offset):
+                    event = usage_scanner.parse_usage_line(line)
+                    if event is not None and start <= event.timestamp < end:
+                        event.file = path
+                        yield event
+    except OSError:
+        return
+
+
+def iter_range_events(session_files, start=None, end=None):
+    """
+    [start, end) 안의 usage 이벤트 순회 (구간과 겹치지 않는 블록은 읽지 않음)
+
+    Yields:
+        UsageEvent: usage 이벤트 (file 포함, 파일 안에서만 시간순)
+    """
+    start = float('-inf') if start is None else start
+    end = float('inf') if end is None else end
+    for session_file in session_files:
+        path = str(session_file)
+        try:
+            stat = usage_scanner.file_stat(session_file)
+        except OSError:
+            continue
+        yield from _iter_events(path, stat, start, end)
+
+
+def query_range(session_files, start, end):
+    """
+    [start, end) 구간의 사용량 합계
+
+    Returns:
+        tuple: (WindowUsage, stats)
+            stats: {"files", "blocks_summed", "blocks_parsed", "blocks_skipped", "bytes_parsed"}
+    """
+    from usage_engine import add_event, new_window_usage
+
+    usage = new_window_usage(start, end)
+    stats = {'files': 0, 'blocks_summed': 0, 'blocks_parsed': 0, 'blocks_skipped': 0, 'bytes_parsed': 0}
+    summed = []
+
+    for session_file in session_files:
+        path = str(session_file)
+        try:
+            stat = usage_scanner.file_stat(session_file)
+        except OSError:
+            continue
+        stats['files'] += 1
+        for event in _iter_events(path, stat, start, end, summed, stats):
+            add_event(usage, event)
+
+    for block in summed:
+        min_ts, max_ts = block[2], block[3]
+        usage.input_tokens += block[4]
+        usage.output_tokens += block[5]
+        usage.cache_read_tokens += block[6]
+        usage.cache_creation_tokens += block[7]
+        usage.messages_count += block[8]
+        if usage.oldest_message_time is None or min_ts < usage.oldest_message_time:
+            usage.oldest_message_time = min_ts
+        if usage.latest_message_time is None or max_ts > usage.latest_message_time:
+            usage.latest_message_time = max_ts
+
+    return usage, stats
+
+
+def build_all(session_files):
+    """큰 트랜스크립트의 zone map을 미리 생성/갱신"""
+    built = 0
+    for session_file in session_files:
+        path = str(session_file)
+        if cold_storage.is_compressed(path):
+            continue
+        try:
+            stat = usage_scanner.file_stat(session_file)
+        except OSError:
+            continue
+        if stat.st_size >= MIN_FILE_BYTES and get_zone_map(path, stat) is not None:
+            built += 1
+    return built
+
+
+def prune_sidecars(session_files):
+    """사라진 트랜스크립트의 sidecar 삭제"""
+    known = {sidecar_path(str(path)).name for path in session_files}
+    removed = 0
+    if ZONE_MAP_DIR.exists():
+        for sidecar in ZONE_MAP_DIR.glob('*.json'):
+            if sidecar.name not in known:
+                sidecar.unlink()
+                removed += 1
+    return removed
+
+
+def main():
+    """메인 함수"""
+    import argparse
+    from usage_engine import usage_summary
+
+    parser = argparse.ArgumentParser(description='Build and query per-transcript zone maps')
+    parser.add_argument('--build', action='store_true',
+                        help='Build or extend zone maps for large transcripts')
+    parser.add_argument('--prune', action='store_true',
+                        help='Remove zone maps of transcripts that no longer exist')
+    parser.add_argument('--query', nargs=2, metavar=('START', 'END'),
+                        help='Sum usage in [START, END) (ISO 8601)')
+    parser.add_argument('--verify', action='store_true',
+                        help='With --query: compare against a full parse')
+    args = parser.parse_args()
+
+    session_files = usage_scanner.find_all_sessions()
+
+    if args.prune:
+        print(f"🧹 Removed {prune_sidecars(session_files)} stale zone map(s)")
+
+    if args.build:
+        started = time.perf_counter()
+        built = build_all(session_files)
+        print(f"✅ {built} zone map(s) up to date ({time.perf_counter() - started:.2f}s)")
+
+    if args.query:
+        start, end = (datetime.fromisoformat(value).timestamp() for value in args.query)
+        started = time.perf_counter()
+        usage, stats = query_range(session_files, start, end)
+        elapsed = time.perf_counter() - started
+        summary = usage_summary(usage)
+        print(json.dumps({
+            'usage': {key: summary[key] for key in ('input_tokens', 'output_tokens', 'cache_read_tokens',
+                                                    'cache_creation_tokens', 'messages_count')},
+            'stats': stats,
+            'elapsed_ms': round(elapsed * 1000, 1)
+        }, indent=2))
+
+        if args.verify:
+            from usage_engine import add_event, new_window_usage
+            started = time.perf_counter()
+            full = new_window_usage(start, end)
+            for event in usage_scanner.iter_new_events(session_files, {}):
+                add_event(full, event)
+            full_elapsed = time.perf_counter() - started
+            expected = usage_summary(full)
+            mismatched = [key for key in ('input_tokens', 'output_tokens', 'cache_read_tokens',
+                                          'cache_creation_tokens', 'messages_count')
+                          if expected[key] != summary[key]]
+            if mismatched:
+                print(f"❌ Mismatch with full parse: {', '.join(mismatched)}")
+                return 1
+            print(f"✅ Matches full parse ({full_elapsed * 1000:.1f} ms)")
+
+    if not (args.build or args.prune or args.query):
+        parser.print_help()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -87,7 +87,7 @@ async function scrapeUsageData() {
     if (response && response.success) {
       await saveUsageData(response.data);
 
-      // Native messaging으로 Python 스크립트 호출
+      // Native messaging으로 Python 호스트에 전달 (실패 시 Downloads 폴더)
       await sendToMonitor(response.data);
     }
 
@@ -133,17 +133,89 @@ async function saveUsageData(data) {
   await updateBadge(data);
 }
 
+// Native messaging 호스트 (claude-usage-sync, claude-install-native-host로 등록)
+const NATIVE_HOST = 'com.claude.usage_monitor';
+const NATIVE_TIMEOUT_MS = 3000;
+
+let nativePort = null;
+let nativeRequestId = 0;
+const nativePending = new Map();
+
+// 호스트 프로세스를 한 번 띄워 두고 포트를 재사용 (스크래핑마다 프로세스 생성 안 함)
+function connectNativeHost() {
+  if (nativePort) {
+    return nativePort;
+  }
+
+  const port = chrome.runtime.connectNative(NATIVE_HOST);
+  port.onMessage.addListener((reply) => {
+    const pending = nativePending.get(reply.id);
+    if (pending) {
+      nativePending.delete(reply.id);
+      pending.resolve(reply);
+    }
+  });
+  port.onDisconnect.addListener(() => {
+    // 호스트가 설치되지 않았거나 종료됨
+    const message = chrome.runtime.lastError ? chrome.runtime.lastError.message : 'Native host disconnected';
+    nativePort = null;
+    for (const pending of nativePending.values()) {
+      pending.reject(new Error(message));
+    }
+    nativePending.clear();
+  });
+
+  nativePort = port;
+  return port;
+}
+
+// 요청/응답은 id로 매칭
+function sendNativeMessage(message) {
+  return new Promise((resolve, reject) => {
+    const id = ++nativeRequestId;
+    const timer = setTimeout(() => {
+      nativePending.delete(id);
+      reject(new Error('Native host timeout'));
+    }, NATIVE_TIMEOUT_MS);
+
+    nativePending.set(id, {
+      resolve: (reply) => { clearTimeout(timer); resolve(reply); },
+      reject: (error) => { clearTimeout(timer); reject(error); }
+    });
+
+    try {
+      connectNativeHost().postMessage({ ...message, id });
+    } catch (error) {
+      nativePending.get(id).reject(error);
+      nativePending.delete(id);
+    }
+  });
+}
+
 // Monitor에 데이터 전송
 async function sendToMonitor(data) {
-  try {
-    // 방법 1: Native messaging 사용
-    // (manifest.json에 nativeMessaging 권한 필요)
+  console.log('Sending to monitor:', data);
 
-    // 방법 2: 파일 시스템 사용 (더 간단)
-    // JSON 파일로 저장하고 Python이 읽도록
+  // 방법 1: Native messaging (파일 없이 Python 호스트에 직접 전달)
+  try {
+    const reply = await sendNativeMessage({ type: 'usage', ...data });
+    if (reply.ok) {
+      console.log('Usage data sent to native host');
+    } else {
+      // 호스트가 데이터를 거부 → 같은 데이터를 파일로 보내도 마찬가지
+      console.error('Native host rejected usage data:', reply.error);
+    }
+    return;
+  } catch (error) {
+    console.log('Native host unavailable, falling back to Downloads:', error.message);
+  }
 
-    console.log('Sending to monitor:', data);
+  // 방법 2: Downloads 폴더 (claude-extension-watcher가 감시)
+  await downloadToMonitor(data);
+}
 
+async function downloadToMonitor(data) {
+  try {
     // Chrome extension은 직접 파일 쓰기 불가
     // → Downloads API + Data URL 사용
     const jsonStr = JSON.stringify(data);
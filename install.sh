@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Claude Usage Monitor - Installation Script
-# macOS only (SwiftBar + fswatch required)
+# macOS only (SwiftBar + python3 required)
 
 set -e
 
@@ -19,21 +19,11 @@ fi
 # Check dependencies
 echo "📦 Checking dependencies..."
 
-# Check fswatch
-if ! command -v fswatch &> /dev/null; then
-    echo "❌ fswatch not found. Installing via Homebrew..."
-    if ! command -v brew &> /dev/null; then
-        echo "❌ Homebrew not installed. Please install it first:"
-        echo "   /bin/bash -c \"\$(curl -fsSL https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh)\""
-        exit 1
-    fi
-    brew install fswatch
-fi
-
-# Check jq
-if ! command -v jq &> /dev/null; then
-    echo "❌ jq not found. Installing via Homebrew..."
-    brew install jq
+# Check python3 (sync/watch/SwiftBar 출력 모두 claude-usage-sync 하나로 처리)
+if ! command -v python3 &> /dev/null; then
+    echo "❌ python3 not found. Install Xcode Command Line Tools first:"
+    echo "   xcode-select --install"
+    exit 1
 fi
 
 # Check SwiftBar
@@ -60,11 +50,17 @@ cp scripts/claude-extension-watcher ~/.local/bin/
 cp scripts/claude-start-extension-watcher ~/.local/bin/
 cp scripts/claude-sync-from-extension ~/.local/bin/
 cp scripts/claude-manual-update ~/.local/bin/
+cp scripts/claude-usage-sync ~/.local/bin/
+cp scripts/claude-install-native-host ~/.local/bin/
+mkdir -p ~/.local/share/claude-monitor
+cp scripts/com.claude.usage_monitor.json ~/.local/share/claude-monitor/
 
 chmod +x ~/.local/bin/claude-extension-watcher
 chmod +x ~/.local/bin/claude-start-extension-watcher
 chmod +x ~/.local/bin/claude-sync-from-extension
 chmod +x ~/.local/bin/claude-manual-update
+chmod +x ~/.local/bin/claude-usage-sync
+chmod +x ~/.local/bin/claude-install-native-host
 
 echo "✅ Scripts installed"
 echo ""
@@ -113,12 +109,15 @@ echo "   - Enable Developer mode"
 echo "   - Click 'Load unpacked'"
 echo "   - Select: $(pwd)/chrome-extension"
 echo ""
+echo "2. Connect the extension directly (recommended, no Downloads file):"
+echo "   claude-install-native-host <extension-id>"
+echo ""
 
 if [[ "$SKIP_SWIFTBAR" != "true" ]]; then
-    echo "2. Start Extension Watcher:"
+    echo "3. (Without native host) Start Extension Watcher:"
     echo "   claude-start-extension-watcher"
     echo ""
-    echo "3. Open SwiftBar and check the menu bar!"
+    echo "4. Open SwiftBar and check the menu bar!"
     echo ""
 fi
 